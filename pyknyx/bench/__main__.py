@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+import sys
+
+from pyknyx.bench.pipeline import main
+
+sys.exit(main())
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Address and priority objects benchmarks
+
+Implements
+==========
+
+ - B{LegacyKnxAddress}
+ - B{LegacyGroupAddress}
+ - B{LegacyIndividualAddress}
+ - B{LegacyPriority}
+
+Documentation
+=============
+
+Compares the interned, __slots__-based L{GroupAddress<pyknyx.stack.groupAddress>},
+L{IndividualAddress<pyknyx.stack.individualAddress>} and L{Priority<pyknyx.stack.priority>} with simplified copies
+of the classes they replaced (plain objects, with an instance dict, created on each access):
+
+ - B{address.fromRaw}, B{address.fromRaw.legacy}: creating the objects of a telegram from their raw value (as done
+   when decoding a cEMI frame);
+ - B{address.fromString}, B{address.fromString.legacy}: creating a group address from its string representation (as
+   done when loading a configuration).
+
+Addresses are drawn from L{DISTINCT} different values. Interning only pays off while the addresses seen fit in the
+cache: compare with L{ADDRESS_CACHE_SIZE<pyknyx.stack.knxAddress>}.
+
+Usage
+=====
+
+python -m pyknyx.bench "address.*"
+
+@license: GPL
+"""
+
+import itertools
+import random
+import struct
+
+from pyknyx.bench.harness import benchmark
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.individualAddress import IndividualAddress
+from pyknyx.stack.priority import Priority
+
+TELEGRAMS = 10000  # number of different telegrams
+DISTINCT = 1000  # number of distinct addresses
+
+
+class LegacyKnxAddress(object):
+    """ KnxAddress, as it was before interning
+
+    Kept here only as a benchmark reference.
+    """
+    def __init__(self, raw=0x0000):
+        super(LegacyKnxAddress, self).__init__()
+
+        if isinstance(raw, bytes) and len(raw) == 2:
+            raw = struct.unpack(">H", raw)[0]
+        if isinstance(raw, int):
+            if not 0 <= raw <= 0xffff:
+                raise ValueError("address %s not in range(0, 0xffff)" % hex(raw))
+        else:
+            raise ValueError("invalid address (%r)" % repr(raw))
+        self._raw = raw
+
+
+class LegacyGroupAddress(LegacyKnxAddress):
+    """ GroupAddress, as it was before interning
+
+    Kept here only as a benchmark reference.
+    """
+    def __init__(self, address="0/0/0", outFormatLevel=3):
+        if isinstance(address, LegacyGroupAddress):
+            address = address._raw
+
+        elif isinstance(address, str):
+            address = address.strip().split('/')
+            address = [int(val) for val in address]
+
+        if isinstance(address, int):
+            pass
+        elif len(address) == 2:
+            if not 0 <= address[0] <= 0x1f or not 0 <= address[1] <= 0x7ff:
+                raise ValueError("group address out of range",address)
+            address = address[0] << 11 | address[1]
+        elif len(address) == 3:
+            if not 0 <= address[0] <= 0x1f or not 0 <= address[1] <= 0x7 or not 0 <= address[2] <= 0xff:
+                raise ValueError("group address out of range",address)
+            address = address[0] << 11 | address[1] << 8 | address[2]
+
+        if outFormatLevel not in (2, 3):
+            raise ValueError("outFormatLevel must be 2 or 3", outFormatLevel)
+        self._outFormatLevel = outFormatLevel
+
+        super(LegacyGroupAddress, self).__init__(address)
+
+
+class LegacyIndividualAddress(LegacyKnxAddress):
+    """ IndividualAddress, as it was before interning
+
+    Kept here only as a benchmark reference.
+    """
+    def __init__(self, address="0.0.0"):
+        if isinstance(address, LegacyIndividualAddress):
+            address = address._raw
+        elif isinstance(address, str):
+            address = address.strip().split('.')
+            address = [int(val) for val in address]
+            if not 0 <= address[0] <= 0xf or not 0 <= address[1] <= 0xf or not 0 <= address[2] <= 0xff:
+                raise ValueError("individual address out of range")
+            address = address[0] << 12 | address[1] << 8 | address[2]
+
+        super(LegacyIndividualAddress, self).__init__(address)
+
+
+class LegacyPriority(object):
+    """ Priority, as it was before singletons
+
+    Kept here only as a benchmark reference.
+    """
+    def __init__(self, level='low'):
+        super(LegacyPriority, self).__init__()
+
+        if isinstance(level, LegacyPriority):
+            level = level._level
+        elif isinstance(level, str):
+            level = Priority.CONV_TABLE[level]
+        elif isinstance(level, int):
+            if not 0x00 <= level <= 0x03:
+                raise ValueError("level %d not in (0x00, 0x01, 0x02, 0x03)" % level)
+
+        self._level = level
+
+
+def _telegrams():
+    """ Build (src, gad, priority) raw values of the benchmark telegrams
+    """
+    rand = random.Random(0)
+    gads = [rand.randrange(1, 0x10000) for i in range(DISTINCT)]
+    srcs = [rand.randrange(1, 0x10000) for i in range(DISTINCT)]
+    return [(rand.choice(srcs), rand.choice(gads), rand.randrange(4)) for i in range(TELEGRAMS)]
+
+
+@benchmark("address.fromRaw", "create the addresses and priority of a telegram from their raw value")
+def _fromRaw():
+    telegrams = itertools.cycle(_telegrams())
+
+    def op():
+        src, gad, level = next(telegrams)
+        return IndividualAddress.fromRaw(src), GroupAddress.fromRaw(gad), Priority(level)
+    return op
+
+
+@benchmark("address.fromRaw.legacy", "same as address.fromRaw, with the classes replaced by interning")
+def _legacyFromRaw():
+    telegrams = itertools.cycle(_telegrams())
+
+    def op():
+        src, gad, level = next(telegrams)
+        return LegacyIndividualAddress(src), LegacyGroupAddress(gad), LegacyPriority(level)
+    return op
+
+
+@benchmark("address.fromString", "create a group address from its string representation")
+def _fromString():
+    strings = itertools.cycle([str(GroupAddress.fromRaw(gad)) for src, gad, level in _telegrams()])
+    return lambda: GroupAddress(next(strings))
+
+
+@benchmark("address.fromString.legacy", "same as address.fromString, with the class replaced by interning")
+def _legacyFromString():
+    strings = itertools.cycle([str(GroupAddress.fromRaw(gad)) for src, gad, level in _telegrams()])
+    return lambda: LegacyGroupAddress(next(strings))
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+DPT translators benchmarks
+
+Documentation
+=============
+
+Value to frame and frame to value conversions of the L{DPTXlators<pyknyx.core.dptXlator.dptXlatorBase>}:
+
+ - B{dptXlator.<type>.encode/decode}: scalar conversions, for each main type handled by the
+   L{DPTXlatorFactory<pyknyx.core.dptXlator.dptXlatorFactory>};
+ - B{dptXlator.<type>.batchEncode/batchDecode}: batch conversions of L{BATCH_SIZE} random values
+   (L{valuesToFrames<pyknyx.core.dptXlator.dptXlatorBase.DPTXlatorBase.valuesToFrames>} and
+   L{framesToValues<pyknyx.core.dptXlator.dptXlatorBase.DPTXlatorBase.framesToValues>}), as done when
+   post-processing a telegram log, for the numeric main types (needs numpy).
+
+Usage
+=====
+
+python -m pyknyx.bench "dptXlator.*"
+
+@license: GPL
+"""
+
+import random
+
+from pyknyx.bench.harness import benchmark
+from pyknyx.core.dptXlator.dptXlatorBase import numpy
+from pyknyx.core.dptXlator.dptXlatorFactory import DPTXlatorFactory
+
+BATCH_DPT_IDS = ("5.001", "6.010", "7.001", "8.010", "9.001", "12.001", "13.010", "14.056")
+BATCH_SIZE = 1000  # number of values per batch conversion
+
+
+def _registerScalar():
+    factory = DPTXlatorFactory()
+    for dptId in factory.handledMainDPTIDs:
+        name = str(dptId).split('.')[0]
+
+        def encode(dptId=dptId):
+            dptXlator = factory.create(dptId)
+            value = dptXlator.dataToValue(dptXlator.frameToData(dptXlator.dataToFrame(1)))
+            return lambda: dptXlator.dataToFrame(dptXlator.valueToData(value))
+
+        def decode(dptId=dptId):
+            dptXlator = factory.create(dptId)
+            frame = dptXlator.dataToFrame(1)
+            return lambda: dptXlator.dataToValue(dptXlator.frameToData(frame))
+
+        benchmark("dptXlator.%s.encode" % name, "convert a %s value to a frame" % dptId)(encode)
+        benchmark("dptXlator.%s.decode" % name, "convert a %s frame to a value" % dptId)(decode)
+
+_registerScalar()
+
+
+def _frames(dptXlator):
+    """ Build random frames, whose values can be converted back
+    """
+    rand = random.Random(0)
+    low, high = dptXlator.dpt.limits
+    frames = []
+    while len(frames) < BATCH_SIZE:
+        frame = dptXlator.dataToFrame(rand.randrange(1 << 8 * dptXlator.typeSize))
+        value = dptXlator.dataToValue(dptXlator.frameToData(frame))
+        if low <= value <= high:  # skip NaNs, and values beyond the DPT limits
+            frames.append(bytes(frame))
+    return b"".join(frames)
+
+
+def _registerBatch():
+    for dptId in BATCH_DPT_IDS:
+        name = dptId.split('.')[0]
+
+        def encode(dptId=dptId):
+            dptXlator = DPTXlatorFactory().create(dptId)
+            frames = _frames(dptXlator)
+            values = dptXlator.framesToValues(frames)
+            size = dptXlator.typeSize
+            scalar = b"".join(bytes(dptXlator.dataToFrame(dptXlator.valueToData(
+                dptXlator.dataToValue(dptXlator.frameToData(frames[i:i+size]))))) for i in range(0, len(frames), size))
+            if dptXlator.valuesToFrames(values).tobytes() != scalar:
+                raise AssertionError("batch and scalar conversions differ for %s" % dptId)
+            return lambda: dptXlator.valuesToFrames(values)
+
+        def decode(dptId=dptId):
+            dptXlator = DPTXlatorFactory().create(dptId)
+            frames = _frames(dptXlator)
+            return lambda: dptXlator.framesToValues(frames)
+
+        benchmark("dptXlator.%s.batchEncode" % name, "convert %d %s values to frames" % (BATCH_SIZE, dptId))(encode)
+        benchmark("dptXlator.%s.batchDecode" % name, "convert %d %s frames to values" % (BATCH_SIZE, dptId))(decode)
+
+if numpy is not None:
+    _registerBatch()
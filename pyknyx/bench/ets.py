@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+ETS engines benchmarks
+
+Documentation
+=============
+
+Compares the threaded L{ETS<pyknyx.core.ets.ETS>} with the L{AsyncETS<pyknyx.core.ets.AsyncETS>}:
+
+ - B{ets.writeNotify.<engine>}: a toggle device writes a value to an actor device, registered in the same ETS; the
+   operation lasts from the write to the call of the actor functional block notifier method;
+ - B{ets.writeNotify.<engine>.udp}: same, with each device in its own ETS, and frames going through the multicast
+   transceivers;
+ - B{ets.idle.<engine>}: a 100ms sleep while both devices are running, without traffic; the CPU time per operation
+   gives the cost of the idle threads.
+
+Usage
+=====
+
+python -m pyknyx.bench "ets.writeNotify.*" "ets.idle.*"
+
+@license: GPL
+"""
+
+import os
+import threading
+import time
+
+from pyknyx.bench.harness import benchmark
+from pyknyx.core.device import Device, LNK
+from pyknyx.core.functionalBlock import FunctionalBlock, FB
+from pyknyx.core.datapoint import DP
+from pyknyx.core.groupObject import GO
+from pyknyx.core.ets import ETS, AsyncETS
+from pyknyx.services.notifier import Notifier
+
+ENGINES = (("threaded", ETS), ("async", AsyncETS))
+
+IDLE_PERIOD = 0.1  # duration of an idle operation, in s
+
+
+class _ToggleFB(FunctionalBlock):
+    change = DP(dptId="1.001", default="Off", access="output")
+    GO_01 = GO(dp=change, flags="CT", priority="low")
+    DESC = "ToggleFB"
+
+
+class _ActorFB(FunctionalBlock):
+    change = DP(dptId="1.001", default="Off", access="input")
+    GO_01 = dict(dp=change, flags="CW", priority="low")
+    DESC = "ActorFB"
+
+    received = None
+
+    @Notifier().datapoint(dp="change", condition="always")
+    def changed(self, event):
+        self.received.set()
+
+
+class _Toggle(Device):
+    toggle_fb = FB(_ToggleFB, desc="binary input")
+    LNK_01 = LNK(toggle_fb.change, gad="1/1/1")
+    DESC = "Toggle"
+
+
+class _Actor(Device):
+    actor_fb = FB(_ActorFB, desc="binary output")
+    LNK_01 = LNK(actor_fb.change, gad="1/1/1")
+    DESC = "Actor"
+
+
+def _start(ets):
+    """ Start ETS, and return a function stopping it
+    """
+    if isinstance(ets, AsyncETS):
+        thread = threading.Thread(target=ets.run)
+        thread.setDaemon(True)
+        thread.start()
+
+        def stop():
+            ets.stop()
+            thread.join()
+    else:
+        ets.start()
+        stop = ets.stop
+
+    return stop
+
+
+def _setup(etsCls, udp):
+    """ Create and start the devices
+
+    @return: toggle functional block change datapoint, actor functional block, and a function stopping the devices
+    @rtype: tuple
+    """
+    if udp:
+        transParams = dict(mcastAddr="224.55.36.73", mcastPort=os.getpid() & 0x7fff | 0x8000)
+        ets = etsCls("1.2.0", transParams=transParams)
+        ets2 = etsCls("1.3.0", transParams=transParams)
+    else:
+        ets = ets2 = etsCls("1.2.0", transCls=None)
+    actor = _Actor(ets, "1.2.3")
+    toggle = _Toggle(ets2, "1.3.4" if udp else "1.2.4")
+    actorFB = actor.fb["actor_fb"]
+    actorFB.received = threading.Event()
+
+    stops = [_start(ets)]
+    if ets2 is not ets:
+        stops.append(_start(ets2))
+    time.sleep(0.5)  # let devices start
+
+    def stop():
+        for stop_ in stops:
+            stop_()
+
+    return toggle.fb["toggle_fb"].dp["change"], actorFB, stop
+
+
+def _registerEngines():
+    for name, etsCls in ENGINES:
+        for udp in (False, True):
+            def writeNotify(etsCls=etsCls, udp=udp):
+                change, actorFB, stop = _setup(etsCls, udp)
+                values = ("Off", "On")
+                state = [0]
+
+                def op():
+                    state[0] ^= 1
+                    actorFB.received.clear()
+                    change.value = values[state[0]]
+                    if not actorFB.received.wait(1):
+                        raise RuntimeError("frame lost")
+                return op, stop
+
+            benchmark("ets.writeNotify.%s%s" % (name, ".udp" if udp else ""),
+                      "datapoint write, through %s ETS%s, up to the notifier method" %
+                      (name, " and the multicast transceivers" if udp else ""))(writeNotify)
+
+        def idle(etsCls=etsCls):
+            change, actorFB, stop = _setup(etsCls, False)
+            return (lambda: time.sleep(IDLE_PERIOD)), stop
+
+        benchmark("ets.idle.%s" % name, "%dms without traffic, with %s ETS running" %
+                  (IDLE_PERIOD * 1000, name))(idle)
+
+_registerEngines()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+FunctionalBlock instantiation benchmarks
+
+Implements
+==========
+
+ - B{BenchFB}
+
+Documentation
+=============
+
+Measures the startup cost of an installation with many identical FunctionalBlocks:
+
+ - B{functionalBlock.instantiate}: creating an instance of a FunctionalBlock class with 6 Datapoints and 6
+   GroupObjects, using the L{FunctionalBlockSchema<pyknyx.core.functionalBlock>} compiled on first instantiation;
+ - B{functionalBlock.instantiate.rescan}: same, with the schema dropped before each instantiation, which costs the
+   full class scan the FunctionalBlock did on every instantiation before the schema was introduced.
+
+Usage
+=====
+
+python -m pyknyx.bench "functionalBlock.*"
+
+@license: GPL
+"""
+
+import itertools
+
+from pyknyx.bench.harness import benchmark
+from pyknyx.core.datapoint import DP
+from pyknyx.core.groupObject import GO
+from pyknyx.core.functionalBlock import FunctionalBlock
+
+
+class BenchFB(FunctionalBlock):
+    DP_01 = dict(name="temperature", access="output", dptId="9.001", default=19.)
+    DP_02 = dict(name="humidity", access="output", dptId="9.007", default=50.)
+    DP_03 = dict(name="wind_speed", access="output", dptId="9.005", default=0.)
+    DP_04 = dict(name="wind_alarm", access="output", dptId="1.005", default="No alarm")
+    DP_05 = dict(name="wind_speed_limit", access="input", dptId="9.005", default=15.)
+    wind_alarm_enable = DP(access="input", dptId="1.003", default="Disable")
+
+    GO_01 = dict(dp="temperature", flags="CRT", priority="low")
+    GO_02 = dict(dp="humidity", flags="CRT", priority="low")
+    GO_03 = dict(dp="wind_speed", flags="CRT", priority="low")
+    GO_04 = dict(dp="wind_alarm", flags="CRT", priority="low")
+    GO_05 = dict(dp="wind_speed_limit", flags="CWU", priority="low")
+    GO_06 = GO(wind_alarm_enable, flags="CWU", priority="low")
+
+    DESC = "Benchmark FB"
+
+
+@benchmark("functionalBlock.instantiate", "create a FunctionalBlock with 6 Datapoints and 6 GroupObjects")
+def _instantiate():
+    count = itertools.count()
+    return lambda: BenchFB(None, "fb_%d" % next(count))
+
+
+@benchmark("functionalBlock.instantiate.rescan", "same as functionalBlock.instantiate, without the compiled schema")
+def _instantiateRescan():
+    count = itertools.count()
+
+    def op():
+        BenchFB.__dict__.get("_schema") and delattr(BenchFB, "_schema")  # force a full class scan
+        return BenchFB(None, "fb_%d" % next(count))
+    return op
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Benchmark harness
+
+Implements
+==========
+
+ - B{Benchmark}
+ - B{benchmark}
+ - B{getBenchmarks}
+ - B{measure}
+ - B{runBenchmarks}
+ - B{formatResult}
+ - B{formatHeader}
+ - B{formatResults}
+ - B{compareResults}
+
+Documentation
+=============
+
+Benchmarks are registered with the L{benchmark} decorator, on a setup function: the setup function is called once
+before the measure, and returns the operation to measure (a callable without argument), or an (operation, teardown)
+tuple.
+
+The operation is first run for a warm-up period, while the number of operations per timed batch is calibrated, so a
+batch lasts at least L{BATCH_TIME}: this keeps the timer overhead out of the throughput of the fastest operations.
+The measure duration is then split in two phases:
+
+ - batches are run to get the number of operations per second, and the CPU time used per operation (by the whole
+   process, so the work done by other threads, if any, is included);
+ - operations are run and timed one at a time, to get the median and 99th percentile of their latency. The overhead
+   of the timing loop, measured with an empty operation, is subtracted from each sample.
+
+Results are plain dicts, which can be dumped as JSON, and compared with the results of a previous run.
+
+Usage
+=====
+
+>>> @benchmark("queue.add", "PriorityQueue add")
+... def _queueAdd():
+...     queue = PriorityQueue(PRIORITY_DISTRIBUTION)
+...     return lambda: queue.add(1, Priority('low'))
+>>> print(formatResults(runBenchmarks(["queue.*"])))
+
+@license: GPL
+"""
+
+
+import array
+import collections
+import fnmatch
+import gc
+import platform
+import time
+import timeit
+
+from pyknyx.common import config
+
+DEFAULT_DURATION = 1.  # measure duration of a benchmark, in s
+WARMUP_DURATION = 0.2  # warm-up duration of a benchmark, in s
+BATCH_TIME = 0.0005  # min. duration of a timed batch, in s
+
+_timer = timeit.default_timer
+try:
+    _cpuTimer = time.process_time
+except AttributeError:
+    _cpuTimer = time.clock  # Python 2
+
+Benchmark = collections.namedtuple("Benchmark", "name desc setup")
+
+_benchmarks = collections.OrderedDict()
+
+
+def benchmark(name, desc=""):
+    """ Register a benchmark setup function
+
+    @param name: benchmark name (dotted, e.g. 'cemi.parse')
+    @type name: str
+
+    @param desc: benchmark description
+    @type desc: str
+    """
+    def decorator(setup):
+        _benchmarks[name] = Benchmark(name, desc, setup)
+        return setup
+
+    return decorator
+
+
+def getBenchmarks(patterns=None):
+    """ Return the registered benchmarks matching the given patterns
+
+    @param patterns: shell-style patterns (all benchmarks if empty)
+    @type patterns: list of str
+
+    @rtype: list of L{Benchmark}
+    """
+    if not patterns:
+        return list(_benchmarks.values())
+    return [bench for name, bench in _benchmarks.items() if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+
+
+def _percentile(values, percent):
+    return values[min(len(values) - 1, int(len(values) * percent / 100.))]
+
+
+def _nop():
+    pass
+
+
+def _timeOps(op, duration):
+    """ Run an operation for the given duration, timing each call
+
+    @return: duration of each call, including the loop overhead, in s
+    @rtype: array of float
+    """
+    samples = array.array('d')
+    append = samples.append
+    last = _timer()
+    end = last + duration
+    while True:
+        op()
+        now = _timer()
+        append(now - last)
+        last = now
+        if now >= end:
+            break
+
+    return samples
+
+
+def measure(op, duration=DEFAULT_DURATION, warmup=WARMUP_DURATION):
+    """ Measure an operation
+
+    @param op: operation to measure
+    @type op: callable
+
+    @param duration: measure duration, in s
+    @type duration: float
+
+    @param warmup: warm-up duration, in s
+    @type warmup: float
+
+    @return: ops (operations run in batches), seconds (time of the batches), opsPerSec, cpu (CPU time per operation,
+             in s), batch (operations per timed batch), samples (operations timed one at a time), p50, p99 (latency
+             of a single operation, in s), overhead (timing overhead subtracted from the latency, in s)
+    @rtype: dict
+    """
+    # Warm up, and calibrate the batch size
+    batch = 1
+    end = _timer() + warmup
+    while True:
+        start = _timer()
+        for i in range(batch):
+            op()
+        now = _timer()
+        if now - start < BATCH_TIME:
+            batch *= 2
+        elif now >= end:
+            break
+
+    # Throughput
+    gc.collect()
+    ops = 0
+    total = 0.
+    cpu = _cpuTimer()
+    while total < duration / 2.:
+        start = _timer()
+        for i in range(batch):
+            op()
+        total += _timer() - start
+        ops += batch
+    cpu = _cpuTimer() - cpu
+
+    # Latency
+    overhead = sorted(_timeOps(_nop, min(duration / 10., 0.05)))
+    overhead = _percentile(overhead, 50)
+    gc.collect()
+    samples = sorted(_timeOps(op, duration / 2.))
+    return dict(ops=ops, seconds=total, opsPerSec=ops / total, cpu=cpu / ops, batch=batch, samples=len(samples),
+                p50=max(_percentile(samples, 50) - overhead, 0.), p99=max(_percentile(samples, 99) - overhead, 0.),
+                overhead=overhead)
+
+
+def runBenchmarks(patterns=None, duration=DEFAULT_DURATION, warmup=WARMUP_DURATION, callback=None):
+    """ Run the registered benchmarks matching the given patterns
+
+    @param callback: called with each result, as soon as it is available
+    @type callback: callable
+
+    @return: results, with the run environment
+    @rtype: dict
+    """
+    results = []
+    for bench in getBenchmarks(patterns):
+        setup = bench.setup()
+        op, teardown = setup if isinstance(setup, tuple) else (setup, None)
+        try:
+            result = measure(op, duration, warmup)
+        finally:
+            if teardown is not None:
+                teardown()
+        result["name"] = bench.name
+        results.append(result)
+        if callback is not None:
+            callback(result)
+
+    return dict(version=config.APP_VERSION, python=platform.python_version(),
+                implementation=platform.python_implementation(), machine=platform.machine(),
+                platform=platform.platform(), time=time.time(), duration=duration, results=results)
+
+
+def formatResult(result, baseline=None):
+    """ Format a result as a table line (see L{formatResults})
+    """
+    line = "%-36s %14.0f %12.3f %12.3f %12.3f" % (result["name"], result["opsPerSec"], result["p50"] * 1e6,
+                                                 result["p99"] * 1e6, result["cpu"] * 1e6)
+    if baseline is not None:
+        reference = baseline.get(result["name"])
+        if reference is None:
+            line += " %10s" % "-"
+        else:
+            line += " %+9.1f%%" % ((result["opsPerSec"] / reference["opsPerSec"] - 1) * 100)
+    return line
+
+
+def formatHeader(baseline=False):
+    header = "%-36s %14s %12s %12s %12s" % ("benchmark", "ops/s", "p50 (us)", "p99 (us)", "CPU/op (us)")
+    if baseline:
+        header += " %10s" % "vs base"
+    return header
+
+
+def formatResults(run, baseline=None):
+    """ Format results as a table
+
+    @param run: results, as returned by L{runBenchmarks}
+    @type run: dict
+
+    @param baseline: results of a previous run, to compare the throughput with
+    @type baseline: dict
+
+    @rtype: str
+    """
+    if baseline is not None:
+        baseline = dict((result["name"], result) for result in baseline["results"])
+    lines = [formatHeader(baseline is not None)]
+    lines.extend(formatResult(result, baseline) for result in run["results"])
+    return "\n".join(lines)
+
+
+def compareResults(run, baseline, threshold=0.1):
+    """ Return the benchmarks whose throughput dropped compared to a previous run
+
+    @param threshold: min. relative drop reported
+    @type threshold: float
+
+    @return: (name, ratio) tuples, where ratio is the throughput relative to the baseline
+    @rtype: list
+    """
+    reference = dict((result["name"], result["opsPerSec"]) for result in baseline["results"])
+    regressions = []
+    for result in run["results"]:
+        if result["name"] in reference:
+            ratio = result["opsPerSec"] / reference[result["name"]]
+            if ratio < 1 - threshold:
+                regressions.append((result["name"], ratio))
+
+    return regressions
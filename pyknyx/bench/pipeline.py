@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Frame pipeline benchmark suite
+
+Implements
+==========
+
+ - B{main}
+
+Documentation
+=============
+
+Repeatable micro and macro benchmarks of the frame pipeline, run with the L{harness<pyknyx.bench.harness>}:
+
+ - B{cemi.parse}, B{cemi.serialize}: decoding a received L{CEMILData<pyknyx.stack.cemi.cemiLData>} frame (with its
+   addresses and NPDU), and building a frame to send;
+ - B{cemi.template}: building the same frame from a prebuilt
+   L{CEMILDataTemplate<pyknyx.stack.cemi.cemiLDataTemplate>};
+ - B{knxnetip.roundtrip}: building a L{KNXnetIPHeader<pyknyx.stack.knxnetip.knxNetIPHeader>} for a routing
+   indication, and decoding it back;
+ - B{ets.processFrame.<N>}: routing a group frame to N stacks subscribed to its GAD;
+ - B{groupDataInd.notify}: from L{A_GroupDataService.groupDataInd<pyknyx.stack.layer7.a_groupDataService>} to the
+   L{GroupObject<pyknyx.core.groupObject>} write, and the L{Notifier<pyknyx.services.notifier>} job of the
+   functional block;
+ - B{loopback.writeReceive}: a datapoint written in a device, sent through its ETS and a deterministic
+   L{LoopbackBus<pyknyx.stack.transceiver.loopbackTransceiver>}, up to the notifier job of a device of another ETS.
+
+L{main} runs these benchmarks, and those registered by the other modules of the package (L{address}, L{dptXlator},
+L{ets}, L{functionalBlock}, L{priorityQueue}, L{scheduler}).
+
+Inputs are fixed, so successive runs measure the same work. Results can be saved as JSON (B{--json}), and compared
+with a previous run (B{--baseline}): the exit status is then 1 if a throughput dropped by more than B{--threshold}.
+
+Usage
+=====
+
+python -m pyknyx.bench --duration 1 --json results.json
+python -m pyknyx.bench "cemi.*" "ets.*" --baseline results.json
+
+@license: GPL
+"""
+
+
+import argparse
+import json
+import sys
+
+from pyknyx.bench import address, dptXlator, ets, functionalBlock, priorityQueue, scheduler  # register benchmarks
+from pyknyx.bench.harness import benchmark, getBenchmarks, runBenchmarks, formatHeader, formatResult, \
+                                  compareResults, DEFAULT_DURATION, WARMUP_DURATION
+from pyknyx.core.datapoint import DP
+from pyknyx.core.device import Device, LNK
+from pyknyx.core.ets import ETS
+from pyknyx.core.functionalBlock import FunctionalBlock, FB
+from pyknyx.core.groupListener import GroupListener
+from pyknyx.core.groupObject import GO
+from pyknyx.services.logger import logging
+from pyknyx.services.notifier import Notifier
+from pyknyx.stack.cemi.cemiLData import CEMILData
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.individualAddress import IndividualAddress
+from pyknyx.stack.knxnetip.knxNetIPHeader import KNXnetIPHeader
+from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceBroadcast
+from pyknyx.stack.priority import Priority
+from pyknyx.stack.stack import Stack
+from pyknyx.stack.transceiver.loopbackTransceiver import LoopbackBus, LoopbackTransceiver
+from pyknyx.tools.testing import makeCEMI
+
+FANOUTS = (1, 10, 100)
+
+FRAME = bytearray(b"\x29\x00\xbc\xd0\x11\x0e\x09\x01\x01\x00\x81")  # GroupValue_Write 1 to 1/1/1
+
+
+@benchmark("cemi.parse", "decode a received cEMI frame")
+def _cemiParse():
+    def op():
+        cEMI = CEMILData(FRAME, wrap=True)
+        return cEMI.sourceAddress, cEMI.destinationAddress, cEMI.priority, cEMI.npdu
+    return op
+
+
+@benchmark("cemi.serialize", "build a cEMI frame to send")
+def _cemiSerialize():
+    src = IndividualAddress("1.1.14")
+    dest = GroupAddress("1/1/1")
+    priority = Priority('low')
+    npdu = bytearray(b"\x01\x00\x81")
+
+    def op():
+        cEMI = CEMILData()
+        cEMI.messageCode = CEMILData.MC_LDATA_REQ
+        cEMI.sourceAddress = src
+        cEMI.destinationAddress = dest
+        cEMI.priority = priority
+        cEMI.hopCount = 6
+        cEMI.npdu = npdu
+        return cEMI.frame.raw
+    return op
+
+
+@benchmark("cemi.template", "build a cEMI frame to send from a template")
+def _cemiTemplate():
+    ets = ETS("1.1.0", transCls=None)
+    stack = Stack(ets, "1.1.14")
+    template = stack.agds.groupValueWriteTemplate(GroupAddress("1/1/1"), Priority('low'), 0)
+    data = bytearray(b"\x01")
+
+    def op():
+        return template.make(data).frame.raw
+    return op
+
+
+@benchmark("knxnetip.roundtrip", "build and decode a KNXnet/IP routing indication header")
+def _knxnetipRoundtrip():
+    length = len(FRAME)
+
+    def op():
+        frame = KNXnetIPHeader(service=KNXnetIPHeader.ROUTING_IND, serviceLength=length).frame + FRAME
+        return KNXnetIPHeader(frame).service
+    return op
+
+
+class _NullListener(GroupListener):
+
+    def onWrite(self, src, data):
+        pass
+
+    def onRead(self, src):
+        pass
+
+    def onResponse(self, src, data):
+        pass
+
+
+class _NullBroadcast(L_DataServiceBroadcast):
+
+    def dataInd(self, cEMI):
+        pass
+
+
+def _registerFanouts():
+    for stacks in FANOUTS:
+        def setup(stacks=stacks):
+            ets = ETS("1.2.0", addrRange=stacks + 1, transCls=None, processImage=False)
+            listener = _NullListener()
+            for i in range(stacks):
+                Stack(ets, "1.2.%d" % (i + 1)).agds.subscribe("1/1/1", listener)
+            source = _NullBroadcast(ets)
+            cEMI = makeCEMI("1/1/1", src="1.1.14")
+            return lambda: ets.processFrame(source, cEMI)
+
+        benchmark("ets.processFrame.%d" % stacks, "route a group frame to %d stacks" % stacks)(setup)
+
+_registerFanouts()
+
+
+class _ToggleFB(FunctionalBlock):
+    change = DP(dptId="1.001", default="Off", access="output")
+    GO_01 = GO(dp=change, flags="CT", priority="low")
+    DESC = "ToggleFB"
+
+
+class _ActorFB(FunctionalBlock):
+    change = DP(dptId="1.001", default="Off", access="input")
+    GO_01 = GO(dp=change, flags="CW", priority="low")
+    DESC = "ActorFB"
+
+    received = 0
+
+    @Notifier().datapoint(dp="change", condition="always")
+    def changed(self, event):
+        self.received += 1
+
+
+class _Toggle(Device):
+    toggle_fb = FB(_ToggleFB, desc="binary input")
+    LNK_01 = LNK(toggle_fb.change, gad="1/1/1")
+    DESC = "Toggle"
+
+
+class _Actor(Device):
+    actor_fb = FB(_ActorFB, desc="binary output")
+    LNK_01 = LNK(actor_fb.change, gad="1/1/1")
+    DESC = "Actor"
+
+
+@benchmark("groupDataInd.notify", "group write indication, up to the functional block notifier job")
+def _groupDataIndNotify():
+    ets = ETS("1.2.0", transCls=None)
+    actor = _Actor(ets, "1.2.3")
+    agds = actor.stack.agds
+    src = IndividualAddress("1.1.14")
+    gad = GroupAddress("1/1/1")
+    priority = Priority('low')
+    aPDUs = (bytearray(b"\x00\x80"), bytearray(b"\x00\x81"))
+    state = [0]
+
+    def op():
+        state[0] ^= 1
+        agds.groupDataInd(src, gad, priority, aPDUs[state[0]])
+    return op
+
+
+@benchmark("loopback.writeReceive", "datapoint write, through 2 ETS and a loopback bus, up to the notifier job")
+def _loopbackWriteReceive():
+    bus = LoopbackBus(deterministic=True)
+    ets1 = ETS("1.1.0", transCls=LoopbackTransceiver, transParams=dict(bus=bus))
+    ets2 = ETS("1.2.0", transCls=LoopbackTransceiver, transParams=dict(bus=bus))
+    toggle = _Toggle(ets1, "1.1.1")
+    actor = _Actor(ets2, "1.2.1")
+    change = toggle.fb["toggle_fb"].dp["change"]
+    actorFB = actor.fb["actor_fb"]
+    values = ("Off", "On")
+    state = [0]
+
+    def op():
+        state[0] ^= 1
+        received = actorFB.received
+        change.value = values[state[0]]
+        bus.run()
+        if actorFB.received != received + 1:
+            raise RuntimeError("frame lost")
+    return op, bus.close
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="PyKNyX benchmark suite")
+    parser.add_argument("patterns", nargs="*", metavar="PATTERN",
+                        help="only run the benchmarks matching these shell-style patterns")
+    parser.add_argument("-l", "--list", action="store_true",
+                        help="list the benchmarks, and exit")
+    parser.add_argument("-d", "--duration", type=float, default=DEFAULT_DURATION,
+                        help="measure duration of each benchmark, in s")
+    parser.add_argument("-w", "--warmup", type=float, default=WARMUP_DURATION,
+                        help="warm-up duration of each benchmark, in s")
+    parser.add_argument("-j", "--json", metavar="FILE",
+                        help="save the results as JSON ('-' for stdout)")
+    parser.add_argument("-b", "--baseline", metavar="FILE",
+                        help="compare with the JSON results of a previous run")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+                        help="relative throughput drop reported as a regression")
+    args = parser.parse_args(args)
+
+    logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+    if args.list:
+        for bench in getBenchmarks(args.patterns):
+            print("%-36s %s" % (bench.name, bench.desc))
+        return 0
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    reference = None if baseline is None else dict((result["name"], result) for result in baseline["results"])
+
+    # The table goes to stderr when the JSON results go to stdout
+    out = sys.stderr if args.json == '-' else sys.stdout
+    out.write(formatHeader(baseline is not None) + "\n")
+
+    def callback(result):
+        out.write(formatResult(result, reference) + "\n")
+        out.flush()
+
+    run = runBenchmarks(args.patterns, args.duration, args.warmup, callback)
+
+    if args.json == '-':
+        json.dump(run, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(run, f, indent=1)
+
+    if baseline is not None:
+        regressions = compareResults(run, baseline, args.threshold)
+        for name, ratio in regressions:
+            out.write("regression: %s at %.1f%% of baseline\n" % (name, ratio * 100))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
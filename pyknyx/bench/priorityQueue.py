@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+PriorityQueue benchmarks
+
+Implements
+==========
+
+ - B{LegacyPriorityQueue}
+
+Documentation
+=============
+
+Compares the deque-based L{PriorityQueue<pyknyx.stack.priorityQueue>} with the list-based implementation it
+replaced (B{LegacyPriorityQueue}, one list per level and B{pop(0)}), for growing numbers of queued elements:
+
+ - B{priorityQueue.addRemove}: adding an element to an empty queue, and removing it;
+ - B{priorityQueue.addRemove.<depth>}, B{priorityQueue.addRemove.<depth>.legacy}: adding an element to a queue
+   holding <depth> elements spread over all priority levels, and removing one;
+ - B{priorityQueue.addDrain.<depth>}: same, with L{QUEUE_BATCH_SIZE<pyknyx.stack.layer2.l_dataService>} elements
+   added one at a time, and removed at once with B{drainUpTo}.
+
+The legacy queue is O(n) per removal.
+
+Usage
+=====
+
+python -m pyknyx.bench "priorityQueue.*"
+
+@license: GPL
+"""
+
+import threading
+
+from pyknyx.bench.harness import benchmark
+from pyknyx.stack.priority import Priority
+from pyknyx.stack.priorityQueue import PriorityQueue
+from pyknyx.stack.layer2.l_dataService import PRIORITY_DISTRIBUTION, QUEUE_BATCH_SIZE
+
+DEPTHS = (10000, 100000)
+
+PRIORITIES = [Priority(level) for level in range(len(PRIORITY_DISTRIBUTION))]
+
+
+class LegacyPriorityQueue(object):
+    """ List-based PriorityQueue, as it was before the deque rewrite
+
+    Kept here only as a benchmark reference.
+    """
+    def __init__(self, priorityDistribution):
+        super(LegacyPriorityQueue, self).__init__()
+
+        self._priorityDistribution = priorityDistribution
+        self._queue = [[] for _ in priorityDistribution]
+        self._condition = threading.Condition()
+        self._n = list(priorityDistribution)
+
+    def add(self, obj, priority):
+        with self._condition:
+            self._queue[priority.level].append(obj)
+            self._condition.notify()
+
+    def remove(self):
+        with self._condition:
+            while True:
+                seen = True
+                while seen:
+                    seen = False
+                    for i, (q, n) in enumerate(zip(self._queue, self._n)):
+                        if not q:
+                            continue
+                        seen = True
+                        if n == 0:
+                            continue
+                        if n >= 0:
+                            self._n[i] = n - 1
+                        return q.pop(0)
+
+                    if seen:
+                        self._n = list(self._priorityDistribution)
+
+                self._condition.wait()
+
+
+def _fill(queue, depth):
+    for i in range(depth):
+        queue.add(i, PRIORITIES[i & 0x03])
+
+
+@benchmark("priorityQueue.addRemove", "add an element to an empty PriorityQueue, and remove it")
+def _addRemove():
+    queue = PriorityQueue(PRIORITY_DISTRIBUTION)
+    priority = Priority('low')
+
+    def op():
+        queue.add(None, priority)
+        return queue.remove()
+    return op
+
+
+def _registerDepths():
+    for depth in DEPTHS:
+        for suffix, queueCls in (("", PriorityQueue), (".legacy", LegacyPriorityQueue)):
+            def addRemove(depth=depth, queueCls=queueCls):
+                queue = queueCls(PRIORITY_DISTRIBUTION)
+                _fill(queue, depth)
+                state = [0]
+
+                def op():
+                    state[0] += 1
+                    queue.add(state[0], PRIORITIES[state[0] & 0x03])
+                    return queue.remove()
+                return op
+
+            benchmark("priorityQueue.addRemove.%d%s" % (depth, suffix),
+                      "add an element to a %s holding %d elements, and remove one" %
+                      (queueCls.__name__, depth))(addRemove)
+
+        def addDrain(depth=depth):
+            queue = PriorityQueue(PRIORITY_DISTRIBUTION)
+            _fill(queue, depth)
+
+            def op():
+                for i in range(QUEUE_BATCH_SIZE):
+                    queue.add(i, PRIORITIES[i & 0x03])
+                return queue.drainUpTo(QUEUE_BATCH_SIZE)
+            return op
+
+        benchmark("priorityQueue.addDrain.%d" % depth,
+                  "add %d elements to a PriorityQueue holding %d elements, and drain as many" %
+                  (QUEUE_BATCH_SIZE, depth))(addDrain)
+
+_registerDepths()
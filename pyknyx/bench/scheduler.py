@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Scheduler backends benchmarks
+
+Documentation
+=============
+
+Compares APScheduler B{BackgroundScheduler} with L{TimerWheelScheduler<pyknyx.services.timerWheel>}:
+
+ - B{scheduler.addJob.<backend>}: registering an interval job;
+ - B{scheduler.run.<backend>}: a round of L{JOBS} concurrent interval jobs (each running once per L{INTERVAL}); the
+   CPU time per operation gives the cost of running the jobs, and the rate shows whether the backend keeps up.
+
+Jobs start at random times within the first interval, so runs are spread over time.
+
+Usage
+=====
+
+python -m pyknyx.bench "scheduler.*"
+
+@license: GPL
+"""
+
+import datetime
+import itertools
+import random
+import threading
+import time
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from pyknyx.bench.harness import benchmark
+from pyknyx.services.logger import logging
+from pyknyx.services.timerWheel import TimerWheelScheduler
+
+BACKENDS = (
+    ("BackgroundScheduler", BackgroundScheduler),
+    ("TimerWheelScheduler", TimerWheelScheduler),
+)
+
+JOBS = 1000  # number of concurrent jobs
+INTERVAL = 0.1  # jobs interval, in s
+
+
+def _nop():
+    pass
+
+
+class _Counter(object):
+    """ Jobs target, signaling when the number of runs reaches a target
+    """
+    def __init__(self):
+        self._runs = itertools.count(1)
+        self.target = 0
+        self.reached = threading.Event()
+
+    def run(self):
+        if next(self._runs) >= self.target:
+            self.reached.set()
+
+
+def _registerBackends():
+    for name, schedulerCls in BACKENDS:
+        def addJob(schedulerCls=schedulerCls):
+            logging.getLogger("apscheduler").setLevel(logging.ERROR)
+            scheduler = schedulerCls()
+            scheduler.start()
+            start = datetime.datetime.now() + datetime.timedelta(days=1)
+
+            def op():
+                scheduler.add_job(_nop, "interval", seconds=INTERVAL, start_date=start)
+            return op, scheduler.shutdown
+
+        def run(schedulerCls=schedulerCls):
+            logging.getLogger("apscheduler").setLevel(logging.ERROR)
+            scheduler = schedulerCls()
+            counter = _Counter()
+            now = time.time()
+            for i in range(JOBS):
+                start = datetime.datetime.fromtimestamp(now + INTERVAL * (1 + random.random()))
+                scheduler.add_job(counter.run, "interval", seconds=INTERVAL, start_date=start, misfire_grace_time=None)
+            scheduler.start()
+
+            def op():
+                counter.reached.clear()
+                counter.target += JOBS
+                if not counter.reached.wait(10 * INTERVAL + 1):
+                    raise RuntimeError("scheduler does not keep up")
+            return op, scheduler.shutdown
+
+        benchmark("scheduler.addJob.%s" % name, "register an interval job in %s" % name)(addJob)
+        benchmark("scheduler.run.%s" % name, "a round of %d interval jobs in %s" % (JOBS, name))(run)
+
+_registerBackends()
@@ -0,0 +1,635 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+End-to-end soak test
+
+Implements
+==========
+
+ - B{LatencyHistogram}
+ - B{SoakTest}
+ - B{checkSLOs}
+ - B{main}
+
+Documentation
+=============
+
+Runs one L{ETS<pyknyx.core.ets.ETS>}, with a configurable number of generated devices, under a synthetic telegram
+load, for minutes or hours, and checks the results against service level objectives (SLOs).
+
+Each generated device has a functional block with an input datapoint (DPT 7.001) and an output datapoint, linked to
+their own GADs. When the input is written, the notifier job of the functional block writes the same value to the
+output, which is sent back on the bus.
+
+The ETS is connected to a real-time L{LoopbackBus<pyknyx.stack.transceiver.loopbackTransceiver>}, where a load
+generator writes sequence numbers to the device inputs, at random, following a Poisson process (B{poisson}), or in
+bursts of back-to-back telegrams, the bursts following a Poisson process (B{bursty}). The load generator measures:
+
+ - the B{handler} latency: from the write on the bus to the notifier job of the device;
+ - the B{write} latency: from the output write in the notifier job to the frame sent on the bus;
+ - the ETS queue depth, sampled at each write;
+ - the resident set size (RSS) of the process.
+
+Writes not handled, or echoes not sent, within B{timeout} are counted as lost. Results are reported for each
+interval, and for the whole run; latency percentiles are computed from L{LatencyHistogram}s, so memory use does not
+grow with the run duration.
+
+Usage
+=====
+
+python -m pyknyx.bench.soak --devices 100 --rate 50 200 1000 --duration 3600 --max-handler-p99 20 --max-rss 200
+
+@license: GPL
+"""
+
+
+import argparse
+import json
+import math
+import random
+import resource
+import sys
+import threading
+import time
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.core.datapoint import DP
+from pyknyx.core.device import Device, LNK
+from pyknyx.core.ets import ETS
+from pyknyx.core.functionalBlock import FunctionalBlock, FB
+from pyknyx.core.groupObject import GO
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.notifier import Notifier
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.individualAddress import IndividualAddress
+from pyknyx.stack.transceiver.loopbackTransceiver import LoopbackBus, LoopbackTransceiver
+from pyknyx.tools.testing import makeCEMI
+
+LOADS = ("poisson", "bursty")
+MAX_DEVICES = 2048  # 8 middle groups of 256 GADs
+HISTOGRAM_RESOLUTION = 0.05  # relative width of the latency histogram buckets
+HISTOGRAM_MIN = 1e-6  # lower bound of the latency histogram, in s
+
+
+class SoakTestValueError(PyKNyXValueError):
+    """
+    """
+
+
+class LatencyHistogram(object):
+    """ Latency histogram, with logarithmic buckets
+
+    @ivar _buckets: number of values in each bucket, indexed by bucket
+    @type _buckets: dict
+
+    @ivar _count: number of values
+    @type _count: int
+
+    @ivar _max: max. value
+    @type _max: float
+    """
+    _LOG_BASE = math.log(1 + HISTOGRAM_RESOLUTION)
+
+    def __init__(self):
+        """
+        """
+        super(LatencyHistogram, self).__init__()
+
+        self._buckets = {}
+        self._count = 0
+        self._max = 0.
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def max(self):
+        return self._max
+
+    def add(self, value):
+        """ Add a value
+
+        @param value: latency, in s
+        @type value: float
+        """
+        bucket = int(math.log(value / HISTOGRAM_MIN) / self._LOG_BASE) + 1 if value > HISTOGRAM_MIN else 0
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self._count += 1
+        if value > self._max:
+            self._max = value
+
+    def update(self, other):
+        """ Add the values of another histogram
+
+        @type other: L{LatencyHistogram}
+        """
+        for bucket, count in other._buckets.items():
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + count
+        self._count += other._count
+        self._max = max(self._max, other._max)
+
+    def percentile(self, percent):
+        """ Return a percentile
+
+        The result is the upper bound of the bucket holding the percentile, so it is overestimated by at most
+        L{HISTOGRAM_RESOLUTION}.
+
+        @param percent: percentile, in [0, 100]
+        @type percent: float
+
+        @return: latency, in s, or None if the histogram is empty
+        @rtype: float
+        """
+        if not self._count:
+            return None
+        rank = max(1, int(math.ceil(self._count * percent / 100.)))
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(HISTOGRAM_MIN * (1 + HISTOGRAM_RESOLUTION) ** bucket, self._max)
+
+
+def _rss():
+    """ Return the resident set size of the process, in bytes
+
+    Falls back to the peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _SoakFB(FunctionalBlock):
+    cmd = DP(dptId="7.001", default=0, access="input")
+    state = DP(dptId="7.001", default=0, access="output")
+    GO_01 = GO(dp=cmd, flags="CW", priority="low")
+    GO_02 = GO(dp=state, flags="CT", priority="low")
+    DESC = "SoakFB"
+
+    soak = None
+    index = None
+
+    @Notifier().datapoint(dp="cmd", condition="always")
+    def cmdChanged(self, event):
+        value = event["newValue"]
+        self.soak._handled(self.index, value)
+        self.dp["state"].value = value
+
+
+class _SoakDevice(Device):
+    soak_fb = FB(_SoakFB, desc="soak test")
+    DESC = "SoakDevice"
+
+
+class _Probe(object):
+    """ Load generator connection to the bus
+
+    Frames sent on the bus by the ETS (the devices echoes) are handed to the L{SoakTest}.
+    """
+    def __init__(self, soak):
+        super(_Probe, self).__init__()
+
+        self._soak = soak
+
+    def receive(self, cEMI):
+        self._soak._transmitted(cEMI)
+
+
+class SoakTest(object):
+    """ SoakTest class
+
+    @ivar _ets: ETS under test
+    @type _ets: L{ETS<pyknyx.core.ets.ETS>}
+
+    @ivar _bus: bus connecting the ETS and the load generator
+    @type _bus: L{LoopbackBus<pyknyx.stack.transceiver.loopbackTransceiver>}
+
+    @ivar _gads: input GADs raw values, by device index
+    @type _gads: list of int
+
+    @ivar _indexes: device indexes, by output GAD raw value
+    @type _indexes: dict
+
+    @ivar _sent: write times of the values not yet handled, by (device index, value)
+    @type _sent: dict
+
+    @ivar _written: output write times of the echoes not yet sent, by (device index, value)
+    @type _written: dict
+
+    @ivar _lock: protects the counters and histograms, shared by the load generator, the ETS and the sampler
+    @type _lock: L{Lock<threading>}
+    """
+    def __init__(self, devices=100, rate=50., load="poisson", burst=10, seed=None, timeout=1.):
+        """
+
+        @param devices: number of generated devices
+        @type devices: int
+
+        @param rate: mean number of telegrams per s
+        @type rate: float
+
+        @param load: load profile, in L{LOADS}
+        @type load: str
+
+        @param burst: number of telegrams in a burst (bursty load)
+        @type burst: int
+
+        @param seed: seed of the random generator
+        @type seed: int
+
+        @param timeout: delay after which a write not handled, or an echo not sent, is lost, in s
+        @type timeout: float
+
+        raise SoakTestValueError:
+        """
+        super(SoakTest, self).__init__()
+
+        if not 0 < devices <= MAX_DEVICES:
+            raise SoakTestValueError("devices out of range (%d)" % devices)
+        if rate <= 0:
+            raise SoakTestValueError("invalid rate (%r)" % rate)
+        if load not in LOADS:
+            raise SoakTestValueError("unknown load (%r)" % load)
+        if burst < 1:
+            raise SoakTestValueError("invalid burst (%d)" % burst)
+
+        self._rate = rate
+        self._burst = burst if load == "bursty" else 1
+        self._random = random.Random(seed)
+        self._timeout = timeout
+
+        self._bus = LoopbackBus()
+        self._ets = ETS("1.0.0", transCls=LoopbackTransceiver, transParams=dict(bus=self._bus))
+        self._probe = _Probe(self)
+        self._bus.attach(self._probe)
+        self._source = IndividualAddress("15.15.250")
+
+        self._gads = []
+        self._indexes = {}
+        for index in range(devices):
+            cmd = GroupAddress("2/%d/%d" % (index // 256, index % 256))
+            state = GroupAddress("3/%d/%d" % (index // 256, index % 256))
+            device = _SoakDevice(self._ets, "1.%d.%d" % (1 + index // 250, 1 + index % 250),
+                                 links=(LNK(fb="soak_fb", dp="cmd", gad=cmd),
+                                        LNK(fb="soak_fb", dp="state", gad=state)))
+            fb = device.fb["soak_fb"]
+            fb.soak = self
+            fb.index = index
+            self._gads.append(cmd.raw)
+            self._indexes[state.raw] = index
+
+        self._values = [0] * devices
+        self._sent = {}
+        self._written = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._resetInterval()
+
+    @property
+    def ets(self):
+        return self._ets
+
+    def _resetInterval(self):
+        self._counts = dict(sent=0, handled=0, transmitted=0, lost=0)
+        self._handler = LatencyHistogram()
+        self._write = LatencyHistogram()
+        self._queueMax = 0
+        self._queueSum = 0
+
+    def _send(self, index):
+        """ Write the next value to the input of a device
+        """
+        value = self._values[index] = (self._values[index] + 1) & 0xffff
+        npdu = bytearray((3, 0x00, 0x80, value >> 8, value & 0xff))  # GroupValue_Write, 2 bytes
+        cEMI = makeCEMI(GroupAddress.fromRaw(self._gads[index]), npdu, src=self._source)
+
+        with self._lock:
+            depth = self._ets.pending
+            self._queueSum += depth
+            if depth > self._queueMax:
+                self._queueMax = depth
+            self._counts["sent"] += 1
+            self._sent[(index, value)] = time.time()
+        self._bus.transmit(self._probe, cEMI)
+
+    def _handled(self, index, value):
+        """ Called by the notifier job of a device, when its input is written
+        """
+        now = time.time()
+        with self._lock:
+            sent = self._sent.pop((index, value), None)
+            if sent is not None:
+                self._handler.add(now - sent)
+                self._counts["handled"] += 1
+            self._written[(index, value)] = now
+
+    def _transmitted(self, cEMI):
+        """ Called by the probe, when the ETS sends a frame on the bus
+        """
+        now = time.time()
+        index = self._indexes.get(cEMI.frame.da)
+        npdu = cEMI.npdu
+        if index is None or len(npdu) != 5:
+            return
+        with self._lock:
+            written = self._written.pop((index, npdu[3] << 8 | npdu[4]), None)
+            if written is not None:
+                self._write.add(now - written)
+                self._counts["transmitted"] += 1
+
+    def _expire(self):
+        """ Count the writes not handled, and the echoes not sent, within the timeout
+
+        Must be called with the lock held.
+        """
+        limit = time.time() - self._timeout
+        for pending in (self._sent, self._written):
+            expired = [key for key, value in pending.items() if value < limit]
+            for key in expired:
+                del pending[key]
+            self._counts["lost"] += len(expired)
+
+    def _loadLoop(self):
+        """ Generate the load
+        """
+        logger.trace("SoakTest._loadLoop()")
+
+        devices = len(self._gads)
+        rate = self._rate / self._burst
+        due = time.time()
+        while not self._stop.is_set():
+            delay = due - time.time()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            for i in range(self._burst):
+                self._send(self._random.randrange(devices))
+            due += self._random.expovariate(rate)
+
+        logger.trace("SoakTest._loadLoop(): ended")
+
+    def _drain(self):
+        """ Wait for the last telegrams to be handled and echoed, up to the timeout
+        """
+        limit = time.time() + self._timeout
+        while time.time() < limit:
+            with self._lock:
+                if not self._sent and not self._written:
+                    break
+            time.sleep(0.01)
+
+    def _sample(self, elapsed, interval):
+        """ Close an interval
+
+        @return: interval sample, and latency histograms
+        @rtype: tuple
+        """
+        with self._lock:
+            self._expire()
+            counts, handler, write = self._counts, self._handler, self._write
+            queueMean = self._queueSum / float(counts["sent"]) if counts["sent"] else 0.
+            queueMax = self._queueMax
+            self._resetInterval()
+
+        sample = dict(counts, time=elapsed, rate=counts["sent"] / interval,
+                      handlerP50=handler.percentile(50), handlerP99=handler.percentile(99), handlerMax=handler.max,
+                      writeP50=write.percentile(50), writeP99=write.percentile(99), writeMax=write.max,
+                      queueMean=queueMean, queueMax=queueMax, rss=_rss())
+
+        return sample, handler, write
+
+    def run(self, duration, interval=10., callback=None):
+        """ Run the soak test
+
+        @param duration: test duration, in s
+        @type duration: float
+
+        @param interval: sampling interval, in s
+        @type interval: float
+
+        @param callback: function called with each interval sample
+        @type callback: callable
+
+        @return: report, with the interval samples and the totals
+        @rtype: dict
+        """
+        logger.trace("SoakTest.run(): duration=%r, interval=%r" % (duration, interval))
+
+        rssStart = _rss()
+        self._ets.start()
+        time.sleep(0.5)  # let devices start
+        self._resetInterval()
+
+        loader = threading.Thread(target=self._loadLoop, name="Soak load")
+        loader.setDaemon(True)
+        self._stop.clear()
+        samples = []
+        handler = LatencyHistogram()
+        write = LatencyHistogram()
+        start = last = time.time()
+        loader.start()
+        try:
+            while last - start < duration:
+                time.sleep(max(0, min(last + interval, start + duration) - time.time()))
+                now = time.time()
+                if now - start >= duration:
+                    self._stop.set()
+                    loader.join()
+                    now = time.time()
+                    self._drain()
+                sample, intervalHandler, intervalWrite = self._sample(now - start, now - last)
+                handler.update(intervalHandler)
+                write.update(intervalWrite)
+                samples.append(sample)
+                if callback is not None:
+                    callback(sample)
+                last = now
+        finally:
+            self._stop.set()
+            loader.join()
+            self._ets.stop()
+            self._bus.close()
+
+        with self._lock:
+            lost = self._counts["lost"] + len(self._sent) + len(self._written)
+        totals = dict((key, sum(sample[key] for sample in samples)) for key in ("sent", "handled", "transmitted"))
+        totals["lost"] = sum(sample["lost"] for sample in samples) + lost
+        rss = [sample["rss"] for sample in samples]
+        summary = dict(totals, duration=last - start,
+                       loss=totals["lost"] / float(2 * totals["sent"]) if totals["sent"] else 0.,
+                       handlerP50=handler.percentile(50), handlerP99=handler.percentile(99), handlerMax=handler.max,
+                       writeP50=write.percentile(50), writeP99=write.percentile(99), writeMax=write.max,
+                       queueMax=max([sample["queueMax"] for sample in samples] or [0]),
+                       rssStart=rssStart, rssMax=max(rss or [rssStart]),
+                       rssGrowth=(rss[-1] if rss else rssStart) - rssStart)
+
+        return dict(devices=len(self._gads), rate=self._rate, burst=self._burst, samples=samples, summary=summary)
+
+
+def checkSLOs(report, handlerP99=None, writeP99=None, queueDepth=None, rss=None, rssGrowth=None, loss=None):
+    """ Check a soak test report against service level objectives
+
+    Objectives left to None are not checked.
+
+    @param report: report, as returned by L{SoakTest.run}
+    @type report: dict
+
+    @param handlerP99: max. 99th percentile of the handler latency, in s
+    @type handlerP99: float
+
+    @param writeP99: max. 99th percentile of the write latency, in s
+    @type writeP99: float
+
+    @param queueDepth: max. ETS queue depth
+    @type queueDepth: int
+
+    @param rss: max. resident set size, in bytes
+    @type rss: int
+
+    @param rssGrowth: max. resident set size growth over the run, in bytes
+    @type rssGrowth: int
+
+    @param loss: max. ratio of lost telegrams
+    @type loss: float
+
+    @return: violated objectives descriptions
+    @rtype: list of str
+    """
+    summary = report["summary"]
+    objectives = (("handler p99", summary["handlerP99"], handlerP99),
+                  ("write p99", summary["writeP99"], writeP99),
+                  ("queue depth", summary["queueMax"], queueDepth),
+                  ("RSS", summary["rssMax"], rss),
+                  ("RSS growth", summary["rssGrowth"], rssGrowth),
+                  ("loss", summary["loss"], loss))
+
+    violations = []
+    for name, value, limit in objectives:
+        if limit is None:
+            continue
+        if value is None:
+            violations.append("%s not measured" % name)
+        elif value > limit:
+            violations.append("%s %.6g > %.6g" % (name, value, limit))
+
+    return violations
+
+
+def _ms(value):
+    return float("nan") if value is None else value * 1e3
+
+
+def _formatSample(sample):
+    return "%8.0f %8.1f %8d %8d %10.2f %10.2f %10.2f %10.2f %8d %8.1f" % \
+        (sample["time"], sample["rate"], sample["handled"], sample["lost"],
+         _ms(sample["handlerP50"]), _ms(sample["handlerP99"]), _ms(sample["writeP50"]), _ms(sample["writeP99"]),
+         sample["queueMax"], sample["rss"] / 1048576.)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="End-to-end soak test")
+    parser.add_argument("-n", "--devices", type=int, default=100,
+                        help="number of generated devices")
+    parser.add_argument("-r", "--rate", type=float, nargs="+", default=[50., 200., 1000.],
+                        help="mean telegrams rates, in telegrams/s (one run per rate)")
+    parser.add_argument("-l", "--load", choices=LOADS, default="poisson",
+                        help="load profile")
+    parser.add_argument("-b", "--burst", type=int, default=10,
+                        help="number of telegrams in a burst (bursty load)")
+    parser.add_argument("-d", "--duration", type=float, default=60.,
+                        help="duration of each run, in s")
+    parser.add_argument("-i", "--interval", type=float, default=10.,
+                        help="sampling interval, in s")
+    parser.add_argument("-s", "--seed", type=int,
+                        help="seed of the load generator")
+    parser.add_argument("-t", "--timeout", type=float, default=1.,
+                        help="delay after which a telegram is lost, in s")
+    parser.add_argument("-j", "--json", metavar="FILE",
+                        help="save the reports as JSON")
+    parser.add_argument("--max-handler-p99", type=float, metavar="MS",
+                        help="SLO: max. 99th percentile of the handler latency, in ms")
+    parser.add_argument("--max-write-p99", type=float, metavar="MS",
+                        help="SLO: max. 99th percentile of the write latency, in ms")
+    parser.add_argument("--max-queue", type=int, metavar="FRAMES",
+                        help="SLO: max. ETS queue depth")
+    parser.add_argument("--max-rss", type=float, metavar="MB",
+                        help="SLO: max. resident set size, in MB")
+    parser.add_argument("--max-rss-growth", type=float, metavar="MB",
+                        help="SLO: max. resident set size growth during a run, in MB")
+    parser.add_argument("--max-loss", type=float, default=0., metavar="RATIO",
+                        help="SLO: max. ratio of lost telegrams")
+    args = parser.parse_args(args)
+
+    logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+    def scaled(value, scale):
+        return None if value is None else value * scale
+
+    slos = dict(handlerP99=scaled(args.max_handler_p99, 1e-3), writeP99=scaled(args.max_write_p99, 1e-3),
+                queueDepth=args.max_queue, rss=scaled(args.max_rss, 1048576),
+                rssGrowth=scaled(args.max_rss_growth, 1048576), loss=args.max_loss)
+
+    reports = []
+    failed = False
+    for rate in args.rate:
+        print("%d devices, %s load, %.0f telegrams/s" % (args.devices, args.load, rate))
+        print("%8s %8s %8s %8s %10s %10s %10s %10s %8s %8s" % ("time (s)", "rate", "handled", "lost",
+                                                               "hdl p50", "hdl p99", "wr p50", "wr p99",
+                                                               "queue", "RSS (MB)"))
+        soak = SoakTest(args.devices, rate, args.load, args.burst, args.seed, args.timeout)
+        report = soak.run(args.duration, args.interval, lambda sample: print(_formatSample(sample)))
+        report["violations"] = violations = checkSLOs(report, **slos)
+        reports.append(report)
+
+        summary = report["summary"]
+        print("total: %d sent, %d handled, %d transmitted, %d lost; handler p50/p99 %.2f/%.2f ms, "
+              "write p50/p99 %.2f/%.2f ms, max. queue %d, RSS growth %.1f MB" %
+              (summary["sent"], summary["handled"], summary["transmitted"], summary["lost"],
+               _ms(summary["handlerP50"]), _ms(summary["handlerP99"]), _ms(summary["writeP50"]),
+               _ms(summary["writeP99"]), summary["queueMax"], summary["rssGrowth"] / 1048576.))
+        for violation in violations:
+            print("SLO violated: %s" % violation)
+        failed = failed or bool(violations)
+        print()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=1)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
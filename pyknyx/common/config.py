@@ -52,3 +52,11 @@ LOGGER_LEVEL = "DEBUG"
 LOGGER_DIR = "/tmp"
 LOGGER_MAX_BYTES = 4096 * 1024
 LOGGER_BACKUP_COUNT = 4  # set to 0 to disable logging on file
+
+# ETS project import
+ETS_PROJECT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pyknyx")
+
+# Metrics export
+METRICS_ADDR = "127.0.0.1"
+METRICS_PORT = 9742
+METRICS_DUMP_PERIOD = 15.  # s
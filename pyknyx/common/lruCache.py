@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Size-bounded Least Recently Used cache
+
+Implements
+==========
+
+ - B{LRUCache}
+ - B{LRUCacheValueError}
+
+Documentation
+=============
+
+The cache is a mapping which holds at most B{maxSize} entries; when full, adding a new entry discards the
+least recently used one. Lookups are counted (see B{hits} and B{misses}). All operations are thread-safe.
+
+Usage
+=====
+
+>>> from lruCache import LRUCache
+>>> cache = LRUCache(2)
+>>> cache.put('a', 1)
+>>> cache.put('b', 2)
+>>> cache.get('a')
+1
+>>> cache.put('c', 3)
+>>> cache.get('b')
+>>> len(cache)
+2
+>>> cache.hits, cache.misses
+(1, 1)
+
+@license: GPL
+"""
+
+
+import threading
+from collections import OrderedDict
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+
+
+class LRUCacheValueError(PyKNyXValueError):
+    """
+    """
+
+
+class LRUCache(object):
+    """ LRU cache class
+
+    @ivar _maxSize: max. number of entries
+    @type _maxSize: int
+
+    @ivar _data: entries, least recently used first
+    @type _data: OrderedDict
+
+    @ivar _lock: lock serializing accesses to the entries
+    @type _lock: L{Lock<threading>}
+
+    @ivar _touch: function marking a key as most recently used
+    @type _touch: callable
+
+    @ivar _hits: number of successful lookups
+    @type _hits: int
+
+    @ivar _misses: number of failed lookups
+    @type _misses: int
+    """
+    def __init__(self, maxSize=1024):
+        """ Init the LRU cache
+
+        @param maxSize: max. number of entries
+        @type maxSize: int
+
+        raise LRUCacheValueError:
+        """
+        super(LRUCache, self).__init__()
+
+        if maxSize < 1:
+            raise LRUCacheValueError("invalid max size (%r)" % maxSize)
+        self._maxSize = maxSize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        try:
+            self._touch = self._data.move_to_end
+        except AttributeError:
+            self._touch = self._touchLegacy
+        self._hits = self._misses = 0
+
+    def __repr__(self):
+        return "<LRUCache(size=%d, maxSize=%d)>" % (len(self._data), self._maxSize)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    @property
+    def maxSize(self):
+        return self._maxSize
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def _touchLegacy(self, key):
+        """ Mark key as most recently used (Python 2 OrderedDict has no move_to_end())
+
+        Called with the lock held.
+        """
+        self._data[key] = self._data.pop(key)
+
+    def get(self, key, default=None):
+        """ Return the value for key, and mark it as most recently used
+
+        @param key: key of the entry
+        @type key: hashable
+
+        @param default: value returned if key is not in the cache
+        @type default: any
+
+        @return: value of the entry, or default
+        @rtype: any
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+                self._touch(key)
+            except KeyError:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        """ Add (or replace) an entry, discarding the least recently used one if the cache is full
+
+        @param key: key of the entry
+        @type key: hashable
+
+        @param value: value of the entry
+        @type value: any
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            if len(self._data) > self._maxSize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """ Remove an entry
+
+        @param key: key of the entry
+        @type key: hashable
+
+        @param default: value returned if key is not in the cache
+        @type default: any
+
+        @return: value of the removed entry, or default
+        @rtype: any
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """ Remove all entries, and reset counters
+        """
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = 0
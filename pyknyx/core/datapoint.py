@@ -85,6 +85,8 @@ class DP(object):
     missing – it does not exist yet.
     """ 
 
+    _PARAMS = ("access", "dptId", "default", "flags", "priority")  # positional params of Datapoint, after name
+
     def __init__(self, name=None, *args, **kwargs):
         """ Remember parameters for eventual instantiation of a L{Datapoint}.
 
@@ -94,6 +96,17 @@ class DP(object):
         self.args = args
         self.kwargs = kwargs
 
+    def param(self, name):
+        """ Return the value given for a L{Datapoint} parameter, or None if not given
+
+        @param name: name of the parameter, in B{Datapoint.__init__}
+        @type name: str
+        """
+        index = DP._PARAMS.index(name)
+        if index < len(self.args):
+            return self.args[index]
+        return self.kwargs.get(name)
+
     def gen(self, obj, name=None):
         """ Instantiate the datapoint.
 
@@ -35,6 +35,7 @@ Device (process) management.
 Implements
 ==========
 
+ - B{DeviceSchema}
  - B{Device}
 
 Documentation
@@ -97,12 +98,10 @@ class LNK(object):
         if isinstance(fb,str):
             fb = obj.fb[fb]
         elif fb is not None:
-            for val in obj.fb.values():
-                if val._factory is fb:
-                    fb = val
-                    break
-            else:
-                raise KeyError("I could not find the FB factory %s on %s",self.fb,obj)
+            try:
+                fb = obj.fb[type(obj)._getSchema().fbNames[fb]]
+            except KeyError:
+                raise KeyError("I could not find the FB factory %s on %s" % (self.fb, obj))
 
         if isinstance(self.dp,str):
             dp = fb.go[self.dp]
@@ -123,18 +122,33 @@ class Link(object):
         self.dp = dp
         self.gad = gad
     
-class Device(object):
-    """ Device class definition.
+class DeviceSchema(object):
+    """ Compiled definitions of a Device class
+
+    @ivar functionalBlocks: FunctionalBlocks definitions, as (name, factory)
+    @type functionalBlocks: tuple
+
+    @ivar links: links definitions
+    @type links: tuple of L{LNK}
+
+    @ivar fbNames: FunctionalBlocks names, indexed by their factory
+    @type fbNames: dict
+
+    @ivar desc: description of the class
+    @type desc: str
     """
-    def __new__(cls, *args, **kwargs):
-        """ Init the class with all available types for this DPT
+    def __init__(self, cls):
+        """ Collect the definitions of a Device class, and of its parents
+
+        @param cls: Device class
+        @type cls: class
         """
-        self = super(Device, cls).__new__(cls)
+        super(DeviceSchema, self).__init__()
 
         # Retrieve all parents classes, to get all objects defined there
         classes = cls.__mro__ # do we really want that?
 
-        # class objects named B{FB_xxx} are treated as FunctionalBlock and added to the B{_functionalBlocks} dict
+        # class objects named B{FB_xxx} are treated as FunctionalBlock
         functionalBlocks = {}
         for cls_ in classes[::-1]:
             for key, value in cls_.__dict__.items():
@@ -146,17 +160,11 @@ class Device(object):
                 if isinstance(value, FB):
                     if value.name is None:
                         value.name = key
-                    value = value.gen(self, key)
-                    value._device = self
-                    logger.debug("%s: new FB %s: %s", self, repr(key), value)
                     functionalBlocks[key] = value
                 elif key in functionalBlocks and value is None:
-                    logger.debug("%s: drop FB %s", self, repr(key))
                     del functionalBlocks[key]
 
-        self._functionalBlocks = FrozenDict(functionalBlocks)
-
-        # class objects named B{LNK_xxx} are treated as links and added to the B{_links} set
+        # class objects named B{LNK_xxx} are treated as links
         links = dict()
         for cls_ in classes[::-1]:
             for key, value in cls_.__dict__.items():
@@ -164,22 +172,60 @@ class Device(object):
                     value = LNK(**value)
 
                 if isinstance(value,LNK):
-                    value = value.gen(self)
-                    logger.debug("%s: new link %s", key, repr(value))
                     links[key] = value
                 elif key in links and value is None:
                     del links[key]
 
-        self._links = frozenset(links.values())
+        self.functionalBlocks = tuple(functionalBlocks.items())
+        self.links = tuple(links.values())
+        self.fbNames = dict((factory, key) for key, factory in self.functionalBlocks)
 
         try:
-            self._desc = cls.__dict__["DESC"]
+            self.desc = cls.__dict__["DESC"]
         except KeyError:
-            logger.exception("Device.__new__()")
-            self._desc = "Device"
+            logger.error("%s: missing DESCription", cls)
+            self.desc = "Device"
+
+
+class Device(object):
+    """ Device class definition.
+
+    The FunctionalBlocks and links definitions of a Device class are collected only once, when the first instance is
+    created, and kept in a L{DeviceSchema}.
+    """
+    def __new__(cls, *args, **kwargs):
+        """ Init the class with all available types for this DPT
+        """
+        self = super(Device, cls).__new__(cls)
+
+        schema = cls._getSchema()
+
+        functionalBlocks = {}
+        for key, factory in schema.functionalBlocks:
+            value = factory.gen(self, key)
+            value._device = self
+            functionalBlocks[key] = value
+        self._functionalBlocks = FrozenDict(functionalBlocks)
+
+        self._links = frozenset(link.gen(self) for link in schema.links)
+
+        self._desc = schema.desc
 
         return self
 
+    @classmethod
+    def _getSchema(cls):
+        """ Return the schema of this class, compiling it on first use
+
+        @rtype: L{DeviceSchema}
+        """
+        try:
+            return cls.__dict__["_schema"]
+        except KeyError:
+            logger.debug("%s: compile schema", cls)
+            cls._schema = schema = DeviceSchema(cls)
+            return schema
+
     def __init__(self, ets, individualAddress=None, links=()):
         """ Init Device object.
         """
@@ -37,6 +37,13 @@ Implements
 
  - B{DPTXlator2ByteFloat}
 
+Documentation
+=============
+
+Decoding uses a table of the 65536 possible values, built on first use and shared by all DPTXlator2ByteFloat objects.
+Encoding computes the exponent from the binary exponent of the mantissa (math.frexp), instead of shifting the
+mantissa until it fits.
+
 Usage
 =====
 
@@ -51,12 +58,13 @@ see L{DPTXlatorBoolean}
 @license: GPL
 """
 
+import math
 import struct
 
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, numpy
 
 
 class DPTXlator2ByteFloat(DPTXlatorBase):
@@ -68,6 +76,12 @@ class DPTXlator2ByteFloat(DPTXlatorBase):
      - M: Significand (Mantissa) [-2048:2047]
 
     For all Datapoint Types 9.xxx, the encoded value 7FFFh shall always be used to denote invalid data.
+
+    @cvar _decodeTable: values of all KNX encoded data (built on first use)
+    @type _decodeTable: list of float
+
+    @cvar _decodeArray: same as _decodeTable, for batch conversions
+    @type _decodeArray: numpy.ndarray of float
     """
     DPT_Generic = DPT("9.xxx", "Generic", (-671088.64, +670760.96))
 
@@ -91,6 +105,11 @@ class DPTXlator2ByteFloat(DPTXlatorBase):
     DPT_Value_Temp_F = DPT("9.027", "Temperature (°F)", (-459.6, 670760.), "°F")
     DPT_Value_Wsp_kmh = DPT("9.028", "Wind speed (km/h)", (0., 670760.), "km/h")
 
+    _frameDtype = ">u2"
+
+    _decodeTable = None
+    _decodeArray = None
+
     def __init__(self, dptId):
         super(DPTXlator2ByteFloat, self).__init__(dptId, 2)
 
@@ -102,7 +121,10 @@ class DPTXlator2ByteFloat(DPTXlatorBase):
         if not self._dpt.limits[0] <= value <= self._dpt.limits[1]:
             raise DPTXlatorValueError("Value not in range %s" % repr(self._dpt.limits))
 
-    def dataToValue(self, data):
+    @staticmethod
+    def _dataToValue(data):
+        """ Conversion from KNX encoded data to python value, without decode table
+        """
         sign = (data & 0x8000) >> 15
         exp = (data & 0x7800) >> 11
         mant = data & 0x07ff
@@ -113,17 +135,36 @@ class DPTXlator2ByteFloat(DPTXlatorBase):
         #logger.debug("DPT2ByteFloat.dataToValue(): value=%.2f" % value)
         return value
 
+    @classmethod
+    def _buildDecodeTable(cls):
+        """ Build the decode table, shared by all instances
+        """
+        table = [cls._dataToValue(data) for data in range(0x10000)]
+        DPTXlator2ByteFloat._decodeTable = table
+        return table
+
+    def dataToValue(self, data):
+        table = DPTXlator2ByteFloat._decodeTable
+        if table is None:
+            table = self._buildDecodeTable()
+        return table[data]
+
     def valueToData(self, value):
         sign = 0
         exp = 0
         if value < 0:
             sign = 1
         mant = int(value * 100)
-        while not -2048 <= mant <= 2047:
-            mant = mant >> 1
-            exp += 1
+        if not -2048 <= mant <= 2047:
+
+            # Smallest exp giving -2048 <= mant >> exp <= 2047
+            frac, exp = math.frexp(mant)
+            if frac == -0.5:
+                exp -= 1
+            exp -= 11
+            mant >>= exp
         #logger.debug("DPT2ByteFloat.valueToData(): sign=%d, exp=%d, mant=%r" % (sign, exp, mant))
-        data = (sign << 15) | (exp << 11) | (int(mant) & 0x07ff)
+        data = (sign << 15) | (exp << 11) | (mant & 0x07ff)
         #logger.debug("DPT2ByteFloat.valueToData(): data=%s" % hex(data))
         return data
 
@@ -134,3 +175,22 @@ class DPTXlator2ByteFloat(DPTXlatorBase):
         data = struct.unpack(">H", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        array = DPTXlator2ByteFloat._decodeArray
+        if array is None:
+            table = DPTXlator2ByteFloat._decodeTable
+            if table is None:
+                table = self._buildDecodeTable()
+            array = DPTXlator2ByteFloat._decodeArray = numpy.array(table, dtype=numpy.float64)
+        return array[data]
+
+    def valuesToDataArray(self, values):
+        values = numpy.asarray(values, dtype=numpy.float64)
+        if not numpy.isfinite(values).all():
+            raise DPTXlatorValueError("values not finite")
+        sign = (values < 0).astype(numpy.int64)
+        mant = numpy.trunc(values * 100).astype(numpy.int64)
+        frac, exp = numpy.frexp(mant.astype(numpy.float64))
+        exp = numpy.where((mant < -2048) | (mant > 2047), exp - (frac == -0.5) - 11, 0)
+        mant >>= exp
+        return (sign << 15) | (exp << 11) | (mant & 0x07ff)
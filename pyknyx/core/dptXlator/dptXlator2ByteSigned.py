@@ -54,7 +54,7 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, numpy, roundArray, intArray
 
 
 class DPTXlator2ByteSigned(DPTXlatorBase):
@@ -77,6 +77,8 @@ class DPTXlator2ByteSigned(DPTXlatorBase):
     DPT_Percent_V16 = DPT("8.010", "Percent (16 bit)", (-327.68, 327.67), "%")
     DPT_Rotation_Angle = DPT("8.011", "Rotation angle", (-32768, 32767), "°")
 
+    _frameDtype = ">u2"
+
     def __init__(self, dptId):
         super(DPTXlator2ByteSigned, self).__init__(dptId, 2)
 
@@ -105,8 +107,6 @@ class DPTXlator2ByteSigned(DPTXlatorBase):
         return value
 
     def valueToData(self, value):
-        if value < 0:
-            value = (abs(value) ^ 0xffff) + 1  # twos complement
         if self._dpt is self.DPT_DeltaTime10Msec:
             data = int(round(value / 10.))
         elif self._dpt is self.DPT_DeltaTime100Msec:
@@ -115,6 +115,8 @@ class DPTXlator2ByteSigned(DPTXlatorBase):
             data = int(round(value * 100.))
         else:
             data = value
+        if data < 0:
+            data = (abs(data) ^ 0xffff) + 1  # twos complement
         #logger.debug("DPTXlator2ByteSigned.valueToData(): data=%s" % hex(data))
         return data
 
@@ -125,3 +127,23 @@ class DPTXlator2ByteSigned(DPTXlatorBase):
         data = struct.unpack(">H", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        data = numpy.where(data >= 0x8000, data - 0x10000, data)  # invert twos complement
+        if self._dpt is self.DPT_DeltaTime10Msec:
+            return data * 10.
+        elif self._dpt is self.DPT_DeltaTime100Msec:
+            return data * 100.
+        elif self._dpt is self.DPT_Percent_V16:
+            return data / 100.
+        return data
+
+    def valuesToDataArray(self, values):
+        if self._dpt is self.DPT_DeltaTime10Msec:
+            data = roundArray(numpy.asarray(values, dtype=numpy.float64) / 10.).astype(numpy.int64)
+        elif self._dpt is self.DPT_DeltaTime100Msec:
+            data = roundArray(numpy.asarray(values, dtype=numpy.float64) / 100.).astype(numpy.int64)
+        elif self._dpt is self.DPT_Percent_V16:
+            data = roundArray(numpy.asarray(values, dtype=numpy.float64) * 100.).astype(numpy.int64)
+        else:
+            data = intArray(values)
+        return numpy.where(data < 0, (abs(data) ^ 0xffff) + 1, data)  # twos complement
@@ -54,7 +54,7 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, numpy, roundArray, intArray
 
 
 class DPTXlator2ByteUnsigned(DPTXlatorBase):
@@ -79,6 +79,8 @@ class DPTXlator2ByteUnsigned(DPTXlatorBase):
     #DPT_UEICurrentmA = DPT("7.012", "Electrical current", (0, 65535), "mA")  # Add special meaning for 0 (create Limit object)
     DPT_Brightness = DPT("7.013", "Brightness", (0, 65535), "lx")
 
+    _frameDtype = ">u2"
+
     def __init__(self, dptId):
         super(DPTXlator2ByteUnsigned, self).__init__(dptId, 2)
 
@@ -117,3 +119,16 @@ class DPTXlator2ByteUnsigned(DPTXlatorBase):
         data = struct.unpack(">H", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        if self._dpt is self.DPT_TimePeriod10Msec:
+            return data * 10.
+        elif self._dpt is self.DPT_TimePeriod100Msec:
+            return data * 100.
+        return data
+
+    def valuesToDataArray(self, values):
+        if self._dpt is self.DPT_TimePeriod10Msec:
+            return roundArray(numpy.asarray(values, dtype=numpy.float64) / 10.).astype(numpy.int64)
+        elif self._dpt is self.DPT_TimePeriod100Msec:
+            return roundArray(numpy.asarray(values, dtype=numpy.float64) / 100.).astype(numpy.int64)
+        return intArray(values)
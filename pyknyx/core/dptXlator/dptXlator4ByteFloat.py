@@ -56,7 +56,7 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, numpy
 
 
 class DPTXlator4ByteFloat(DPTXlatorBase):
@@ -153,6 +153,8 @@ class DPTXlator4ByteFloat(DPTXlatorBase):
     DPT_Value_Weight = DPT("14.078", "Weight", (-3.4028234663852886e+38, 3.4028234663852886e+38), "N")
     DPT_Value_Work = DPT("14.079", "Work", (-3.4028234663852886e+38, 3.4028234663852886e+38), "J")
 
+    _frameDtype = ">u4"
+
     def __init__(self, dptId):
         super(DPTXlator4ByteFloat, self).__init__(dptId, 4)
 
@@ -181,3 +183,13 @@ class DPTXlator4ByteFloat(DPTXlatorBase):
         data = struct.unpack(">L", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        with numpy.errstate(invalid='ignore'):  # NaNs are kept as is
+            return data.astype(numpy.uint32).view(numpy.float32).astype(numpy.float64)
+
+    def valuesToDataArray(self, values):
+        values = numpy.asarray(values, dtype=numpy.float64)
+        values32 = values.astype(numpy.float32)
+        if (numpy.isinf(values32) & numpy.isfinite(values)).any():
+            raise DPTXlatorValueError("values out of float range")
+        return values32.view(numpy.uint32).astype(numpy.int64)
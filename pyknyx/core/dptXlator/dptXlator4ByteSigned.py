@@ -54,7 +54,7 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, numpy, roundArray, intArray
 
 
 class DPTXlator4ByteSigned(DPTXlatorBase):
@@ -77,6 +77,8 @@ class DPTXlator4ByteSigned(DPTXlatorBase):
     DPT_ReactiveEnergy_KVARh = DPT("13.015", "Reactive energy (kVARh)", (-214748.3648, 214748.3647), "kVAR.h")
     DPT_LongDeltaTimeSec = DPT("13.100", "Long delta time", (-214748.3648, 214748.3647), "s")
 
+    _frameDtype = ">u4"
+
     def __init__(self, dptId):
         super(DPTXlator4ByteSigned, self).__init__(dptId, 4)
 
@@ -101,12 +103,12 @@ class DPTXlator4ByteSigned(DPTXlatorBase):
         return value
 
     def valueToData(self, value):
-        if value < 0:
-            value = (abs(value) ^ 0xffffffff) + 1  # twos complement
         if self._dpt is self.DPT_Value_FlowRate_m3h:
             data = int(round(value * 10000.))
         else:
             data = value
+        if data < 0:
+            data = (abs(data) ^ 0xffffffff) + 1  # twos complement
         #logger.debug("DPTXlator4ByteSigned.valueToData(): data=%s" % hex(data))
         return data
 
@@ -117,3 +119,15 @@ class DPTXlator4ByteSigned(DPTXlatorBase):
         data = struct.unpack(">L", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        data = numpy.where(data >= 0x80000000, data - 0x100000000, data)  # invert twos complement
+        if self._dpt is self.DPT_Value_FlowRate_m3h:
+            return data / 10000.
+        return data
+
+    def valuesToDataArray(self, values):
+        if self._dpt is self.DPT_Value_FlowRate_m3h:
+            data = roundArray(numpy.asarray(values, dtype=numpy.float64) * 10000.).astype(numpy.int64)
+        else:
+            data = intArray(values)
+        return numpy.where(data < 0, (abs(data) ^ 0xffffffff) + 1, data)  # twos complement
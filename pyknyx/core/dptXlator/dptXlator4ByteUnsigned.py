@@ -54,7 +54,7 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, intArray
 
 
 class DPTXlator4ByteUnsigned(DPTXlatorBase):
@@ -69,6 +69,8 @@ class DPTXlator4ByteUnsigned(DPTXlatorBase):
 
     DPT_Value_4_Ucount = DPT("12.001", "Unsigned count", (0, 4294967295), "pulses")
 
+    _frameDtype = ">u4"
+
     def __init__(self, dptId):
         super(DPTXlator4ByteUnsigned, self).__init__(dptId, 4)
 
@@ -97,3 +99,8 @@ class DPTXlator4ByteUnsigned(DPTXlatorBase):
         data = struct.unpack(">L", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        return data
+
+    def valuesToDataArray(self, values):
+        return intArray(values)
@@ -54,7 +54,7 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, numpy, intArray
 
 
 def twos_comp(val, bits):
@@ -78,6 +78,8 @@ class DPTXlator8BitSigned(DPTXlatorBase):
     DPT_Value_1_Count = DPT("6.010", "Signed count", (-128, 127), "pulses")
     #DPT_Status_Mode3 = DPT("6.020", "Status mode 3", (, ))
 
+    _frameDtype = "u1"
+
     def __init__(self, dptId):
         super(DPTXlator8BitSigned, self).__init__(dptId, 1)
 
@@ -111,3 +113,9 @@ class DPTXlator8BitSigned(DPTXlatorBase):
         data = struct.unpack(">B", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        return numpy.where(data >= 0x80, data - 0x100, data)  # invert twos complement
+
+    def valuesToDataArray(self, values):
+        data = intArray(values)
+        return numpy.where(data < 0, (abs(data) ^ 0xff) + 1, data)  # twos complement
@@ -54,7 +54,7 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.core.dptXlator.dptId import DPTID
 from pyknyx.core.dptXlator.dpt import DPT
-from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorBase, DPTXlatorValueError, numpy, roundArray, intArray
 
 
 class DPTXlator8BitUnsigned(DPTXlatorBase):
@@ -74,6 +74,8 @@ class DPTXlator8BitUnsigned(DPTXlatorBase):
     #DPT_Tariff = DPT("5.006", "Tariff", (0, 254), "ratio")
     DPT_Value_1_Ucount = DPT("5.010", "Unsigned count", (0, 255), "pulses")
 
+    _frameDtype = "u1"
+
     def __init__(self, dptId):
         super(DPTXlator8BitUnsigned, self).__init__(dptId, 1)
 
@@ -115,3 +117,20 @@ class DPTXlator8BitUnsigned(DPTXlatorBase):
         data = struct.unpack(">B", frame)[0]
         return data
 
+    def dataArrayToValues(self, data):
+        if self._dpt is self.DPT_Scaling:
+            return data * 100. / 255.
+        elif self._dpt is self.DPT_Angle:
+            return data * 360. / 255.
+        elif self._dpt is self.DPT_DecimalFactor:
+            return data / 255.
+        return data
+
+    def valuesToDataArray(self, values):
+        if self._dpt is self.DPT_Scaling:
+            return roundArray(numpy.asarray(values, dtype=numpy.float64) * 255 / 100.).astype(numpy.int64)
+        elif self._dpt is self.DPT_Angle:
+            return roundArray(numpy.asarray(values, dtype=numpy.float64) * 255 / 360.).astype(numpy.int64)
+        elif self._dpt is self.DPT_DecimalFactor:
+            return roundArray(numpy.asarray(values, dtype=numpy.float64) * 255).astype(numpy.int64)
+        return intArray(values)
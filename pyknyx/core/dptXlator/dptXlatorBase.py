@@ -36,11 +36,20 @@ Implements
 ==========
 
  - B{DPTXlatorValueError}
+ - B{DPTXlatorMeta}
  - B{DPTXlatorBase}
 
 Documentation
 =============
 
+DPTXlator objects do not hold any conversion state: the same instance can be shared by all users of a DPT (see
+L{DPTXlatorFactory<pyknyx.core.dptXlator.dptXlatorFactory>}).
+
+Numeric DPTXlators also provide batch conversions (L{framesToValues<DPTXlatorBase.framesToValues>} and
+L{valuesToFrames<DPTXlatorBase.valuesToFrames>}), working on NumPy arrays; they need numpy to be installed, and give
+the same results as the scalar conversions. Values are checked against the DPT limits
+(L{checkValues<DPTXlatorBase.checkValues>}), as done by L{checkValue<DPTXlatorBase.checkValue>} for a single value.
+
 Usage
 =====
 
@@ -51,6 +60,13 @@ Usage
 @license: GPL
 """
 
+import six
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.common.utils import reprStr
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
@@ -62,6 +78,59 @@ class DPTXlatorValueError(PyKNyXValueError):
     """
 
 
+class DPTXlatorMeta(type):
+    """ DPTXlator metaclass
+
+    Builds the table of handled DPTs once, when the DPTXlator class is created.
+
+    All class objects defined in the class body, named B{DPT_xxx}, will be treated as DPT objects and added to the
+    B{_handledDPT} dict.
+    """
+    def __init__(cls, name, bases, dict_):
+        """ Init the metaclass
+        """
+        super(DPTXlatorMeta, cls).__init__(name, bases, dict_)
+
+        cls._handledDPT = {}
+        for key, value in dict_.items():
+            if key.startswith("DPT_"):
+                cls._handledDPT[value.id] = value
+
+
+def roundArray(values):
+    """ Round values to the nearest integer, as the built-in round() does
+
+    @param values: values to round
+    @type values: numpy.ndarray
+
+    @rtype: numpy.ndarray of float
+    """
+    if six.PY2:
+        return numpy.where(values >= 0, numpy.floor(values + 0.5), numpy.ceil(values - 0.5))
+    else:
+        return numpy.rint(values)
+
+
+def intArray(values):
+    """ Convert values to an array of integers
+
+    @param values: integer values
+    @type values: sequence or numpy.ndarray
+
+    @rtype: numpy.ndarray of int64
+
+    @raise DPTXlatorValueError: values are not integers
+    """
+    values = numpy.asarray(values)
+    if values.dtype.kind == 'f':
+        if not (values == numpy.trunc(values)).all():
+            raise DPTXlatorValueError("values not integers")
+    elif values.dtype.kind not in ('i', 'u', 'b'):
+        raise DPTXlatorValueError("values not integers (%s)" % values.dtype)
+    return values.astype(numpy.int64)
+
+
+@six.add_metaclass(DPTXlatorMeta)
 class DPTXlatorBase(object):
     """ Base DPT translator class
 
@@ -83,21 +152,12 @@ class DPTXlatorBase(object):
     @ivar _data: KNX encoded data
     @type _data: depends on sub-class
 
+    @ivar _frameDtype: numpy dtype of a bus frame, for batch conversions (defined in sub-classes)
+    @type _frameDtype: str
+
     @todo: remove the strValue stuff
     """
-    def __new__(cls, *args, **kwargs):
-        """ Init the class with all available types for this DPT
-
-        All class objects defined in sub-classes name B{DPT_xxx}, will be treated as DPT objects and added to the
-        B{_handledDPT} dict.
-        """
-        self = super(DPTXlatorBase, cls).__new__(cls)
-        cls._handledDPT = {}
-        for key, value in cls.__dict__.items():
-            if key.startswith("DPT_"):
-                self._handledDPT[value.id] = value
-
-        return self
+    _frameDtype = None
 
     def __init__(self, dptId, typeSize):
         """ Creates a DPT for the given Datapoint Type ID
@@ -135,9 +195,7 @@ class DPTXlatorBase(object):
 
     @property
     def handledDPT(self):
-        handledDPT = self._handledDPT.keys()
-        handledDPT.sort()
-        return handledDPT
+        return sorted(self._handledDPT.keys())
 
     @property
     def dpt(self):
@@ -145,6 +203,10 @@ class DPTXlatorBase(object):
 
     @dpt.setter
     def dpt(self, dptId):
+        """ Change the current DPT
+
+        Don't use this on DPTXlator objects returned by the factory, as they are shared.
+        """
         if not isinstance(dptId, DPTID):
             dptId = DPTID(dptId)
         try:
@@ -232,3 +294,115 @@ class DPTXlatorBase(object):
         """
         raise NotImplementedError
 
+
+    def _checkBatch(self):
+        """ Check if batch conversions can be done
+
+        @raise DPTXlatorValueError: batch conversions not available
+        """
+        if numpy is None:
+            raise DPTXlatorValueError("batch conversions need numpy")
+        if self._frameDtype is None:
+            raise DPTXlatorValueError("batch conversions not supported by %s" % self.__class__.__name__)
+
+    def framesToDataArray(self, frames):
+        """ Batch conversion from bus frames to KNX encoded data
+
+        @param frames: KNX encoded data as bus frames, concatenated (or one frame per row)
+        @type frames: buffer or numpy.ndarray of uint8
+
+        @return: KNX encoded data, one per frame
+        @rtype: numpy.ndarray of int64
+
+        @raise DPTXlatorValueError:
+        """
+        self._checkBatch()
+        if isinstance(frames, numpy.ndarray):
+            frames = numpy.ascontiguousarray(frames, dtype=numpy.uint8).reshape(-1)
+        else:
+            frames = numpy.frombuffer(frames, dtype=numpy.uint8)
+        if frames.size % self._typeSize:
+            raise DPTXlatorValueError("frames length (%d) not a multiple of %d" % (frames.size, self._typeSize))
+        return frames.view(self._frameDtype).astype(numpy.int64)
+
+    def dataArrayToFrames(self, data):
+        """ Batch conversion from KNX encoded data to bus frames
+
+        Use C{tobytes()} on the result to get the concatenated frames.
+
+        @param data: KNX encoded data
+        @type data: sequence or numpy.ndarray of int
+
+        @return: KNX encoded data as bus frames, one per row
+        @rtype: numpy.ndarray of uint8
+
+        @raise DPTXlatorValueError: data out of range
+        """
+        self._checkBatch()
+        data = intArray(data)
+        if data.size and (data.min() < 0 or data.max() >> (8 * self._typeSize)):
+            raise DPTXlatorValueError("data not in (0, %s)" % hex((1 << 8 * self._typeSize) - 1))
+        return data.astype(self._frameDtype).view(numpy.uint8).reshape(-1, self._typeSize)
+
+    def dataArrayToValues(self, data):
+        """ Batch conversion from KNX encoded data to python values
+
+        @param data: KNX encoded data
+        @type data: numpy.ndarray of int64
+
+        @return: python values
+        @rtype: numpy.ndarray
+        """
+        raise NotImplementedError
+
+    def valuesToDataArray(self, values):
+        """ Batch conversion from python values to KNX encoded data
+
+        @param values: python values
+        @type values: sequence or numpy.ndarray
+
+        @return: KNX encoded data
+        @rtype: numpy.ndarray of int64
+        """
+        raise NotImplementedError
+
+    def framesToValues(self, frames):
+        """ Batch conversion from bus frames to python values
+
+        @param frames: KNX encoded data as bus frames, concatenated (or one frame per row)
+        @type frames: buffer or numpy.ndarray of uint8
+
+        @return: python values, one per frame
+        @rtype: numpy.ndarray
+
+        @raise DPTXlatorValueError:
+        """
+        return self.dataArrayToValues(self.framesToDataArray(frames))
+
+    def checkValues(self, values):
+        """ Batch version of L{checkValue}: check if the values are in the range of the Datapoint Type
+
+        @param values: values to check
+        @type values: numpy.ndarray
+
+        @raise DPTXlatorValueError: a value is out of range (or NaN)
+        """
+        low, high = self._dpt.limits
+        if values.size and not ((values >= low) & (values <= high)).all():
+            raise DPTXlatorValueError("values not in range %s" % repr(self._dpt.limits))
+
+    def valuesToFrames(self, values):
+        """ Batch conversion from python values to bus frames
+
+        @param values: python values
+        @type values: sequence or numpy.ndarray
+
+        @return: KNX encoded data as bus frames, one per row
+        @rtype: numpy.ndarray of uint8
+
+        @raise DPTXlatorValueError:
+        """
+        self._checkBatch()
+        values = numpy.asarray(values)
+        self.checkValues(values)
+        return self.dataArrayToFrames(self.valuesToDataArray(values))
@@ -165,6 +165,12 @@ class DPTXlatorFactoryObject(object):
 
     @ivar _handledMainDPTMappers: table containing all main Datapoint Type mappers
     @type _handledMainDPTMappers: dict
+
+    @ivar _xlators: shared DPTXlator objects, by Datapoint Type ID
+    @type _xlators: dict of L{DPTXlatorBase}
+
+    @ivar _xlatorsByName: shared DPTXlator objects, by Datapoint Type ID string
+    @type _xlatorsByName: dict of L{DPTXlatorBase}
     """
     TYPE_Boolean = DPTMainTypeMapper("1.xxx", DPTXlatorBoolean, "Boolean (main type 1)")
     TYPE_3BitControlled = DPTMainTypeMapper("3.xxx", DPTXlator3BitControl, "3-Bit-Control (main type 3)")
@@ -185,44 +191,65 @@ class DPTXlatorFactoryObject(object):
     TYPE_8BitEncAbsValue = DPTMainTypeMapper("20.xxx", DPTXlator8BitEncAbsValue, "Encoding absolute value (main type 20)")
     #TYPE_HeatingMode = DPTMainTypeMapper("20.xxx", DPTXlatorHeatingMode, "Heating mode (main type 20)")
 
-    def __new__(cls, *args, **kwargs):
-        """ Init the class with all available main Types
-
-        All class objects name B{TYPE_xxx}, will be treated as MainTypeMapper objects and added to the
-        B{_handledDPT} dict.
-        """
-        self = super(DPTXlatorFactoryObject, cls).__new__(cls)
-        cls._handledMainDPTMappers = {}
-        for key, value in cls.__dict__.items():
-            if key.startswith("TYPE_"):
-                cls._handledMainDPTMappers[value.id] = value
-
-        return self
-
     def __init__(self):
         """ Init the Datapoint Type convertor factory
+
+        All class objects named B{TYPE_xxx}, will be treated as MainTypeMapper objects and added to the
+        B{_handledMainDPTMappers} dict.
         """
         super(DPTXlatorFactoryObject, self).__init__()
 
+        self._handledMainDPTMappers = {}
+        for key, value in DPTXlatorFactoryObject.__dict__.items():
+            if key.startswith("TYPE_"):
+                self._handledMainDPTMappers[value.id] = value
+
+        self._xlators = {}
+        self._xlatorsByName = {}
+
     @property
     def handledMainDPTIDs(self):
         """ Return all handled main Datapoint Type IDs the factory can create
         """
-        handleMainDPTIDs = self._handledMainDPTMappers.keys()
-        handleMainDPTIDs.sort()
-        return handleMainDPTIDs
+        return sorted(self._handledMainDPTMappers.keys())
 
-    def create(self, dptId):
+    def create(self, dptId, shared=True):
         """ Create the Datapoint Type for the given dptId
 
         The creation is delegated to the main type mapper.
 
+        By default, DPTXlator objects are created once per dptId, and shared: they must not be modified (see
+        L{DPTXlatorBase.dpt}).
+
         @param dptId: Datapoint Type ID
-        @type dptId: str
+        @type dptId: str or L{DPTID}
+
+        @param shared: if False, always create a new, private, DPTXlator object
+        @type shared: bool
         """
+        if shared:
+            try:
+                if isinstance(dptId, DPTID):
+                    return self._xlators[dptId]
+                else:
+                    return self._xlatorsByName[dptId]
+            except KeyError:
+                pass
+
+        name = dptId
         if not isinstance(dptId, DPTID):
             dptId = DPTID(dptId)
-        return self._handledMainDPTMappers[dptId.generic].createXlator(dptId)
+        if not shared:
+            return self._handledMainDPTMappers[dptId.generic].createXlator(dptId)
+
+        try:
+            dptXlator = self._xlators[dptId]
+        except KeyError:
+            dptXlator = self._xlators.setdefault(dptId, self._handledMainDPTMappers[dptId.generic].createXlator(dptId))
+        if name is not dptId:
+            self._xlatorsByName[name] = dptXlator
+
+        return dptXlator
 
 
 def DPTXlatorFactory():
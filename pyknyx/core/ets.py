@@ -36,10 +36,36 @@ Implements
 ==========
 
  - B{ETS}
+ - B{AsyncETS}
 
 Documentation
 =============
 
+ETS maintains a L{ProcessImage<pyknyx.services.processImage>}, holding the last value of each group address it
+routes (use processImage=False to disable it).
+
+An ETS can be given a L{GroupValueCache<pyknyx.stack.groupValueCache>}: it then keeps the last value written (or
+sent in response) on each group address, and answers GroupValue_Read requests for recent values itself, without
+forwarding them. The answer is sent back to the requester, and routed to all the other layer2 objects like any
+response, so that other stacks and bus monitors see it too; its source address is the one of the last writer.
+
+The initial values reads of all the stacks of an ETS share a single
+L{InitReadBudget<pyknyx.stack.initReader.InitReadBudget>}: the number of outstanding reads and the reads rate are
+limited for the whole ETS, whatever the number of devices. Set B{initReadBudget} before starting the devices to change
+these limits.
+
+An ETS can also be given a L{TelegramCaptureWriter<pyknyx.services.telegramCapture>}: every frame it processes is
+then appended to the capture file. If writing fails (disk full, file removed...), the error is logged and the capture
+is disabled; frames are still routed.
+
+L{ETS} processes frames in its own thread, and its default transceiver uses threads too.
+
+L{AsyncETS} runs everything in a single asyncio event loop instead: frames are processed by a loop callback, the
+default transceiver is an L{AsyncUDPTransceiver<pyknyx.stack.transceiver.asyncUdpTransceiver>}, and the
+L{Scheduler<pyknyx.services.scheduler>} uses the APScheduler asyncio scheduler. Devices and functional blocks
+don't need any change; their L{Notifier<pyknyx.services.notifier>} and scheduler jobs may also be coroutines, which
+are run in the event loop. Devices are started in the default executor, as their start may block.
+
 Usage
 =====
 
@@ -57,16 +83,41 @@ from pyknyx.common.singleton import Singleton
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.stack.flags import Flags
 from pyknyx.stack.priority import Priority
+from pyknyx.stack.cemi.cemiLData import CEMILData
+from pyknyx.stack.layer7.apci import APCI
 from pyknyx.stack.individualAddress import IndividualAddress
 from pyknyx.stack.groupAddress import GroupAddress
 from pyknyx.services.scheduler import Scheduler
+from pyknyx.services.timerWheel import TimerWheelScheduler
 from pyknyx.services.notifier import Notifier
 from pyknyx.services.groupAddressTableMapper import GroupAddressTableMapper
-from pyknyx.stack.priorityQueue import PriorityQueue
-from pyknyx.stack.layer2.l_dataService import PRIORITY_DISTRIBUTION
+from pyknyx.services.processImage import ProcessImage
+from pyknyx.services.metrics import MetricsRegistry
+from pyknyx.stack.groupValueCache import GroupValueCache
+from pyknyx.stack.initReader import InitReadBudget
+from pyknyx.stack.priorityQueue import PriorityQueue, AsyncPriorityQueue
+from pyknyx.stack.layer2.l_dataService import PRIORITY_DISTRIBUTION, QUEUE_BATCH_SIZE
+from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceUnicast, NOT_REQUIRED
 from pyknyx.stack.transceiver.udpTransceiver import UDPTransceiver
+from apscheduler.schedulers.background import BackgroundScheduler
 import time
 
+try:
+    import asyncio
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from pyknyx.stack.transceiver.asyncUdpTransceiver import AsyncUDPTransceiver
+except ImportError:
+    asyncio = AsyncIOScheduler = AsyncUDPTransceiver = None
+
+_metrics = MetricsRegistry()
+_FRAMES = _metrics.counter("pyknyx_ets_frames_total",
+                           "Frames processed by the ETS, by result (a frame forwarded to some layer2, but not "
+                           "re-broadcast because of its hop count, is counted twice; a read answered from the "
+                           "cache is counted as cached, and its response routed like any frame)", ("result",))
+_FORWARDED, _NOT_SENDABLE, _HOPCOUNT_EXHAUSTED, _CACHED, _UNSUPPORTED = \
+    (_FRAMES.labels(result) for result in ("forwarded", "not_sendable", "hopcount_exhausted", "cached", "unsupported"))
+
+
 class ETSValueError(PyKNyXValueError):
     """
     """
@@ -83,17 +134,57 @@ class ETS(threading.Thread):
     @ivar _running: flag whether ETS has been started
     @type _devices: bool
 
+    @ivar _routes: routing index, as (group routes, group catch-all, individual routes, others)
+    @type _routes: tuple
+
+    @ivar _routesGen: incremented each time the routing index needs to be rebuilt
+    @type _routesGen: int
+
+    @ivar _routesBuiltGen: value of L{_routesGen} when the routing index was last built
+    @type _routesBuiltGen: int
+
+    @ivar _groupValueCache: cache answering group reads, if any
+    @type _groupValueCache: L{GroupValueCache<pyknyx.stack.groupValueCache>}
+
+    @ivar _processImage: last values of all group addresses, if enabled
+    @type _processImage: L{ProcessImage<pyknyx.services.processImage>}
+
+    @ivar _capture: capture of the processed frames, if any
+    @type _capture: L{TelegramCaptureWriter<pyknyx.services.telegramCapture>}
+
+    @ivar _tc: transceiver connecting ETS to the bus, if any
+    @type _tc: L{L_DataServiceBroadcast<pyknyx.stack.layer2.l_dataServiceBase>}
+
+    @ivar _initReadBudget: bus load budget of the initial values reads of all the stacks
+    @type _initReadBudget: L{InitReadBudget<pyknyx.stack.initReader>}
+
+    @cvar SCHEDULER_TYPE: APScheduler class the L{Scheduler<pyknyx.services.scheduler>} must use; not used if the
+                          Scheduler uses a L{TimerWheelScheduler<pyknyx.services.timerWheel>}
+    @type SCHEDULER_TYPE: class
+
     raise ETSValueError:
     """
+    SCHEDULER_TYPE = BackgroundScheduler
+
     _running = False
 
     def __init__(self, addr, addrRange=-1,
                  transCls=UDPTransceiver,
-                 transParams=dict(mcastAddr="224.0.23.12", mcastPort=3671)):
+                 transParams=dict(mcastAddr="224.0.23.12", mcastPort=3671),
+                 groupValueCache=None, processImage=True, capture=None):
         """
         Set up the ETS stack.
 
         @param addr: the physical address of this stack (and possibly its sole device)
+
+        @param groupValueCache: cache used to answer group reads; None to forward all reads
+        @type groupValueCache: L{GroupValueCache<pyknyx.stack.groupValueCache>}
+
+        @param processImage: if True, maintain a process image
+        @type processImage: bool
+
+        @param capture: capture writer the processed frames are appended to; None to disable capture
+        @type capture: L{TelegramCaptureWriter<pyknyx.services.telegramCapture>}
         """
         super(ETS, self).__init__()
         self._devices = set()
@@ -101,9 +192,17 @@ class ETS(threading.Thread):
         self._addr = IndividualAddress(addr)
         self._addrNum = addrRange
         self._addrAlloc = self._addr
-        self._queue = PriorityQueue(PRIORITY_DISTRIBUTION)
+        self._queue = PriorityQueue(PRIORITY_DISTRIBUTION, "ets")
+        self._routes = ({}, (), {}, ())
+        self._routesGen = self._routesBuiltGen = 0
+        self._groupValueCache = groupValueCache
+        self._processImage = ProcessImage() if processImage else None
+        self._capture = capture
+        self._initReadBudget = InitReadBudget()
 
         self._scheduler = Scheduler()
+        if not issubclass(self._scheduler.type, TimerWheelScheduler):
+            self._scheduler.setType(self.SCHEDULER_TYPE)
         self.setDaemon(True)
         if transCls is None:
             self._tc = None
@@ -131,6 +230,40 @@ class ETS(threading.Thread):
     def addr(self):
         return self._addr
 
+    @property
+    def groupValueCache(self):
+        return self._groupValueCache
+
+    @property
+    def processImage(self):
+        return self._processImage
+
+    @property
+    def capture(self):
+        return self._capture
+
+    @property
+    def transceiver(self):
+        return self._tc
+
+    @property
+    def initReadBudget(self):
+        return self._initReadBudget
+
+    @initReadBudget.setter
+    def initReadBudget(self, budget):
+        self._initReadBudget = budget
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def pending(self):
+        """ Number of frames waiting to be processed
+        """
+        return len(self._queue)
+
     @property
     def gadMap(self):
         return self._gadMap
@@ -141,9 +274,51 @@ class ETS(threading.Thread):
 
     def addLayer2(self, layer2):
         self._layer2.add(layer2)
+        self.invalidateRoutes()
         if self._running:
             layer2.start()
 
+    def invalidateRoutes(self):
+        """ Rebuild the routing index before processing the next frame
+
+        Must be called when a layer2 object changes the group addresses it wants to receive.
+        """
+        self._routesGen += 1
+
+    def _getRoutes(self):
+        """ Return the routing index, rebuilding it if needed
+
+        Unicast layer2 objects are indexed by the group addresses they want (see
+        L{groupAddresses<pyknyx.stack.layer2.l_dataServiceBase.L_DataServiceBase.groupAddresses>}) and by their
+        individual address. Other layer2 objects (broadcast transceivers) are asked for each frame.
+
+        @return: (group routes, group catch-all, individual routes, others)
+        @rtype: tuple
+        """
+        gen = self._routesGen
+        if gen != self._routesBuiltGen:
+            groupRoutes = {}
+            groupAll = []
+            individualRoutes = {}
+            others = []
+            for layer2 in list(self._layer2):
+                if isinstance(layer2, L_DataServiceUnicast):
+                    gads = layer2.groupAddresses
+                    if gads is None:
+                        groupAll.append(layer2)
+                    else:
+                        for gad in gads:
+                            groupRoutes.setdefault(gad, []).append(layer2)
+                    if layer2.physAddr is not None and layer2.physAddr is not NOT_REQUIRED:
+                        individualRoutes[layer2.physAddr.raw] = layer2
+                else:
+                    others.append(layer2)
+            self._routes = (groupRoutes, tuple(groupAll), individualRoutes, tuple(others))
+            self._routesBuiltGen = gen
+            logger.debug("ETS._getRoutes(): %d group routes, %d individual routes" % (len(groupRoutes), len(individualRoutes)))
+
+        return self._routes
+
     def register(self, device, buildingMap='root', links=()):
         """
         Register a device
@@ -176,8 +351,15 @@ class ETS(threading.Thread):
             if groupObject.group is None:
                 groupObject.group = group
 
+        self.invalidateRoutes()
+
         if self._running:
-            device.start()
+            self._startDevice(device)
+
+    def _startDevice(self, device):
+        """ Start a device registered while ETS is running
+        """
+        device.start()
 
     def putFrame(self, l2, cEMI):
         """
@@ -194,10 +376,21 @@ class ETS(threading.Thread):
         # Add to inQueue and notify inQueue handler
         self._queue.add((l2,cEMI), priority)
 
+    def putFrames(self, l2, cEMIs):
+        """
+        Add several frames, received together, to be processed.
+
+        @param cEMIs:
+        @type cEMIs: list of L{CEMILData<pyknyx.stack.cemi.cemiLData>}
+        """
+        logger.debug("ETS.putFrames(): %d cEMI" % len(cEMIs))
+
+        self._queue.addMany(((l2,cEMI), cEMI.priority) for cEMI in cEMIs)
+
     def start(self):
         if self._running:
             return
-        self._queue = PriorityQueue(PRIORITY_DISTRIBUTION) # clean start
+        self._queue = PriorityQueue(PRIORITY_DISTRIBUTION, "ets") # clean start
         super(ETS,self).start()
 
     def run(self):
@@ -211,18 +404,38 @@ class ETS(threading.Thread):
             self._scheduler.start()
             while self._running:
                 logger.trace("ETS.run(): looping")
-                msg = self._queue.remove()
-                if msg is None:
-                    logger.trace("ETS.run(): exit: None")
-                    return
-                l2,cEMI = msg
-                self.processFrame(l2,cEMI)
+                for msg in self._queue.drainUpTo(QUEUE_BATCH_SIZE):
+                    if msg is None:
+                        logger.trace("ETS.run(): exit: None")
+                        return
+                    l2,cEMI = msg
+                    self.processFrame(l2,cEMI)
             logger.trace("ETS.run(): exit: !_running")
         except Exception:
             logger.exception("ETS main loop")
         finally:
             self._running = False
 
+    def processPending(self):
+        """ Process the frames waiting in the queue, in the calling thread
+
+        Only meant for an ETS which has not been started, driven by a simulation (see
+        L{LoopbackBus<pyknyx.stack.transceiver.loopbackTransceiver>}).
+
+        @return: number of frames processed
+        @rtype: int
+        """
+        count = 0
+        while True:
+            batch = self._queue.drainUpTo(QUEUE_BATCH_SIZE, block=False)
+            if not batch:
+                return count
+            for msg in batch:
+                if msg is not None:
+                    l2, cEMI = msg
+                    self.processFrame(l2, cEMI)
+                    count += 1
+
     def stop(self):
         self._running = False
         self._scheduler.stop()
@@ -231,15 +444,55 @@ class ETS(threading.Thread):
             dev.stop()
         for dev in self._layer2:
             dev.stop()
+        self._flushCapture()
+
+    def _captureFailed(self, where):
+        """ Disable the capture after an I/O error, so routing goes on
+        """
+        logger.exception("%s: capture failed; disabled" % where)
+        self._capture = None
+
+    def _flushCapture(self):
+        if self._capture is not None:
+            try:
+                self._capture.flush()
+            except (IOError, OSError, ValueError):
+                self._captureFailed("ETS._flushCapture()")
+
+    def _captureFrame(self, cEMI):
+        """ Append a frame to the capture file, if any
+        """
+        if self._capture is not None:
+            try:
+                self._capture.write(cEMI)
+            except (IOError, OSError, ValueError):
+                self._captureFailed("ETS.processFrame()")
 
     def processFrame(self, l2, cEMI):
         """
         Forward the frame @cEMI, received from layer2 device @l2, to all
         other eligible interfaces.
+
+        Only the layer2 objects found in the routing index for the destination address, and the broadcast
+        ones, are considered.
+
+        A group read answered from the cache is not forwarded: the response is sent to @l2, and then routed
+        instead of the read.
         """
 
         logger.trace("recv: get %s from %s", cEMI, l2)
+        self._captureFrame(cEMI)
         destAddr = cEMI.destinationAddress
+        if isinstance(destAddr, GroupAddress) and \
+                (self._processImage is not None or self._groupValueCache is not None):
+            response = self._groupValue(l2, cEMI, destAddr)
+            if response is not None:
+                if _metrics.enabled:
+                    _CACHED.inc()
+                l2.dataInd(response)
+                self._captureFrame(response)
+                cEMI = response
+        groupRoutes, groupAll, individualRoutes, others = self._getRoutes()
 
         hopCount = cEMI.hopCount
         if hopCount == 7:
@@ -261,14 +514,19 @@ class ETS(threading.Thread):
         if isinstance(destAddr, GroupAddress):
             r = 'wantsGroupFrame'
             may_force = False
+            targets = chain(groupRoutes.get(destAddr.raw, ()), groupAll, others)
         elif isinstance(destAddr, IndividualAddress):
             r = 'wantsIndividualFrame'
             may_force = True
+            dev = individualRoutes.get(destAddr.raw)
+            targets = others if dev is None else chain((dev,), others)
         else:
             logger.warning("recv %s: unsupported destination address type (%s)", l2, repr(destAddr))
+            if _metrics.enabled:
+                _UNSUPPORTED.inc()
             return
         done = skipped = False
-        for dev in self._layer2:
+        for dev in targets:
             if l2 == dev:
                 logger.trace("recv: same: %s", l2)
                 continue
@@ -276,28 +534,74 @@ class ETS(threading.Thread):
             if not cEMI_x:
                 logger.trace("recv: skip: %s", l2)
                 skipped = True
-            elif getattr(dev,r)(cEMI):
+            elif getattr(dev,r)(cEMI_x):
                 logger.trace("recv: sent: %s", l2)
-                dev.dataInd(cEMI)
+                dev.dataInd(cEMI_x)
                 done = True
             else:
                 logger.trace("recv: notsent: %s", l2)
         if may_force and not done:
             # We never saw this address. Send to every broadcast device.
             logger.trace("recv: repeat")
-            for dev in self._layer2:
+            for dev in others:
                 if l2 == dev:
                     continue
                 cEMI_x = cEMI_b if dev.hop else cEMI
-                if cEMI_x and getattr(dev,r)(cEMI, force=True):
+                if cEMI_x and getattr(dev,r)(cEMI_x, force=True):
+                    dev.dataInd(cEMI_x)
                     done = True
             if not done:
-                logger.debug("recv %s: unknown destination address (%s)", repr(destAddr))
+                logger.debug("recv %s: unknown destination address (%s)", l2, repr(destAddr))
         if skipped:
-            logger.debug("recv %s: not forwarded (hopcount zero): %s from %s", l2, cEMI)
+            logger.debug("recv %s: not forwarded (hopcount zero): %s", l2, cEMI)
         elif not done:
-            logger.debug("recv %s: not sendable: %s from %s", l2, cEMI)
+            logger.debug("recv %s: not sendable: %s", l2, cEMI)
+        if _metrics.enabled:
+            if done:
+                _FORWARDED.inc()
+            if skipped:
+                _HOPCOUNT_EXHAUSTED.inc()
+            elif not done:
+                _NOT_SENDABLE.inc()
+
 
+    def _groupValue(self, l2, cEMI, gad):
+        """ Feed the process image and the group value cache with a group frame, or answer it from the cache
+
+        @return: response to the frame, if it is a read answered from the cache, or None
+        @rtype: L{CEMILData<pyknyx.stack.cemi.cemiLData>}
+        """
+        apci, nSDU = GroupValueCache.groupValueService(cEMI.npdu)
+        if apci is None:
+            return None
+
+        cache = self._groupValueCache
+        if apci != APCI.GROUPVALUE_READ:
+            sa = cEMI.frame.sa
+            if self._processImage is not None:
+                self._processImage.update(gad.raw, nSDU, sa, time.time())
+            if cache is not None:
+                cache.put(gad.raw, nSDU, sa)
+            return None
+
+        if cache is None:
+            return None
+        nSDU, sa = cache.lookup(gad.raw)
+        if nSDU is None:
+            return None
+
+        logger.trace("recv: answer %s from cache", cEMI)
+        response = CEMILData()
+        response.messageCode = CEMILData.MC_LDATA_IND
+        if sa is None:
+            response.sourceAddress = self._addr
+        else:
+            response.frame.sa = sa
+        response.destinationAddress = gad
+        response.priority = cEMI.priority
+        response.hopCount = 6
+        response.npdu = bytearray((len(nSDU) - 1,)) + nSDU
+        return response
 
     def getGrOAT(self, device=None, by="gad", outFormatLevel=3):
         """ Build the Group Object Association Table
@@ -310,7 +614,7 @@ class ETS(threading.Thread):
         else:
             devices = (device,)
         for dev in devices:
-            for gad in dev.stack.agds.groups.keys():
+            for gad in dev.stack.agds.rawGroups.keys():
                 gads.append(GroupAddress(gad, outFormatLevel))
         gads.sort()  #reverse=True)
 
@@ -344,10 +648,10 @@ class ETS(threading.Thread):
 
                 i = 0
                 for dev in devices:
-                    groups = dev.stack.agds.groups
-                    if gad.address not in groups:
+                    groups = dev.stack.agds.rawGroups
+                    if gad.raw not in groups:
                         continue
-                    for go in groups[gad.address].listeners:
+                    for go in groups[gad.raw].listeners:
                         dp = go.datapoint
                         fb = dp.owner
                         if i:
@@ -372,11 +676,11 @@ class ETS(threading.Thread):
                         output +=  "%-30s" % ("" if i else fb.name)
                         dp = go.datapoint
                         gads_ = set()
-                        groups = dev.stack.agds.groups
+                        groups = dev.stack.agds.rawGroups
                         for gad in gads:
-                            if gad.address not in groups:
+                            if gad.raw not in groups:
                                 continue
-                            if go in groups[gad.address].listeners:
+                            if go in groups[gad.raw].listeners:
                                 gads_.add(gad.address)
                         output +=  "%-30s %-10s %-30s %-10s %-10s\n" % (go.name, dp.dptId, ", ".join(gads_), go.flags, go.priority)
 
@@ -398,3 +702,150 @@ class ETS(threading.Thread):
         finally:
             self.stop()
 
+
+class AsyncETS(ETS):
+    """ AsyncETS class
+
+    Same as L{ETS}, but runs in an asyncio event loop instead of its own thread.
+
+    @ivar _loop: event loop running this ETS
+    @type _loop: L{AbstractEventLoop<asyncio>}
+
+    @ivar _ownLoop: True if the event loop has been created by L{run()}
+    @type _ownLoop: bool
+
+    @ivar _inRun: True while L{run()} runs the event loop, which must then be stopped with ETS
+    @type _inRun: bool
+
+    raise ETSValueError:
+    """
+    SCHEDULER_TYPE = AsyncIOScheduler
+
+    def __init__(self, addr, addrRange=-1,
+                 transCls=AsyncUDPTransceiver,
+                 transParams=dict(mcastAddr="224.0.23.12", mcastPort=3671),
+                 groupValueCache=None, processImage=True, capture=None, loop=None):
+        """
+        Set up the ETS stack.
+
+        @param addr: the physical address of this stack (and possibly its sole device)
+
+        @param loop: event loop to run in. If None, the running loop when L{start()} is called, or a new loop
+                     created by L{run()}
+        @type loop: L{AbstractEventLoop<asyncio>}
+        """
+        if asyncio is None:
+            raise ETSValueError("asyncio is not available")
+
+        self._loop = loop
+        self._ownLoop = self._inRun = False
+
+        super(AsyncETS, self).__init__(addr, addrRange, transCls, transParams, groupValueCache, processImage, capture)
+
+    @property
+    def loop(self):
+        return self._loop
+
+    def _startDevice(self, device):
+        self._loop.run_in_executor(None, device.start)
+
+    def start(self, loop=None):
+        """ Start processing frames in the event loop
+
+        May be called from any thread.
+
+        @param loop: event loop to run in (see L{__init__()})
+        @type loop: L{AbstractEventLoop<asyncio>}
+        """
+        if self._running:
+            return
+        if loop is not None:
+            self._loop = loop
+        elif self._loop is None:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                raise ETSValueError("no event loop to run in")
+
+        self._queue = AsyncPriorityQueue(PRIORITY_DISTRIBUTION, self._loop, self._processQueue, "ets") # clean start
+        self._running = True
+        self._loop.call_soon_threadsafe(self._start)
+
+    def _start(self):
+        logger.debug("AsyncETS._start(): starting")
+        for dev in self._layer2:
+            dev.start()
+        for dev in self._devices:
+            self._startDevice(dev)
+        if not issubclass(self._scheduler.type, TimerWheelScheduler):
+            self._scheduler.setType(self.SCHEDULER_TYPE)  # reset by a previous stop
+        if isinstance(self._scheduler.apscheduler, TimerWheelScheduler):
+            self._scheduler.apscheduler.loop = self._loop
+        self._scheduler.start()
+        Notifier().setLoop(self._loop)
+
+    def _processQueue(self):
+        """ Process pending frames
+
+        Called in the event loop by the queue, when frames are available.
+        """
+        for l2, cEMI in self._queue.drainNowait(QUEUE_BATCH_SIZE):
+            try:
+                self.processFrame(l2, cEMI)
+            except Exception:
+                logger.exception("AsyncETS._processQueue()")
+
+    def run(self):
+        """ Run the event loop in the current thread, until L{stop()} is called
+
+        If no loop has been given, a new one is created, and closed on exit.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._ownLoop = True
+        loop = self._loop
+        self._inRun = True
+        try:
+            self.start()
+            loop.run_forever()
+        finally:
+            if self._running:
+                # Interrupted; let devices and transceivers stop cleanly
+                self.stop()
+                loop.run_forever()
+            self._inRun = False
+            if self._ownLoop:
+                loop.close()
+                self._loop = None
+                self._ownLoop = False
+
+    def stop(self):
+        """ Stop processing frames
+
+        May be called from any thread. If the event loop is run by L{run()}, it is stopped too.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._loop.call_soon_threadsafe(self._stop)
+
+    def _stop(self):
+        logger.debug("AsyncETS._stop(): stopping")
+        if issubclass(self._scheduler.type, TimerWheelScheduler):
+            self._scheduler.stop()
+        else:
+            self._scheduler.setType(ETS.SCHEDULER_TYPE)  # can't be started out of an event loop; keeps the jobs
+        for dev in self._devices:
+            dev.stop()
+        for dev in self._layer2:
+            dev.stop()
+        self._flushCapture()
+        Notifier().setLoop(None)
+        if self._inRun:
+            self._loop.call_soon(self._loop.stop)
+
+    def mainLoop(self):
+        try:
+            self.run()
+        except KeyboardInterrupt:
+            pass
@@ -36,6 +36,7 @@ Implements
 ==========
 
  - B{FunctionalBlockValueError}
+ - B{FunctionalBlockSchema}
  - B{FunctionalBlock}
 
 Documentation
@@ -43,6 +44,11 @@ Documentation
 
 B{FunctionalBlock} is one of the most important object of B{PyKNyX} framework, after L{Datapoint<pyknyx.core.datapoint>}.
 
+The Datapoints and GroupObjects definitions of a FunctionalBlock class are collected from the class and its parents
+only once, when the first instance is created, and kept in a L{FunctionalBlockSchema}. Creating an instance then
+only instantiates the Datapoints and GroupObjects of the schema. As a consequence, a class must not be modified
+after it has been instanciated.
+
 Usage
 =====
 
@@ -74,10 +80,9 @@ class FB_DP(object):
         if isinstance(self.dp,str):
             return fb.go[self.dp]
         else:
-            for val in fb.go.values():
-                if val._factory.dp is self.dp:
-                    return val
-            else:
+            try:
+                return fb.go[type(fb)._getSchema().goNames[self.dp]]
+            except KeyError:
                 raise KeyError("I could not find the GO for DP '%s' in FB '%s'"%(self.dp.name, fb.__class__.__name__))
 
 
@@ -127,6 +132,91 @@ class FB(object):
         return fb
 
 
+class FunctionalBlockSchema(object):
+    """ Compiled definitions of a FunctionalBlock class
+
+    @ivar datapoints: Datapoints definitions, as (name, factory)
+    @type datapoints: tuple
+
+    @ivar groupObjects: GroupObjects definitions, as (name, factory, datapoint name); the datapoint name is None if
+                        the factory refers to an existing L{Datapoint}
+    @type groupObjects: tuple
+
+    @ivar goNames: GroupObjects names, indexed by the factory of their Datapoint
+    @type goNames: dict
+
+    @ivar desc: description of the class
+    @type desc: str
+    """
+    def __init__(self, cls):
+        """ Collect the definitions of a FunctionalBlock class, and of its parents
+
+        @param cls: FunctionalBlock class
+        @type cls: class
+        """
+        super(FunctionalBlockSchema, self).__init__()
+
+        # Retrieve all parents classes, to get all objects defined there
+        classes = cls.__mro__
+
+        # objects named B{DP_xxx} or of type DP are treated as Datapoint
+        datapoints = {}
+        for cls_ in classes[::-1]:
+            for key, value in cls_.__dict__.items():
+                if key.startswith("DP_") and isinstance(value,dict):
+                    assert 'name' in value, value
+                    value = DP(**value)
+                    key = value.name
+
+                if isinstance(value, DP):
+                    if value.name is None:
+                        value.name = key
+                    datapoints[key] = value
+                elif key in datapoints and value is None:
+                    del datapoints[key]
+        dpNames = dict((factory, key) for key, factory in datapoints.items())
+
+        # If a Datapoint has Flags, auto-generate a GO for it as a shortcut
+        groupObjects = {}
+        for key, factory in datapoints.items():
+            flags = factory.param("flags")
+            if flags is not None:
+                groupObjects[key] = (GO(factory, flags=flags, priority=factory.param("priority")), key)
+
+        # objects named B{GO_xxx} or of type GO are treated as GroupObjects
+        for cls_ in classes[::-1]:
+            for key, value in cls_.__dict__.items():
+                if key.startswith("GO_") and isinstance(value, dict):
+                    value = GO(**value)
+
+                if isinstance(value, GO):
+                    if isinstance(value.dp, str):
+                        dpName = value.dp
+                        value.dp = datapoints[dpName] # required for symbolic LNK() to work
+                    elif isinstance(value.dp, DP):
+                        try:
+                            dpName = dpNames[value.dp]
+                        except KeyError:
+                            raise KeyError("I could not find the DP factory %s on %s" % (value.dp, cls))
+                    else:
+                        dpName = None
+                    key = value.dp.name if dpName is None else dpName
+                    groupObjects[key] = (value, dpName)
+                elif key in groupObjects and value is None:
+                    del groupObjects[key]
+
+        self.datapoints = tuple(datapoints.items())
+        self.groupObjects = tuple((key, factory, dpName) for key, (factory, dpName) in groupObjects.items())
+        self.goNames = dict((datapoints[dpName], key) for key, factory, dpName in self.groupObjects
+                            if dpName is not None)
+
+        try:
+            self.desc = cls.__dict__["DESC"]
+        except KeyError:
+            logger.error("%s: missing DESCription", cls)
+            self.desc = "FB"
+
+
 class FunctionalBlock(object):
     """ FunctionalBlock class
 
@@ -161,60 +251,32 @@ class FunctionalBlock(object):
 
         self._device = dev
 
-        # Retrieve all parents classes, to get all objects defined there
-        classes = cls.__mro__
-
-        # objects named B{DP_xxx} or of type DP are treated as Datapoint and added to the B{_datapoints} dict
-        datapoints = {}
-        for cls_ in classes[::-1]:
-            for key, value in cls_.__dict__.items():
-                if key.startswith("DP_") and isinstance(value,dict):
-                    assert 'name' in value, value
-                    value = DP(**value)
-                    key = value.name
-
-                if isinstance(value, DP):
-                    if value.name is None:
-                        value.name = key
-                    value = value.gen(self, key)
-                    logger.debug("%s: new DP %s: %s", self, repr(key), value)
-                    datapoints[key] = value
-                elif key in datapoints and value is None:
-                    logger.debug("%s: drop DP %s", self, repr(key))
-                    del datapoints[key]
+        schema = cls._getSchema()
 
+        datapoints = dict((key, factory.gen(self, key)) for key, factory in schema.datapoints)
         self._datapoints = FrozenDict(datapoints)
 
-        # If a Datapoint has Flags, auto-generate a GO for it as a shortcut
         groupObjects = {}
-        for key, value in datapoints.items():
-            if value.flags is not None:
-                groupObjects[key] = GO(value._factory, flags=value.flags, priority=value.priority).gen(self)
+        for key, factory, dpName in schema.groupObjects:
+            groupObjects[key] = factory.make(factory.dp if dpName is None else datapoints[dpName])
+        self._groupObjects = FrozenDict(groupObjects)
 
-        # objects named B{GO_xxx} or of type GO are treated as GroupObjects and added to the B{_groupObjects} dict
-        for cls_ in classes[::-1]:
-            for key, value in cls_.__dict__.items():
-                if key.startswith("GO_") and isinstance(value, dict):
-                    key = value.get('name',key)
-                    value = GO(**value)
+        self._desc = schema.desc
 
-                if isinstance(value, GO):
-                    value = value.gen(self)
-                    key = value.datapoint.name
-                    logger.debug("%s: new GO %s: %s", self, repr(key), value)
-                    groupObjects[key] = value
-                elif key in groupObjects and value is None:
-                    logger.debug("%s: drop GO %s", self, repr(key))
-                    del groupObjects[key]
-        self._groupObjects = FrozenDict(groupObjects)
+        return self
+
+    @classmethod
+    def _getSchema(cls):
+        """ Return the schema of this class, compiling it on first use
 
+        @rtype: L{FunctionalBlockSchema}
+        """
         try:
-            self._desc = cls.__dict__["DESC"]
+            return cls.__dict__["_schema"]
         except KeyError:
-            logger.error("%s: missing DESCription", cls)
-            self._desc = "FB"
-
-        return self
+            logger.debug("%s: compile schema", cls)
+            cls._schema = schema = FunctionalBlockSchema(cls)
+            return schema
 
     def __init__(self, dev, name, desc=None, params={}):
         """
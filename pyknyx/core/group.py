@@ -153,6 +153,14 @@ class Group(A_GroupDataListener):
         """
         self._agds.groupValueWriteReq(self._gad, priority, data, size)
 
+    def writeTemplate(self, priority, size):
+        """ Build a transmit template for write requests on the GAD associated with this group
+
+        @return: template; use its send() method to write data
+        @rtype: L{CEMILDataTemplate<pyknyx.stack.cemi.cemiLDataTemplate>}
+        """
+        return self._agds.groupValueWriteTemplate(self._gad, priority, size)
+
     def read(self, priority):
         """ Read data request on the GAD associated with this group
         """
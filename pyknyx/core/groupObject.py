@@ -85,6 +85,14 @@ class GO(object):
             assert isinstance(self.dp,str), self.dp
             dp = obj.dp[self.dp]
             self.dp = dp._factory # required for symbolic LNK() to work
+        return self.make(dp)
+
+    def make(self, dp):
+        """ Instantiate the group object, for an already resolved datapoint
+
+        @param dp: datapoint of the group object
+        @type dp: L{Datapoint}
+        """
         go = GroupObject(dp, *self.args, **self.kwargs)
         go._factory = self
         return go
@@ -104,6 +112,9 @@ class GroupObject(GroupListener):
     @ivar _group: group to use to communicate on the bus
     @type _group: L{Group<pyknyx.core.group>}
 
+    @ivar _writeTemplate: prebuilt frame used to write the datapoint value on the bus
+    @type _writeTemplate: L{CEMILDataTemplate<pyknyx.stack.cemi.cemiLDataTemplate>}
+
     @todo: take 'access' into account when managing flags
     @todo: add lock for user
     """
@@ -134,6 +145,7 @@ class GroupObject(GroupListener):
         self._priority = priority
 
         self._group = None
+        self._writeTemplate = None
 
         # Connect signals
         datapoint.signalChanged.connect(self._slotChanged)
@@ -160,7 +172,10 @@ class GroupObject(GroupListener):
         if self._group is not None and self._flags.communicate:
             if (oldValue != newValue and self._flags.transmit) or self._flags.stateless:
                 frame, size = self._datapoint.frame
-                self._group.write(self._priority, frame, size)
+                template = self._writeTemplate
+                if template is None or template.size != size:
+                    template = self._writeTemplate = self._group.writeTemplate(self._priority, size)
+                template.send(frame)
         # @todo: add a param to set refresh max delay
 
     @property
@@ -182,10 +197,11 @@ class GroupObject(GroupListener):
         return self._priority
 
     @priority.setter
-    def priority(str, level):
+    def priority(self, priority):
         if not isinstance(priority, Priority):
             priority = Priority(priority)
         self._priority = priority
+        self._writeTemplate = None
 
     @property
     def group(self):
@@ -194,6 +210,7 @@ class GroupObject(GroupListener):
     @group.setter
     def group(self, group):
         self._group = group
+        self._writeTemplate = None
 
         # If the flag init is set, send a read request on that accesspoint, which is bound to the default GAD
         # Does not work, as stck is not yet running!!!!!!
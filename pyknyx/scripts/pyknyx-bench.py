@@ -0,0 +1,16 @@
+#!/usr/bin/python3
+
+#
+# Runs the frame pipeline benchmark suite; see pyknyx.bench.pipeline.
+#
+# Usage:
+#
+# pyknyx-bench [PATTERN...] [--duration S] [--json FILE] [--baseline FILE]
+#
+
+import sys
+
+from pyknyx.bench.pipeline import main
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -62,6 +62,7 @@ import os.path
 import argparse
 import threading
 
+from pyknyx.common import config
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.services.groupAddressTableMapper import GroupAddressTableMapper, GroupAddressTableMapperValueError
@@ -394,7 +395,7 @@ def main():
 
     # If XML map file name is given, try to load it
     if args.xmlMapFile:
-        mapper.loadXML(args.xmlMapFile)
+        mapper.loadXML(args.xmlMapFile, config.ETS_PROJECT_CACHE_DIR)
         for gad,tab in mapper.table.items():
             print gad,tab
     else:
@@ -0,0 +1,517 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+ETS project import
+
+Implements
+==========
+
+ - B{EtsProjectImporter}
+ - B{EtsProjectImporterValueError}
+ - B{EtsGroupAddress}
+
+Documentation
+=============
+
+Extract the group addresses (and their Datapoint Types) from an ETS4/5 project archive (B{.knxproj}), or from an
+ETS XML file containing group addresses.
+
+Documents are read with C{iterparse()}, and elements are dropped as soon as they are processed, so memory usage does
+not depend on the size of the project. The project connections (B{ComObjectInstanceRef}) are scanned once, and
+indexed by group address; a GAD without Datapoint Type then gets the one of the first connected object which has one,
+receiving objects first, falling back to the object size. Manufacturer files are only parsed when needed, at most
+once each, and only the few attributes used are kept.
+
+The resolved GAD map table (see L{GroupAddressTableMapper<pyknyx.services.groupAddressTableMapper>}) can be cached in
+a directory, as a JSON file. The cache is valid as long as the size and modification time of the project are the
+same; if only the modification time changed, the SHA-1 of the project is checked before importing it again.
+
+Usage
+=====
+
+>>> importer = EtsProjectImporter("house.knxproj", cacheDir="/tmp/cache")
+>>> importer.table
+{'1/2/80': {'name': 'DL Keller', 'desc': None, 'dptId': '1.001'}}
+
+@license: GPL
+"""
+
+
+import collections
+import hashlib
+import itertools
+import json
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as etree
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.core.dptXlator.dptId import DPTID
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.stack.groupAddress import GroupAddress
+
+EtsGroupAddress = collections.namedtuple("EtsGroupAddress", "id address path desc dptId")
+
+_DPT_RE = re.compile(r"^DPS?T-(\d+)(?:-(\d+))?$")
+
+
+class EtsProjectImporterValueError(PyKNyXValueError):
+    """
+    """
+
+
+def _localName(tag):
+    """ Strip the namespace from an element tag
+    """
+    return tag.rpartition('}')[2]
+
+
+def _iterparse(source):
+    """ Iterate over the elements of an XML document
+
+    Elements are cleared once their end has been reached.
+
+    @param source: XML document
+    @type source: str or file
+
+    @return: (start, element) tuples, where start is False at the end of the element
+    @rtype: generator
+    """
+    for event, elem in etree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            yield True, elem
+        else:
+            yield False, elem
+            elem.clear()
+
+
+class EtsProjectImporter(object):
+    """ ETS project importer
+
+    @ivar _path: path of the ETS project archive, or XML file
+    @type _path: str
+
+    @ivar _cacheDir: directory where the GAD map table is cached, or None to disable caching
+    @type _cacheDir: str
+
+    @ivar _groupAddresses: imported group addresses
+    @type _groupAddresses: list of L{EtsGroupAddress}
+
+    @ivar _archive: ETS project archive, while importing it
+    @type _archive: L{zipfile.ZipFile}
+
+    @ivar _dpts: Datapoint Types, by ETS id (B{DPT-n}/B{DPST-n-m})
+    @type _dpts: dict of L{DPTID}
+
+    @ivar _dptSizes: first Datapoint Type with a given size (in bits)
+    @type _dptSizes: dict of L{DPTID}
+
+    @ivar _comObjects: manufacturer objects (RefId, DatapointType, ObjectSize), by manufacturer file and id
+    @type _comObjects: dict of dict of tuple
+
+    @ivar _refDpts: Datapoint Types already resolved, by (object RefId, use object size)
+    @type _refDpts: dict of L{DPTID}
+    """
+    CACHE_VERSION = 1
+
+    OBJECT_SIZES = {
+        "1 Bit": "DPST-1-1",
+        "1 Byte": "DPST-5-1",
+        "2 Bytes": "DPST-9-1"
+    }
+
+    def __init__(self, path, cacheDir=None):
+        """ Init the ETS project importer
+
+        @param path: path of the ETS project archive, or XML file
+        @type path: str
+
+        @param cacheDir: directory where the GAD map table is cached, or None to disable caching
+        @type cacheDir: str
+        """
+        super(EtsProjectImporter, self).__init__()
+
+        self._path = path
+        self._cacheDir = cacheDir
+        self._groupAddresses = None
+        self._archive = None
+        self._dpts = {}
+        self._dptSizes = {}
+        self._comObjects = {}
+        self._refDpts = {}
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def groupAddresses(self):
+        """ Return the group addresses of the project, in document order
+
+        The project is always imported (the cache is not used).
+        """
+        if self._groupAddresses is None:
+            if zipfile.is_zipfile(self._path):
+                self._groupAddresses = self._importArchive()
+            else:
+                self._groupAddresses = self._importXML(self._path)
+
+        return self._groupAddresses
+
+    @property
+    def table(self):
+        """ Return the GAD map table of the project
+
+        The table is loaded from the cache if it is still valid; otherwise, the project is imported, and the table
+        saved in the cache.
+        """
+        table = self._loadCache()
+        if table is None:
+            table = {}
+            for groupAddress in self.groupAddresses:
+                table[groupAddress.address] = {'name': groupAddress.path[-1], 'desc': groupAddress.desc,
+                                               'dptId': groupAddress.dptId and str(groupAddress.dptId)}
+            self._saveCache(table)
+
+        return table
+
+    def _getDpt(self, ident):
+        """ Convert an ETS Datapoint Type id
+
+        @param ident: ETS id (B{DPT-n} or B{DPST-n-m}); only the first one of a space separated list is used
+        @type ident: str
+
+        @return: Datapoint Type ID, or None if ident is empty or unknown
+        @rtype: L{DPTID}
+        """
+        if not ident:
+            return None
+        ident = ident.split(' ', 1)[0]
+        try:
+            return self._dpts[ident]
+        except KeyError:
+            match = _DPT_RE.match(ident)
+            if match is None:
+                logger.warning("EtsProjectImporter._getDpt(): unknown Datapoint Type '%s'" % ident)
+                return None
+            main, sub = match.groups()
+            dptId = DPTID(main=int(main), sub=sub and int(sub))
+            self._dpts[ident] = dptId
+            return dptId
+
+    def _getSizeDpt(self, size):
+        """ Convert an ETS object size
+
+        @param size: object size ('1 Bit', '4 Bytes'...)
+        @type size: str
+
+        @return: Datapoint Type ID, or None if size is empty or unknown
+        @rtype: L{DPTID}
+        """
+        if not size:
+            return None
+        try:
+            return self._getDpt(EtsProjectImporter.OBJECT_SIZES[size])
+        except KeyError:
+            try:
+                value, unit = size.split(' ', 1)
+                bits = int(value) * 8 if unit.lower().startswith("byte") else int(value)
+            except ValueError:
+                logger.warning("EtsProjectImporter._getSizeDpt(): unknown object size '%s'" % size)
+                return None
+            return self._dptSizes.get(bits)
+
+    def _importXML(self, source):
+        """ Import the group addresses of an ETS XML document
+
+        @param source: XML document
+        @type source: str or file
+
+        @return: group addresses
+        @rtype: list of L{EtsGroupAddress}
+        """
+        groupAddresses = []
+        ranges = []
+        connections = {}
+        comObject = None
+        order = itertools.count()
+        for start, elem in _iterparse(source):
+            tag = _localName(elem.tag)
+            if tag == "GroupRange":
+                if start:
+                    ranges.append(elem.get("Name"))
+                else:
+                    ranges.pop()
+            elif not start:
+                if tag == "ComObjectInstanceRef":
+                    comObject = None
+            elif tag == "GroupAddress":
+                address = elem.get("Address")
+                if '/' in address:
+                    address = GroupAddress(address)
+                else:
+                    address = GroupAddress.fromRaw(int(address))
+                dpt = elem.get("DatapointType") or elem.get("DPTs")
+                groupAddresses.append(EtsGroupAddress(id=elem.get("Id"), address=str(address),
+                                                      path=tuple(ranges) + (elem.get("Name"),),
+                                                      desc=elem.get("Description"), dptId=self._getDpt(dpt)))
+            elif tag == "ComObjectInstanceRef":
+                comObject = (next(order), elem.get("RefId"), elem.get("DatapointType"))
+            elif tag in ("Receive", "Send") and comObject is not None:
+                gid = elem.get("GroupAddressRefId")
+                if gid is not None:
+                    connections.setdefault(gid, []).append((tag == "Send", comObject))
+
+        if connections:
+            self._resolveConnections(groupAddresses, connections)
+
+        return groupAddresses
+
+    def _resolveConnections(self, groupAddresses, connections):
+        """ Give the group addresses without Datapoint Type the one of their connected objects
+
+        @param groupAddresses: group addresses to resolve (replaced in place)
+        @type groupAddresses: list of L{EtsGroupAddress}
+
+        @param connections: connected objects (send, (order, RefId, DatapointType)), by group address id
+        @type connections: dict of list
+        """
+        for i, groupAddress in enumerate(groupAddresses):
+            if groupAddress.dptId is not None or groupAddress.id not in connections:
+                continue
+
+            # Receiving objects first, then in document order (order is unique per object)
+            comObjects = [comObject for send, comObject in
+                          sorted(connections[groupAddress.id], key=lambda connection: (connection[0], connection[1][0]))]
+            for useObjSize in (False, True):
+                for order, refId, dpt in comObjects:
+                    dptId = self._getDpt(dpt) if dpt else self._getRefDpt(refId, useObjSize)
+                    if dptId is not None:
+                        groupAddresses[i] = groupAddress._replace(dptId=dptId)
+                        break
+                else:
+                    continue
+                break
+
+    def _importArchive(self):
+        """ Import the group addresses of an ETS project archive
+
+        @return: group addresses
+        @rtype: list of L{EtsGroupAddress}
+
+        raise EtsProjectImporterValueError:
+        """
+        logger.debug("EtsProjectImporter._importArchive(): importing '%s'" % self._path)
+        with zipfile.ZipFile(self._path) as archive:
+            self._archive = archive
+            try:
+                self._importMaster()
+                projectId = self._getProjectId()
+                try:
+                    projectFile = archive.open("P-%s/Project.xml" % projectId)
+                except KeyError:
+                    projectFile = archive.open("P-%s/project.xml" % projectId)
+                with projectFile:
+                    for start, elem in _iterparse(projectFile):
+                        if _localName(elem.tag) == "ProjectInformation":
+                            number = elem.get("ProjectId")
+                            break
+                    else:
+                        raise EtsProjectImporterValueError("no project information in '%s'" % self._path)
+                with archive.open("P-%s/%s.xml" % (projectId, number)) as installation:
+                    return self._importXML(installation)
+            finally:
+                self._archive = None
+
+    def _getProjectId(self):
+        """ Return the id of the (only) project of the archive
+        """
+        projectId = None
+        for name in self._archive.namelist():
+            if name.startswith("P-") and name.endswith(".signature") and len(name) == 16:
+                if projectId is not None:
+                    raise EtsProjectImporterValueError("more than one project in '%s'" % self._path)
+                projectId = name[2:6]
+        if projectId is None:
+            raise EtsProjectImporterValueError("no project in '%s'" % self._path)
+
+        return projectId
+
+    def _importMaster(self):
+        """ Import the Datapoint Types defined in the master file
+        """
+        try:
+            master = self._archive.open("knx_master.xml")
+        except KeyError:
+            logger.warning("EtsProjectImporter._importMaster(): no master file in '%s'" % self._path)
+            return
+
+        with master:
+            main = size = None
+            for start, elem in _iterparse(master):
+                if not start:
+                    continue
+                tag = _localName(elem.tag)
+                if tag == "DatapointType":
+                    main = int(elem.get("Number"))
+                    size = elem.get("SizeInBit")
+                    size = size and int(size)
+                    self._dpts[elem.get("Id")] = DPTID(main=main)
+                elif tag == "DatapointSubtype":
+                    dptId = DPTID(main=main, sub=int(elem.get("Number")))
+                    self._dpts[elem.get("Id")] = dptId
+                    if size is not None:
+                        self._dptSizes.setdefault(size, dptId)
+
+    def _getComObjects(self, refId):
+        """ Return the manufacturer objects of the file defining the given object
+
+        @param refId: manufacturer object id (B{M-xxxx_A-yyyy_...})
+        @type refId: str
+
+        @return: (RefId, DatapointType, ObjectSize), by object id
+        @rtype: dict
+        """
+        manufacturer, application = refId.split('_', 2)[:2]
+        name = "%s/%s_%s.xml" % (manufacturer, manufacturer, application)
+        try:
+            return self._comObjects[name]
+        except KeyError:
+            comObjects = self._comObjects[name] = {}
+            try:
+                source = self._archive.open(name)
+            except KeyError:
+                logger.warning("EtsProjectImporter._getComObjects(): no manufacturer file '%s'" % name)
+                return comObjects
+
+            with source:
+                for start, elem in _iterparse(source):
+                    if start and _localName(elem.tag) in ("ComObjectRef", "ComObject"):
+                        comObjects[elem.get("Id")] = (elem.get("RefId"), elem.get("DatapointType"),
+                                                      elem.get("ObjectSize"))
+            return comObjects
+
+    def _getRefDpt(self, refId, useObjSize):
+        """ Return the Datapoint Type of a manufacturer object
+
+        @param refId: manufacturer object id
+        @type refId: str
+
+        @param useObjSize: if True, fall back to the object size
+        @type useObjSize: bool
+
+        @return: Datapoint Type ID, or None if unknown
+        @rtype: L{DPTID}
+        """
+        try:
+            return self._refDpts[(refId, useObjSize)]
+        except KeyError:
+            dptId = None
+            if self._archive is not None and refId:
+                comObjects = self._getComObjects(refId)
+                ident = refId
+                while ident in comObjects and dptId is None:
+                    ident, dpt, size = comObjects[ident]
+                    dptId = self._getDpt(dpt)
+                    if dptId is None and useObjSize:
+                        dptId = self._getSizeDpt(size)
+            self._refDpts[(refId, useObjSize)] = dptId
+            return dptId
+
+    def _getCachePath(self):
+        """ Return the path of the cache file of the project
+        """
+        key = hashlib.sha1(os.path.abspath(self._path).encode("utf-8")).hexdigest()
+        return os.path.join(self._cacheDir, "etsProject-%s.json" % key)
+
+    def _getDigest(self):
+        """ Return the SHA-1 of the project
+        """
+        digest = hashlib.sha1()
+        with open(self._path, "rb") as source:
+            for chunk in iter(lambda: source.read(65536), b''):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def _loadCache(self):
+        """ Load the GAD map table from the cache
+
+        @return: GAD map table, or None if there is no valid cached table
+        @rtype: dict
+        """
+        if self._cacheDir is None:
+            return None
+
+        cachePath = self._getCachePath()
+        try:
+            with open(cachePath) as cacheFile:
+                cache = json.load(cacheFile)
+        except (IOError, OSError, ValueError):
+            return None
+
+        stat = os.stat(self._path)
+        if cache.get("version") != EtsProjectImporter.CACHE_VERSION or cache.get("size") != stat.st_size:
+            return None
+        if cache.get("mtime") != stat.st_mtime:
+            if cache.get("sha1") != self._getDigest():
+                return None
+            self._saveCache(cache["table"], cache["sha1"])
+        logger.debug("EtsProjectImporter._loadCache(): loaded '%s' from '%s'" % (self._path, cachePath))
+
+        return cache["table"]
+
+    def _saveCache(self, table, digest=None):
+        """ Save the GAD map table in the cache
+
+        @param table: GAD map table
+        @type table: dict
+
+        @param digest: SHA-1 of the project, if already known
+        @type digest: str
+        """
+        if self._cacheDir is None:
+            return
+
+        cachePath = self._getCachePath()
+        try:
+            if not os.path.isdir(self._cacheDir):
+                os.makedirs(self._cacheDir)
+            stat = os.stat(self._path)
+            cache = dict(version=EtsProjectImporter.CACHE_VERSION, size=stat.st_size, mtime=stat.st_mtime,
+                         sha1=digest or self._getDigest(), table=table)
+            with open(cachePath + ".tmp", "w") as cacheFile:
+                json.dump(cache, cacheFile)
+            os.rename(cachePath + ".tmp", cachePath)
+        except (IOError, OSError):
+            logger.exception("EtsProjectImporter._saveCache(): can't save '%s'" % cachePath)
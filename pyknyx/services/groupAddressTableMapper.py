@@ -59,6 +59,12 @@ GAD_MAP_TABLE = {
 
 GroupAddressTableMapper object is a singleton.
 
+A reverse index (nickname to GAD) and the datapoint translators of the GADs are maintained along with the table, so
+all lookups are done in constant time. Updates are checked against this index, so a nickname can't be used twice.
+As a consequence, the table must only be changed through the load/update methods.
+
+The table can also be loaded from an ETS project, see L{EtsProjectImporter<pyknyx.services.etsProjectImporter>}.
+
 Usage
 =====
 
@@ -86,14 +92,13 @@ Usage
 """
 
 import six
-import re
 import os.path
 import imp
-import xml.etree.ElementTree as etree
 
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.common.singleton import Singleton
 from pyknyx.core.dptXlator.dptXlatorFactory import DPTXlatorFactory
+from pyknyx.services.etsProjectImporter import EtsProjectImporter
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.stack.groupAddress import GroupAddress, GroupAddressValueError
 
@@ -111,6 +116,12 @@ class GroupAddressTableMapper(object):
 
     @ivar _gadMapTable: GroupAddress mapping table
     @type _gadMapTable: dict
+
+    @ivar _nicknames: GAD, indexed by nickname
+    @type _nicknames: dict
+
+    @ivar _dptXlators: datapoint translators, indexed by GAD (filled on first use)
+    @type _dptXlators: dict
     """
 
     def __init__(self, module='gadMapTable'):
@@ -126,25 +137,67 @@ class GroupAddressTableMapper(object):
         self._gadMapModule = module
 
         self._gadMapTable = {}
+        self._nicknames = {}
+        self._dptXlators = {}
 
     @property
     def table(self):
         return self._gadMapTable
 
+    def _buildIndex(self, table, nicknames=None):
+        """ Build the nicknames index of a GAD map table
+
+        @param table: GAD map table
+        @type table: dict
+
+        @param nicknames: index of the current table, if table is an update of this table
+        @type nicknames: dict
+
+        @return: nicknames index of the table, or None if a nickname is duplicated
+        @rtype: dict
+        """
+        index = {}
+        for key, value in table.items():
+            name = value['name']
+            if name in index or nicknames is not None and nicknames.get(name, key) != key and \
+                    nicknames[name] not in table:
+                logger.warning("Duplicated nickname '%s' in GAD map table" % name)
+                return None
+            index[name] = key
+
+        return index
+
     def isTableValid(self, table):
         """ Check GAD map table validity.
 
         GAD and nickname should be unique (GAD are, as they are dict keys!)
         """
-        nicknames = {}
-        for key, value in table.items():
-            if value['name'] in nicknames:
-                logger.warning("Duplicated nickname '%s' in GAD map table" % value['name'])
-                return False
-            else:
-                nicknames[value['name']] = dict(gad=key, desc=value['desc'])
+        return self._buildIndex(table) is not None
+
+    def _load(self, table):
+        """ Replace the GAD map table, if valid
+        """
+        index = self._buildIndex(table)
+        if index is not None:
+            self._gadMapTable = dict(table)
+            self._nicknames = index
+            self._dptXlators = {}
 
-        return True
+    def _update(self, table):
+        """ Update the GAD map table, if valid
+
+        Only the updated entries are checked.
+        """
+        index = self._buildIndex(table, self._nicknames)
+        if index is not None:
+            for key in table:
+                try:
+                    del self._nicknames[self._gadMapTable[key]['name']]
+                except KeyError:
+                    pass
+                self._dptXlators.pop(key, None)
+            self._gadMapTable.update(table)
+            self._nicknames.update(index)
 
     def _loadTable(self, path):
         """ Do load the GAD map table from module.
@@ -173,74 +226,62 @@ class GroupAddressTableMapper(object):
 
         return gadMapTable
 
-    def _loadXMLTable(self, file):
+    def _loadXMLTable(self, file, cacheDir=None):
+        """ Do load the GAD map table from ETS project.
+
+        @param file: ETS project archive, or XML file
+        @type file: str
+
+        @param cacheDir: directory where the imported table is cached, or None to disable caching
+        @type cacheDir: str
+        """
         gadMapTable = {}
         if os.path.exists(file):
             logger.debug("GroupAddressTableMapper.loadXMLTable(): loading from '%s'" % file)
-
-            tree = etree.parse(file)
-            root = tree.getroot()
-            for gad in root.findall('.//ets:GroupAddress', namespaces={'ets': 'http://knx.org/xml/project/12'}):
-                numericAddress = int(gad.get('Address'))
-                name = gad.get('Name')
-                dpt = gad.get('DatapointType')
-                dptId = None
-
-                hg = (numericAddress >> 11) & 0x0F
-                mg = (numericAddress >>  8) & 0x07
-                ga = (numericAddress >>  0) & 0xFF
-
-                dptmatch = re.search('DPT-([0-9]+)', dpt)
-                if dptmatch:
-                    dptId="%i.*" % (int(dptmatch.group(1)))
-
-                dpstmatch = re.search('DPST-([0-9]+)-([0-9]+)', dpt)
-                if dpstmatch:
-                    dptId="%i.%i" % (int(dpstmatch.group(1)), int(dpstmatch.group(2)))
-
-                gadMapTable["%i/%i/%i" % (hg,mg,ga)] = {'name': name, 'desc': None, 'dptId': dptId}
+            gadMapTable.update(EtsProjectImporter(file, cacheDir).table)
 
         else:
             logger.warning("GAD map XML '%s' does not exist" % file)
 
         return gadMapTable
 
-    def loadXML(self, file):
-        """ Load GAD map table from ETS XML Project File.
+    def loadXML(self, file, cacheDir=None):
+        """ Load GAD map table from ETS project (archive or XML file).
         """
-
-        table = self._loadXMLTable(file)
-        if self.isTableValid(table):
-            self._gadMapTable = {}
-            self._gadMapTable.update(table)
+        self._load(self._loadXMLTable(file, cacheDir))
 
     def loadFrom(self, path):
         """ Load GAD map table from module in GAD map path.
         """
-        table = self._loadTable(path)
-        if self.isTableValid(table):
-            self._gadMapTable = {}
-            self._gadMapTable.update(table)
+        self._load(self._loadTable(path))
 
     def updateFrom(self, path):
         """ Updated GAD map table from module in GAD map path.
         """
-        table = self._loadTable(path)
-        if self.isTableValid(table):
-            self._gadMapTable.update(table)
+        self._update(self._loadTable(path))
 
     def loadWith(self, table):
         """ Load GAD map table from given table.
         """
-        if self.isTableValid(table):
-            self._gadMapTable = {}
-            self._gadMapTable.update(table)
+        self._load(table)
 
     def updateWith(self, table):
         """ Updated GAD map table from given table.
         """
-        if self.isTableValid(table):
-            self._gadMapTable.update(table)
+        self._update(table)
+
+    def _getEntry(self, gad):
+        """ Return the table entry of the given GAD/nickname
+
+        @raise GroupAddressTableMapperValueError:
+        """
+        try:
+            return self._gadMapTable[gad]
+        except KeyError:
+            try:
+                return self._gadMapTable[self._nicknames[gad]]
+            except KeyError:
+                raise GroupAddressTableMapperValueError("Can't find GAD nor nickname '%s' in GAD map table" % gad)
 
     def getGad(self, nickname):
         """ Convert GAD nickname to GAD.
@@ -253,10 +294,9 @@ class GroupAddressTableMapper(object):
 
         @raise GroupAddressTableMapperValueError:
         """
-        for key, value in self._gadMapTable.items():
-            if nickname == value['name']:
-                return key
-        else:
+        try:
+            return self._nicknames[nickname]
+        except KeyError:
             raise GroupAddressTableMapperValueError("Can't find '%s' GAD nickname in GAD map table" % nickname)
 
     def getNickname(self, gad):
@@ -286,14 +326,7 @@ class GroupAddressTableMapper(object):
 
         @raise GroupAddressTableMapperValueError:
         """
-        try:
-            value = self._gadMapTable[gad]
-        except KeyError:
-            try:
-                value = self._gadMapTable[self.getGad(gad)]
-            except KeyError:
-                raise GroupAddressTableMapperValueError("Can't find GAD nor nickname '%s' in GAD map table" % gad)
-
+        value = self._getEntry(gad)
         try:
             return value['desc']
         except KeyError:
@@ -311,20 +344,28 @@ class GroupAddressTableMapper(object):
         @raise GroupAddressTableMapperValueError:
         """
         try:
-            value = self._gadMapTable[gad]
+            return self._dptXlators[gad]
         except KeyError:
-            try:
-                value = self._gadMapTable[self.getGad(gad)]
-            except KeyError:
-                raise GroupAddressTableMapperValueError("Can't find GAD nor nickname '%s' in GAD map table" % gad)
+            pass
 
+        if gad not in self._gadMapTable:
+            gad = self._nicknames.get(gad, gad)
+        try:
+            return self._dptXlators[gad]
+        except KeyError:
+            pass
+
+        value = self._getEntry(gad)
         try:
             dptId = value['dptId']
         except KeyError:
             raise  GroupAddressTableMapperValueError("Can't find a dataponint id for given GAD/nickname (%s)" % gad)
 
-        if dptId == None:
-            return None
+        if dptId is None:
+            dptXlator = None
+        else:
+            dptXlator = DPTXlatorFactory().create(dptId)
+        self._dptXlators[gad] = dptXlator
 
-        return DPTXlatorFactory().create(dptId)
+        return dptXlator
 
@@ -0,0 +1,680 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Metrics management
+
+Implements
+==========
+
+ - B{Counter}
+ - B{Histogram}
+ - B{Gauge}
+ - B{MetricsRegistry}
+ - B{MetricsServer}
+ - B{MetricsDumper}
+ - B{MetricsValueError}
+
+Documentation
+=============
+
+Lightweight metrics, exported in the Prometheus text format (version 0.0.4).
+
+The framework layers declare their metrics in the L{MetricsRegistry} singleton, when their module is imported:
+
+ - L{UDPTransceiver<pyknyx.stack.transceiver.udpTransceiver>}: frames received and sent, datagrams dropped (own
+   datagrams echoed by the multicast group, malformed headers and cEMI frames, other services);
+ - L{ETS<pyknyx.core.ets>}: frames forwarded, not sendable, with an exhausted hop count, or answered from the group
+   value cache;
+ - L{PriorityQueue<pyknyx.stack.priorityQueue>}: depth of the named queues, per priority level, and time spent in
+   queue;
+ - L{A_GroupDataService<pyknyx.stack.layer7.a_groupDataService>}: group telegrams received, per APCI, and
+   telegrams for a GAD without group;
+ - L{Notifier<pyknyx.services.notifier>}: jobs running time;
+ - L{Scheduler<pyknyx.services.scheduler>}: jobs lag (delay between the scheduled time and the job submission).
+
+Metrics are only updated while the registry is enabled; the instrumented code checks L{enabled<MetricsRegistry.enabled>}
+first, so the overhead is a single test when metrics are not exported. The exporters enable the registry when
+started: L{MetricsServer} answers HTTP requests on a local socket, and L{MetricsDumper} periodically writes the
+metrics to a file (for example, for the textfile collector of the Prometheus node exporter).
+
+Gauges are computed by a callback, when metrics are exported.
+
+Usage
+=====
+
+>>> from pyknyx.services.metrics import MetricsServer
+>>> server = MetricsServer(port=9742)
+>>> server.start()
+>>> ...
+$ curl http://127.0.0.1:9742/metrics
+
+@license: GPL
+"""
+
+
+import bisect
+import collections
+import math
+import os
+import threading
+
+import six
+from six.moves import BaseHTTPServer, socketserver
+
+from pyknyx.common import config
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.common.singleton import Singleton
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+
+METRICS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10.)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsValueError(PyKNyXValueError):
+    """
+    """
+
+
+def _formatValue(value):
+    if isinstance(value, six.integer_types):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _formatLabels(labels):
+    if not labels:
+        return ""
+    escaped = ('%s="%s"' % (name, value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+               for name, value in labels)
+    return "{%s}" % ",".join(escaped)
+
+
+class _Metric(object):
+    """ Metric base class
+
+    A metric declared with label names holds no value itself: values are held by its children, one per label values
+    combination, returned by L{labels()<_Metric.labels>}.
+
+    @ivar _name: metric name
+    @type _name: str
+
+    @ivar _help: metric description
+    @type _help: str
+
+    @ivar _labelNames: label names
+    @type _labelNames: tuple of str
+
+    @ivar _children: children metrics, by label values
+    @type _children: OrderedDict
+
+    @ivar _lock: protects the value (or the children)
+    @type _lock: L{Lock<threading>}
+    """
+    TYPE = None
+
+    def __init__(self, name, help_, labelNames=()):
+        """
+
+        @param name: metric name
+        @type name: str
+
+        @param help_: metric description
+        @type help_: str
+
+        @param labelNames: label names
+        @type labelNames: tuple of str
+        """
+        super(_Metric, self).__init__()
+
+        self._name = name
+        self._help = help_
+        self._labelNames = tuple(labelNames)
+        self._children = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<%s(name=%r, labelNames=%r)>" % (type(self).__name__, self._name, self._labelNames)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def help(self):
+        return self._help
+
+    @property
+    def labelNames(self):
+        return self._labelNames
+
+    def _newChild(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """ Return the child metric for the given label values, creating it if needed
+
+        Children should be looked up once, and kept, by the code updating them.
+
+        raise MetricsValueError:
+        """
+        if len(values) != len(self._labelNames):
+            raise MetricsValueError("%s: expected %d label values, got %d" %
+                                    (self._name, len(self._labelNames), len(values)))
+        values = tuple(str(value) for value in values)
+        with self._lock:
+            try:
+                return self._children[values]
+            except KeyError:
+                child = self._children[values] = self._newChild()
+                return child
+
+    def _checkUnlabeled(self):
+        if self._labelNames:
+            raise MetricsValueError("%s: labeled metric; use labels()" % self._name)
+
+    def _samples(self):
+        """ Return the samples of an unlabeled metric
+
+        @return: (name suffix, additional labels, value) tuples
+        @rtype: list
+        """
+        raise NotImplementedError
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def samples(self):
+        """ Return the samples of the metric
+
+        @return: (name, labels, value) tuples; labels are (name, value) tuples
+        @rtype: list
+        """
+        if not self._labelNames:
+            return [(self._name + suffix, extra, value) for suffix, extra, value in self._samples()]
+
+        with self._lock:
+            children = list(self._children.items())
+        samples = []
+        for values, child in children:
+            labels = tuple(zip(self._labelNames, values))
+            samples.extend((self._name + suffix, labels + extra, value) for suffix, extra, value in child._samples())
+
+        return samples
+
+    def reset(self):
+        """ Reset the value of the metric, or of its children
+        """
+        with self._lock:
+            children = list(self._children.values())
+        for child in children or (self,):
+            child._reset()
+
+
+class Counter(_Metric):
+    """ Counter class
+
+    @ivar _value: counter value
+    @type _value: int or float
+    """
+    TYPE = "counter"
+
+    def __init__(self, name, help_, labelNames=()):
+        super(Counter, self).__init__(name, help_, labelNames)
+
+        self._value = 0
+
+    def _newChild(self):
+        return Counter(self._name, self._help)
+
+    @property
+    def value(self):
+        return self._value
+
+    def inc(self, amount=1):
+        """ Increment the counter
+
+        @param amount: increment, >= 0
+        @type amount: int or float
+
+        raise MetricsValueError: the counter has labels
+        """
+        if self._labelNames:
+            self._checkUnlabeled()
+        with self._lock:
+            self._value += amount
+
+    def _samples(self):
+        return [("", (), self._value)]
+
+    def _reset(self):
+        with self._lock:
+            self._value = 0
+
+
+class Histogram(_Metric):
+    """ Histogram class
+
+    @ivar _buckets: upper bounds of the buckets, +Inf excluded
+    @type _buckets: tuple of float
+
+    @ivar _counts: number of observations in each bucket (not cumulative), +Inf included
+    @type _counts: list of int
+    """
+    TYPE = "histogram"
+
+    def __init__(self, name, help_, labelNames=(), buckets=METRICS_BUCKETS):
+        """
+
+        @param buckets: upper bounds of the buckets, sorted
+        @type buckets: tuple of float
+
+        raise MetricsValueError:
+        """
+        super(Histogram, self).__init__(name, help_, labelNames)
+
+        buckets = tuple(float(bucket) for bucket in buckets if not math.isinf(bucket))
+        if list(buckets) != sorted(set(buckets)):
+            raise MetricsValueError("%s: buckets must be sorted, without duplicates" % name)
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.
+
+    def _newChild(self):
+        return Histogram(self._name, self._help, buckets=self._buckets)
+
+    @property
+    def buckets(self):
+        return self._buckets
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def observe(self, value):
+        """ Add an observation
+
+        @param value: observed value (a duration, in s)
+        @type value: float
+
+        raise MetricsValueError: the histogram has labels
+        """
+        if self._labelNames:
+            self._checkUnlabeled()
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def _samples(self):
+        with self._lock:
+            counts, sum_ = list(self._counts), self._sum
+        samples = []
+        total = 0
+        for bound, count in zip(self._buckets + (float("inf"),), counts):
+            total += count
+            samples.append(("_bucket", (("le", _formatValue(bound)),), total))
+        samples.append(("_sum", (), sum_))
+        samples.append(("_count", (), total))
+
+        return samples
+
+    def _reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self._buckets) + 1)
+            self._sum = 0.
+
+
+class Gauge(_Metric):
+    """ Gauge class
+
+    The value is computed when the metric is exported.
+
+    @ivar _collect: callback returning the value (unlabeled gauge), or (label values, value) tuples
+    @type _collect: callable
+    """
+    TYPE = "gauge"
+
+    def __init__(self, name, help_, collect, labelNames=()):
+        """
+
+        @param collect: callback returning the value (unlabeled gauge), or (label values, value) tuples
+        @type collect: callable
+        """
+        super(Gauge, self).__init__(name, help_, labelNames)
+
+        self._collect = collect
+
+    def labels(self, *values):
+        raise MetricsValueError("%s: gauge values are collected" % self._name)
+
+    def samples(self):
+        try:
+            collected = self._collect()
+        except Exception:
+            logger.exception("Gauge.samples(): %s" % self._name)
+            return []
+        if not self._labelNames:
+            return [(self._name, (), collected)]
+
+        return [(self._name, tuple(zip(self._labelNames, (str(value) for value in values))), value_)
+                for values, value_ in collected]
+
+    def reset(self):
+        pass
+
+
+@six.add_metaclass(Singleton)
+class MetricsRegistry(object):
+    """ MetricsRegistry class
+
+    @ivar _metrics: declared metrics, by name
+    @type _metrics: OrderedDict
+
+    @ivar _enabled: if False, the instrumented code does not update the metrics
+    @type _enabled: bool
+    """
+    def __init__(self):
+        """ Init the registry
+        """
+        super(MetricsRegistry, self).__init__()
+
+        self._metrics = collections.OrderedDict()
+        self._enabled = False
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self._metrics
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    def enable(self):
+        """ Start updating the metrics
+        """
+        self._enabled = True
+
+    def disable(self):
+        """ Stop updating the metrics
+
+        Values are kept.
+        """
+        self._enabled = False
+
+    def _declare(self, cls, name, help_, labelNames, **kwargs):
+        """ Declare a metric, or return the existing one
+
+        raise MetricsValueError: a metric with the same name, but another type or other labels, already exists
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_, labelNames=labelNames, **kwargs)
+            elif type(metric) is not cls or metric.labelNames != tuple(labelNames):
+                raise MetricsValueError("metric %s already declared as %r" % (name, metric))
+
+        return metric
+
+    def counter(self, name, help_, labelNames=()):
+        """ Declare a counter
+
+        @rtype: L{Counter}
+        """
+        return self._declare(Counter, name, help_, labelNames)
+
+    def histogram(self, name, help_, labelNames=(), buckets=METRICS_BUCKETS):
+        """ Declare a histogram
+
+        @rtype: L{Histogram}
+        """
+        return self._declare(Histogram, name, help_, labelNames, buckets=buckets)
+
+    def gauge(self, name, help_, collect, labelNames=()):
+        """ Declare a gauge
+
+        @param collect: callback returning the value (unlabeled gauge), or (label values, value) tuples
+        @type collect: callable
+
+        @rtype: L{Gauge}
+        """
+        metric = self._declare(Gauge, name, help_, labelNames, collect=collect)
+        metric._collect = collect
+
+        return metric
+
+    def get(self, name):
+        """ Return a declared metric
+
+        raise MetricsValueError:
+        """
+        try:
+            return self._metrics[name]
+        except KeyError:
+            raise MetricsValueError("unknown metric (%s)" % name)
+
+    def reset(self):
+        """ Reset the values of all metrics
+        """
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def exposition(self):
+        """ Export the metrics in the Prometheus text format
+
+        @rtype: str
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append("# HELP %s %s" % (metric.name, metric.help.replace('\\', r'\\').replace('\n', r'\n')))
+            lines.append("# TYPE %s %s" % (metric.name, metric.TYPE))
+            for name, labels, value in metric.samples():
+                lines.append("%s%s %s" % (name, _formatLabels(labels), _formatValue(value)))
+        lines.append("")
+
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """ Write the metrics to a file, in the Prometheus text format
+
+        The file is replaced atomically, so readers never see a partial dump.
+
+        @param path: file path
+        @type path: str
+        """
+        with open(path + ".tmp", "w") as f:
+            f.write(self.exposition())
+        os.rename(path + ".tmp", path)
+
+
+class _MetricsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ HTTP requests handler
+    """
+    def do_GET(self):
+        if self.path.split('?')[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.registry.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format_, *args):
+        logger.debug("MetricsServer: %s" % (format_ % args))
+
+
+class _MetricsHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer(object):
+    """ MetricsServer class
+
+    Serves the metrics on B{/metrics}.
+
+    @ivar _server: HTTP server
+    @type _server: L{HTTPServer<http.server>}
+
+    @ivar _thread: server thread
+    @type _thread: L{Thread<threading>}
+    """
+    def __init__(self, addr=config.METRICS_ADDR, port=config.METRICS_PORT, registry=None):
+        """
+
+        @param addr: address to bind to; keep the default (loopback) unless the metrics may be public
+        @type addr: str
+
+        @param port: port to bind to (0 for any free port)
+        @type port: int
+
+        @param registry: registry to export (default to the L{MetricsRegistry} singleton)
+        @type registry: L{MetricsRegistry}
+        """
+        super(MetricsServer, self).__init__()
+
+        self._server = _MetricsHTTPServer((addr, port), _MetricsHandler)
+        self._server.registry = registry or MetricsRegistry()
+        self._thread = None
+
+    @property
+    def addr(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        """ Enable the registry, and start serving requests
+        """
+        logger.trace("MetricsServer.start()")
+
+        self._server.registry.enable()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="Metrics server")
+        self._thread.setDaemon(True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop serving requests
+
+        The registry is left enabled, as other exporters may use it.
+        """
+        logger.trace("MetricsServer.stop()")
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+class MetricsDumper(object):
+    """ MetricsDumper class
+
+    @ivar _path: dump file path
+    @type _path: str
+
+    @ivar _period: dump period, in s
+    @type _period: float
+    """
+    def __init__(self, path, period=config.METRICS_DUMP_PERIOD, registry=None):
+        """
+
+        @param path: dump file path
+        @type path: str
+
+        @param period: dump period, in s
+        @type period: float
+
+        @param registry: registry to export (default to the L{MetricsRegistry} singleton)
+        @type registry: L{MetricsRegistry}
+
+        raise MetricsValueError:
+        """
+        super(MetricsDumper, self).__init__()
+
+        if period <= 0:
+            raise MetricsValueError("invalid period (%r)" % period)
+        self._path = path
+        self._period = period
+        self._registry = registry or MetricsRegistry()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def path(self):
+        return self._path
+
+    def dump(self):
+        try:
+            self._registry.dump(self._path)
+        except (IOError, OSError):
+            logger.exception("MetricsDumper.dump(): can't write '%s'" % self._path)
+
+    def _dumpLoop(self):
+        """ Dump the metrics periodically
+        """
+        logger.trace("MetricsDumper._dumpLoop()")
+
+        while not self._stop.wait(self._period):
+            self.dump()
+
+        logger.trace("MetricsDumper._dumpLoop(): ended")
+
+    def start(self):
+        """ Enable the registry, and start dumping the metrics
+        """
+        logger.trace("MetricsDumper.start()")
+
+        self._registry.enable()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dumpLoop, name="Metrics dumper")
+        self._thread.setDaemon(True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop dumping the metrics, after a last dump
+        """
+        logger.trace("MetricsDumper.stop()")
+
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.dump()
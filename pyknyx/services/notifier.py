@@ -62,6 +62,16 @@ If found, the method is registered in APScheduler.
 
 Notifier also adds a listener to be notified when a decorated method call fails to be run, so we can log it.
 
+The decorated functions found in a class are indexed the first time an instance of this class is registered, so
+registering more instances of the same class does not scan all decorated functions again.
+
+Triggered methods are run by an executor (see L{notifierExecutor<pyknyx.services.notifierExecutor>}). By default,
+they are run inline, in the thread which changed the datapoint; L{setExecutor()<Notifier.setExecutor>} can be used to
+run them in a thread pool, or from the event loop, without blocking the telegrams processing.
+
+Decorated methods may be coroutines: they are then run in the event loop given to L{setLoop()<Notifier.setLoop>}
+(done by L{AsyncETS<pyknyx.core.ets>}).
+
 Usage
 =====
 
@@ -87,11 +97,17 @@ Idem for scheduler.
 
 import six
 
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.common.utils import reprStr
 from pyknyx.common.utils import func_name, meth_name,meth_self,meth_func
 from pyknyx.common.singleton import Singleton
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.notifierExecutor import NotifierExecutor
 
 scheduler = None
 
@@ -109,6 +125,15 @@ class Notifier(object):
 
     @ivar _datapointJobs:
     @type _registeredJobs: dict
+
+    @ivar _classJobs: pending functions defined by a class, as (name, type, args), indexed by class
+    @type _classJobs: dict
+
+    @ivar _loop: event loop running coroutine jobs
+    @type _loop: L{AbstractEventLoop<asyncio>}
+
+    @ivar _executor: executor running triggered methods
+    @type _executor: L{NotifierExecutor<pyknyx.services.notifierExecutor>}
     """
 
     def __init__(self):
@@ -121,6 +146,46 @@ class Notifier(object):
         self._pendingFuncs = []
         self._datapointJobs = {}
         #self._groupJobs = {}
+        self._classJobs = {}
+        self._loop = None
+        self._executor = NotifierExecutor()
+
+    @property
+    def executor(self):
+        return self._executor
+
+    def setLoop(self, loop):
+        """ Set the event loop running coroutine jobs
+
+        @param loop: event loop, or None if there is no event loop anymore
+        @type loop: L{AbstractEventLoop<asyncio>}
+        """
+        self._loop = loop
+        self._executor.setLoop(loop)
+
+    def setExecutor(self, executor):
+        """ Set the executor running triggered methods
+
+        The previous executor is shut down.
+
+        @param executor: new executor
+        @type executor: L{NotifierExecutor<pyknyx.services.notifierExecutor>}
+        """
+        previous, self._executor = self._executor, executor
+        if previous is not executor:
+            previous.shutdown()
+        executor.setLoop(self._loop)
+        executor.start()
+
+    def _call(self, method, event):
+        """ Call given method
+
+        @return: the future of the coroutine, if the method returned one
+        @rtype: L{Future<concurrent.futures>}
+        """
+        result = method(event)
+        if asyncio is not None and asyncio.iscoroutine(result):
+            return self._schedule(result)
 
     def _execute(self, method, event):
         """ Execute given method
@@ -130,10 +195,34 @@ class Notifier(object):
         @todo: add a more explicite message for enduser?
         """
         try:
-            method(event)
+            return self._call(method, event)
         except:
             logger.exception("Notifier._execute()")
 
+    def _schedule(self, coro):
+        """ Run a coroutine job in the event loop
+
+        May be called from any thread.
+
+        @return: the future of the coroutine, or None if there is no event loop
+        @rtype: L{Future<concurrent.futures>}
+        """
+        if self._loop is None:
+            logger.error("Notifier._schedule(): no event loop to run %s" % repr(coro))
+            coro.close()
+            return
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        future.add_done_callback(self._done)
+        return future
+
+    @staticmethod
+    def _done(future):
+        """ Log coroutine job failure
+        """
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Notifier._execute(): %s" % repr(future.exception()))
+
     def addDatapointJob(self, func, dp, condition="change"):
         """ Add a job for a datapoint change
 
@@ -152,6 +241,7 @@ class Notifier(object):
             raise NotifierValueError("invalid condition (%s)" % repr(condition))
 
         self._pendingFuncs.append(("datapoint", func, (dp, condition)))
+        self._classJobs.clear()
 
     def datapoint(self, dp, *args, **kwargs):
         """ Decorator for addDatapointJob()
@@ -194,6 +284,26 @@ class Notifier(object):
 
         #return decorated
 
+    def _getClassJobs(self, cls):
+        """ Return the pending functions defined by a class
+
+        @param cls: class of the instances to register
+        @type cls: class
+
+        @return: pending functions, as (name, type, args)
+        @rtype: tuple
+        """
+        try:
+            return self._classJobs[cls]
+        except KeyError:
+            jobs = []
+            for type_, func, args in self._pendingFuncs:
+                attr = getattr(cls, func_name(func), None)
+                if getattr(attr, "__func__", attr) is func:  # avoid name clash between FB methods
+                    jobs.append((func_name(func), type_, args))
+            self._classJobs[cls] = jobs = tuple(jobs)
+            return jobs
+
     def doRegisterJobs(self, obj):
         """ Really register jobs
 
@@ -202,38 +312,34 @@ class Notifier(object):
         """
         logger.debug("Notifier.doRegisterJobs(): obj=%s" % repr(obj))
 
-        for type_, func, args in self._pendingFuncs:
-            logger.debug("Notifier.doRegisterJobs(): type_=\"%s\", func=%s, args=%s" % (type_, func_name(func), repr(args)))
-
-            method = getattr(obj, func_name(func), None)
-            if method is not None:
-                logger.debug("Notifier.doRegisterJobs(): add method %s() of %s" % (meth_name(method), meth_self(method)))
-
-                if meth_func(method) is func:  # avoid name clash between FB methods
-
-                    if type_ == "datapoint":
-                        dp, condition = args
-                        if isinstance(dp,str):
-                            dp = obj.dp[dp]._factory
-                        try:
-                            self._datapointJobs[obj][dp].append((method, condition))
-                        except KeyError:
-                            try:
-                                self._datapointJobs[obj][dp] = [(method, condition)]
-                            except KeyError:
-                                self._datapointJobs[obj] = {dp: [(method, condition)]}
-
-                    #elif type_ == "group":
-                        #gad = args
-                        #try:
-                            #self._groupJobs[gad].append(method)
-                        #except KeyError:
-                            #self._groupJobs[gad] = [method]
+        for name, type_, args in self._getClassJobs(type(obj)):
+            method = getattr(obj, name)
+            logger.debug("Notifier.doRegisterJobs(): add method %s() of %s" % (meth_name(method), meth_self(method)))
+
+            if type_ == "datapoint":
+                dp, condition = args
+                if isinstance(dp,str):
+                    dp = obj.dp[dp]._factory
+                try:
+                    self._datapointJobs[obj][dp].append((method, condition))
+                except KeyError:
+                    try:
+                        self._datapointJobs[obj][dp] = [(method, condition)]
+                    except KeyError:
+                        self._datapointJobs[obj] = {dp: [(method, condition)]}
+
+            #elif type_ == "group":
+                #gad = args
+                #try:
+                    #self._groupJobs[gad].append(method)
+                #except KeyError:
+                    #self._groupJobs[gad] = [method]
 
     def datapointNotify(self, obj, dp, oldValue, newValue):
         """ Notification of a datapoint change
 
-        This method is called when a datapoint value changes.
+        This method is called when a datapoint value changes. Triggered methods are handed to the executor, with
+        the owner of the datapoint as serialization key.
 
         @param obj: owner of the datapoint
         @type obj: <FunctionalBloc>
@@ -247,15 +353,22 @@ class Notifier(object):
         @param newValue: new value of the datapoint
         @type newValue: depends on datapoint type
         """
-        logger.debug("Notifier.datapointNotify(): obj=%s, dp=%s, oldValue=%s, newValue=%s" % (obj.name, dp, repr(oldValue), repr(newValue)))
+        try:
+            jobs = self._datapointJobs[obj][dp._factory]
+        except KeyError:
+            return
+
+        logger.debug("Notifier.datapointNotify(): obj=%s, dp=%s, oldValue=%r, newValue=%r", obj.name, dp, oldValue, newValue)
 
-        for method, condition in self._datapointJobs.get(obj,{}).get(dp._factory,()):
-            if oldValue != newValue and condition == "change" or condition == "always":
+        changed = oldValue != newValue
+        for method, condition in jobs:
+            if changed and condition == "change" or condition == "always":
                 try:
-                    logger.debug("Notifier.datapointNotify(): trigger method %s() of %s" % (meth_name(method), meth_self(method)))
-                    event = dict(name="datapoint", dp=dp, oldValue=oldValue, newValue=newValue, condition=condition)
+                    logger.debug("Notifier.datapointNotify(): trigger method %s() of %s", meth_name(method), meth_self(method))
 
-                    self._execute(method, event)
+                    # Each method gets its own event, as it may modify it
+                    event = dict(name="datapoint", dp=dp, oldValue=oldValue, newValue=newValue, condition=condition)
+                    self._executor.submit(obj, self._call, method, event)
                 except:
                     logger.exception("Notifier.datapointNotify()")
 
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Notifier jobs execution
+
+Implements
+==========
+
+ - B{NotifierExecutorValueError}
+ - B{NotifierExecutor}
+ - B{ThreadNotifierExecutor}
+ - B{AsyncNotifierExecutor}
+
+Documentation
+=============
+
+The L{Notifier<pyknyx.services.notifier>} hands the datapoint jobs it triggers to an executor:
+
+ - B{NotifierExecutor} runs them inline, in the thread which changed the datapoint (the ETS thread, when the change
+   comes from the bus). This is the default, and the historical behaviour;
+ - B{ThreadNotifierExecutor} runs them in a bounded pool of threads;
+ - B{AsyncNotifierExecutor} runs them from the event loop given to the Notifier (see
+   L{AsyncETS<pyknyx.core.ets>}), in a thread pool for plain methods, while coroutines run in the loop itself.
+
+The last two do not block the caller, so a slow job does not delay the telegrams processing anymore. Jobs are
+submitted with a key (the FunctionalBlock owning the datapoint): jobs sharing the same key are run one after the
+other, in submission order (a coroutine job must complete before the next one starts), while jobs of different keys
+run concurrently.
+
+All executors maintain some metrics (see L{metrics<NotifierExecutor.metrics>}): number of pending jobs (and its
+peak), number of executed and failed jobs, time spent waiting in queue and running (mean and max). The running time is
+also exported as an histogram in the L{metrics registry<pyknyx.services.metrics>}.
+
+Usage
+=====
+
+>>> from pyknyx.services.notifier import Notifier
+>>> from pyknyx.services.notifierExecutor import ThreadNotifierExecutor
+>>> Notifier().setExecutor(ThreadNotifierExecutor(workers=4))
+
+@license: GPL
+"""
+
+import collections
+import functools
+import threading
+import time
+
+from six.moves import queue
+
+try:
+    import asyncio
+    import concurrent.futures
+except ImportError:
+    asyncio = None
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.metrics import MetricsRegistry
+
+NOTIFIER_WORKERS = 4  # default number of threads running jobs
+
+_STOP = object()  # workers exit token
+_FAILED = object()  # result of a job which raised
+
+_metrics = MetricsRegistry()
+_JOB_SECONDS = _metrics.histogram("pyknyx_notifier_job_seconds", "Running time of the notifier jobs")
+
+
+class NotifierExecutorValueError(PyKNyXValueError):
+    """
+    """
+
+
+class NotifierExecutor(object):
+    """ Inline jobs executor
+
+    Jobs are run in the calling thread. A job may return a future (a coroutine scheduled in the event loop); it is
+    not waited for, but taken into account in metrics.
+
+    @ivar _lock: metrics lock
+    @type _lock: L{Lock<threading>}
+    """
+    def __init__(self):
+        """ Init the executor
+        """
+        super(NotifierExecutor, self).__init__()
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peakPending = 0
+        self._executed = 0
+        self._failed = 0
+        self._waitTotal = self._waitMax = 0.
+        self._latencyTotal = self._latencyMax = 0.
+
+    @property
+    def metrics(self):
+        """ Return executor metrics
+
+        Times are in seconds. B{wait} is the time spent in queue, B{latency} the time spent running.
+
+        @rtype: dict
+        """
+        with self._lock:
+            executed = self._executed or 1
+            return dict(pending=self._pending, peakPending=self._peakPending,
+                        executed=self._executed, failed=self._failed,
+                        wait=self._waitTotal / executed, maxWait=self._waitMax,
+                        latency=self._latencyTotal / executed, maxLatency=self._latencyMax)
+
+    def _queued(self):
+        """ Account for a new pending job
+        """
+        with self._lock:
+            self._pending += 1
+            if self._pending > self._peakPending:
+                self._peakPending = self._pending
+
+    def _done(self, queued, started, failed=False):
+        """ Account for a completed job
+
+        @param queued: submission time
+        @type queued: float
+
+        @param started: execution start time
+        @type started: float
+
+        @param failed: True if the job raised
+        @type failed: bool
+        """
+        now = time.time()
+        with self._lock:
+            self._pending -= 1
+            self._executed += 1
+            if failed:
+                self._failed += 1
+            wait, latency = started - queued, now - started
+            self._waitTotal += wait
+            self._waitMax = max(self._waitMax, wait)
+            self._latencyTotal += latency
+            self._latencyMax = max(self._latencyMax, latency)
+        if _metrics.enabled:
+            _JOB_SECONDS.observe(latency)
+
+    def _futureDone(self, queued, started, future):
+        """ Account for a completed coroutine job
+        """
+        self._done(queued, started, future.cancelled() or future.exception() is not None)
+
+    def _run(self, queued, func, args):
+        """ Run a job
+
+        The job is accounted as done if it raises.
+
+        @return: the result of the job, or _FAILED if it raised
+        """
+        started = time.time()
+        try:
+            return func(*args)
+        except:
+            logger.exception("NotifierExecutor._run()")
+            self._done(queued, started, True)
+            return _FAILED
+
+    def setLoop(self, loop):
+        """ Set the event loop given to the Notifier
+
+        @param loop: event loop, or None if there is no event loop anymore
+        @type loop: L{AbstractEventLoop<asyncio>}
+        """
+        pass
+
+    def start(self):
+        """ Start the executor
+        """
+        pass
+
+    def shutdown(self, wait=True):
+        """ Stop the executor
+
+        Jobs still pending may be dropped.
+
+        @param wait: if True, wait for running jobs to complete
+        @type wait: bool
+        """
+        pass
+
+    def submit(self, key, func, *args):
+        """ Submit a job
+
+        May be called from any thread.
+
+        @param key: serialization key; jobs with the same key run in submission order
+        @type key: hashable
+
+        @param func: job
+        @type func: callable
+        """
+        self._queued()
+        queued = time.time()
+        result = self._run(queued, func, args)
+        if result is _FAILED:
+            return
+        if asyncio is not None and isinstance(result, concurrent.futures.Future):
+            result.add_done_callback(functools.partial(self._futureDone, queued, queued))
+        else:
+            self._done(queued, queued)
+
+
+class ThreadNotifierExecutor(NotifierExecutor):
+    """ Thread pool jobs executor
+
+    @ivar _workers: number of threads
+    @type _workers: int
+
+    @ivar _maxPending: max. number of pending jobs before L{submit()} blocks (0 for no limit); jobs submitted by
+                       running jobs never block, as the worker threads would wait for themselves
+    @type _maxPending: int
+
+    @ivar _queues: pending jobs, per key; a key is present while it has pending or running jobs
+    @type _queues: dict of deque
+
+    @ivar _ready: keys with jobs ready to run
+    @type _ready: L{Queue<queue>}
+    """
+    def __init__(self, workers=NOTIFIER_WORKERS, maxPending=0):
+        """ Init the executor
+
+        @param workers: number of threads running jobs
+        @type workers: int
+
+        @param maxPending: max. number of pending jobs; when reached, L{submit()} blocks until a job completes
+                           (0 for no limit)
+        @type maxPending: int
+
+        raise NotifierExecutorValueError:
+        """
+        super(ThreadNotifierExecutor, self).__init__()
+
+        if workers < 1:
+            raise NotifierExecutorValueError("invalid workers (%s)" % repr(workers))
+        if maxPending < 0:
+            raise NotifierExecutorValueError("invalid maxPending (%s)" % repr(maxPending))
+
+        self._workers = workers
+        self._maxPending = maxPending
+        self._queues = {}
+        self._ready = queue.Queue()
+        self._condition = threading.Condition(threading.Lock())
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._work, name="Notifier worker %d" % i)
+            thread.setDaemon(True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, wait=True):
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            self._ready.put(_STOP)
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def submit(self, key, func, *args):
+        if not self._threads:
+            self.start()
+        with self._condition:
+            if threading.current_thread() not in self._threads:
+                while self._maxPending and self._pending >= self._maxPending:
+                    self._condition.wait()
+            self._queued()
+            item = (time.time(), func, args)
+            try:
+                self._queues[key].append(item)
+            except KeyError:
+                self._queues[key] = collections.deque((item,))
+                self._ready.put(key)
+
+    def _work(self):
+        """ Worker thread main loop
+        """
+        while True:
+            key = self._ready.get()
+            if key is _STOP:
+                break
+
+            with self._condition:
+                queued, func, args = self._queues[key].popleft()
+            started = time.time()
+            result = self._run(queued, func, args)
+            if result is not _FAILED:
+                failed = False
+                if asyncio is not None and isinstance(result, concurrent.futures.Future):
+                    try:
+                        result.result()  # complete coroutine jobs before running the next job of the key
+                    except Exception:
+                        failed = True
+                self._done(queued, started, failed)
+
+            with self._condition:
+                if self._queues[key]:
+                    self._ready.put(key)
+                else:
+                    del self._queues[key]
+                self._condition.notify_all()
+
+
+class AsyncNotifierExecutor(NotifierExecutor):
+    """ Event loop jobs executor
+
+    Jobs are dispatched from the event loop given to the Notifier; plain methods run in a thread pool, coroutines in
+    the loop. If the Notifier has no event loop, jobs are run inline.
+
+    @ivar _loop: event loop
+    @type _loop: L{AbstractEventLoop<asyncio>}
+
+    @ivar _pool: thread pool running plain methods, or None to use the loop default executor
+    @type _pool: L{ThreadPoolExecutor<concurrent.futures>}
+
+    @ivar _queues: pending jobs, per key; only accessed from the event loop
+    @type _queues: dict of deque
+    """
+    def __init__(self, workers=None):
+        """ Init the executor
+
+        @param workers: number of threads running plain methods, or None to use the loop default executor
+        @type workers: int
+
+        raise NotifierExecutorValueError:
+        """
+        super(AsyncNotifierExecutor, self).__init__()
+
+        if asyncio is None:
+            raise NotifierExecutorValueError("asyncio is not available")
+        if workers is not None and workers < 1:
+            raise NotifierExecutorValueError("invalid workers (%s)" % repr(workers))
+
+        self._workers = workers
+        self._loop = None
+        self._pool = None
+        self._queues = {}
+
+    def setLoop(self, loop):
+        self._loop = loop
+
+    def start(self):
+        if self._workers is not None and self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(self._workers)
+
+    def shutdown(self, wait=True):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait)
+
+    def submit(self, key, func, *args):
+        loop = self._loop
+        if loop is None:
+            logger.warning("AsyncNotifierExecutor.submit(): no event loop; run %s inline" % repr(func))
+            super(AsyncNotifierExecutor, self).submit(key, func, *args)
+            return
+        if self._workers is not None and self._pool is None:
+            self.start()
+        self._queued()
+        loop.call_soon_threadsafe(self._enqueue, key, (time.time(), func, args))
+
+    def _enqueue(self, key, item):
+        """ Queue a job; run in the event loop
+        """
+        try:
+            self._queues[key].append(item)
+        except KeyError:
+            self._queues[key] = collections.deque((item,))
+            self._next(key)
+
+    def _next(self, key):
+        """ Start the next job of the key, if any; run in the event loop
+        """
+        jobs = self._queues[key]
+        if not jobs:
+            del self._queues[key]
+            return
+        queued, func, args = jobs[0]
+        started = time.time()
+        future = self._loop.run_in_executor(self._pool, self._run, queued, func, args)
+        future.add_done_callback(functools.partial(self._jobDone, key, queued, started))
+
+    def _jobDone(self, key, queued, started, future):
+        """ Job completion; run in the event loop
+        """
+        result = _FAILED if future.cancelled() else future.result()
+        if isinstance(result, concurrent.futures.Future):
+            wrapped = asyncio.wrap_future(result, loop=self._loop)
+            wrapped.add_done_callback(functools.partial(self._coroutineDone, key, queued, started))
+            return
+
+        if future.cancelled():
+            self._done(queued, started, True)
+        elif result is not _FAILED:
+            self._done(queued, started)
+        self._queues[key].popleft()
+        self._next(key)
+
+    def _coroutineDone(self, key, queued, started, future):
+        """ Coroutine job completion; run in the event loop
+        """
+        self._futureDone(queued, started, future)
+        self._queues[key].popleft()
+        self._next(key)
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Process image management
+
+Implements
+==========
+
+ - B{ProcessImage}
+ - B{ProcessImageValueError}
+
+Documentation
+=============
+
+The process image holds the current state of the whole installation, as seen by L{ETS<pyknyx.core.ets>}: for each
+group address, the last value written (or sent in response), when and by whom, and how many times it has been
+updated. ETS feeds it with all group frames it routes, so dashboards and rule code can query any group address
+without subscribing GroupObjects.
+
+Records are stored in flat arrays indexed by the raw 16-bit group address, so lookups are O(1) and never copy the
+image: B{payload()} returns a view on it, and B{readInto()} copies the payload into a buffer given by the caller, so
+a reader polling many group addresses can reuse the same buffer. The image takes about 2 MB. Payloads are the
+group value data, as given to L{Datapoint.frame<pyknyx.core.datapoint.Datapoint.frame>}: one byte holding the 6-bit
+value for short values, the data bytes otherwise (at most L{PAYLOAD_SIZE}).
+
+B{snapshot()} returns a frozen copy of the image; B{diff()} lists the group addresses updated between two images.
+
+Updates are serialized; lookups are lock-free, so a record read while being updated may be inconsistent. Use a
+snapshot when consistency matters.
+
+Usage
+=====
+
+>>> image = ets.processImage
+>>> gad = GroupAddress("1/1/1").raw
+>>> if image.count(gad):
+...     data = image.payload(gad)
+>>> before = image.snapshot()
+>>> ...
+>>> changed = image.snapshot().diff(before)
+
+@license: GPL
+"""
+
+
+import array
+import threading
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+
+PAYLOAD_SIZE = 14  # max. group value data size in a standard frame
+GAD_COUNT = 0x10000
+COUNT_MAX = 0xffffffff  # update counts wrap to 1 after this value
+
+
+class ProcessImageValueError(PyKNyXValueError):
+    """
+    """
+
+
+class ProcessImage(object):
+    """ ProcessImage class
+
+    @ivar _payloads: payloads, L{PAYLOAD_SIZE} bytes per group address
+    @type _payloads: bytearray
+
+    @ivar _lengths: payloads length
+    @type _lengths: array of unsigned char
+
+    @ivar _timestamps: time of the last update
+    @type _timestamps: array of double
+
+    @ivar _sources: raw individual address of the last update source
+    @type _sources: array of unsigned short
+
+    @ivar _counts: number of updates (wrapping to 1, see L{COUNT_MAX})
+    @type _counts: array of unsigned int
+
+    @ivar _gads: raw group addresses updated at least once, in first update order
+    @type _gads: list of int
+
+    @ivar _frozen: True for a snapshot
+    @type _frozen: bool
+    """
+    def __init__(self):
+        """ Create an empty process image
+        """
+        super(ProcessImage, self).__init__()
+
+        self._payloads = bytearray(GAD_COUNT * PAYLOAD_SIZE)
+        self._payloadsView = memoryview(self._payloads)
+        self._lengths = array.array('B', bytes(bytearray(GAD_COUNT)))
+        self._timestamps = array.array('d', [0.]) * GAD_COUNT
+        self._sources = array.array('H', [0]) * GAD_COUNT
+        self._counts = array.array('I', [0]) * GAD_COUNT
+        self._gads = []
+        self._lock = threading.Lock()
+        self._frozen = False
+
+    def __repr__(self):
+        return "<ProcessImage(gads=%d, frozen=%s)>" % (len(self._gads), self._frozen)
+
+    def __len__(self):
+        return len(self._gads)
+
+    def __contains__(self, gad):
+        return self._counts[gad] != 0
+
+    @property
+    def gads(self):
+        """ Raw group addresses updated at least once, sorted
+        """
+        return sorted(self._gads)
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def update(self, gad, nSDU, src, timestamp):
+        """ Update the record of a group address
+
+        @param gad: raw group address
+        @type gad: int
+
+        @param nSDU: NSDU of a GroupValue_Write or GroupValue_Response (TPCI/APCI and data)
+        @type nSDU: bytearray
+
+        @param src: raw individual address of the source
+        @type src: int
+
+        @param timestamp: time of the update
+        @type timestamp: float
+
+        raise ProcessImageValueError:
+        """
+        if self._frozen:
+            raise ProcessImageValueError("can't update a snapshot")
+
+        length = len(nSDU) - 2
+        if length > PAYLOAD_SIZE:
+            logger.warning("ProcessImage.update(): payload too long (%d) for gad %d" % (length, gad))
+            return
+
+        offset = gad * PAYLOAD_SIZE
+        with self._lock:
+            if length > 0:
+                self._payloads[offset:offset+length] = nSDU[2:]
+            else:
+                length = 1
+                self._payloads[offset] = nSDU[1] & 0x3f
+            self._lengths[gad] = length
+            self._timestamps[gad] = timestamp
+            self._sources[gad] = src
+            count = self._counts[gad]
+            if not count:
+                self._gads.append(gad)
+            self._counts[gad] = count + 1 if count != COUNT_MAX else 1
+
+    def count(self, gad):
+        """ Number of updates of a group address (0 if never seen)
+        """
+        return self._counts[gad]
+
+    def timestamp(self, gad):
+        """ Time of the last update of a group address (0. if never seen)
+        """
+        return self._timestamps[gad]
+
+    def source(self, gad):
+        """ Raw individual address of the last update source of a group address
+        """
+        return self._sources[gad]
+
+    def payload(self, gad):
+        """ Payload of the last update of a group address
+
+        @return: a view on the payload (it changes on next update, unless this is a snapshot), or None if never seen
+        @rtype: memoryview
+        """
+        if not self._counts[gad]:
+            return None
+        offset = gad * PAYLOAD_SIZE
+        return self._payloadsView[offset:offset+self._lengths[gad]]
+
+    def readInto(self, gad, buffer_):
+        """ Copy the payload of the last update of a group address
+
+        @param buffer_: buffer to copy the payload into, at least L{PAYLOAD_SIZE} bytes long
+        @type buffer_: bytearray
+
+        @return: length of the payload, 0 if never seen
+        @rtype: int
+        """
+        length = self._lengths[gad]
+        offset = gad * PAYLOAD_SIZE
+        buffer_[:length] = self._payloadsView[offset:offset+length]
+        return length
+
+    def snapshot(self):
+        """ Return a frozen copy of this image
+        """
+        image = ProcessImage.__new__(ProcessImage)
+        with self._lock:
+            image._payloads = bytearray(self._payloads)
+            image._lengths = array.array('B', self._lengths)
+            image._timestamps = array.array('d', self._timestamps)
+            image._sources = array.array('H', self._sources)
+            image._counts = array.array('I', self._counts)
+            image._gads = list(self._gads)
+        image._payloadsView = memoryview(image._payloads)
+        image._lock = threading.Lock()
+        image._frozen = True
+        return image
+
+    def diff(self, other):
+        """ Return the group addresses updated in this image since other
+
+        @param other: older image (usually a snapshot of this one)
+        @type other: L{ProcessImage}
+
+        @return: raw group addresses, sorted
+        @rtype: list of int
+        """
+        counts = self._counts
+        otherCounts = other._counts
+        return sorted(gad for gad in list(self._gads) if counts[gad] != otherCounts[gad])
@@ -60,7 +60,14 @@ Then, when a new instance of the FunctionalBlock sub-class is created, in ets.re
 Scheduler.doRegisterJobs() method which tried to retrieve the bounded method matching one of the decorated functions.
 If found, the method is registered in APScheduler.
 
-Scheduler also adds a listener to be notified when a decorated method call fails to be run, so we can log it.
+Scheduler also adds a listener to be notified when a decorated method call fails to be run, so we can log it. The
+same listener measures the jobs lag (delay between their scheduled time and their submission), exported in the
+L{metrics registry<pyknyx.services.metrics>}.
+
+The APScheduler scheduler class used can be changed with the B{type_} param, or with L{setType()<Scheduler.setType>}.
+For installations with many short periodic jobs, L{TimerWheelScheduler<pyknyx.services.timerWheel>} is a lightweight
+replacement, which accepts the same decorators arguments. Unlike APScheduler classes, it can be used by both
+L{ETS<pyknyx.core.ets>} and L{AsyncETS<pyknyx.core.ets>}, the latter running its timers in the event loop.
 
 Usage
 =====
@@ -70,19 +77,26 @@ Usage
 @license: GPL
 """
 
+import datetime
 import six
 import traceback
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.events import EVENT_JOB_ERROR,EVENT_JOB_MISSED
+from apscheduler.events import EVENT_JOB_ERROR,EVENT_JOB_MISSED,EVENT_JOB_SUBMITTED
 
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.common.singleton import Singleton
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.metrics import MetricsRegistry
+from pyknyx.services.timerWheel import TimerWheelJob, TimerWheelScheduler
 from pyknyx.common.utils import func_name, meth_name,meth_self,meth_func
 
 scheduler = None
 
+_metrics = MetricsRegistry()
+_JOB_LAG = _metrics.histogram("pyknyx_scheduler_job_lag_seconds",
+                              "Delay between the scheduled time of the scheduler jobs and their submission")
+
 
 class SchedulerValueError(PyKNyXValueError):
     """
@@ -111,10 +125,14 @@ class Scheduler(object):
         @param autoStart: if True, automatically starts the scheduler
         @type autoStart: bool
 
+        @param type_: APScheduler scheduler class, or L{TimerWheelScheduler<pyknyx.services.timerWheel>}
+        @type type_: class
+
         raise SchedulerValueError:
         """
         super(Scheduler, self).__init__()
         self._type = type_
+        self._typeKwargs = {}
 
         if autoStart:
             self.start()
@@ -126,6 +144,12 @@ class Scheduler(object):
 
         It can be setup so only errors are triggered.
         """
+        if event.code == EVENT_JOB_SUBMITTED:
+            if _metrics.enabled:
+                runTime = event.scheduled_run_times[-1]
+                _JOB_LAG.observe((datetime.datetime.now(runTime.tzinfo) - runTime).total_seconds())
+            return
+
         logger.debug("Scheduler._listener(): event=%s" % repr(event))
 
         if event.exception:
@@ -136,6 +160,67 @@ class Scheduler(object):
     def apscheduler(self):
         return self._apscheduler
 
+    @property
+    def type(self):
+        return self._type
+
+    def setType(self, type_, **kwargs):
+        """ Change the APScheduler class used
+
+        Does nothing if this class is already used. Otherwise, the current scheduler is stopped, and its jobs are
+        moved to the new one, which is not started.
+
+        @param type_: APScheduler scheduler class
+        @type type_: class
+
+        @param kwargs: additional arguments for the APScheduler class
+        @type kwargs: dict
+        """
+        if type_ is self._type and kwargs == self._typeKwargs:
+            return
+
+        logger.debug("Scheduler.setType(): type_=%s" % repr(type_))
+        jobs = self._apscheduler.get_jobs() if self._apscheduler is not None else ()
+        self.stop()
+        self._type = type_
+        self._typeKwargs = kwargs
+        self._createAPScheduler()
+        for job in jobs:
+            self._moveJob(job)
+
+    def _moveJob(self, job):
+        """ Add a job of the previous real scheduler to the current one
+
+        @param job: job to add
+        @type job: L{Job<apscheduler.job>} or L{TimerWheelJob<pyknyx.services.timerWheel>}
+        """
+        if isinstance(job, TimerWheelJob):
+            options = dict(coalesce=job.coalesce, misfire_grace_time=job.misfireGraceTime,
+                           max_instances=job.maxInstances)
+            if job.jitter is not None:
+                if isinstance(self._apscheduler, TimerWheelScheduler):
+                    options['jitter'] = job.jitter
+                else:
+                    job.trigger.jitter = job.jitter
+        else:
+            options = dict(coalesce=job.coalesce, misfire_grace_time=job.misfire_grace_time,
+                           max_instances=job.max_instances)
+        self._apscheduler.add_job(job.func, trigger=job.trigger, args=job.args, kwargs=job.kwargs, id=job.id,
+                                  name=job.name, **options)
+
+    def _createAPScheduler(self):
+        """ Create the real scheduler
+        """
+        self._apscheduler = self._type(**self._typeKwargs)
+        self._apscheduler.add_listener(self._listener, mask=(EVENT_JOB_ERROR|EVENT_JOB_MISSED|EVENT_JOB_SUBMITTED))
+
+    def _getAPScheduler(self):
+        """ Return the real scheduler, creating it if needed (after a stop)
+        """
+        if self._apscheduler is None:
+            self._createAPScheduler()
+        return self._apscheduler
+
     def _register(self, typ,func,kwargs):
         jobs = getattr(func,'_Sched', None)
         if jobs is None:
@@ -167,7 +252,7 @@ class Scheduler(object):
         @type kwargs: dict
         """
         logger.debug("Scheduler.addEveryJob(): func=%s" % repr(func))
-        self._apscheduler.add_interval_job(func, **kwargs)
+        self._getAPScheduler().add_job(func, trigger=Scheduler.TYPE_EVERY, **kwargs)
 
     def at(self, **kwargs):
         """ Decorator for addAtJob()
@@ -190,7 +275,7 @@ class Scheduler(object):
         @type func: callable
         """
         logger.debug("Scheduler.addAtJob(): func=%s" % repr(func))
-        self._apscheduler.add_date_job(func, **kwargs)
+        self._getAPScheduler().add_job(func, trigger=Scheduler.TYPE_AT, **kwargs)
 
     def cron(self, **kwargs):
         """ Decorator for addCronJob()
@@ -213,7 +298,7 @@ class Scheduler(object):
         @type func: callable
         """
         logger.debug("Scheduler.addCronJob(): func=%s" % repr(func))
-        self._apscheduler.add_cron_job(func, **kwargs)
+        self._getAPScheduler().add_job(func, trigger=Scheduler.TYPE_CRON, **kwargs)
 
     def doRegisterJobs(self, obj):
         """ Really register jobs in APScheduler
@@ -223,13 +308,14 @@ class Scheduler(object):
         """
         logger.debug("Scheduler.doRegisterJobs(): obj=%s" % repr(obj))
 
+        apscheduler = self._getAPScheduler()
         for name,func in vars(type(obj)).items():
             method = None
             for trigger,kwargs in getattr(func,'_Sched',()):
                 if method is None:
                     method = getattr(obj,name)
                     logger.debug("Scheduler.doRegisterJobs(): %s: func=%s, kwargs=%s" % (trigger, func_name(func), repr(kwargs)))
-                    self._apscheduler.add_job(method, trigger=trigger, **kwargs)
+                    apscheduler.add_job(method, trigger=trigger, **kwargs)
 
     def printJobs(self):
         """ Print pending jobs
@@ -245,11 +331,7 @@ class Scheduler(object):
         """
         logger.trace("Scheduler.start()")
 
-        if self._apscheduler is None:
-            self._apscheduler = self._type()
-            self._apscheduler.add_listener(self._listener, mask=(EVENT_JOB_ERROR|EVENT_JOB_MISSED))
-
-        if not self._apscheduler.running:
+        if not self._getAPScheduler().running:
             self._apscheduler.start()
 
             logger.trace("Scheduler.start(): running")
@@ -0,0 +1,550 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Binary telegram capture
+
+Implements
+==========
+
+ - B{TelegramCaptureWriter}
+ - B{TelegramCaptureReader}
+ - B{TelegramRecord}
+ - B{TelegramCaptureValueError}
+
+Documentation
+=============
+
+A capture file is an append-only sequence of records, one per cEMI frame, with periodic index blocks.
+
+File header (20 bytes): magic (B{PKNYXCAP}), version, reserved, offset of the last index block (0 if none).
+
+Record: fixed-size header (22 bytes), followed by the raw cEMI frame:
+
+ - type (1), frame length (2)
+ - timestamp, in µs since the epoch (8)
+ - source address (2), raw destination address (2)
+ - flags (1): group address (bit 7), priority (bits 4-5), hop count (bits 0-2)
+ - APCI (2): the service (4 bits, or 10 bits for the escaped services), 0xffff if the frame has none
+ - distance to the previous record sent to the same GAD in the chunk, 0 if none (4)
+
+Index block: written every B{indexRecords} records, or when a record comes more than B{indexPeriod} seconds after
+the first one of the chunk (the records since the previous index block); also written on flush. It holds the number
+of records of the chunk, its time range, the offset of its first record and of the previous index block, and a
+table, sorted by GAD, giving the offset of the last record sent to each GAD of the chunk; the records of a GAD are
+found by following their back links from there.
+
+All integers are big-endian. Timestamps never decrease (a timestamp older than the previous one is raised to it). The
+offset of the last index block is updated in the file header each time one is written; if a capture has not been
+closed properly, the records after the last index block (and a truncated record at the end) are recovered by
+scanning them.
+
+The reader maps the file in memory, and walks the index blocks (from the last one, backwards) when opened: seeking to
+a time is a binary search over the chunks, and looking for a GAD only reads the records sent to it (the records of the
+chunk not indexed yet are scanned).
+The reader sees the file as it was when opened.
+
+Usage
+=====
+
+>>> capture = TelegramCaptureWriter("/var/log/knx.cap")
+>>> ets = ETS("1.0.0", capture=capture)
+>>> ...
+>>> with TelegramCaptureReader("/var/log/knx.cap") as reader:
+...     for record in reader.records(start=time.time() - 3600, gad=GroupAddress("1/1/1").raw):
+...         print(record.timestamp, record.cEMI)
+
+@license: GPL
+"""
+
+
+import bisect
+import collections
+import mmap
+import os
+import struct
+import threading
+import time
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.stack.cemi.cemiLData import CEMILData
+
+MAGIC = b"PKNYXCAP"
+VERSION = 1
+
+INDEX_RECORDS = 4096  # max. number of records between index blocks
+INDEX_PERIOD = 600  # max. time covered by the records between index blocks, in s
+
+NO_APCI = 0xffff
+
+_FILE_HEADER = struct.Struct(">8sHHQ")  # magic, version, reserved, last index offset
+_LAST_INDEX_OFFSET = 12
+_RECORD = struct.Struct(">BHQHHBHI")  # type, frame length, timestamp, src, dest, flags, APCI, previous same GAD
+_INDEX = struct.Struct(">BIQQQQI")  # type, count, first/last timestamps, first record, previous index, GAD count
+_INDEX_GAD = struct.Struct(">HQ")  # GAD, offset of its last record
+
+_TYPE_RECORD = 1
+_TYPE_INDEX = 2
+
+_APCI_4 = 0x03c0
+_APCI_10 = 0x03ff
+_APCI_ESCAPES = (0x02c0, 0x03c0)
+
+_Chunk = collections.namedtuple("_Chunk", "firstRecord end count firstTime lastTime gadTable gadCount")
+
+
+class TelegramCaptureValueError(PyKNyXValueError):
+    """
+    """
+
+
+class TelegramRecord(collections.namedtuple("TelegramRecord",
+                                            "offset timestamp src dest isGroup priority hopCount apci frame")):
+    """ Captured frame
+
+    Addresses are raw; the timestamp is in s since the epoch.
+    """
+    __slots__ = ()
+
+    @property
+    def cEMI(self):
+        return CEMILData(bytearray(self.frame))
+
+
+class TelegramCaptureReader(object):
+    """ TelegramCaptureReader class
+
+    @ivar _file: capture file
+    @type _file: file
+
+    @ivar _map: memory map of the capture file
+    @type _map: L{mmap<mmap>}
+
+    @ivar _chunks: chunks of records, in file order; the last one may not be indexed (gadTable is then None)
+    @type _chunks: list of L{_Chunk}
+
+    @ivar _lastTimes: last timestamp of each chunk, for binary search
+    @type _lastTimes: list of int
+
+    @ivar _end: end of the last complete record or index block
+    @type _end: int
+
+    @ivar _lastIndex: offset of the last index block (0 if none)
+    @type _lastIndex: int
+    """
+    def __init__(self, path):
+        """
+
+        @param path: path of the capture file
+        @type path: str
+
+        raise TelegramCaptureValueError:
+        """
+        super(TelegramCaptureReader, self).__init__()
+
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < _FILE_HEADER.size:
+                raise TelegramCaptureValueError("'%s' is not a capture file" % path)
+            self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+            magic, version, reserved, lastIndex = _FILE_HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise TelegramCaptureValueError("'%s' is not a capture file" % path)
+            if version != VERSION:
+                raise TelegramCaptureValueError("unsupported capture version (%d)" % version)
+            self._loadChunks(lastIndex)
+        except:
+            self._file.close()
+            raise
+
+        self._lastTimes = [chunk.lastTime for chunk in self._chunks]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return sum(chunk.count for chunk in self._chunks)
+
+    def __iter__(self):
+        return self.records()
+
+    @property
+    def end(self):
+        """ End of the last complete record or index block
+        """
+        return self._end
+
+    def _readIndex(self, offset):
+        """ Read the index block at the given offset
+
+        @return: (chunk, previous index offset)
+        @rtype: tuple
+        """
+        type_, count, firstTime, lastTime, firstRecord, prevIndex, gadCount = _INDEX.unpack_from(self._map, offset)
+        if type_ != _TYPE_INDEX:
+            raise TelegramCaptureValueError("no index block at %d" % offset)
+        chunk = _Chunk(firstRecord, offset, count, firstTime, lastTime, offset + _INDEX.size, gadCount)
+
+        return chunk, prevIndex
+
+    def _loadChunks(self, lastIndex):
+        """ Load the chunks from the index blocks, and recover the records after the last one
+        """
+        chunks = []
+        offset = lastIndex
+        while offset:
+            chunk, offset = self._readIndex(offset)
+            chunks.append(chunk)
+        chunks.reverse()
+
+        # Records (and index blocks) written after the last index block referenced by the header
+        if chunks:
+            offset = chunks[-1].gadTable + chunks[-1].gadCount * _INDEX_GAD.size
+        else:
+            offset = _FILE_HEADER.size
+        start = offset
+        count = 0
+        firstTime = lastTime = None
+        size = len(self._map)
+        while offset + _RECORD.size <= size:
+            type_ = self._map[offset:offset+1]
+            if type_ == b'\x02':
+                if offset + _INDEX.size > size:
+                    break
+                chunk, prevIndex = self._readIndex(offset)
+                end = chunk.gadTable + chunk.gadCount * _INDEX_GAD.size
+                if end > size:
+                    break
+                chunks.append(chunk)
+                lastIndex = offset
+                offset = start = end
+                count = 0
+                firstTime = None
+                continue
+            type_, length, timestamp = _RECORD.unpack_from(self._map, offset)[:3]
+            if type_ != _TYPE_RECORD:
+                raise TelegramCaptureValueError("invalid record at %d" % offset)
+            if offset + _RECORD.size + length > size:
+                break
+            if firstTime is None:
+                firstTime = timestamp
+            lastTime = timestamp
+            count += 1
+            offset += _RECORD.size + length
+        if count:
+            chunks.append(_Chunk(start, offset, count, firstTime, lastTime, None, 0))
+
+        self._chunks = chunks
+        self._end = offset
+        self._lastIndex = lastIndex
+
+    def _findGad(self, chunk, gad):
+        """ Return the offset of the last record sent to a GAD in an indexed chunk, or None
+        """
+        low, high = 0, chunk.gadCount
+        while low < high:
+            middle = (low + high) // 2
+            entry, offset = _INDEX_GAD.unpack_from(self._map, chunk.gadTable + middle * _INDEX_GAD.size)
+            if entry < gad:
+                low = middle + 1
+            elif entry > gad:
+                high = middle
+            else:
+                return offset
+
+        return None
+
+    def _record(self, offset):
+        """ Decode the record at the given offset
+        """
+        type_, length, timestamp, src, dest, flags, apci, prev = _RECORD.unpack_from(self._map, offset)
+        start = offset + _RECORD.size
+        return TelegramRecord(offset, timestamp / 1e6, src, dest, bool(flags & 0x80), (flags >> 4) & 0x03,
+                              flags & 0x07, apci, self._map[start:start+length])
+
+    def records(self, start=None, end=None, gad=None):
+        """ Iterate over the captured frames, in capture order
+
+        @param start: only frames captured at or after this time (s since the epoch)
+        @type start: float
+
+        @param end: only frames captured at or before this time (s since the epoch)
+        @type end: float
+
+        @param gad: only frames sent to this raw group address
+        @type gad: int
+
+        @return: records
+        @rtype: generator of L{TelegramRecord}
+        """
+        startUs = None if start is None else int(round(start * 1e6))
+        endUs = None if end is None else int(round(end * 1e6))
+        first = 0 if startUs is None else bisect.bisect_left(self._lastTimes, startUs)
+        for chunk in self._chunks[first:]:
+            if endUs is not None and chunk.firstTime > endUs:
+                return
+            if gad is not None and chunk.gadTable is not None:
+                offset = self._findGad(chunk, gad)
+                offsets = []
+                while offset is not None:
+                    offsets.append(offset)
+                    prev = _RECORD.unpack_from(self._map, offset)[7]
+                    offset = offset - prev if prev else None
+                for offset in reversed(offsets):
+                    timestamp = _RECORD.unpack_from(self._map, offset)[2]
+                    if endUs is not None and timestamp > endUs:
+                        return
+                    if startUs is None or timestamp >= startUs:
+                        yield self._record(offset)
+                continue
+
+            offset = chunk.firstRecord
+            while offset < chunk.end:
+                type_, length, timestamp, src, dest, flags = _RECORD.unpack_from(self._map, offset)[:6]
+                if endUs is not None and timestamp > endUs:
+                    return
+                if (startUs is None or timestamp >= startUs) and (gad is None or (dest == gad and flags & 0x80)):
+                    yield self._record(offset)
+                offset += _RECORD.size + length
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class TelegramCaptureWriter(object):
+    """ TelegramCaptureWriter class
+
+    @ivar _path: path of the capture file
+    @type _path: str
+
+    @ivar _indexRecords: max. number of records between index blocks
+    @type _indexRecords: int
+
+    @ivar _indexPeriod: max. time covered by the records between index blocks, in µs
+    @type _indexPeriod: int
+
+    @ivar _offset: end of the file
+    @type _offset: int
+
+    @ivar _lastIndex: offset of the last index block (0 if none)
+    @type _lastIndex: int
+
+    @ivar _chunkStart: offset of the first record not indexed yet
+    @type _chunkStart: int
+
+    @ivar _chunkCount: number of records not indexed yet
+    @type _chunkCount: int
+
+    @ivar _chunkFirst: timestamp of the first record not indexed yet
+    @type _chunkFirst: int
+
+    @ivar _chunkGads: offset of the last record not indexed yet, by raw GAD
+    @type _chunkGads: dict
+
+    @ivar _lastTime: timestamp of the last record
+    @type _lastTime: int
+
+    @ivar _lock: serializes writes
+    @type _lock: L{Lock<threading>}
+    """
+    def __init__(self, path, indexRecords=INDEX_RECORDS, indexPeriod=INDEX_PERIOD):
+        """ Create a capture file, or append to an existing one
+
+        @param path: path of the capture file
+        @type path: str
+
+        @param indexRecords: max. number of records between index blocks
+        @type indexRecords: int
+
+        @param indexPeriod: max. time covered by the records between index blocks, in s
+        @type indexPeriod: float
+
+        raise TelegramCaptureValueError:
+        """
+        super(TelegramCaptureWriter, self).__init__()
+
+        if indexRecords < 1 or indexPeriod <= 0:
+            raise TelegramCaptureValueError("invalid index interval (%r, %r)" % (indexRecords, indexPeriod))
+
+        self._path = path
+        self._indexRecords = indexRecords
+        self._indexPeriod = int(indexPeriod * 1e6)
+        self._lock = threading.Lock()
+        self._count = 0
+        self._chunkGads = {}
+        self._chunkCount = 0
+        self._chunkFirst = self._lastTime = 0
+
+        if os.path.exists(path) and os.path.getsize(path):
+            self._recover()
+        else:
+            self._file = open(path, "w+b")
+            self._file.write(_FILE_HEADER.pack(MAGIC, VERSION, 0, 0))
+            self._offset = self._chunkStart = _FILE_HEADER.size
+            self._lastIndex = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def count(self):
+        """ Number of records written since the file was opened
+        """
+        return self._count
+
+    def _recover(self):
+        """ Open an existing capture file, to append records to it
+
+        The records written after the last index block are scanned to rebuild the current chunk, and a truncated
+        record at the end is dropped.
+        """
+        with TelegramCaptureReader(self._path) as reader:
+            end = reader.end
+            self._lastIndex = reader._lastIndex
+            chunk = reader._chunks[-1] if reader._chunks else None
+            if chunk is not None and chunk.gadTable is None:
+                self._chunkStart = chunk.firstRecord
+                for record in reader.records(start=chunk.firstTime / 1e6):
+                    if record.offset < chunk.firstRecord:
+                        continue
+                    if record.isGroup:
+                        self._chunkGads[record.dest] = record.offset
+                self._chunkCount = chunk.count
+                self._chunkFirst = chunk.firstTime
+                self._lastTime = chunk.lastTime
+            else:
+                self._chunkStart = end
+                if chunk is not None:
+                    self._lastTime = chunk.lastTime
+
+        self._file = open(self._path, "r+b")
+        if os.path.getsize(self._path) != end:
+            logger.warning("TelegramCaptureWriter._recover(): truncating '%s' at %d" % (self._path, end))
+            self._file.truncate(end)
+        self._file.seek(_LAST_INDEX_OFFSET)
+        self._file.write(struct.pack(">Q", self._lastIndex))
+        self._file.seek(end)
+        self._offset = end
+
+    def write(self, cEMI, timestamp=None):
+        """ Capture a frame
+
+        @param cEMI: frame to capture
+        @type cEMI: L{CEMILData<pyknyx.stack.cemi.cemiLData>}
+
+        @param timestamp: capture time, in s since the epoch (now if None)
+        @type timestamp: float
+        """
+        frame = cEMI.frame
+        raw = frame.raw
+        base = 8 + frame.addIL
+        if len(raw) > base + 2:
+            apci = (raw[base+1] << 8 | raw[base+2]) & _APCI_4
+            if apci in _APCI_ESCAPES:
+                apci = (raw[base+1] << 8 | raw[base+2]) & _APCI_10
+        else:
+            apci = NO_APCI
+        ctrl2 = frame.ctrl2
+        flags = ctrl2 & 0x80 | (frame.ctrl1 & 0x0c) << 2 | (ctrl2 >> 4) & 0x07
+        isGroup = ctrl2 & 0x80
+
+        with self._lock:
+            timestamp = int(round((time.time() if timestamp is None else timestamp) * 1e6))
+            if timestamp < self._lastTime:
+                timestamp = self._lastTime
+            if self._chunkCount and timestamp - self._chunkFirst > self._indexPeriod:
+                self._writeIndex()
+
+            offset = self._offset
+            prev = 0
+            if isGroup:
+                last = self._chunkGads.get(frame.da)
+                if last is not None:
+                    prev = offset - last
+                self._chunkGads[frame.da] = offset
+            self._file.write(_RECORD.pack(_TYPE_RECORD, len(raw), timestamp, frame.sa, frame.da, flags, apci, prev))
+            self._file.write(raw)
+            self._offset += _RECORD.size + len(raw)
+            self._count += 1
+            self._lastTime = timestamp
+
+            if not self._chunkCount:
+                self._chunkFirst = timestamp
+            self._chunkCount += 1
+            if self._chunkCount >= self._indexRecords:
+                self._writeIndex()
+
+    def _writeIndex(self):
+        """ Write the index block of the current chunk
+
+        Must be called with the lock held.
+        """
+        if not self._chunkCount:
+            return
+
+        offset = self._offset
+        gads = sorted(self._chunkGads.items())
+        block = [_INDEX.pack(_TYPE_INDEX, self._chunkCount, self._chunkFirst, self._lastTime, self._chunkStart,
+                             self._lastIndex, len(gads))]
+        block.extend(_INDEX_GAD.pack(gad, gadOffset) for gad, gadOffset in gads)
+        block = b''.join(block)
+        self._file.write(block)
+        self._file.seek(_LAST_INDEX_OFFSET)
+        self._file.write(struct.pack(">Q", offset))
+        self._file.seek(offset + len(block))
+
+        self._offset = self._chunkStart = offset + len(block)
+        self._lastIndex = offset
+        self._chunkCount = 0
+        self._chunkGads = {}
+
+    def flush(self):
+        """ Index the pending records, and flush the file
+        """
+        with self._lock:
+            self._writeIndex()
+            self._file.flush()
+
+    def close(self):
+        """ Flush and close the file
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._writeIndex()
+            self._file.close()
@@ -0,0 +1,756 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Timer wheel scheduler
+
+Implements
+==========
+
+ - B{TimerWheelValueError}
+ - B{TimerWheel}
+ - B{TimerWheelJob}
+ - B{TimerWheelScheduler}
+
+Documentation
+=============
+
+B{TimerWheelScheduler} is a lightweight, in-process, replacement for the APScheduler scheduler classes used by the
+L{Scheduler<pyknyx.services.scheduler>}. It is aimed at installations with thousands of short periodic jobs, where
+APScheduler per-job overhead (job stores, executors, locking) dominates.
+
+Pending jobs are kept in a hierarchical timer wheel (B{TimerWheel}): time is divided in ticks of B{resolution}
+seconds, and each level of the wheel has 256 slots, each slot of a level covering a whole turn of the level below.
+Adding a job, or getting the jobs due at a given tick, costs O(1), whatever the number of jobs; jobs far in the future
+are moved down the levels (cascaded) as time advances.
+
+Only the triggers computation is delegated to APScheduler (B{interval}, B{date} and B{cron} triggers, with the same
+arguments); interval triggers, the most common ones, are then computed without datetime objects.
+
+Supported job options are:
+
+ - B{coalesce}: when several runs of a job are due (the scheduler was late), run it only once;
+ - B{misfire_grace_time}: runs later than this number of seconds are skipped, and notified as missed;
+ - B{max_instances}: max. number of concurrent runs of a coroutine job;
+ - B{jitter} (trigger option): delay each run by a random time, up to this number of seconds.
+
+Default values of B{coalesce}, B{misfire_grace_time} and B{max_instances} are the same as APScheduler ones, and can
+be changed with B{job_defaults}.
+
+Without event loop, jobs are run by a dedicated thread. If an event loop is given, timers and jobs run in this loop
+(see L{AsyncETS<pyknyx.core.ets>}), and jobs may be coroutines. In both cases, jobs are run one after the other, so
+they must be short (or be coroutines).
+
+Usage
+=====
+
+>>> from pyknyx.services.scheduler import Scheduler
+>>> from pyknyx.services.timerWheel import TimerWheelScheduler
+>>> Scheduler().setType(TimerWheelScheduler, resolution=0.01)
+
+@license: GPL
+"""
+
+import calendar
+import datetime
+import functools
+import itertools
+import math
+import random
+import sys
+import threading
+import time
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+try:
+    from datetime import timezone
+    UTC = timezone.utc
+except ImportError:
+    from pytz import utc as UTC
+
+from apscheduler.events import EVENT_ALL, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_MAX_INSTANCES, \
+                               EVENT_JOB_SUBMITTED, JobExecutionEvent, JobSubmissionEvent
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+
+TIMER_WHEEL_RESOLUTION = 0.01  # tick duration (s)
+TIMER_WHEEL_BITS = 8  # 256 slots per level
+TIMER_WHEEL_LEVELS = 4
+
+TRIGGERS = {
+    'interval': IntervalTrigger,
+    'date': DateTrigger,
+    'cron': CronTrigger
+}
+
+JOB_DEFAULTS = dict(coalesce=True, misfire_grace_time=1, max_instances=1)  # same as APScheduler
+
+
+def _timestamp(dt):
+    """ Convert an aware datetime to a timestamp
+    """
+    try:
+        return dt.timestamp()
+    except AttributeError:
+        return calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+
+
+class TimerWheelValueError(PyKNyXValueError):
+    """
+    """
+
+
+class TimerWheel(object):
+    """ Hierarchical timer wheel
+
+    Items are added for a given tick, and popped once this tick is reached. Items can't be removed: they must be
+    ignored when popped, if no longer valid.
+
+    @ivar _tick: next tick to process
+    @type _tick: int
+
+    @ivar _wheels: levels of the wheel; each slot is a list of (tick, item)
+    @type _wheels: list of list of list
+
+    @ivar _overflow: items too far in the future for the wheel
+    @type _overflow: list
+
+    @ivar _count: number of items in the wheel
+    @type _count: int
+
+    @ivar _count0: number of items in the first level of the wheel
+    @type _count0: int
+    """
+    def __init__(self, bits=TIMER_WHEEL_BITS, levels=TIMER_WHEEL_LEVELS):
+        """ Init the wheel
+
+        @param bits: number of bits of the slot index of a level (the number of slots is 2**bits)
+        @type bits: int
+
+        @param levels: number of levels
+        @type levels: int
+        """
+        super(TimerWheel, self).__init__()
+
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._tick = 0
+        self._wheels = [[[] for i in range(1 << bits)] for level in range(levels)]
+        self._overflow = []
+        self._count = self._count0 = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def tick(self):
+        return self._tick
+
+    def _place(self, entry):
+        """ Put an entry in the slot matching its tick
+        """
+        tick = entry[0]
+        delta = tick - self._tick
+        if delta < 0:
+            tick = self._tick
+            delta = 0
+        bits = self._bits
+        for level, wheel in enumerate(self._wheels):
+            if delta < 1 << (bits * (level + 1)):
+                wheel[(tick >> (bits * level)) & self._mask].append(entry)
+                if not level:
+                    self._count0 += 1
+                return
+        self._overflow.append(entry)
+
+    def add(self, tick, item):
+        """ Add an item
+
+        @param tick: tick at which the item is due; if already passed, the item is due at the next tick
+        @type tick: int
+
+        @param item: item to add
+        @type item: object
+        """
+        self._place((tick, item))
+        self._count += 1
+
+    def _cascade(self):
+        """ Move the entries of the higher levels slots matching the current tick to the lower levels
+        """
+        tick = self._tick
+        for level in range(1, len(self._wheels)):
+            index = (tick >> (self._bits * level)) & self._mask
+            wheel = self._wheels[level]
+            entries, wheel[index] = wheel[index], []
+            for entry in entries:
+                self._place(entry)
+            if index:
+                break
+        else:
+            entries, self._overflow = self._overflow, []
+            for entry in entries:
+                self._place(entry)
+
+    def pop(self, tick):
+        """ Remove and return all items due until the given tick (included)
+
+        @param tick: tick to advance to
+        @type tick: int
+
+        @return: due items, in tick order
+        @rtype: list
+        """
+        due = []
+        mask = self._mask
+        wheel0 = self._wheels[0]
+        while self._tick <= tick:
+            if not self._count:
+                self._tick = tick + 1
+                break
+            if not self._count0 and self._tick & mask:
+
+                # Nothing in the first level: jump to the next cascade
+                self._tick = min(tick + 1, (self._tick | mask) + 1)
+                continue
+            if not self._tick & mask:
+                self._cascade()
+            index = self._tick & mask
+            entries = wheel0[index]
+            if entries:
+                wheel0[index] = []
+                self._count -= len(entries)
+                self._count0 -= len(entries)
+                due.extend(item for tick_, item in entries)
+            self._tick += 1
+
+        return due
+
+    def nextTick(self):
+        """ Return the next tick worth being processed
+
+        This is the tick of the next item of the first level, or the next cascade, if sooner.
+
+        @return: tick, or None if the wheel is empty
+        @rtype: int
+        """
+        if not self._count:
+            return None
+        tick = self._tick
+        mask = self._mask
+        if self._count > self._count0:
+            boundary = tick if not tick & mask else (tick | mask) + 1  # cascade may be pending on current tick
+        else:
+            boundary = tick + mask + 1
+        if self._count0:
+            wheel0 = self._wheels[0]
+            for tick_ in range(tick, boundary):
+                if wheel0[tick_ & mask]:
+                    return tick_
+        return boundary
+
+
+class TimerWheelJob(object):
+    """ Timer wheel job
+
+    @ivar id: job id
+    @type id: str
+
+    @ivar name: job name
+    @type name: str
+
+    @ivar func: job callable
+    @type func: callable
+
+    @ivar trigger: APScheduler trigger
+    @type trigger: L{BaseTrigger<apscheduler.triggers.base>}
+
+    @ivar nextRunTime: timestamp of the next run (jitter included), or None if the job is finished
+    @type nextRunTime: float
+    """
+    def __init__(self, scheduler, id_, name, func, args, kwargs, trigger, jitter, coalesce, misfireGraceTime,
+                 maxInstances):
+        """ Init the job
+        """
+        super(TimerWheelJob, self).__init__()
+
+        self._scheduler = scheduler
+        self.id = id_
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.trigger = trigger
+        self.jitter = jitter
+        self.coalesce = coalesce
+        self.misfireGraceTime = misfireGraceTime
+        self.maxInstances = maxInstances
+
+        if isinstance(trigger, IntervalTrigger):
+            self._interval = trigger.interval_length
+            self._end = None if trigger.end_date is None else _timestamp(trigger.end_date)
+        else:
+            self._interval = None
+        self._nominal = None  # next run time, without jitter
+        self.nextRunTime = None
+        self._generation = 0
+        self._instances = 0
+
+    def __repr__(self):
+        return "<TimerWheelJob(id=%s, name=%s, trigger=%s)>" % (self.id, self.name, self.trigger)
+
+    def remove(self):
+        """ Remove the job from its scheduler
+        """
+        self._scheduler.remove_job(self.id)
+
+    def _first(self, now):
+        """ Compute the first run time
+        """
+        fireTime = self.trigger.get_next_fire_time(None, datetime.datetime.fromtimestamp(now, UTC))
+        self._setNominal(None if fireTime is None else _timestamp(fireTime))
+
+    def _setNominal(self, nominal):
+        """ Set the next run time, and apply jitter
+        """
+        self._nominal = nominal
+        if nominal is None:
+            self.nextRunTime = None
+        elif self.jitter:
+            self.nextRunTime = nominal + random.uniform(0, self.jitter)
+        else:
+            self.nextRunTime = nominal
+
+    def _dueRuns(self, now):
+        """ Compute the runs due at the given time, and advance to the next run time
+
+        Runs later than the misfire grace time are skipped.
+
+        @return: (run times, number of skipped runs)
+        @rtype: tuple
+        """
+        nominal = self._nominal
+        oldest = None if self.misfireGraceTime is None else now - self.misfireGraceTime
+        interval = self._interval
+        if interval is not None:
+            count = int((now - nominal) // interval) + 1
+            start = 0
+            if oldest is not None and nominal < oldest:
+                start = min(count, int(math.ceil((oldest - nominal) / interval)))
+            runTimes = [nominal + i * interval for i in range(start, count)]
+            missed = start
+            next_ = nominal + count * interval
+            if self._end is not None and next_ > self._end:
+                next_ = None
+        else:
+            nowDt = datetime.datetime.fromtimestamp(now, UTC)
+            fireTime = datetime.datetime.fromtimestamp(nominal, UTC)
+            runTimes = []
+            missed = 0
+            while fireTime is not None and fireTime <= nowDt:
+                runTime = _timestamp(fireTime)
+                if oldest is not None and runTime < oldest:
+                    missed += 1
+                else:
+                    runTimes.append(runTime)
+                fireTime = self.trigger.get_next_fire_time(fireTime, nowDt)
+            next_ = None if fireTime is None else _timestamp(fireTime)
+
+        self._setNominal(next_)
+        return runTimes, missed
+
+
+class TimerWheelScheduler(object):
+    """ Timer wheel scheduler
+
+    Implements the subset of the APScheduler scheduler API used by the L{Scheduler<pyknyx.services.scheduler>}.
+
+    @ivar _resolution: tick duration (s)
+    @type _resolution: float
+
+    @ivar _origin: timestamp of tick 0
+    @type _origin: float
+
+    @ivar _wheel: pending jobs, as (job, generation)
+    @type _wheel: L{TimerWheel}
+
+    @ivar _jobs: jobs, indexed by id
+    @type _jobs: dict
+
+    @ivar _condition: lock protecting the jobs and the wheel; also used to wake up the thread
+    @type _condition: L{Condition<threading>}
+
+    @ivar _loop: event loop running timers, or None to use a thread
+    @type _loop: L{AbstractEventLoop<asyncio>}
+
+    @ivar _handle: pending event loop timer
+    @type _handle: L{TimerHandle<asyncio>}
+    """
+    def __init__(self, resolution=TIMER_WHEEL_RESOLUTION, loop=None, job_defaults=None):
+        """ Init the scheduler
+
+        @param resolution: tick duration (s)
+        @type resolution: float
+
+        @param loop: event loop running timers and jobs, or None to use a dedicated thread
+        @type loop: L{AbstractEventLoop<asyncio>}
+
+        @param job_defaults: default values for B{coalesce}, B{misfire_grace_time} and B{max_instances}
+        @type job_defaults: dict
+
+        raise TimerWheelValueError:
+        """
+        super(TimerWheelScheduler, self).__init__()
+
+        if resolution <= 0:
+            raise TimerWheelValueError("invalid resolution (%s)" % repr(resolution))
+
+        self._resolution = resolution
+        self._loop = loop
+        self._jobDefaults = dict(JOB_DEFAULTS)
+        self._jobDefaults.update(job_defaults or {})
+        self._origin = time.time()
+        self._wheel = TimerWheel()
+        self._jobs = {}
+        self._ids = itertools.count()
+        self._listeners = []
+        self._condition = threading.Condition(threading.RLock())
+        self._running = False
+        self._thread = None
+        self._handle = None
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def loop(self):
+        return self._loop
+
+    @loop.setter
+    def loop(self, loop):
+        if self._running:
+            raise TimerWheelValueError("can't change the event loop of a running scheduler")
+        self._loop = loop
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    def _tickOf(self, timestamp):
+        """ Return the first tick at or after the given time
+        """
+        return int(math.ceil((timestamp - self._origin) / self._resolution))
+
+    def add_listener(self, callback, mask=EVENT_ALL):
+        """ Add a listener for job events
+
+        @param callback: listener, called with a L{JobExecutionEvent<apscheduler.events>} (a
+                         L{JobSubmissionEvent<apscheduler.events>} for EVENT_JOB_SUBMITTED)
+        @type callback: callable
+
+        @param mask: events to listen to
+        @type mask: int
+        """
+        self._listeners.append((callback, mask))
+
+    def _dispatch(self, code, job, runTime, exception=None, traceback=None):
+        """ Send an event to the listeners
+        """
+        event = None
+        for callback, mask in self._listeners:
+            if code & mask:
+                if event is None:
+                    runTime = datetime.datetime.fromtimestamp(runTime, UTC)
+                    if code == EVENT_JOB_SUBMITTED:
+                        event = JobSubmissionEvent(code, job.id, None, [runTime])
+                    else:
+                        event = JobExecutionEvent(code, job.id, None, runTime,
+                                                  exception=exception, traceback=traceback)
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("TimerWheelScheduler._dispatch()")
+
+    def add_job(self, func, trigger=None, args=None, kwargs=None, id=None, name=None, **options):
+        """ Add a job
+
+        @param func: job callable
+        @type func: callable
+
+        @param trigger: trigger name, in ('interval', 'date', 'cron'), or trigger object; if None, the job is run
+                        as soon as possible
+        @type trigger: str or L{BaseTrigger<apscheduler.triggers.base>}
+
+        @param options: job options (B{coalesce}, B{misfire_grace_time}, B{max_instances}) and trigger arguments
+                        (B{jitter} included)
+        @type options: dict
+
+        @return: new job
+        @rtype: L{TimerWheelJob}
+
+        raise TimerWheelValueError:
+        """
+        jobOptions = dict(self._jobDefaults)
+        for key in JOB_DEFAULTS:
+            if key in options:
+                jobOptions[key] = options.pop(key)
+        jitter = options.pop('jitter', None)
+
+        if trigger is None:
+            trigger = DateTrigger()
+        elif not hasattr(trigger, "get_next_fire_time"):
+            try:
+                trigger = TRIGGERS[trigger](**options)
+            except KeyError:
+                raise TimerWheelValueError("unsupported trigger (%s)" % repr(trigger))
+        elif options:
+            raise TimerWheelValueError("unexpected trigger arguments (%s)" % repr(options))
+
+        with self._condition:
+            if id is None:
+                id = "%x" % next(self._ids)
+            elif id in self._jobs:
+                raise TimerWheelValueError("duplicated job id (%s)" % repr(id))
+
+            job = TimerWheelJob(self, id, name or getattr(func, "__name__", repr(func)), func, tuple(args or ()),
+                                dict(kwargs or {}), trigger, jitter, jobOptions['coalesce'],
+                                jobOptions['misfire_grace_time'], jobOptions['max_instances'])
+            job._first(time.time())
+            if job.nextRunTime is None:
+                logger.warning("TimerWheelScheduler.add_job(): %s will never run" % repr(job))
+                return job
+            self._jobs[id] = job
+            self._wheel.add(self._tickOf(job.nextRunTime), (job, job._generation))
+
+            self._wakeUp()
+
+        return job
+
+    def remove_job(self, job_id):
+        """ Remove a job
+
+        @param job_id: id of the job to remove
+        @type job_id: str
+        """
+        with self._condition:
+            job = self._jobs.pop(job_id)
+            job._generation += 1
+
+    def get_job(self, job_id):
+        return self._jobs.get(job_id)
+
+    def get_jobs(self):
+        with self._condition:
+            return list(self._jobs.values())
+
+    def print_jobs(self, out=None):
+        """ Print pending jobs
+        """
+        out = out or sys.stdout
+        jobs = sorted(self.get_jobs(), key=lambda job: job.nextRunTime)
+        out.write("Pending jobs:\n")
+        if jobs:
+            for job in jobs:
+                out.write("    %s (next run at: %s)\n" % (job, datetime.datetime.fromtimestamp(job.nextRunTime)))
+        else:
+            out.write("    No scheduled jobs\n")
+
+    def start(self):
+        """ Start the scheduler
+
+        If an event loop is used, may be called from any thread.
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        if self._loop is None:
+            self._thread = threading.Thread(target=self._run, name="Timer wheel")
+            self._thread.setDaemon(True)
+            self._thread.start()
+        else:
+            self._loop.call_soon_threadsafe(self._reschedule)
+
+    def shutdown(self, wait=True):
+        """ Stop the scheduler
+
+        @param wait: if True, wait for the thread to complete the current jobs
+        @type wait: bool
+        """
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify()
+
+        if self._loop is None:
+            thread, self._thread = self._thread, None
+            if wait and thread is not threading.current_thread():
+                thread.join()
+        else:
+            self._loop.call_soon_threadsafe(self._cancel)
+
+    def _wakeUp(self):
+        """ Make the timer take a new job into account
+
+        Called with the lock held.
+        """
+        if not self._running:
+            return
+        if self._loop is None:
+            self._condition.notify()
+        else:
+            self._loop.call_soon_threadsafe(self._reschedule)
+
+    def _collect(self, now):
+        """ Pop the jobs due at the given time, and reschedule them
+
+        Called with the lock held.
+
+        @return: runs to execute, as (job, run time)
+        @rtype: list
+        """
+        runs = []
+        for job, generation in self._wheel.pop(int((now - self._origin) / self._resolution)):
+            if generation != job._generation:
+                continue
+
+            runTimes, missed = job._dueRuns(now)
+            if missed:
+                logger.warning("TimerWheelScheduler._collect(): %d run(s) of %s missed" % (missed, repr(job)))
+                self._dispatch(EVENT_JOB_MISSED, job, now)
+            if job.coalesce:
+                runTimes = runTimes[-1:]
+            for runTime in runTimes:
+                runs.append((job, runTime))
+
+            if job.nextRunTime is None:
+                del self._jobs[job.id]
+            else:
+                self._wheel.add(self._tickOf(job.nextRunTime), (job, generation))
+
+        return runs
+
+    def _execute(self, job, runTime):
+        """ Run a job
+        """
+        if job._instances >= job.maxInstances:
+            logger.warning("TimerWheelScheduler._execute(): %s skipped: maximum number of running instances reached" % repr(job))
+            self._dispatch(EVENT_JOB_MAX_INSTANCES, job, runTime)
+            return
+        self._dispatch(EVENT_JOB_SUBMITTED, job, runTime)
+        try:
+            result = job.func(*job.args, **job.kwargs)
+        except Exception:
+            exc, tb = sys.exc_info()[1:]
+            self._dispatch(EVENT_JOB_ERROR, job, runTime, exc, tb)
+            return
+
+        if asyncio is not None and asyncio.iscoroutine(result):
+            if self._loop is None:
+                logger.error("TimerWheelScheduler._execute(): no event loop to run %s" % repr(job))
+                result.close()
+                return
+            job._instances += 1
+            task = asyncio.ensure_future(result, loop=self._loop)
+            task.add_done_callback(functools.partial(self._taskDone, job, runTime))
+
+    def _taskDone(self, job, runTime, task):
+        """ Coroutine job completion
+        """
+        job._instances -= 1
+        if not task.cancelled() and task.exception() is not None:
+            exc = task.exception()
+            self._dispatch(EVENT_JOB_ERROR, job, runTime, exc, exc.__traceback__)
+
+    def _delay(self, now):
+        """ Return the delay until the next tick worth being processed, or None if there is no job
+
+        Called with the lock held.
+        """
+        tick = self._wheel.nextTick()
+        if tick is None:
+            return None
+        return max(0., self._origin + tick * self._resolution - now)
+
+    def _run(self):
+        """ Thread main loop
+        """
+        while True:
+            with self._condition:
+                if not self._running:
+                    break
+                now = time.time()
+                runs = self._collect(now)
+                if not runs:
+                    self._condition.wait(self._delay(now))
+                    continue
+
+            for job, runTime in runs:
+                self._execute(job, runTime)
+
+    def _cancel(self):
+        """ Cancel the event loop timer; run in the event loop
+        """
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _reschedule(self):
+        """ Program the event loop timer for the next tick worth being processed; run in the event loop
+        """
+        self._cancel()
+        if not self._running:
+            return
+        with self._condition:
+            delay = self._delay(time.time())
+        if delay is not None:
+            self._handle = self._loop.call_later(delay, self._onTimer)
+
+    def _onTimer(self):
+        """ Event loop timer callback
+        """
+        self._handle = None
+        with self._condition:
+            runs = self._collect(time.time())
+        for job, runTime in runs:
+            self._execute(job, runTime)
+        self._reschedule()
@@ -40,6 +40,11 @@ Implements
 Documentation
 =============
 
+Source address, destination address and priority objects are created on first access, and cached until changed
+through this object. Do not modify them directly through the L{frame<CEMILData.frame>}.
+
+Received frames can be decoded without copying the underlying buffer (wrap=True); see L{CEMILDataFrame}.
+
 Usage
 =====
 
@@ -68,7 +73,18 @@ class CEMILData(CEMI):
 
     @ivar _frame: cEMI L_Data raw frame
     @type _frame: L{CEMILDataFrame}
+
+    @ivar _src: cached source address
+    @type _src: L{IndividualAddress}
+
+    @ivar _dest: cached destination address
+    @type _dest: L{IndividualAddress} or L{GroupAddress}
+
+    @ivar _priority: cached priority
+    @type _priority: L{Priority}
     """
+    __slots__ = ("_frame", "_src", "_dest", "_priority")
+
     MC_LDATA_REQ = 0x11  # message code for L-Data request
     MC_LDATA_CON = 0x2E  # message code for L-Data confirmation
     MC_LDATA_IND = 0x29  # message code for L-Data indication
@@ -100,19 +116,26 @@ class CEMILData(CEMI):
     EFF_STD_FRAME = 0
     EFF_LTE_FRAME_MASK = 0x08
 
-    def __init__(self, frame=None):
+    def __init__(self, frame=None, wrap=False, own=False):
         """ Create a new cEMI L-Data message
 
         @param frame: raw frame
-        @type frame: str or bytearray
+        @type frame: str or bytearray or memoryview or L{CEMILDataFrame}
+
+        @param wrap: if True, reference the given frame instead of copying it (decode mode)
+        @type wrap: bool
+
+        @param own: if True, take ownership of the given frame (a bytearray not used by the caller anymore)
+        @type own: bool
         """
         super(CEMILData, self).__init__()
 
-        self._frame = CEMILDataFrame(frame)
+        self._frame = CEMILDataFrame(frame, wrap=wrap, own=own)
+        self._src = self._dest = self._priority = None
 
         if frame is not None:
             if self.messageCode not in CEMILData.MESSAGE_CODES:
-                raise CEMIValueError("invalid Message Code (%d)" % mc)
+                raise CEMIValueError("invalid Message Code (%d)" % self.messageCode)
             elif self._frame.addIL:
                 logger.warning("Additional Informations not supported and ignored")
             elif self.frameType == CEMILData.FT_EXT_FRAME:
@@ -121,7 +144,9 @@ class CEMILData(CEMI):
             self.frameType = CEMILData.FT_STD_FRAME
 
     def copy(self):
-        return type(self)(self._frame.copy())
+        cEMI = type(self)(self._frame, wrap=True)
+        cEMI._src, cEMI._dest, cEMI._priority = self._src, self._dest, self._priority
+        return cEMI
 
     def __repr__(self):
         s= "<CEMILData(mc=%s, priority=%s, src=%s, dest=%s, npdu=%s)>" % \
@@ -203,8 +228,9 @@ class CEMILData(CEMI):
 
     @property
     def priority(self):
-        pr = (self._frame.ctrl1 >> 2) & 0x03
-        return Priority(pr)
+        if self._priority is None:
+            self._priority = Priority((self._frame.ctrl1 >> 2) & 0x03)
+        return self._priority
 
     @priority.setter
     def priority(self, pr):
@@ -213,6 +239,7 @@ class CEMILData(CEMI):
         ctrl1 = self._frame.ctrl1 & 0xf3
         ctrl1 |= (pr & 0x03) << 2
         self._frame.ctrl1 = ctrl1
+        self._priority = None
 
     @property
     def ack(self):
@@ -245,6 +272,7 @@ class CEMILData(CEMI):
         ctrl2 = self._frame.ctrl2 & 0x7f
         ctrl2 |= (at & 0x01) << 7
         self._frame.ctrl2 = ctrl2
+        self._dest = None
 
     @property
     def hopCount(self):
@@ -268,21 +296,25 @@ class CEMILData(CEMI):
 
     @property
     def sourceAddress(self):
-        return IndividualAddress(self._frame.sa)
+        if self._src is None:
+            self._src = IndividualAddress.fromRaw(self._frame.sa)
+        return self._src
 
     @sourceAddress.setter
     def sourceAddress(self, sa):
         if not isinstance(sa, IndividualAddress):
             sa = IndividualAddress(sa)
         self._frame.sa = sa.raw
+        self._src = sa
 
     @property
     def destinationAddress(self):
-        if self.addressType == 0:
-            da = IndividualAddress(self._frame.da)
-        else:
-            da = GroupAddress(self._frame.da)
-        return da
+        if self._dest is None:
+            if self.addressType == 0:
+                self._dest = IndividualAddress.fromRaw(self._frame.da)
+            else:
+                self._dest = GroupAddress.fromRaw(self._frame.da)
+        return self._dest
 
     @destinationAddress.setter
     def destinationAddress(self, da):
@@ -304,6 +336,7 @@ class CEMILData(CEMI):
         else:
             raise CEMIValueError("invalid address (%s)" % da)
         self._frame.da = da.raw
+        self._dest = da
 
     @property
     def npdu(self):
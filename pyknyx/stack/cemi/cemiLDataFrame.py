@@ -52,6 +52,17 @@ Structure of a cEMI L_Data raw frame:
  - Destination address high/low (DAH, DAL): 2 bytes
  - NPDU: 1 to n bytes. First byte is NPDU length
 
+The fixed part of the header (MC, AddIL, Ctrl1, Ctrl2, SA, DA) is unpacked once, when the frame is created, and
+kept in slots; accessors do not touch the raw frame anymore.
+
+A frame can be created in decode mode (wrap=True): the given buffer is then referenced instead of copied. The
+buffer is never written: the first modification of the frame (a new hopCount when re-broadcasting a frame, for
+example) makes a private copy of it (copy-on-write). L{copy<CEMILDataFrame.copy>} also relies on this, so copying
+a frame only costs an object creation. A frame can also take ownership of a buffer built for it (own=True): the
+buffer is neither copied nor considered shared. For the same reason as above, B{raw} makes the frame private first: writing to it
+never changes the referenced buffer, nor other copies of the frame. The private copy is kept, so only the first
+access to B{raw} copies.
+
 Usage
 =====
 
@@ -84,62 +95,106 @@ import struct
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.stack.cemi.cemi import CEMIValueError
 
+_PREFIX = struct.Struct(">2B")  # mc, addIL
+_HEADER = struct.Struct(">2B2H")  # ctrl1, ctrl2, sa, da
+_WORD = struct.Struct(">H")
+
 
 class CEMILDataFrame(object):
     """ cEMI L_Data Raw Frame container
 
     @ivar _raw: raw frame
-    @type _raw: bytearray
+    @type _raw: bytearray or buffer (decode mode)
+
+    @ivar _shared: if True, _raw is not owned by the frame, and must be copied before any modification
+    @type _shared: bool
     """
+    __slots__ = ("_raw", "_shared", "_mc", "_addIL", "_ctrl1", "_ctrl2", "_sa", "_da")
+
     BASIC_LENGTH = 9
 
-    def __init__(self, frame=None, addIL=0):
+    def __init__(self, frame=None, addIL=0, wrap=False, own=False):
         """ Init frame
 
         @param frame: raw frame
-        @type frame: str or bytearray
+        @type frame: str or bytearray or memoryview or L{CEMILDataFrame}
 
         @param addIL: additional info length
         @type addIL: int
+
+        @param wrap: if True, reference the given frame instead of copying it (decode mode)
+        @type wrap: bool
+
+        @param own: if True, take ownership of the given frame, which must be a bytearray not used by the caller
+                    anymore, instead of copying it
+        @type own: bool
         """
         super(CEMILDataFrame, self).__init__()
 
         if frame is not None:
             if addIL:
                 raise CEMIValueError("can't give both frame and addIL args")
-            if isinstance(frame,CEMILDataFrame):
+            if isinstance(frame, CEMILDataFrame):
+                if wrap:
+                    frame._shared = True
                 frame = frame._raw
             if len(frame) < CEMILDataFrame.BASIC_LENGTH:
                 raise CEMIValueError("data too short (%d)" % len(frame))
-            self._raw = bytearray(frame)
+            if wrap:
+                self._raw = frame
+                self._shared = True
+            elif own:
+                self._raw = frame
+                self._shared = False
+            else:
+                self._raw = bytearray(frame)
+                self._shared = False
+            self._mc, self._addIL = _PREFIX.unpack_from(frame)
+            if len(frame) < CEMILDataFrame.BASIC_LENGTH + self._addIL:
+                raise CEMIValueError("data too short (%d) for addIL (%d)" % (len(frame), self._addIL))
+            self._ctrl1, self._ctrl2, self._sa, self._da = _HEADER.unpack_from(frame, 2 + self._addIL)
         else:
             self._raw = bytearray(CEMILDataFrame.BASIC_LENGTH+addIL)
             self._raw[1] = addIL
+            self._shared = False
+            self._mc = self._ctrl1 = self._ctrl2 = self._sa = self._da = 0
+            self._addIL = addIL
 
     def __repr__(self):
-        return "<CEMILDataFrame(mc=%s, addIL=%d, ctrl1=%s, ctrl2=%s, src=%s, dest=%s)>" % (hex(self.mc), self.addIL, hex(self.ctrl1), hex(self.ctrl2), hex(self.sa), hex(self.da))
+        return "<CEMILDataFrame(mc=%s, addIL=%d, ctrl1=%s, ctrl2=%s, src=%s, dest=%s)>" % (hex(self._mc), self._addIL, hex(self._ctrl1), hex(self._ctrl2), hex(self._sa), hex(self._da))
 
     def __str__(self):
+        if self._shared:
+            return str(bytearray(self._raw))
         return str(self._raw)
 
+    def _own(self):
+        """ Make a private copy of the raw frame, if it is shared
+        """
+        if self._shared:
+            self._raw = bytearray(self._raw)
+            self._shared = False
+
     def copy(self):
-        return type(self)(self._raw)
+        return type(self)(self, wrap=True)
 
     @property
     def raw(self):
+        self._own()
         return self._raw
 
     @property
     def mc(self):
-        return self._raw[0]
+        return self._mc
 
     @mc.setter
     def mc(self, mc):
-        self._raw[0] = mc & 0xff
+        self._own()
+        self._mc = self._raw[0] = mc & 0xff
 
     @property
     def addIL(self):
-        return self._raw[1]
+        return self._addIL
 
     # Must be set at frame creation
     #@addIL.setter
@@ -148,98 +203,104 @@ class CEMILDataFrame(object):
 
     @property
     def addInfo(self):
-        if self.addIL:
-            return self._raw[2:2+self.addIL]
+        if self._addIL:
+            return bytearray(self._raw[2:2+self._addIL])
         else:
             return None
 
     @addInfo.setter
     def addInfo(self, addInfo):
-        if not self.addIL or self.addIL != len(addInfo):
-            raise CEMIValueError("incompatible addIL value (%d)" % self.addIL)
-        self._raw[2:2+self.addIL] = addInfo
+        if not self._addIL or self._addIL != len(addInfo):
+            raise CEMIValueError("incompatible addIL value (%d)" % self._addIL)
+        self._own()
+        self._raw[2:2+self._addIL] = addInfo
 
     @property
     def ctrl1(self):
-        return self._raw[2+self.addIL]
+        return self._ctrl1
 
     @ctrl1.setter
     def ctrl1(self, ctrl1):
-        self._raw[2+self.addIL] = ctrl1
+        self._own()
+        self._raw[2+self._addIL] = ctrl1
+        self._ctrl1 = ctrl1
 
     @property
     def ctrl2(self):
-        return self._raw[3+self.addIL]
+        return self._ctrl2
 
     @ctrl2.setter
     def ctrl2(self, ctrl2):
-        self._raw[3+self.addIL] = ctrl2
+        self._own()
+        self._raw[3+self._addIL] = ctrl2
+        self._ctrl2 = ctrl2
 
     @property
     def sah(self):
-        return self._raw[4+self.addIL]
+        return self._sa >> 8
 
     @sah.setter
     def sah(self, sah):
-        self._raw[4+self.addIL] = sah
+        self.sa = (sah & 0xff) << 8 | self._sa & 0xff
 
     @property
     def sal(self):
-        return self._raw[5+self.addIL]
+        return self._sa & 0xff
 
     @sal.setter
     def sal(self, sal):
-        self._raw[5+self.addIL] = sal
+        self.sa = self._sa & 0xff00 | sal & 0xff
 
     @property
     def sa(self):
-        b = self._raw[4+self.addIL:6+self.addIL]
-        return struct.unpack(">H", b)[0]
+        return self._sa
 
     @sa.setter
     def sa(self, sa):
-        if isinstance(sa, int):
-            self.sah = (sa >> 8) & 0xff  # use struct.pack!!!
-            self.sal = sa & 0xff
-        else:
-            self._raw[4+self.addIL:6+self.addIL] = sa
+        if not isinstance(sa, int):
+            sa = _WORD.unpack(bytes(bytearray(sa)))[0]
+        self._own()
+        _WORD.pack_into(self._raw, 4+self._addIL, sa & 0xffff)
+        self._sa = sa & 0xffff
 
     @property
     def dah(self):
-        return self._raw[6+self.addIL]
+        return self._da >> 8
 
     @dah.setter
     def dah(self, dah):
-        self._raw[6+self.addIL] = dah
+        self.da = (dah & 0xff) << 8 | self._da & 0xff
 
     @property
     def dal(self):
-        return self._raw[7+self.addIL]
+        return self._da & 0xff
 
     @dal.setter
     def dal(self, dal):
-        self._raw[7+self.addIL] = dal
+        self.da = self._da & 0xff00 | dal & 0xff
 
     @property
     def da(self):
-        b = self._raw[6+self.addIL:8+self.addIL]
-        return struct.unpack(">H", b)[0]
+        return self._da
 
     @da.setter
     def da(self, da):
-        if isinstance(da, int):
-            self.dah = (da >> 8) & 0xff  # use struct.pack!!!
-            self.dal = da & 0xff
-        else:
-            self._raw[6+self.addIL:8+self.addIL] = da
+        if not isinstance(da, int):
+            da = _WORD.unpack(bytes(bytearray(da)))[0]
+        self._own()
+        _WORD.pack_into(self._raw, 6+self._addIL, da & 0xffff)
+        self._da = da & 0xffff
 
     @property
     def npdu(self):
-        return self._raw[8+self.addIL:]
+        if self._shared:
+            return bytearray(self._raw[8+self._addIL:])
+        return self._raw[8+self._addIL:]
 
     @npdu.setter
     def npdu(self, npdu):
-        self._raw[8+self.addIL:] = npdu
+        self._own()
+        self._raw[8+self._addIL:] = npdu
 
     #@property
     #def l(self):
@@ -248,4 +309,3 @@ class CEMILDataFrame(object):
     ##@l.setter
     ##def l(self, l):
         ##self._raw[8] = l
-
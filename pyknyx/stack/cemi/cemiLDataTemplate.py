@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+cEMI L_Data transmit templates
+
+Implements
+==========
+
+ - B{CEMILDataTemplate}
+
+Documentation
+=============
+
+A template is a complete cEMI L_Data frame (control fields, source and destination addresses, TPCI/APCI),
+prebuilt once through the whole stack, of which only the data bytes change from one transmission to another.
+
+For 6 bits data (size 0), the data is merged into the APCI low bits; otherwise, it replaces the B{size} last bytes
+of the frame. Each call to L{make<CEMILDataTemplate.make>} returns a new frame, so frames already queued are never
+modified: a write costs one copy of the template (a dozen bytes) and the frame object, and the frame owns its buffer,
+so it is not copied again on its way to the transceiver. A single reusable buffer would not save this copy, as the
+frame has to be detached from it when queued.
+
+Usage
+=====
+
+>>> from cemiLDataTemplate import CEMILDataTemplate
+>>> template = CEMILDataTemplate(cEMI, 2, lds)
+>>> template.send(b"\x0c\x1a")
+
+@license: GPL
+"""
+
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.stack.cemi.cemi import CEMIValueError
+from pyknyx.stack.cemi.cemiLData import CEMILData
+
+
+class CEMILDataTemplate(object):
+    """ cEMI L_Data transmit template
+
+    @ivar _frame: prebuilt raw frame
+    @type _frame: bytes
+
+    @ivar _size: size of the data
+    @type _size: int
+
+    @ivar _lds: link data service used to send the frames
+    @type _lds: L{L_DataService<pyknyx.stack.layer2.l_dataService>}
+    """
+    __slots__ = ("_frame", "_size", "_lds")
+
+    def __init__(self, cEMI, size, lds=None):
+        """ Create a new template
+
+        @param cEMI: complete frame, with null data
+        @type cEMI: L{CEMILData}
+
+        @param size: size of the data (0 for 6 bits data)
+        @type size: int
+
+        @param lds: link data service used to send the frames
+        @type lds: L{L_DataService<pyknyx.stack.layer2.l_dataService>}
+        """
+        super(CEMILDataTemplate, self).__init__()
+
+        self._frame = bytes(cEMI.frame.raw)
+        self._size = size
+        self._lds = lds
+
+    def __repr__(self):
+        return "<CEMILDataTemplate(frame=%s, size=%d)>" % (repr(self._frame), self._size)
+
+    @property
+    def size(self):
+        return self._size
+
+    def make(self, data):
+        """ Build a frame from the template
+
+        @param data: data to put in the frame
+        @type data: bytearray
+
+        @return: new frame
+        @rtype: L{CEMILData}
+
+        @raise CEMIValueError:
+        """
+        size = self._size
+        raw = bytearray(self._frame)
+        if size:
+            if len(data) != size:
+                raise CEMIValueError("incompatible data/size values")
+            raw[-size:] = data
+        else:
+            data = bytearray(data)
+            if len(data) != 1 or data[0] & 0x3f != data[0]:
+                raise CEMIValueError("incompatible data/size values")
+            raw[-1] |= data[0]
+
+        return CEMILData(raw, own=True)
+
+    def send(self, data):
+        """ Build a frame from the template, and send it
+
+        @param data: data to put in the frame
+        @type data: bytearray
+        """
+        return self._lds.dataReq(self.make(data))
@@ -65,7 +65,7 @@ GroupAddressValueError: group address out of range
 2
 >>> groupAddr.sub
 3
->>> groupAddr.outFormatLevel = 2
+>>> groupAddr = groupAddr.withFormatLevel(2)
 >>> groupAddr.address
 '1/515'
 >>> groupAddr.main
@@ -74,7 +74,7 @@ GroupAddressValueError: group address out of range
 0
 >>> groupAddr.sub
 515
->>> groupAddr.outFormatLevel = 4
+>>> groupAddr.withFormatLevel(4)
 GroupAddressValueError: outFormatLevel 4 must be 2 or 3
 >>> groupAddr.frame
 '\n\x03'
@@ -87,7 +87,8 @@ GroupAddressValueError: outFormatLevel 4 must be 2 or 3
 
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
-from pyknyx.stack.knxAddress import KnxAddress, KnxAddressValueError
+from pyknyx.common.lruCache import LRUCache
+from pyknyx.stack.knxAddress import KnxAddress, KnxAddressValueError, ADDRESS_CACHE_SIZE
 
 
 class GroupAddressValueError(KnxAddressValueError):
@@ -101,11 +102,15 @@ class GroupAddress(KnxAddress):
     @ivar _outFormatLevel: output format level representation, in (2, 3).
     @type _outFormatLevel: int
     """
-    def __init__(self, address="0/0/0", outFormatLevel=3):
+    __slots__ = ("_outFormatLevel",)
+
+    _cache = LRUCache(ADDRESS_CACHE_SIZE)
+
+    def __new__(cls, address="0/0/0", outFormatLevel=3):
         """ Create a group address
 
         @param address: group address
-        @type address: str or tuple of int
+        @type address: str or tuple of int or int
 
         @param outFormatLevel: output format level representation, in (2, 3)
                                Note that the format is only used for output; the address can always be entered as
@@ -113,40 +118,92 @@ class GroupAddress(KnxAddress):
         @type outFormatLevel: int
 
         @raise GroupAddressValueError:
-
-        @todo: add constructor with simple int
         """
-        #logger.debug("GroupAddress.__init__(): address=%s" % repr(address))
+        #logger.debug("GroupAddress.__new__(): address=%s" % repr(address))
 
         if isinstance(address, GroupAddress):
             address = address._raw
 
         elif isinstance(address, str):
-            address = address.strip().split('/')
-            try:
-                address = [int(val) for val in address]
-            except ValueError:
-                logger.exception("GroupAddress.__init__()")
-                raise GroupAddressValueError("invalid group address")
-
-        if isinstance(address, int):
-            pass
-        elif len(address) == 2:
+            obj = cls._cache.get((address, outFormatLevel))
+            if obj is not None:
+                return obj
+            obj = cls.fromRaw(cls._parse(address), outFormatLevel)
+            cls._cache.put((address, outFormatLevel), obj)
+            return obj
+
+        if not isinstance(address, int):
+            address = cls._fromTuple(address)
+
+        return cls.fromRaw(address, outFormatLevel)
+
+    @classmethod
+    def fromRaw(cls, raw, outFormatLevel=3):
+        """ Return the group address for the given raw value
+
+        @param raw: knx raw address
+        @type raw: int
+
+        @param outFormatLevel: output format level representation, in (2, 3)
+        @type outFormatLevel: int
+
+        @raise GroupAddressValueError:
+        """
+        obj = cls._cache.get(raw << 2 | outFormatLevel)
+        if obj is None:
+            if not 0 <= raw <= 0xffff:
+                raise KnxAddressValueError("address %s not in range(0, 0xffff)" % hex(raw))
+            if outFormatLevel not in (2, 3):
+                raise GroupAddressValueError("outFormatLevel must be 2 or 3", outFormatLevel)
+            obj = object.__new__(cls)
+            object.__setattr__(obj, "_raw", raw)
+            object.__setattr__(obj, "_outFormatLevel", outFormatLevel)
+            cls._cache.put(raw << 2 | outFormatLevel, obj)
+        return obj
+
+    @classmethod
+    def _parse(cls, address):
+        """ Convert a group address string to its raw value
+
+        @param address: group address
+        @type address: str
+
+        @raise GroupAddressValueError:
+        """
+        address = address.strip().split('/')
+        try:
+            address = [int(val) for val in address]
+        except ValueError:
+            logger.exception("GroupAddress._parse()")
+            raise GroupAddressValueError("invalid group address")
+        return cls._fromTuple(address)
+
+    @classmethod
+    def _fromTuple(cls, address):
+        """ Convert a group address tuple (2 or 3 levels) to its raw value
+
+        @param address: group address
+        @type address: tuple of int
+
+        @raise GroupAddressValueError:
+        """
+        try:
+            length = len(address)
+        except TypeError:
+            raise GroupAddressValueError("invalid group address")
+        if length == 2:
             if not 0 <= address[0] <= 0x1f or not 0 <= address[1] <= 0x7ff:
                 raise GroupAddressValueError("group address out of range",address)
-            address = address[0] << 11 | address[1]
-        elif len(address) == 3:
+            return address[0] << 11 | address[1]
+        elif length == 3:
             if not 0 <= address[0] <= 0x1f or not 0 <= address[1] <= 0x7 or not 0 <= address[2] <= 0xff:
                 raise GroupAddressValueError("group address out of range",address)
-            address = address[0] << 11 | address[1] << 8 | address[2]
+            return address[0] << 11 | address[1] << 8 | address[2]
         else:
             raise GroupAddressValueError("invalid group address")
 
-        if outFormatLevel not in (2, 3):
-            raise GroupAddressValueError("outFormatLevel must be 2 or 3", outFormatLevel)
-        self._outFormatLevel = outFormatLevel
-
-        super(GroupAddress, self).__init__(address)
+    def __reduce__(self):
+        return (type(self).fromRaw, (self._raw, self._outFormatLevel))
 
     def __repr__(self):
         return "<GroupAddress('%s')>" % self.address
@@ -183,9 +240,12 @@ class GroupAddress(KnxAddress):
     def outFormatLevel(self):
         return self._outFormatLevel
 
-    @outFormatLevel.setter
-    def outFormatLevel(self, level):
-        if level not in (2, 3):
-            raise GroupAddressValueError("outFormatLevel must be 2 or 3", level)
-        self._outFormatLevel = level
+    def withFormatLevel(self, level):
+        """ Return the same group address, with another output format level
 
+        @param level: output format level representation, in (2, 3)
+        @type level: int
+
+        @raise GroupAddressValueError:
+        """
+        return type(self).fromRaw(self._raw, level)
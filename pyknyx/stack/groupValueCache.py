@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Group values cache
+
+Implements
+==========
+
+ - B{GroupValueCache}
+ - B{GroupValueCacheValueError}
+
+Documentation
+=============
+
+Keeps the last value seen on each group address, so that L{ETS<pyknyx.core.ets>} can answer GroupValue_Read
+requests itself, instead of forwarding them to the devices (and other buses) and waiting for the owner to respond.
+This cuts bus traffic caused by clients polling the same group addresses again and again.
+
+Values are stored as the NSDU of a GroupValue_Response (TPCI/APCI and data, as found in
+L{CEMILData.npdu<pyknyx.stack.cemi.cemiLData.CEMILData.npdu>} after the length byte), ready to be sent. The cache
+is bounded: when full, the least recently used group address is discarded (see
+L{LRUCache<pyknyx.common.lruCache>}). Values older than B{maxAge} are not used. The source address of the frame
+which carried each value is kept too (see L{lookup<GroupValueCache.lookup>}), so that an answer looks as if sent by
+the last writer.
+
+Lookups are counted: B{hits} for reads answered from the cache, B{misses} for the others (unknown or expired).
+
+Usage
+=====
+
+>>> from pyknyx.stack.groupValueCache import GroupValueCache
+>>> ets = ETS("1.2.0", groupValueCache=GroupValueCache(maxSize=512, maxAge=30.))
+
+@license: GPL
+"""
+
+
+import time
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.common.lruCache import LRUCache
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.stack.layer4.tpci import TPCI
+from pyknyx.stack.layer7.apci import APCI
+
+GROUP_VALUE_CACHE_SIZE = 1024
+GROUP_VALUE_CACHE_MAX_AGE = 60.  # s
+
+
+class GroupValueCacheValueError(PyKNyXValueError):
+    """
+    """
+
+
+class GroupValueCache(object):
+    """ GroupValueCache class
+
+    @ivar _cache: (timestamp, response NSDU, raw source address), indexed by raw group address
+    @type _cache: L{LRUCache<pyknyx.common.lruCache>}
+
+    @ivar _maxAge: max. age of the values used, in s
+    @type _maxAge: float
+
+    @ivar _hits: number of reads answered from the cache
+    @type _hits: int
+
+    @ivar _misses: number of reads not answered from the cache
+    @type _misses: int
+    """
+    def __init__(self, maxSize=GROUP_VALUE_CACHE_SIZE, maxAge=GROUP_VALUE_CACHE_MAX_AGE):
+        """ Init the group values cache
+
+        @param maxSize: max. number of group addresses
+        @type maxSize: int
+
+        @param maxAge: max. age of the values used, in s
+        @type maxAge: float
+
+        raise GroupValueCacheValueError:
+        """
+        super(GroupValueCache, self).__init__()
+
+        if maxAge <= 0:
+            raise GroupValueCacheValueError("invalid max age (%r)" % maxAge)
+        self._cache = LRUCache(maxSize)
+        self._maxAge = maxAge
+        self._hits = self._misses = 0
+
+    def __repr__(self):
+        return "<GroupValueCache(size=%d, maxSize=%d, maxAge=%s)>" % (len(self._cache), self._cache.maxSize, self._maxAge)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, gad):
+        return gad in self._cache
+
+    @property
+    def maxSize(self):
+        return self._cache.maxSize
+
+    @property
+    def maxAge(self):
+        return self._maxAge
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def put(self, gad, nSDU, src=None):
+        """ Store the value of a group
+
+        @param gad: raw group address
+        @type gad: int
+
+        @param nSDU: NSDU of a GroupValue_Write or GroupValue_Response (TPCI/APCI and data); the APCI of the stored
+                     copy is changed to GroupValue_Response
+        @type nSDU: bytearray
+
+        @param src: raw source address of the frame, if known
+        @type src: int
+        """
+        nSDU = bytearray(nSDU)
+        nSDU[1] = nSDU[1] & 0x3f | APCI.GROUPVALUE_RES & 0xc0
+        self._cache.put(gad, (time.time(), nSDU, src))
+
+    def lookup(self, gad):
+        """ Return the value of a group, and the source address of the frame which carried it, if recent enough
+
+        @param gad: raw group address
+        @type gad: int
+
+        @return: (NSDU of a GroupValue_Response, raw source address or None), or (None, None)
+        @rtype: tuple
+        """
+        entry = self._cache.get(gad)
+        if entry is not None:
+            timestamp, nSDU, src = entry
+            if time.time() - timestamp <= self._maxAge:
+                self._hits += 1
+                return nSDU, src
+            self._cache.pop(gad)
+        self._misses += 1
+        return None, None
+
+    def get(self, gad):
+        """ Return the value of a group, if recent enough
+
+        @param gad: raw group address
+        @type gad: int
+
+        @return: NSDU of a GroupValue_Response, or None
+        @rtype: bytearray
+        """
+        return self.lookup(gad)[0]
+
+    def invalidate(self, gad=None):
+        """ Forget the value of a group, or of all groups
+
+        @param gad: raw group address, or None for all groups
+        @type gad: int
+        """
+        if gad is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(gad)
+
+    @staticmethod
+    def groupValueService(npdu):
+        """ Decode a group NPDU
+
+        @param npdu: NPDU of a cEMI frame sent to a group address
+        @type npdu: bytearray
+
+        @return: (APCI, NSDU), or (None, None) if this is not a group value service
+        @rtype: tuple
+        """
+        if len(npdu) < 3 or npdu[1] & 0xc0 != TPCI.UNNUMBERED_DATA:
+            return None, None
+        apci = (npdu[1] << 8 | npdu[2]) & APCI._4
+        if apci not in (APCI.GROUPVALUE_READ, APCI.GROUPVALUE_RES, APCI.GROUPVALUE_WRITE):
+            return None, None
+        return apci, npdu[1:]
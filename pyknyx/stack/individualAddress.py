@@ -74,7 +74,8 @@ IndividualAddressValueError: individual address out of range
 
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
-from pyknyx.stack.knxAddress import KnxAddress, KnxAddressValueError
+from pyknyx.common.lruCache import LRUCache
+from pyknyx.stack.knxAddress import KnxAddress, KnxAddressValueError, ADDRESS_CACHE_SIZE
 
 
 class IndividualAddressValueError(KnxAddressValueError):
@@ -85,41 +86,59 @@ class IndividualAddressValueError(KnxAddressValueError):
 class IndividualAddress(KnxAddress):
     """ Individual address hanlding class
     """
-    def __init__(self, address="0.0.0"):
+    __slots__ = ()
+
+    _cache = LRUCache(ADDRESS_CACHE_SIZE)
+
+    def __new__(cls, address="0.0.0"):
         """ Create an individual address
 
         @param address: individual address
-        @type address: str or tuple of int
+        @type address: str or tuple of int or int
 
         raise IndividualAddressValueError: invalid address
-
-        @todo: add constructor with simple int
         """
-        #logger.debug("IndividualAddress.__init__(): address=%s" % repr(address))
+        #logger.debug("IndividualAddress.__new__(): address=%s" % repr(address))
+
+        if isinstance(address, IndividualAddress):
+            return address
 
-        if isinstance(address,IndividualAddress): # copy
-            address = address._raw
         elif isinstance(address, str):
-            address = address.strip().split('.')
+            obj = cls._cache.get(address)
+            if obj is not None:
+                return obj
             try:
-                address = [int(val) for val in address]
+                raw = [int(val) for val in address.strip().split('.')]
             except ValueError:
-                logger.exception("IndividualAddress.__init__()")
+                logger.exception("IndividualAddress.__new__()")
                 raise IndividualAddressValueError("invalid individual address")
+            obj = cls.fromRaw(cls._fromTuple(raw))
+            cls._cache.put(address, obj)
+            return obj
 
-            try:
-                if len(address) == 3:
-                    if not 0 <= address[0] <= 0xf or not 0 <= address[1] <= 0xf or not 0 <= address[2] <= 0xff:
-                        raise IndividualAddressValueError("individual address out of range")
-                    address = address[0] << 12 | address[1] << 8 | address[2]
-                else:
-                    raise IndividualAddressValueError("invalid individual address")
-            except TypeError:
-                if not isinstance(address, int):
-                    logger.exception("IndividualAddress.__init__()")
-                    raise IndividualAddressValueError("invalid individual address")
-
-        super(IndividualAddress, self).__init__(address)
+        elif isinstance(address, int):
+            return cls.fromRaw(address)
+
+        return cls.fromRaw(cls._fromTuple(address))
+
+    @classmethod
+    def _fromTuple(cls, address):
+        """ Convert an individual address tuple to its raw value
+
+        @param address: individual address
+        @type address: tuple of int
+
+        raise IndividualAddressValueError: invalid address
+        """
+        try:
+            length = len(address)
+        except TypeError:
+            raise IndividualAddressValueError("invalid individual address")
+        if length != 3:
+            raise IndividualAddressValueError("invalid individual address")
+        if not 0 <= address[0] <= 0xf or not 0 <= address[1] <= 0xf or not 0 <= address[2] <= 0xff:
+            raise IndividualAddressValueError("individual address out of range")
+        return address[0] << 12 | address[1] << 8 | address[2]
 
     def __repr__(self):
         return "<IndividualAddress('%s')>" % self.address
@@ -142,4 +161,3 @@ class IndividualAddress(KnxAddress):
     @property
     def device(self):
         return self._raw & 0x0ff
-
@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Initial group values read management
+
+Implements
+==========
+
+ - B{InitReader}
+ - B{InitReadBudget}
+ - B{InitReaderValueError}
+
+Documentation
+=============
+
+When a L{Stack<pyknyx.stack.stack>} starts, it must read the initial value of all groups having a GroupObject with
+the I (init) flag. The B{InitReader} sends these reads from its own thread, so starting the stack does not block:
+
+ - at most B{window} reads are outstanding (sent, not answered yet) at a time;
+ - reads are paced to at most B{rate} reads per second, to keep bus load within budget;
+ - a group is done as soon as a value is received for it (read response, or write from another device);
+ - a read not answered within B{timeout} is retried, after a delay doubling at each attempt (starting at
+   B{timeout}), up to B{retries} times; after that, the group is given up.
+
+The window and rate are those of an L{InitReadBudget}, which can be shared by several readers: the
+L{ETS<pyknyx.core.ets>} gives the same budget to the readers of all its stacks, so the bus load does not grow with the
+number of devices.
+
+Once all groups are done, B{finished} is set, and the optional B{callback} is called, with the list of groups given
+up. The time elapsed is logged. Use B{wait()} to wait for it.
+
+Values are tracked by raw group address; the owner must forward them to B{valueReceived()} (see
+L{A_GroupDataService.setValueListener()<pyknyx.stack.layer7.a_groupDataService.A_GroupDataService.setValueListener>}).
+
+Usage
+=====
+
+>>> reader = InitReader(agds.rawGroups.values(), window=4, rate=10.)
+>>> agds.setValueListener(reader.valueReceived)
+>>> reader.start()
+>>> reader.wait(30)
+True
+
+@license: GPL
+"""
+
+
+import heapq
+import itertools
+import threading
+import time
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.stack.priority import Priority
+
+INIT_READ_WINDOW = 4
+INIT_READ_RATE = 10.  # reads/s
+INIT_READ_TIMEOUT = 2.  # s
+INIT_READ_RETRIES = 2
+INIT_READ_DELAY = 0.25  # s, before the first read
+
+
+class InitReaderValueError(PyKNyXValueError):
+    """
+    """
+
+
+class InitReadBudget(object):
+    """ Bus load budget, shared by several InitReaders
+
+    The readers sharing a budget also share its condition, so a reader waiting for a free slot is woken up when
+    another reader frees one.
+
+    @ivar _outstanding: number of reads sent and not answered yet, by all readers
+    @type _outstanding: int
+
+    @ivar _nextSend: time before which no read may be sent, to respect the rate
+    @type _nextSend: float
+    """
+    def __init__(self, window=INIT_READ_WINDOW, rate=INIT_READ_RATE):
+        """ Create a new budget
+
+        @param window: max. number of outstanding reads
+        @type window: int
+
+        @param rate: max. number of reads sent per second
+        @type rate: float
+
+        raise InitReaderValueError:
+        """
+        super(InitReadBudget, self).__init__()
+
+        if window < 1:
+            raise InitReaderValueError("invalid window (%s)" % repr(window))
+        if rate <= 0:
+            raise InitReaderValueError("invalid rate (%s)" % repr(rate))
+
+        self._window = window
+        self._interval = 1. / rate
+        self._outstanding = 0
+        self._nextSend = 0.
+        self._condition = threading.Condition()
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def rate(self):
+        return 1. / self._interval
+
+    @property
+    def outstanding(self):
+        """ Number of reads sent and not answered yet, by all readers
+        """
+        return self._outstanding
+
+    @property
+    def condition(self):
+        return self._condition
+
+    def available(self):
+        """ Return the time from which a read may be sent, or None if the window is full
+
+        Must be called with the condition held.
+        """
+        if self._outstanding >= self._window:
+            return None
+        return self._nextSend
+
+    def acquire(self, now):
+        """ Account for a read sent
+
+        Must be called with the condition held.
+        """
+        self._outstanding += 1
+        self._nextSend = now + self._interval
+
+    def release(self, count=1):
+        """ Account for reads answered or given up, and wake up the readers
+
+        Must be called with the condition held.
+        """
+        if count:
+            self._outstanding -= count
+            self._condition.notify_all()
+
+
+class InitReader(object):
+    """ InitReader class
+
+    @ivar _groups: groups to read, indexed by raw group address
+    @type _groups: dict of L{Group<pyknyx.core.group>}
+
+    @ivar _schedule: heap of reads to send, as (not before, sequence, raw gad, attempt)
+    @type _schedule: list of tuple
+
+    @ivar _outstanding: reads sent and not answered yet, as raw gad -> (deadline, attempt)
+    @type _outstanding: dict
+
+    @ivar _remaining: raw group addresses still waiting for a value
+    @type _remaining: set of int
+
+    @ivar _givenUp: groups which did not answer
+    @type _givenUp: list of L{Group<pyknyx.core.group>}
+
+    @ivar _budget: window and rate limits, maybe shared with other readers
+    @type _budget: L{InitReadBudget}
+
+    @ivar _notBefore: time before which no read may be sent (initial delay)
+    @type _notBefore: float
+    """
+    def __init__(self, groups, window=INIT_READ_WINDOW, rate=INIT_READ_RATE, timeout=INIT_READ_TIMEOUT,
+                 retries=INIT_READ_RETRIES, delay=INIT_READ_DELAY, priority=Priority(), callback=None, budget=None):
+        """ Create a new InitReader
+
+        @param groups: groups to read
+        @type groups: iterable of L{Group<pyknyx.core.group>}
+
+        @param window: max. number of outstanding reads
+        @type window: int
+
+        @param rate: max. number of reads sent per second
+        @type rate: float
+
+        @param timeout: time to wait for an answer, in s
+        @type timeout: float
+
+        @param retries: number of retries of an unanswered read
+        @type retries: int
+
+        @param delay: time to wait before sending the first read, in s
+        @type delay: float
+
+        @param priority: priority of the reads
+        @type priority: L{Priority}
+
+        @param callback: called from the reader thread once all groups are done, with the list of groups given up
+        @type callback: callable
+
+        @param budget: budget shared with other readers; if given, window and rate are not used
+        @type budget: L{InitReadBudget}
+
+        raise InitReaderValueError:
+        """
+        super(InitReader, self).__init__()
+
+        if timeout <= 0:
+            raise InitReaderValueError("invalid timeout (%s)" % repr(timeout))
+
+        if budget is None:
+            budget = InitReadBudget(window, rate)
+        self._budget = budget
+        self._timeout = timeout
+        self._retries = retries
+        self._delay = delay
+        self._priority = priority
+        self._callback = callback
+
+        self._groups = dict((group.gad.raw, group) for group in groups)
+        self._seq = itertools.count()
+        self._schedule = [(0., next(self._seq), gad, 0) for gad in self._groups]
+        heapq.heapify(self._schedule)
+        self._outstanding = {}
+        self._remaining = set(self._groups)
+        self._givenUp = []
+        self._notBefore = 0.
+        self._startTime = None
+        self._duration = None
+
+        self._condition = budget.condition
+        self._finished = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._groups)
+
+    @property
+    def finished(self):
+        """ True once all groups have a value or have been given up
+        """
+        return self._finished.is_set()
+
+    @property
+    def remaining(self):
+        """ Number of groups still waiting for a value
+        """
+        return len(self._remaining)
+
+    @property
+    def outstanding(self):
+        """ Number of reads sent and not answered yet
+        """
+        return len(self._outstanding)
+
+    @property
+    def budget(self):
+        return self._budget
+
+    @property
+    def givenUp(self):
+        """ Groups which did not answer
+        """
+        return list(self._givenUp)
+
+    @property
+    def duration(self):
+        """ Time it took to read all groups, in s (None if not finished)
+        """
+        return self._duration
+
+    def wait(self, timeout=None):
+        """ Wait until all groups are done
+
+        @return: True if all groups are done, False on timeout
+        @rtype: bool
+        """
+        return self._finished.wait(timeout)
+
+    def valueReceived(self, gad):
+        """ A value has been received for a group
+
+        May be called from any thread.
+
+        @param gad: raw group address
+        @type gad: int
+        """
+        if gad not in self._remaining:
+            return
+        with self._condition:
+            if gad in self._remaining:
+                self._remaining.discard(gad)
+                if self._outstanding.pop(gad, None) is not None:
+                    self._budget.release()
+                self._condition.notify_all()
+
+    def start(self):
+        """ Start reading groups, from a dedicated thread
+        """
+        self._startTime = time.time()
+        self._notBefore = self._startTime + self._delay
+        if not self._groups:
+            self._finish()
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="Init reader")
+        self._thread.setDaemon(True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop reading groups
+        """
+        with self._condition:
+            self._running = False
+            self._budget.release(len(self._outstanding))
+            self._outstanding.clear()
+            self._condition.notify_all()
+
+    def _expire(self, now):
+        """ Reschedule or give up timed out reads
+
+        Must be called with the condition held.
+        """
+        for gad, (deadline, attempt) in list(self._outstanding.items()):
+            if deadline <= now:
+                del self._outstanding[gad]
+                self._budget.release()
+                if attempt < self._retries:
+                    backoff = self._timeout * 2 ** attempt
+                    logger.debug("InitReader._expire(): retry %s in %.2fs" % (self._groups[gad].gad, backoff))
+                    heapq.heappush(self._schedule, (now + backoff, next(self._seq), gad, attempt + 1))
+                else:
+                    logger.warning("InitReader._expire(): no answer from %s" % self._groups[gad].gad)
+                    self._remaining.discard(gad)
+                    self._givenUp.append(self._groups[gad])
+
+    def _nextRead(self, now):
+        """ Return the next group to read, or the time to wait before checking again
+
+        Must be called with the condition held.
+
+        @return: (raw gad, None) or (None, time to wait)
+        @rtype: tuple
+        """
+        schedule = self._schedule
+        while schedule and schedule[0][2] not in self._remaining:
+            heapq.heappop(schedule)  # answered meanwhile
+
+        wakeUp = [deadline for deadline, attempt in self._outstanding.values()]
+        available = self._budget.available()
+        if schedule and available is not None:
+            notBefore = max(schedule[0][0], self._notBefore, available)
+            if notBefore <= now:
+                notBefore, seq, gad, attempt = heapq.heappop(schedule)
+                self._outstanding[gad] = (now + self._timeout, attempt)
+                self._budget.acquire(now)
+                return gad, None
+            wakeUp.append(notBefore)
+
+        if not wakeUp:
+            return None, None
+        return None, min(wakeUp) - now
+
+    def _run(self):
+        """
+        """
+        logger.trace("InitReader._run()")
+
+        while True:
+            with self._condition:
+                if not self._running:
+                    logger.trace("InitReader._run(): stopped")
+                    return
+                now = time.time()
+                self._expire(now)
+                if not self._remaining:
+                    break
+                gad, wait = self._nextRead(now)
+                if gad is None:
+                    self._condition.wait(wait)
+                    continue
+
+            # Send outside the lock; the answer may be processed before read() returns
+            try:
+                self._groups[gad].read(priority=self._priority)
+            except Exception:
+                logger.exception("InitReader._run()")
+
+        self._finish()
+
+    def _finish(self):
+        self._duration = time.time() - self._startTime
+        if self._givenUp:
+            logger.info("InitReader: %d/%d initial values read in %.2fs" % \
+                        (len(self._groups) - len(self._givenUp), len(self._groups), self._duration))
+        else:
+            logger.info("InitReader: all %d initial values read in %.2fs" % (len(self._groups), self._duration))
+        self._finished.set()
+        if self._callback is not None:
+            try:
+                self._callback(self.givenUp)
+            except Exception:
+                logger.exception("InitReader._finish()")
@@ -41,6 +41,9 @@ Implements
 Documentation
 =============
 
+Addresses are immutable objects. They are interned in a per-class LRU cache (up to L{ADDRESS_CACHE_SIZE} entries),
+so creating an address usually returns an existing object. Use B{fromRaw()} to create an address from its raw
+value with as little overhead as possible.
 
 Usage
 =====
@@ -67,8 +70,11 @@ import functools
 import struct
 
 from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.common.lruCache import LRUCache
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 
+ADDRESS_CACHE_SIZE = 8192  # max. number of interned addresses, per address class
+
 
 class KnxAddressValueError(PyKNyXValueError):
     """
@@ -79,11 +85,17 @@ class KnxAddressValueError(PyKNyXValueError):
 class KnxAddress(object):
     """ KNX address hanlding class
 
+    Addresses are immutable, and interned: creating an address already in the cache returns the cached object.
+
     @ivar _raw: knx raw address
     @type _raw: int
     @todo: use buffer protocole (bytearray)?
     """
-    def __init__(self, raw=0x0000):
+    __slots__ = ("_raw",)
+
+    _cache = LRUCache(ADDRESS_CACHE_SIZE)
+
+    def __new__(cls, raw=0x0000):
         """ Create a generic address
 
         @param raw: knx raw address
@@ -91,18 +103,46 @@ class KnxAddress(object):
 
         @raise KnxAddressValueError:
         """
-        super(KnxAddress, self).__init__()
-
-        #logger.debug("KnxAddress.__init__(): raw=%r" % raw)
+        #logger.debug("KnxAddress.__new__(): raw=%r" % raw)
 
         if isinstance(raw, bytes) and len(raw) == 2:
             raw = struct.unpack(">H", raw)[0]
-        if isinstance(raw, int):
+        if not isinstance(raw, int):
+            raise KnxAddressValueError("invalid address (%r)" % repr(raw))
+        return cls.fromRaw(raw)
+
+    @classmethod
+    def fromRaw(cls, raw):
+        """ Return the address for the given raw value
+
+        @param raw: knx raw address
+        @type raw: int
+
+        @raise KnxAddressValueError:
+        """
+        obj = cls._cache.get(raw)
+        if obj is None:
             if not 0 <= raw <= 0xffff:
                 raise KnxAddressValueError("address %s not in range(0, 0xffff)" % hex(raw))
-        else:
-            raise KnxAddressValueError("invalid address (%r)" % repr(raw))
-        self._raw = raw
+            obj = object.__new__(cls)
+            object.__setattr__(obj, "_raw", raw)
+            cls._cache.put(raw, obj)
+        return obj
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is immutable" % type(self).__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError("%s is immutable" % type(self).__name__)
+
+    def __reduce__(self):
+        return (type(self).fromRaw, (self._raw,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
         return "<KnxAddress('%s')>" % hex(self._raw)
@@ -113,13 +153,14 @@ class KnxAddress(object):
     def __eq__(self, other):
         return self.raw == other.raw
 
+    def __ne__(self, other):
+        return not self == other
+
     def __lt__(self, other):
         return self.raw < other.raw
 
     def __add__(self, incr):
-        obj = KnxAddress.__new__(type(self))
-        KnxAddress.__init__(obj, self._raw + incr)
-        return obj
+        return type(self).fromRaw(self._raw + incr)
 
     def __hash__(self):
         return self._raw
@@ -149,4 +190,3 @@ class KnxAddress(object):
     @property
     def isNull(self):
         return self._raw == 0x0000
-
@@ -129,6 +129,8 @@ class KNXnetIPHeader(object):
     HEADER_SIZE = 0x06
     KNXNETIP_VERSION = 0x10
 
+    _STRUCT = struct.Struct(">2B2H")
+
     def __init__(self, frame=None, service=None, serviceLength=0):
         """ Creates a new KNXnet/IP header
 
@@ -182,6 +184,40 @@ class KNXnetIPHeader(object):
         else:
             raise KNXnetIPHeaderValueError("must give either frame or service type")
 
+    @classmethod
+    def check(cls, frame, length=None):
+        """ Check the KNXnet/IP header of a raw frame, without creating a header object
+
+        Used by receivers validating many frames in a row.
+
+        @param frame: buffer starting with the KNXnet/IP header
+        @type frame: bytearray or memoryview
+
+        @param length: length of the frame in the buffer (whole buffer if None)
+        @type length: int
+
+        @return: service identifier
+        @rtype: int
+
+        @raise KnxNetIPHeaderValueError:
+        """
+        if length is None:
+            length = len(frame)
+        if length < KNXnetIPHeader.HEADER_SIZE:
+            raise KNXnetIPHeaderValueError("frame too short for KNXnet/IP header (%d)" % length)
+
+        headersize, protocolVersion, service, totalSize = cls._STRUCT.unpack_from(frame)
+        if headersize != KNXnetIPHeader.HEADER_SIZE:
+            raise KNXnetIPHeaderValueError("wrong header size (%d)" % headersize)
+        if protocolVersion != KNXnetIPHeader.KNXNETIP_VERSION:
+            raise KNXnetIPHeaderValueError("unsupported KNXnet/IP protocol (%d)" % protocolVersion)
+        if service not in KNXnetIPHeader.SERVICE:
+            raise KNXnetIPHeaderValueError("unsupported service (%d)" % service)
+        if length != totalSize:
+            raise KNXnetIPHeaderValueError("wrong frame length (%d; should be %d)" % (length, totalSize))
+
+        return service
+
     def __repr__(self):
         s = "<KNXnetIPHeader(service='%s', totalSize=%d)>" % (self.serviceName, self._totalSize)
         return s
@@ -200,7 +236,7 @@ class KNXnetIPHeader(object):
 
     @property
     def frame(self):
-        s = struct.pack(">2B2H", KNXnetIPHeader.HEADER_SIZE, KNXnetIPHeader.KNXNETIP_VERSION, self._service, self._totalSize)
+        s = KNXnetIPHeader._STRUCT.pack(KNXnetIPHeader.HEADER_SIZE, KNXnetIPHeader.KNXNETIP_VERSION, self._service, self._totalSize)
         return bytearray(s)
 
     @property
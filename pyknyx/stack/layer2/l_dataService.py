@@ -61,6 +61,7 @@ from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceUnicast, NOT_REQU
 from pyknyx.stack.cemi.cemiLData import CEMILData
 
 PRIORITY_DISTRIBUTION = (-1, 3, 2, 1)
+QUEUE_BATCH_SIZE = 32  # max. number of frames handled per queue wake-up
 
 class L_DSValueError(PyKNyXValueError):
     """
@@ -82,9 +83,12 @@ class L_DataService(L_DataServiceUnicast):
     @ivar _ldl: link data listener
     @type _ldl: L{L_DataListener<pyknyx.core.layer2.l_dataListener>}
 
+    @ivar _agds: group data service of the stack, giving the group addresses to receive
+    @type _agds: L{A_GroupDataService<pyknyx.stack.layer7.a_groupDataService>}
     """
 
     _ldl = None
+    _agds = None
 
     def setListener(self, ldl):
         """
@@ -94,6 +98,33 @@ class L_DataService(L_DataServiceUnicast):
         """
         self._ldl = ldl
 
+    def setGroupDataService(self, agds):
+        """ Only receive group frames for groups handled by the given group data service
+
+        @param agds: group data service
+        @type agds: L{A_GroupDataService<pyknyx.stack.layer7.a_groupDataService>}
+        """
+        self._agds = agds
+        agds.setGroupsListener(self._ets.invalidateRoutes)
+        self._ets.invalidateRoutes()
+
+    @property
+    def groupAddresses(self):
+        if self._agds is None:
+            return None
+        return self._agds.groupAddresses
+
+    def setSourceAddress(self, cEMI):
+        """
+        Set the source address of a frame to transmit (if not already done).
+        """
+        if self.physAddr is NOT_REQUIRED:
+            sourceAddress = self.emi.addr
+        else:
+            sourceAddress = self.physAddr
+        if cEMI.frame.sa != sourceAddress.raw:
+            cEMI.sourceAddress = sourceAddress
+
     def dataReq(self, cEMI):
         """
         Transmit a frame, i.e. forward to ETS.
@@ -101,10 +132,7 @@ class L_DataService(L_DataServiceUnicast):
         logger.debug("L_DataService.dataReq(): cEMI=%s" % cEMI)
 
         # Add source address to cEMI
-        if self.physAddr is NOT_REQUIRED:
-            cEMI.sourceAddress = self.emi.addr
-        else:
-            cEMI.sourceAddress = self.physAddr
+        self.setSourceAddress(cEMI)
 
         # Let EMI distribute the packet
         super(L_DataService, self).dataReq(cEMI)
@@ -98,6 +98,14 @@ class L_DataServiceBase(object):
     def physAddr(self):
         return self._physAddr
 
+    @property
+    def groupAddresses(self):
+        """ Raw group addresses this object wants to receive
+
+        Used by ETS to build its routing index. None means all group frames.
+        """
+        return None
+
     def wantsGroupFrame(self, cEMI):
         return True
 
@@ -128,6 +136,12 @@ class L_DataServiceBase(object):
         """
         self._ets.putFrame(self, cEMI)
 
+    def dataReqBatch(self, cEMIs):
+        """
+        Called by upper layers to forward several packets at once
+        """
+        self._ets.putFrames(self, cEMIs)
+
     def cleanup(self):
         raise NotImplementedError
 
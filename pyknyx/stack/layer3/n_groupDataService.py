@@ -55,6 +55,7 @@ from pyknyx.stack.groupAddress import GroupAddress
 from pyknyx.stack.individualAddress import IndividualAddress
 from pyknyx.stack.layer2.l_dataListener import L_DataListener
 from pyknyx.stack.cemi.cemiLData import CEMILData, CEMIValueError
+from pyknyx.stack.cemi.cemiLDataTemplate import CEMILDataTemplate
 
 
 class N_GDSValueError(PyKNyXValueError):
@@ -125,12 +126,9 @@ class N_GroupDataService(L_DataListener):
         """
         self._ngdl = ngdl
 
-    def groupDataReq(self, gad, priority, nSDU):
-        """
+    def _makeCEMI(self, gad, priority, nSDU):
+        """ Build the cEMI frame for the given nSDU
         """
-        logger.debug("N_GroupDataService.groupDataReq(): gad=%s, priority=%s, nSDU=%s" % \
-                       (gad, priority, repr(nSDU)))
-
         if gad.isNull:
             raise N_GDSValueError("invalid Group Address")
 
@@ -145,5 +143,32 @@ class N_GroupDataService(L_DataListener):
         nPDU[1:] = nSDU
         cEMI.npdu = nPDU
 
-        return self._lds.dataReq(cEMI)
+        return cEMI
+
+    def groupDataReq(self, gad, priority, nSDU):
+        """
+        """
+        logger.debug("N_GroupDataService.groupDataReq(): gad=%s, priority=%s, nSDU=%s" % \
+                       (gad, priority, repr(nSDU)))
+
+        return self._lds.dataReq(self._makeCEMI(gad, priority, nSDU))
+
+    def groupDataTemplate(self, gad, priority, nSDU, size):
+        """ Build a transmit template
+
+        @param nSDU: nSDU, with null data
+        @type nSDU: bytearray
+
+        @param size: size of the data
+        @type size: int
+
+        @return: template
+        @rtype: L{CEMILDataTemplate<pyknyx.stack.cemi.cemiLDataTemplate>}
+        """
+        logger.debug("N_GroupDataService.groupDataTemplate(): gad=%s, priority=%s, nSDU=%s, size=%d" % \
+                       (gad, priority, repr(nSDU), size))
+
+        cEMI = self._makeCEMI(gad, priority, nSDU)
+        self._lds.setSourceAddress(cEMI)
+        return CEMILDataTemplate(cEMI, size, self._lds)
 
@@ -151,3 +151,10 @@ class T_GroupDataService(N_GroupDataListener):
         tPDU[0] |= TPCI.UNNUMBERED_DATA
         return self._ngds.groupDataReq(gad, priority, tPDU)
 
+    def groupDataTemplate(self, gad, priority, tSDU, size):
+        """
+        """
+        tPDU = tSDU
+        tPDU[0] |= TPCI.UNNUMBERED_DATA
+        return self._ngds.groupDataTemplate(gad, priority, tPDU, size)
+
@@ -40,6 +40,13 @@ Implements
 Documentation
 =============
 
+Groups are indexed by their raw (16 bits) group address, so that no address formatting occurs when a telegram is
+received. With flat=True, they are also stored in a 65536 slots table, trading 512kB of memory for a plain index
+lookup. The group monitor (subscription to "0/0/0") is kept apart.
+
+The B{groups} property still gives the groups indexed by their string representation (monitor included). Both
+B{groups} and B{rawGroups} are read-only: use L{subscribe()<A_GroupDataService.subscribe>} to add groups.
+
 Usage
 =====
 
@@ -49,8 +56,11 @@ Usage
 """
 
 
+import types
+
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.metrics import MetricsRegistry
 from pyknyx.core.group import Group
 from pyknyx.core.groupMonitor import GroupMonitor
 from pyknyx.stack.groupAddress import GroupAddress
@@ -58,6 +68,14 @@ from pyknyx.stack.layer7.apci import APCI
 from pyknyx.stack.layer7.apdu import APDU
 from pyknyx.stack.layer4.t_groupDataListener import T_GroupDataListener
 
+_metrics = MetricsRegistry()
+_TELEGRAMS = _metrics.counter("pyknyx_group_telegrams_total", "Group telegrams received by the stacks, by APCI",
+                              ("apci",))
+_WRITE, _READ, _RESPONSE, _OTHER, _INVALID = \
+    (_TELEGRAMS.labels(apci) for apci in ("write", "read", "response", "other", "invalid"))
+_UNKNOWN_GAD = _metrics.counter("pyknyx_group_unknown_gad_total",
+                                "Group telegrams received by a stack without group for their GAD")
+
 
 class A_GDSValueError(PyKNyXValueError):
     """
@@ -70,15 +88,33 @@ class A_GroupDataService(T_GroupDataListener):
     @ivar _tgds: transport group data service object
     @type _tgds: L{T_GroupDataService<pyknyx.core.layer4.t_groupDataService>}
 
-    @ivar _groups: Groups managed
-    @type _groups: set of L{Group}
+    @ivar _groups: Groups managed, indexed by raw group address
+    @type _groups: dict of L{Group}
+
+    @ivar _rawGroups: read-only view of _groups
+    @type _rawGroups: L{MappingProxyType<types>}
+
+    @ivar _groupTable: Groups managed, indexed by raw group address (flat mode only)
+    @type _groupTable: list of L{Group}
+
+    @ivar _monitors: Group monitors
+    @type _monitors: list of L{GroupMonitor}
+
+    @ivar _groupsListener: called when a new group is created
+    @type _groupsListener: callable
+
+    @ivar _valueListener: called when a group value is received
+    @type _valueListener: callable
     """
-    def __init__(self, tgds):
+    def __init__(self, tgds, flat=False):
         """
 
         @param tgds: Transport group data service object
         @type tgds: L{T_GroupDataService<pyknyx.core.layer4.t_groupDataService>}
 
+        @param flat: if True, also store groups in a 65536 slots table
+        @type flat: bool
+
         raise A_GDSValueError:
         """
         super(A_GroupDataService, self).__init__()
@@ -86,6 +122,11 @@ class A_GroupDataService(T_GroupDataListener):
         self._tgds = tgds
 
         self._groups = {}
+        self._rawGroups = types.MappingProxyType(self._groups)
+        self._groupTable = [None] * 0x10000 if flat else None
+        self._monitors = []
+        self._groupsListener = None
+        self._valueListener = None
 
         tgds.setListener(self)
 
@@ -97,43 +138,100 @@ class A_GroupDataService(T_GroupDataListener):
         if length >= 0:
             apci = aPDU[0] << 8 | aPDU[1]
 
-            try:
-                group = self._groups[gad.address]
-            except KeyError:
+            if self._groupTable is not None:
+                group = self._groupTable[gad.raw]
+            else:
+                group = self._groups.get(gad.raw)
+            if group is None:
                 logger.debug("A_GroupDataService.groupDataInd(): no registered group for that GAD (%s)" % repr(gad))
-                group = None
-
-            groupMonitor = self._groups.get("0/0/0",None)
+                if _metrics.enabled:
+                    _UNKNOWN_GAD.inc()
 
             if (apci & APCI._4) == APCI.GROUPVALUE_WRITE:
+                if _metrics.enabled:
+                    _WRITE.inc()
                 data = APDU.getGroupValue(aPDU)
+                if self._valueListener is not None:
+                    self._valueListener(gad.raw)
                 if group is not None:
                     group.groupValueWriteInd(src, priority, data)
-                if groupMonitor is not None:
+                for groupMonitor in self._monitors:
                     groupMonitor.groupValueWriteInd(src, gad, priority, data)
 
             elif (apci & APCI._4) == APCI.GROUPVALUE_READ:
+                if _metrics.enabled:
+                    _READ.inc()
                 if length == 0:
                     if group is not None:
                         group.groupValueReadInd(src, priority)
-                    if groupMonitor is not None:
+                    for groupMonitor in self._monitors:
                         groupMonitor.groupValueReadInd(src, gad, priority)
                 else:
                     logger.warning("A_GroupDataService.groupDataInd(): invalid aPDU length")
 
             elif (apci & APCI._4) == APCI.GROUPVALUE_RES:
+                if _metrics.enabled:
+                    _RESPONSE.inc()
                 data = APDU.getGroupValue(aPDU)
+                if self._valueListener is not None:
+                    self._valueListener(gad.raw)
                 if group is not None:
                     group.groupValueReadCon(src, priority, data)
-                if groupMonitor is not None:
+                for groupMonitor in self._monitors:
                     groupMonitor.groupValueReadCon(src, gad, priority, data)
 
+            elif _metrics.enabled:
+                _OTHER.inc()
+
         else:
             logger.warning("A_GroupDataService.groupDataInd(): invalid aPDU length")
+            if _metrics.enabled:
+                _INVALID.inc()
 
     @property
     def groups(self):
-        return self._groups
+        """ Groups managed, indexed by group address string (group monitor as "0/0/0")
+
+        Built on each call, and read-only; use L{rawGroups} where speed matters.
+        """
+        groups = dict((group.gad.address, group) for group in self._groups.values())
+        if self._monitors:
+            groups["0/0/0"] = self._monitors[0]
+        return types.MappingProxyType(groups)
+
+    @property
+    def rawGroups(self):
+        """ Groups managed, indexed by raw group address (group monitor excluded), read-only
+        """
+        return self._rawGroups
+
+    @property
+    def monitors(self):
+        return self._monitors
+
+    @property
+    def groupAddresses(self):
+        """ Raw group addresses handled, or None if all group telegrams are wanted (group monitor)
+        """
+        if self._monitors:
+            return None
+        return set(self._groups)
+
+    def setGroupsListener(self, listener):
+        """ Set the function to call when a new group is created
+
+        @param listener: function taking no argument
+        @type listener: callable
+        """
+        self._groupsListener = listener
+
+    def setValueListener(self, listener):
+        """ Set the function to call when a group value is received (write or read response)
+
+        @param listener: function taking the raw group address, or None
+        @type listener: callable
+        """
+        self._valueListener = listener
 
     def subscribe(self, gad, listener):
         """ Subscribe listener to specified group address
@@ -156,13 +254,23 @@ class A_GroupDataService(T_GroupDataListener):
         if not isinstance(gad, GroupAddress):
             gad = GroupAddress(gad)
 
-        try:
-            group = self._groups[gad.address]
-        except KeyError:
-            if gad.isNull:
-                group = self._groups[gad.address] = GroupMonitor(self)
+        if gad.isNull:
+            if self._monitors:
+                group = self._monitors[0]
             else:
-                group = self._groups[gad.address] = Group(gad, self)
+                group = GroupMonitor(self)
+                self._monitors.append(group)
+                if self._groupsListener is not None:
+                    self._groupsListener()
+        else:
+            try:
+                group = self._groups[gad.raw]
+            except KeyError:
+                group = self._groups[gad.raw] = Group(gad, self)
+                if self._groupTable is not None:
+                    self._groupTable[gad.raw] = group
+                if self._groupsListener is not None:
+                    self._groupsListener()
 
         group.addListener(listener)
 
@@ -177,6 +285,18 @@ class A_GroupDataService(T_GroupDataListener):
         aPDU = APDU.makeGroupValue(APCI.GROUPVALUE_WRITE, data, size)
         return self._tgds.groupDataReq(gad, priority, aPDU)
 
+    def groupValueWriteTemplate(self, gad, priority, size):
+        """ Build a transmit template for group value writes
+
+        @return: template; use its send() method to write a value
+        @rtype: L{CEMILDataTemplate<pyknyx.stack.cemi.cemiLDataTemplate>}
+        """
+        logger.debug("A_GroupDataService.groupValueWriteTemplate(): gad=%s, priority=%s, size=%d" % \
+                       (gad, priority, size))
+
+        aPDU = APDU.makeGroupValue(APCI.GROUPVALUE_WRITE, bytearray(size or 1), size)
+        return self._tgds.groupDataTemplate(gad, priority, aPDU, size)
+
     def groupValueReadReq(self, gad, priority):
         """
         """
@@ -56,14 +56,24 @@ Usage
 """
 
 
+import errno
+import select
 import socket
 import struct
+import sys
 import six
 
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 
 
+RECV_BUFFER_SIZE = 1024
+
+# Linux reports the number of datagrams dropped by the kernel as ancillary data when this option is set.
+SO_RXQ_OVFL = getattr(socket, "SO_RXQ_OVFL", 40 if sys.platform.startswith("linux") else None)
+_ANCDATA_SIZE = socket.CMSG_SPACE(4) if hasattr(socket, "CMSG_SPACE") else 0
+
+
 class McastSockValueError(PyKNyXValueError):
     """
     """
@@ -120,9 +130,21 @@ class MulticastSocketBase(socket.socket):
 
 class MulticastSocketReceive(MulticastSocketBase):
     """
+
+    @ivar _dropped: number of datagrams dropped by the kernel (receive queue overflow), if the system reports it
+    @type _dropped: int
+
+    @ivar _truncated: number of datagrams which did not fit in the receive buffer
+    @type _truncated: int
     """
-    def __init__(self, localAddr, localPort, mcastAddr, mcastPort, timeout=1, ttl=32, loop=1):
+    def __init__(self, localAddr, localPort, mcastAddr, mcastPort, timeout=1, ttl=32, loop=1, rcvBufSize=None):
         """
+
+        @param timeout: timeout of the blocking receive() calls; use 0 for a non-blocking socket (receiveBatch())
+        @type timeout: float
+
+        @param rcvBufSize: size of the kernel receive buffer (system default if None)
+        @type rcvBufSize: int
         """
 
         multicast = six.byte2int(socket.inet_aton(mcastAddr)) in range(224, 240)
@@ -137,6 +159,18 @@ class MulticastSocketReceive(MulticastSocketBase):
         value = struct.pack("=4sl", socket.inet_aton(mcastAddr), socket.INADDR_ANY)
         self.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, value)
         self.settimeout(timeout)
+        if rcvBufSize:
+            self.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvBufSize)
+
+        self._dropped = 0
+        self._truncated = 0
+        self._rxqOvfl = False
+        if SO_RXQ_OVFL is not None and hasattr(self, "recvmsg_into"):
+            try:
+                self.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+                self._rxqOvfl = True
+            except socket.error:
+                logger.exception("MulticastSocketReceive.__init__(): system doesn't support SO_RXQ_OVFL")
 
     def _bind(self):
         """
@@ -151,10 +185,80 @@ class MulticastSocketReceive(MulticastSocketBase):
 
         self.bind(("", self._localPort))
 
+    @property
+    def dropped(self):
+        return self._dropped
+
+    @property
+    def truncated(self):
+        return self._truncated
+
     def receive(self):
         """
         """
-        return self.recvfrom(1024)
+        return self.recvfrom(RECV_BUFFER_SIZE)
+
+    def receiveInto(self, buffer, flags=0):
+        """ Receive a datagram into the given buffer
+
+        @param buffer: buffer to fill
+        @type buffer: bytearray
+
+        @return: number of bytes received, source address. The number of bytes is None if the datagram did not fit.
+        @rtype: tuple
+        """
+        if self._rxqOvfl:
+            nbytes, ancdata, msgFlags, address = self.recvmsg_into((buffer,), _ANCDATA_SIZE, flags)
+            for level, type_, data in ancdata:
+                if level == socket.SOL_SOCKET and type_ == SO_RXQ_OVFL and len(data) >= 4:
+                    self._dropped = struct.unpack("=I", data[:4])[0]
+            if msgFlags & socket.MSG_TRUNC:
+                nbytes = None
+        else:
+            nbytes, address = self.recvfrom_into(buffer, 0, flags)
+            if nbytes >= len(buffer):  # can't tell whether it fitted exactly
+                nbytes = None
+
+        if nbytes is None:
+            self._truncated += 1
+            logger.warning("MulticastSocketReceive.receiveInto(): datagram from %s truncated" % repr(address))
+
+        return nbytes, address
+
+    def receiveBatch(self, buffers, timeout=None):
+        """ Receive all pending datagrams, up to the number of given buffers
+
+        Waits for the first datagram at most timeout seconds, then drains what is already queued in the kernel
+        without blocking. Truncated datagrams are dropped (and counted).
+
+        The socket must have been created with timeout=0 (non-blocking).
+
+        @param buffers: pre-allocated buffers to fill
+        @type buffers: list of bytearray
+
+        @param timeout: max. time to wait for the first datagram (None for infinite)
+        @type timeout: float
+
+        @return: received datagrams, as (buffer, number of bytes, source address)
+        @rtype: list of tuple
+        """
+        batch = []
+        if not select.select((self,), (), (), timeout)[0]:
+            return batch
+
+        i = 0
+        while i < len(buffers):
+            try:
+                nbytes, address = self.receiveInto(buffers[i])
+            except socket.error as e:
+                if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if nbytes is not None:
+                batch.append((buffers[i], nbytes, address))
+                i += 1
+
+        return batch
 
 
 class MulticastSocketTransmit(MulticastSocketBase):
@@ -175,6 +279,21 @@ class MulticastSocketTransmit(MulticastSocketBase):
         if self._localPort == 0:
             self._localPort = self.getsockname()[1]
 
+    @property
+    def sourceAddress(self):
+        """ Address the datagrams are sent from, as seen by the receivers
+
+        When bound to all interfaces, this is the address of the interface routing the multicast group.
+        """
+        if self._localAddr != "0.0.0.0":
+            return self._localAddr
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            probe.connect((self._mcastAddr, self._mcastPort))
+            return probe.getsockname()[0]
+        finally:
+            probe.close()
+
     def transmit(self, data):
         """
         """
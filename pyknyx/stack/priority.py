@@ -43,6 +43,8 @@ Documentation
 
 Priority is used for bus frame priority.
 
+Priority objects are immutable singletons: there is one object per level, and Priority() returns it.
+
 Usage
 =====
 
@@ -76,36 +78,58 @@ class PriorityValueError(PyKNyXValueError):
 
 class Priority(object):
     """ Priority handling class
+
+    There is only one instance per priority level.
+
+    @ivar _level: level of the priority
+    @type _level: int
     """
+    __slots__ = ("_level",)
+
     CONV_TABLE = {'system': 0x00, 'normal': 0x01, 'urgent': 0x02, 'low': 0x03,
                   0x00: 'system', 0x01: 'normal', 0x02: 'urgent', 0x03: 'low'
                  }
 
-    def __init__(self, level='low'):
-        """ Create a priority object
+    _instances = ()
+
+    def __new__(cls, level='low'):
+        """ Return the priority object for the given level
 
         @param level: level of the priority
         @type level: str or int
 
         raise PriorityValueError:
         """
-        super(Priority, self).__init__()
-
-        if isinstance(level, Priority):
-            level = level.level
+        if isinstance(level, int):
+            if not 0x00 <= level <= 0x03:
+                raise PriorityValueError("level %d not in (0x00, 0x01, 0x02, 0x03)" % level)
+        elif isinstance(level, Priority):
+            return level
         elif isinstance(level, str):
             try:
                 level = Priority.CONV_TABLE[level]
             except KeyError:
-                logger.exception("Priority.__init__()")
+                logger.exception("Priority.__new__()")
                 raise PriorityValueError("level %r not in ('system', 'normal', 'urgent', 'low')" % repr(level))
-        elif isinstance(level, int):
-            if not 0x00 <= level <= 0x03:
-                raise PriorityValueError("level %d not in (0x00, 0x01, 0x02, 0x03)" % level)
         else:
             raise PriorityValueError("invalid priority level (%s)" % repr(level))
 
-        self._level = level
+        return Priority._instances[level]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Priority is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Priority is immutable")
+
+    def __reduce__(self):
+        return (Priority, (self._level,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
         return "<Priority('%s')>" % self.name
@@ -123,3 +147,10 @@ class Priority(object):
     def name(self):
         return Priority.CONV_TABLE[self._level]
 
+
+def _createPriority(level):
+    priority = object.__new__(Priority)
+    object.__setattr__(priority, "_level", level)
+    return priority
+
+Priority._instances = tuple(_createPriority(level) for level in range(4))
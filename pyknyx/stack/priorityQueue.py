@@ -36,6 +36,7 @@ Implements
 ==========
 
  - B{PriorityQueue}
+ - B{AsyncPriorityQueue}
  - B{PriorityQueueValueError}
 
 Documentation
@@ -60,7 +61,18 @@ The size of this array must be smaller by one than the number of priority steps.
 
 The array is used internally (it is not cloned)
 
-A queue inherits threading.Condition object, so can block/notify calling threads
+Each priority level is stored in its own deque, so adding and removing elements is O(1) whatever the queue depth.
+A single threading.Condition protects all levels, so can block/notify calling threads.
+
+Consumers which can handle several elements per wake-up should use B{drainUpTo()}: it returns a batch of elements,
+in the same order successive B{remove()} calls would have returned them, while taking the lock only once.
+Similarly, producers can hand several elements at once to B{addMany()}.
+
+L{AsyncPriorityQueue} feeds an asyncio event loop instead of consumer threads: adding elements (from any thread)
+schedules a consumer callback in the loop, which takes them with B{drainNowait()}.
+
+Named queues are exported as L{metrics<pyknyx.services.metrics>}: their depth per priority level, and, if metrics are
+enabled when the queue is created, the time elements spend in queue.
 
 Usage
 =====
@@ -68,16 +80,48 @@ Usage
 @author: Frédéric Mantegazza
 @copyright: (C) 2013-2015 Frédéric Mantegazza
 @license: GPL
-
-@todo: use Queue.PriorityQueue?
 """
 
 
-import copy
 import threading
+import time
+import weakref
+from collections import deque
 
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.metrics import MetricsRegistry
+
+_queues = weakref.WeakSet()  # named queues
+_queuesLock = threading.Lock()
+
+
+def _depths():
+    """ Return the depth of the named queues, per priority level (queues with the same name are added)
+    """
+    with _queuesLock:
+        queues = list(_queues)
+    depths = {}
+    for queue in queues:
+        for level, depth in enumerate(queue.depths):
+            key = (queue.name, level)
+            depths[key] = depths.get(key, 0) + depth
+
+    return sorted(depths.items())
+
+_metrics = MetricsRegistry()
+_metrics.gauge("pyknyx_queue_depth", "Number of elements in queue, per priority level", _depths, ("queue", "level"))
+_WAIT = _metrics.histogram("pyknyx_queue_wait_seconds", "Time spent in queue", ("queue",))
+
+
+class _Timed(object):
+    """ Element queued while metrics are enabled, with its queuing time
+    """
+    __slots__ = ("queued", "obj")
+
+    def __init__(self, queued, obj):
+        self.queued = queued
+        self.obj = obj
 
 
 class PriorityQueueValueError(PyKNyXValueError):
@@ -90,29 +134,62 @@ class PriorityQueue(object):
 
     @ivar _priorityDistribution: determines the handling of the different priorities
     @type _priorityDistribution: list/tuple of int
+
+    @ivar _queue: one deque per priority level
+    @type _queue: tuple of L{deque<collections>}
+
+    @ivar _n: number of elements we may (still) read from each level before getting to lower priorities
+    @type _n: list of int
+
+    @ivar _name: name of the queue in metrics, or None
+    @type _name: str
+
+    @ivar _wait: time in queue histogram (named queues only, and only updated while metrics are enabled), or None
+    @type _wait: L{Histogram<pyknyx.services.metrics>}
     """
-    def __init__(self, priorityDistribution):
+    def __init__(self, priorityDistribution, name=None):
         """ Create a new PriorityQueue
 
         @param priorityDistribution: determines the handling of the different priorities
         @type priorityDistribution: list/tuple of int
 
+        @param name: name of the queue in metrics; unnamed queues are not exported
+        @type name: str
+
         raise PriorityQueueValueError:
         """
         super(PriorityQueue, self).__init__()
 
         if len(priorityDistribution) < 2:
             raise PriorityQueueValueError("there must be a least one priority step")
-        self._priorityDistribution = priorityDistribution
+        self._priorityDistribution = tuple(priorityDistribution)
 
-        self._queue = len(priorityDistribution) * [[]]
+        self._queue = tuple(deque() for _ in priorityDistribution)
+        self._len = 0
 
         self._condition = threading.Condition()
 
-        # queue priority we found the last element at
-        self._pos = 0
-        # number of items we may (still) read before getting to lower prios
-        self._n = priorityDistribution[:]
+        self._n = list(priorityDistribution)
+
+        self._name = name
+        self._wait = None
+        if name is not None:
+            with _queuesLock:
+                _queues.add(self)
+            self._wait = _WAIT.labels(name)
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def depths(self):
+        """ Number of queued elements, per priority level
+        """
+        return tuple(len(q) for q in self._queue)
 
     def add(self, obj, priority):
         """ Add an element to the queue
@@ -124,44 +201,226 @@ class PriorityQueue(object):
         @type obj: any
 
         @param priority: priority value of the object to add
-        @type priority: int
+        @type priority: L{Priority<pyknyx.stack.priority>} or int
         """
-        #logger.debug("PriorityQueue.add(): _queue=%s" % repr(self._queue))
+        level = getattr(priority, "level", priority)
+        if self._wait is not None and _metrics.enabled:
+            obj = _Timed(time.time(), obj)
 
         with self._condition:
-            self._queue[priority.level].append(obj)
+            self._queue[level].append(obj)
+            self._len += 1
             self._condition.notify()
 
+    def addMany(self, items):
+        """ Add several elements to the queue at once
+
+        Same as calling B{add()} for each element, but the queue is locked (and waiting consumers woken up) only once.
+
+        @param items: elements to be inserted into the queue, with their priority
+        @type items: iterable of (any, L{Priority<pyknyx.stack.priority>} or int)
+        """
+        if self._wait is not None and _metrics.enabled:
+            now = time.time()
+            items = [(_Timed(now, obj), priority) for obj, priority in items]
+
+        with self._condition:
+            count = 0
+            for obj, priority in items:
+                self._queue[getattr(priority, "level", priority)].append(obj)
+                count += 1
+            if count:
+                self._len += count
+                self._condition.notify(count)
+
+    def _next(self):
+        """ Return the deque the next element must be taken from, or None if there is no eligible element
+
+        Must be called with the condition held.
+        """
+        quorum = self._n
+        seen = False
+        for i, q in enumerate(self._queue):
+            # Return the first non-empty queue which did not exhaust its quorum
+            if q:
+                n = quorum[i]
+                if n:
+                    if n > 0:
+                        quorum[i] = n - 1
+                    return q
+                seen = True
+
+        if seen:
+            # Only exhausted queues are left; start a new round
+            quorum[:] = self._priorityDistribution
+            for i, q in enumerate(self._queue):
+                if q:
+                    n = quorum[i]
+                    if n:
+                        if n > 0:
+                            quorum[i] = n - 1
+                        return q
+
+        return None
+
+    def _unwrap(self, batch):
+        """ Account for the time the timed elements of a batch spent in queue, and return the elements
+
+        Elements queued before metrics were enabled are not timed; elements removed after metrics were disabled are
+        not accounted for.
+        """
+        now = time.time()
+        wait = self._wait if _metrics.enabled else None
+        elements = []
+        for obj in batch:
+            if type(obj) is _Timed:
+                if wait is not None:
+                    wait.observe(now - obj.queued)
+                obj = obj.obj
+            elements.append(obj)
+
+        return elements
 
     def remove(self):
         """ Removes and returns the next element from this queue
 
         @return: the next element from this queue (blocks if queue is empty)
         """
-        #logger.debug("PriorityQueue.remove(): _queue=%s" % repr(self._queue))
+        with self._condition:
+            while True:
+                q = self._next()
+                if q is not None:
+                    self._len -= 1
+                    obj = q.popleft()
+                    break
+
+                # no element found. Wait.
+                self._condition.wait()
+
+        if self._wait is not None:
+            obj = self._unwrap((obj,))[0]
+
+        return obj
+
+    def drainUpTo(self, n, block=True):
+        """ Removes and returns up to n elements from this queue
+
+        Blocks until at least one element is available, unless block is False. The elements are returned in the order
+        successive B{remove()} calls would have returned them.
 
+        @param n: maximum number of elements to return
+        @type n: int
+
+        @param block: if False, return an empty list instead of waiting for elements
+        @type block: bool
+
+        @return: next elements from this queue
+        @rtype: list
+        """
+        batch = []
         with self._condition:
-            while True: # Loop until we transmit something.
-                seen = True
-                while seen: # Loop until the array of queues is empty.
-                    seen = False
-                    for i,q in enumerate(zip(self._queue,self._n)):
-                        # scan all queues. Return the first element with
-                        # lowest-prio queue that's not exhausted its
-                        # quorum.
-                        q,n = q
-                        if not q:
-                            continue
-                        seen = True
-                        if n == 0:
-                            continue
-                        if n >= 0:
-                            self._n[i] = n-1
-                        return q.pop(0) # takes absolute precendece
-
-                    if seen:
-                        self._n = self._priorityDistribution[:]
+            while True:
+                while len(batch) < n:
+                    q = self._next()
+                    if q is None:
+                        break
+                    batch.append(q.popleft())
+                if batch or not block:
+                    self._len -= len(batch)
+                    break
 
                 # no element found. Wait.
                 self._condition.wait()
 
+        if self._wait is not None:
+            batch = self._unwrap(batch)
+
+        return batch
+
+
+class AsyncPriorityQueue(PriorityQueue):
+    """ PriorityQueue class, feeding an asyncio event loop
+
+    When elements are added, the consumer is scheduled in the event loop; it must take elements with
+    B{drainNowait()}, which schedules it again while elements are left. The consumer is scheduled only once until the
+    queue is emptied, however many elements are added meanwhile.
+
+    @ivar _loop: event loop running the consumer
+    @type _loop: L{AbstractEventLoop<asyncio>}
+
+    @ivar _consumer: called in the event loop, without argument, when elements are available
+    @type _consumer: callable
+
+    @ivar _scheduled: True if the consumer has been scheduled, and did not empty the queue yet
+    @type _scheduled: bool
+    """
+    def __init__(self, priorityDistribution, loop, consumer, name=None):
+        """ Create a new AsyncPriorityQueue
+
+        @param priorityDistribution: determines the handling of the different priorities
+        @type priorityDistribution: list/tuple of int
+
+        @param loop: event loop running the consumer
+        @type loop: L{AbstractEventLoop<asyncio>}
+
+        @param consumer: called in the event loop, without argument, when elements are available
+        @type consumer: callable
+
+        @param name: name of the queue in metrics; unnamed queues are not exported
+        @type name: str
+
+        raise PriorityQueueValueError:
+        """
+        super(AsyncPriorityQueue, self).__init__(priorityDistribution, name)
+
+        self._loop = loop
+        self._consumer = consumer
+        self._scheduled = False
+
+    def _wakeUp(self):
+        """ Schedule the consumer, if not already done
+        """
+        with self._condition:
+            if self._scheduled or not self._len:
+                return
+            self._scheduled = True
+        self._loop.call_soon_threadsafe(self._consumer)
+
+    def add(self, obj, priority):
+        super(AsyncPriorityQueue, self).add(obj, priority)
+        self._wakeUp()
+
+    def addMany(self, items):
+        super(AsyncPriorityQueue, self).addMany(items)
+        self._wakeUp()
+
+    def drainNowait(self, n):
+        """ Removes and returns up to n elements from this queue, without blocking
+
+        Must be called by the consumer, in the event loop. If elements are left, the consumer is scheduled again.
+
+        @param n: maximum number of elements to return
+        @type n: int
+
+        @return: next elements from this queue (may be empty)
+        @rtype: list
+        """
+        batch = []
+        with self._condition:
+            while len(batch) < n:
+                q = self._next()
+                if q is None:
+                    break
+                batch.append(q.popleft())
+            self._len -= len(batch)
+            again = len(batch) == n
+            if not again:
+                self._scheduled = False
+
+        if again:
+            self._loop.call_soon(self._consumer)
+
+        if self._wait is not None:
+            batch = self._unwrap(batch)
+
+        return batch
@@ -41,6 +41,11 @@ Implements
 Documentation
 =============
 
+On start, the initial values of the groups having a GroupObject with the I (init) flag are read by an
+L{InitReader<pyknyx.stack.initReader>}, in the background. Its parameters can be changed through
+B{initReadParams}, before the stack is started. Unless these parameters give their own window or rate, the reader
+uses the L{InitReadBudget<pyknyx.stack.initReader.InitReadBudget>} of the ETS, shared by all its stacks.
+
 Usage
 =====
 
@@ -50,8 +55,6 @@ Usage
 """
 
 
-import time
-
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
 from pyknyx.stack.individualAddress import IndividualAddress
@@ -59,7 +62,7 @@ from pyknyx.stack.layer7.a_groupDataService import A_GroupDataService
 from pyknyx.stack.layer4.t_groupDataService import T_GroupDataService
 from pyknyx.stack.layer3.n_groupDataService import N_GroupDataService
 from pyknyx.stack.layer2.l_dataService import L_DataService
-from pyknyx.stack.priority import Priority
+from pyknyx.stack.initReader import InitReader
 
 
 class StackValueError(PyKNyXValueError):
@@ -82,20 +85,36 @@ class Stack(object):
     @ivar _lds: Transport layer Data Service object
     @type _lds: L{L_DataService}
 
+    @ivar _initReadParams: additional L{InitReader} parameters
+    @type _initReadParams: dict
+
+    @ivar _initReader: initial values reader of the last start
+    @type _initReader: L{InitReader}
+
+    @ivar _ets: ETS the stack is connected to
+    @type _ets: L{ETS<pyknyx.core.ets>}
     """
-    def __init__(self, ets, individualAddress=None):
+    def __init__(self, ets, individualAddress=None, initReadParams=None):
         """
 
+        @param initReadParams: additional L{InitReader} parameters (window, rate, timeout...)
+        @type initReadParams: dict
+
         raise StackValueError:
         """
         super(Stack, self).__init__()
         if not isinstance(individualAddress, IndividualAddress):
             individualAddress = IndividualAddress(individualAddress)
 
+        self._ets = ets
         self._lds = L_DataService(ets, individualAddress=individualAddress)
         self._ngds = N_GroupDataService(self._lds)
         self._tgds = T_GroupDataService(self._ngds)
         self._agds = A_GroupDataService(self._tgds)
+        self._lds.setGroupDataService(self._agds)
+
+        self._initReadParams = dict(initReadParams or {})
+        self._initReader = None
 
     @property
     def agds(self):
@@ -105,33 +124,57 @@ class Stack(object):
     def individualAddress(self):
         return self._lds.physAddr
 
+    @property
+    def initReadParams(self):
+        return self._initReadParams
+
+    @initReadParams.setter
+    def initReadParams(self, params):
+        self._initReadParams = dict(params)
+
+    @property
+    def initReader(self):
+        return self._initReader
+
     def start(self):
         """
         Start the stack. All we need to do is to read initial state from the bus.
+
+        Reads are sent in the background; see L{initReader}.
         """
         logger.trace("Stack.start()")
 
-        time.sleep(0.25)
-
-        # Iterate over Group to find those which need to send a initial read request
-        # (depending on GroupObject init flag)
+        # Find Group which need to send a initial read request (depending on GroupObject init flag)
         logger.debug("Stack.start(): initiate a read request for Group having at least one GroupObject with 'init' flag on")
-        for group in self._agds.groups.values():
+        groups = []
+        for group in self._agds.rawGroups.values():
             for listener in group.listeners:
                 try:
                     if listener.flags.init:
-                        group.read(priority=Priority())
-                        time.sleep(0.1)  # avoid bus saturation
+                        groups.append(group)
                         break
                 except AttributeError:
                     logger.exception("Stack.start(): listener does not seem to be a GroupObject")
 
+        params = dict(self._initReadParams)
+        if 'window' not in params and 'rate' not in params:
+            params.setdefault('budget', self._ets.initReadBudget)
+        self._initReader = InitReader(groups, callback=self._initReadDone, **params)
+        self._agds.setValueListener(self._initReader.valueReceived)
+        self._initReader.start()
+
         logger.debug("Stack.start(): running")
 
+    def _initReadDone(self, givenUp):
+        self._agds.setValueListener(None)
+
     def stop(self):
         """
-        Stop the stack. Nothing to do here; all done by device.stop and ets.stop
+        Stop the stack. Only the initial values reader needs to be stopped; all other done by device.stop and ets.stop
         """
         #logger.trace("Stack.stop()")
+        if self._initReader is not None:
+            self._initReader.stop()
+            self._agds.setValueListener(None)
         logger.debug("Stack.stop(): stopped")
 
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Runs a Layer2 driver for multicasting, in an asyncio event loop
+
+Implements
+==========
+
+ - B{AsyncUDPTransceiver}
+
+Documentation
+=============
+
+Same as L{UDPTransceiver<pyknyx.stack.transceiver.udpTransceiver>}, but runs in the event loop of an
+L{AsyncETS<pyknyx.core.ets>}, instead of using its own threads: the multicast sockets are wrapped in asyncio datagram
+endpoints. Received frames are decoded in place, and handed to ETS as soon as they arrive; frames to send are
+transmitted directly from ETS frame processing, so they leave in the order ETS processes them.
+
+Usage
+=====
+
+@license: GPL
+"""
+
+
+import asyncio
+
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.metrics import MetricsRegistry
+from pyknyx.stack.multicastSocket import MulticastSocketReceive, MulticastSocketTransmit
+from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceBroadcast
+from pyknyx.stack.knxnetip.knxNetIPHeader import KNXnetIPHeader, KNXnetIPHeaderValueError
+from pyknyx.stack.cemi.cemiLData import CEMILData, CEMIValueError
+
+# Same metrics as the UDPTransceiver
+_metrics = MetricsRegistry()
+_FRAMES = _metrics.counter("pyknyx_udp_frames_total", "cEMI frames received and sent by the UDP transceivers",
+                           ("direction",))
+_RX, _TX = _FRAMES.labels("rx"), _FRAMES.labels("tx")
+_IGNORED = _metrics.counter("pyknyx_udp_ignored_total", "Datagrams ignored by the UDP transceivers, by reason",
+                            ("reason",))
+_SELF_ECHO, _MALFORMED_HEADER, _MALFORMED_CEMI, _OTHER_SERVICE = \
+    (_IGNORED.labels(reason) for reason in ("self_echo", "malformed_header", "malformed_cemi", "other_service"))
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    """ Forward datagrams received on an endpoint to the transceiver
+    """
+    def __init__(self, transceiver):
+        super(_Protocol, self).__init__()
+
+        self._transceiver = transceiver
+
+    def datagram_received(self, data, addr):
+        self._transceiver.datagramReceived(data, addr)
+
+    def error_received(self, exc):
+        logger.error("AsyncUDPTransceiver: %s" % exc)
+
+
+class AsyncUDPTransceiver(L_DataServiceBroadcast):
+    """ AsyncUDPTransceiver class
+
+    @ivar _mcastAddr:
+    @type _mcastAddr:
+
+    @ivar _mcastPort:
+    @type _mcastPort:
+
+    @ivar _receiverTransport: transport of the receiver socket, once connected to the event loop
+    @type _receiverTransport: L{DatagramTransport<asyncio>}
+
+    @ivar _transmitterTransport: transport of the transmitter socket, once connected to the event loop
+    @type _transmitterTransport: L{DatagramTransport<asyncio>}
+
+    @ivar _pending: frames to send, waiting for the transmitter transport
+    @type _pending: list of L{CEMILData<pyknyx.stack.cemi.cemiLData>}
+
+    @ivar _txHeaders: prebuilt KNXnet/IP routing indication headers, indexed by cEMI frame length
+    @type _txHeaders: dict of bytes
+    """
+    _running = False
+
+    def __init__(self, ets, mcastAddr="224.0.23.12", mcastPort=3671, rcvBufSize=None):
+        """
+
+        @param ets: ETS running this transceiver; must provide the event loop, see L{AsyncETS<pyknyx.core.ets>}
+        @type ets: L{AsyncETS<pyknyx.core.ets>}
+
+        @param mcastAddr: multicast address to bind to
+        @type mcastAddr: str
+
+        @param mcastPort: multicast port to bind to
+        @type mcastPort: str
+
+        @param rcvBufSize: size of the kernel receive buffer (system default if None)
+        @type rcvBufSize: int
+        """
+        super(AsyncUDPTransceiver, self).__init__(ets)
+
+        self._mcastAddr = mcastAddr
+        self._mcastPort = mcastPort
+
+        localAddr = "0.0.0.0"
+        self._transmitterSock = MulticastSocketTransmit(localAddr, 0, mcastAddr, mcastPort)
+        self._receiverSock = MulticastSocketReceive(localAddr, self._transmitterSock.localPort, mcastAddr, mcastPort,
+                                                    timeout=0, rcvBufSize=rcvBufSize)
+        self._ownAddr = (self._transmitterSock.localAddress, self._transmitterSock.localPort)
+
+        self._receiverTransport = self._transmitterTransport = None
+        self._started = False
+        self._pending = []
+        self._txHeaders = {}
+
+    @property
+    def mcastAddr(self):
+        return self._mcastAddr
+
+    @property
+    def mcastPort(self):
+        return self._mcastPort
+
+    @property
+    def localAddr(self):
+        return self._receiverSock.localAddress
+
+    @property
+    def localPort(self):
+        return self._receiverSock.localPort
+
+    def datagramReceived(self, data, addr):
+        """ Called in the event loop when a datagram is received
+        """
+        if addr == self._ownAddr:
+            if _metrics.enabled:
+                _SELF_ECHO.inc()
+            return # we got our own packet
+        try:
+            service = KNXnetIPHeader.check(data, len(data))
+        except KNXnetIPHeaderValueError:
+            logger.exception("AsyncUDPTransceiver.datagramReceived()")
+            if _metrics.enabled:
+                _MALFORMED_HEADER.inc()
+            return
+        if service != KNXnetIPHeader.ROUTING_IND:
+            logger.debug("AsyncUDPTransceiver.datagramReceived(): ignore service %s" % hex(service))
+            if _metrics.enabled:
+                _OTHER_SERVICE.inc()
+            return
+        try:
+            cEMI = CEMILData(memoryview(data)[KNXnetIPHeader.HEADER_SIZE:], wrap=True)
+        except CEMIValueError:
+            logger.exception("AsyncUDPTransceiver.datagramReceived()")
+            if _metrics.enabled:
+                _MALFORMED_CEMI.inc()
+            return
+
+        if _metrics.enabled:
+            _RX.inc()
+        self.dataReq(cEMI)
+
+    def dataInd(self, cEMI):
+        if self._transmitterTransport is None:
+            self._pending.append(cEMI)
+        else:
+            self._transmit(cEMI)
+
+    def _transmit(self, cEMI):
+        """ Send a frame through the transmitter transport
+        """
+        logger.debug("AsyncUDPTransceiver._transmit(): frame=%s" % repr(cEMI))
+
+        cEMIRawFrame = cEMI.frame.raw
+        length = len(cEMIRawFrame)
+        try:
+            header = self._txHeaders[length]
+        except KeyError:
+            header = KNXnetIPHeader(service=KNXnetIPHeader.ROUTING_IND, serviceLength=length).frame
+            header = self._txHeaders[length] = bytes(header)
+        try:
+            self._transmitterTransport.sendto(header + bytes(cEMIRawFrame), (self._mcastAddr, self._mcastPort))
+            if _metrics.enabled:
+                _TX.inc()
+        except Exception:
+            logger.exception("AsyncUDPTransceiver._transmit()")
+
+    def _receiverConnected(self, future):
+        try:
+            transport, protocol = future.result()
+        except Exception:
+            logger.exception("AsyncUDPTransceiver._receiverConnected()")
+            return
+
+        if self._running:
+            self._receiverTransport = transport
+        else:
+            transport.close()
+
+    def _transmitterConnected(self, future):
+        try:
+            transport, protocol = future.result()
+        except Exception:
+            logger.exception("AsyncUDPTransceiver._transmitterConnected()")
+            return
+
+        if self._running:
+            self._transmitterTransport = transport
+            pending, self._pending = self._pending, []
+            for cEMI in pending:
+                self._transmit(cEMI)
+        else:
+            transport.close()
+
+    def start(self):
+        """
+        """
+        logger.trace("AsyncUDPTransceiver.start()")
+
+        loop = self._ets.loop
+        self._running = self._started = True
+        for sock, protocolFactory, connected in ((self._receiverSock, lambda: _Protocol(self), self._receiverConnected),
+                                                 (self._transmitterSock, asyncio.DatagramProtocol, self._transmitterConnected)):
+            future = asyncio.run_coroutine_threadsafe(loop.create_datagram_endpoint(protocolFactory, sock=sock), loop)
+            future.add_done_callback(connected)
+
+    def stop(self):
+        """
+        """
+        logger.trace("AsyncUDPTransceiver.stop()")
+
+        self._running = False
+        self._pending = []
+        for transport in (self._receiverTransport, self._transmitterTransport):
+            if transport is not None:
+                transport.close()
+        self._receiverTransport = self._transmitterTransport = None
+        if not self._started:
+            self._transmitterSock.close()
+            self._receiverSock.close()
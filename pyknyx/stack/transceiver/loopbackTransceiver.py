@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Runs an in-memory Layer2 driver, for multi-device simulation
+
+Implements
+==========
+
+ - B{LoopbackBus}
+ - B{LoopbackTransceiver}
+ - B{LoopbackTransceiverValueError}
+
+Documentation
+=============
+
+A L{LoopbackBus} connects the L{LoopbackTransceiver}s of several L{ETS<pyknyx.core.ets>} instances, in the same
+process: a frame sent by one of them is received by all the others, as with the
+L{UDPTransceiver<pyknyx.stack.transceiver.udpTransceiver>}, but without any socket.
+
+The bus can delay frames (latency, plus a random jitter) and lose them (probability per receiver). Delays never
+reorder the frames received by a transceiver.
+
+In real-time mode (the default), frames without delay are handed to the receiving ETS as soon as they are sent; delayed
+frames are handed by a bus thread. Each ETS runs as usual.
+
+In deterministic mode, the ETS are not started: the bus runs everything in the calling thread, with a virtual clock,
+when L{step()<LoopbackBus.step>}, L{advance()<LoopbackBus.advance>} or L{run()<LoopbackBus.run>} are called. The
+pending frames of the ETS are processed in the order the transceivers were attached, then the next frame due is
+delivered, and so on. With a given seed, a simulation always gives the same result.
+
+Usage
+=====
+
+>>> bus = LoopbackBus(latency=0.005, loss=0.01, seed=1, deterministic=True)
+>>> ets1 = ETS("1.1.0", transCls=LoopbackTransceiver, transParams=dict(bus=bus))
+>>> ets2 = ETS("1.2.0", transCls=LoopbackTransceiver, transParams=dict(bus=bus))
+>>> ...
+>>> bus.run()
+
+@license: GPL
+"""
+
+
+import heapq
+import random
+import threading
+import time
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceBroadcast
+
+
+class LoopbackTransceiverValueError(PyKNyXValueError):
+    """
+    """
+
+
+class LoopbackBus(object):
+    """ LoopbackBus class
+
+    @ivar _latency: delay of the frames, in s
+    @type _latency: float
+
+    @ivar _jitter: max. random delay added to the latency, in s
+    @type _jitter: float
+
+    @ivar _loss: probability a frame is lost, for each receiver
+    @type _loss: float
+
+    @ivar _random: random generator used for jitter and loss
+    @type _random: L{Random<random>}
+
+    @ivar _deterministic: if True, run the simulation in the calling thread, with a virtual clock
+    @type _deterministic: bool
+
+    @ivar _transceivers: attached transceivers, in attachment order
+    @type _transceivers: list of L{LoopbackTransceiver}
+
+    @ivar _pending: delayed frames, as a heap of (due time, sequence, receiver, cEMI)
+    @type _pending: list of tuple
+
+    @ivar _lastDue: due time of the last delayed frame, by receiver
+    @type _lastDue: dict
+
+    @ivar _now: virtual time (deterministic mode only)
+    @type _now: float
+
+    @ivar _condition: protects the bus state, and wakes up the delivery thread
+    @type _condition: L{Condition<threading>}
+
+    @ivar _thread: delivery thread (real-time mode only), started when the first frame is delayed
+    @type _thread: L{Thread<threading>}
+    """
+    def __init__(self, latency=0., jitter=0., loss=0., seed=None, deterministic=False):
+        """
+
+        @param latency: delay of the frames, in s
+        @type latency: float
+
+        @param jitter: max. random delay added to the latency, in s
+        @type jitter: float
+
+        @param loss: probability a frame is lost, for each receiver, in [0, 1]
+        @type loss: float
+
+        @param seed: seed of the random generator
+        @type seed: int
+
+        @param deterministic: if True, run the simulation in the calling thread, with a virtual clock
+        @type deterministic: bool
+
+        raise LoopbackTransceiverValueError:
+        """
+        super(LoopbackBus, self).__init__()
+
+        if latency < 0 or jitter < 0:
+            raise LoopbackTransceiverValueError("invalid latency (%r, %r)" % (latency, jitter))
+        if not 0 <= loss <= 1:
+            raise LoopbackTransceiverValueError("invalid loss (%r)" % loss)
+
+        self._latency = latency
+        self._jitter = jitter
+        self._loss = loss
+        self._random = random.Random(seed)
+        self._deterministic = deterministic
+
+        self._transceivers = []
+        self._pending = []
+        self._lastDue = {}
+        self._seq = 0
+        self._now = 0.
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = True
+
+        self._sent = self._delivered = self._lost = 0
+
+    @property
+    def deterministic(self):
+        return self._deterministic
+
+    @property
+    def transceivers(self):
+        return tuple(self._transceivers)
+
+    @property
+    def now(self):
+        """ Current time of the bus (virtual time in deterministic mode)
+        """
+        if self._deterministic:
+            return self._now
+        return time.time()
+
+    @property
+    def pending(self):
+        """ Number of delayed frames not yet delivered
+        """
+        return len(self._pending)
+
+    @property
+    def sent(self):
+        """ Number of frames sent on the bus
+        """
+        return self._sent
+
+    @property
+    def delivered(self):
+        """ Number of frames delivered to receivers
+        """
+        return self._delivered
+
+    @property
+    def lost(self):
+        """ Number of frames lost (counted once per receiver)
+        """
+        return self._lost
+
+    def attach(self, transceiver):
+        """ Connect a transceiver to the bus
+        """
+        with self._condition:
+            if transceiver not in self._transceivers:
+                self._transceivers.append(transceiver)
+
+    def detach(self, transceiver):
+        """ Disconnect a transceiver from the bus
+
+        Frames already delayed for it are dropped when due.
+        """
+        with self._condition:
+            if transceiver in self._transceivers:
+                self._transceivers.remove(transceiver)
+                self._lastDue.pop(transceiver, None)
+
+    def transmit(self, sender, cEMI):
+        """ Send a frame to all transceivers but the sender
+
+        @param sender: sending transceiver
+        @type sender: L{LoopbackTransceiver}
+
+        @param cEMI: frame to send
+        @type cEMI: L{CEMILData<pyknyx.stack.cemi.cemiLData>}
+        """
+        immediate = []
+        with self._condition:
+            self._sent += 1
+            now = self.now
+            for receiver in self._transceivers:
+                if receiver is sender:
+                    continue
+                if self._loss and self._random.random() < self._loss:
+                    self._lost += 1
+                    continue
+                delay = self._latency
+                if self._jitter:
+                    delay += self._random.uniform(0, self._jitter)
+                if not delay and not self._deterministic and not self._lastDue.get(receiver, 0) > now:
+                    immediate.append(receiver)
+                    continue
+
+                # Never deliver before a frame sent earlier to the same receiver
+                due = max(now + delay, self._lastDue.get(receiver, now))
+                self._lastDue[receiver] = due
+                heapq.heappush(self._pending, (due, self._seq, receiver, cEMI.copy()))
+                self._seq += 1
+
+            if self._pending and not self._deterministic:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._deliveryLoop, name="Loopback bus")
+                    self._thread.setDaemon(True)
+                    self._thread.start()
+                self._condition.notify()
+
+            self._delivered += len(immediate)
+
+        for receiver in immediate:
+            receiver.receive(cEMI.copy())
+
+    def _popDue(self, until):
+        """ Remove the delayed frames due at the given time
+
+        Must be called with the lock held.
+
+        @return: (receiver, cEMI) tuples, in delivery order
+        @rtype: list
+        """
+        frames = []
+        while self._pending and self._pending[0][0] <= until:
+            due, seq, receiver, cEMI = heapq.heappop(self._pending)
+            if receiver in self._transceivers:
+                frames.append((receiver, cEMI))
+        self._delivered += len(frames)
+
+        return frames
+
+    def _deliveryLoop(self):
+        """ Deliver the delayed frames (real-time mode)
+        """
+        logger.trace("LoopbackBus._deliveryLoop()")
+
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    break
+                delay = self._pending[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                frames = self._popDue(time.time())
+
+            for receiver, cEMI in frames:
+                try:
+                    receiver.receive(cEMI)
+                except Exception:
+                    logger.exception("LoopbackBus._deliveryLoop()")
+
+        logger.trace("LoopbackBus._deliveryLoop(): ended")
+
+    def _checkDeterministic(self):
+        if not self._deterministic:
+            raise LoopbackTransceiverValueError("bus is not in deterministic mode")
+
+    def _processPending(self):
+        """ Process the frames waiting in the ETS queues (deterministic mode)
+
+        @return: number of frames processed
+        @rtype: int
+        """
+        count = 0
+        done = set()
+        for transceiver in list(self._transceivers):
+            ets = transceiver.ets
+            if ets not in done:
+                done.add(ets)
+                count += ets.processPending()
+
+        return count
+
+    def step(self):
+        """ Process the pending frames of all ETS, then deliver the next delayed frame
+
+        The virtual clock is moved to the due time of the delivered frame.
+
+        @return: True if a frame has been processed or delivered
+        @rtype: bool
+
+        raise LoopbackTransceiverValueError:
+        """
+        self._checkDeterministic()
+
+        processed = self._processPending()
+        while self._pending:
+            due, seq, receiver, cEMI = heapq.heappop(self._pending)
+            self._now = max(self._now, due)
+            if receiver in self._transceivers:
+                self._delivered += 1
+                receiver.receive(cEMI)
+                self._processPending()
+                return True
+
+        return processed > 0
+
+    def advance(self, duration):
+        """ Run the simulation for the given duration of virtual time
+
+        @param duration: virtual time to run, in s
+        @type duration: float
+
+        @return: number of frames delivered
+        @rtype: int
+
+        raise LoopbackTransceiverValueError:
+        """
+        self._checkDeterministic()
+
+        until = self._now + duration
+        delivered = self._delivered
+        self._processPending()
+        while self._pending and self._pending[0][0] <= until:
+            self.step()
+        self._now = until
+
+        return self._delivered - delivered
+
+    def run(self, maxFrames=None):
+        """ Run the simulation until no frame is left
+
+        @param maxFrames: max. number of frames to deliver (None for no limit)
+        @type maxFrames: int
+
+        @return: number of frames delivered
+        @rtype: int
+
+        raise LoopbackTransceiverValueError:
+        """
+        self._checkDeterministic()
+
+        delivered = self._delivered
+        while maxFrames is None or self._delivered - delivered < maxFrames:
+            if not self.step():
+                break
+
+        return self._delivered - delivered
+
+    def close(self):
+        """ Stop the delivery thread, and drop the delayed frames
+        """
+        with self._condition:
+            self._running = False
+            del self._pending[:]
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+
+class LoopbackTransceiver(L_DataServiceBroadcast):
+    """ LoopbackTransceiver class
+
+    @ivar _bus: bus the transceiver is connected to
+    @type _bus: L{LoopbackBus}
+    """
+    def __init__(self, ets, bus=None):
+        """
+
+        @param bus: bus to connect to
+        @type bus: L{LoopbackBus}
+
+        raise LoopbackTransceiverValueError:
+        """
+        super(LoopbackTransceiver, self).__init__(ets)
+
+        if bus is None:
+            raise LoopbackTransceiverValueError("no bus given")
+        self._bus = bus
+        bus.attach(self)
+
+    @property
+    def bus(self):
+        return self._bus
+
+    def receive(self, cEMI):
+        """ Called by the bus to hand a frame sent by another transceiver
+        """
+        logger.debug("LoopbackTransceiver.receive(): cEMI=%s" % cEMI)
+        self.dataReq(cEMI)
+
+    def dataInd(self, cEMI):
+        self._bus.transmit(self, cEMI)
+
+    def start(self):
+        """
+        """
+        logger.trace("LoopbackTransceiver.start()")
+
+        self._bus.attach(self)
+
+    def stop(self):
+        """
+        """
+        logger.trace("LoopbackTransceiver.stop()")
+
+        self._bus.detach(self)
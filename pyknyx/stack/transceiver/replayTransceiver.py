@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Runs a Layer2 driver replaying a telegram capture
+
+Implements
+==========
+
+ - B{ReplayTransceiver}
+ - B{ReplayTransceiverValueError}
+
+Documentation
+=============
+
+The ReplayTransceiver reads a capture file (see L{TelegramCaptureReader<pyknyx.services.telegramCapture>}), and
+hands the captured frames to ETS, as if they were received from the bus. This allows to feed devices under test with
+real bus traffic.
+
+The replay starts with ETS (or when L{run()<ReplayTransceiver.run>} is called), and can be limited to a time range
+or to a GAD. Frames are replayed:
+
+ - in real time (speed=1), or N times faster (speed=N): the delays between frames are those of the capture, divided
+   by the speed;
+ - as fast as possible (speed=None); the replay then waits while more than B{maxPending} frames are waiting in the
+   ETS queue, so that the queue does not grow without limit.
+
+At the end of the replay, the transceiver waits for ETS to process the frames left in its queue, and builds a report
+(see L{report<ReplayTransceiver.report>}), which is also logged. Frames sent by the devices during the replay are
+counted, but go nowhere.
+
+Usage
+=====
+
+>>> ets = ETS("1.0.0", transCls=ReplayTransceiver, transParams=dict(path="/var/log/knx.cap", speed=100))
+>>> ...
+>>> ets.start()
+>>> report = ets.transceiver.wait()
+>>> print(ets.transceiver.formatReport())
+
+@license: GPL
+"""
+
+
+import array
+import threading
+import time
+
+from pyknyx.common.exception import PyKNyXValueError
+from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.telegramCapture import TelegramCaptureReader
+from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceBroadcast
+
+REPLAY_MAX_PENDING = 1000  # max. number of frames waiting in the ETS queue, when replaying as fast as possible
+DRAIN_POLL_PERIOD = 0.001
+
+
+class ReplayTransceiverValueError(PyKNyXValueError):
+    """
+    """
+
+
+def _percentile(values, percent):
+    """ Return the given percentile of sorted values
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * percent / 100.))]
+
+
+class ReplayTransceiver(L_DataServiceBroadcast):
+    """ ReplayTransceiver class
+
+    @ivar _path: path of the capture file
+    @type _path: str
+
+    @ivar _speed: replay speed (1 for real time), or None to replay as fast as possible
+    @type _speed: float
+
+    @ivar _start: replay frames captured from this time (s since the epoch)
+    @type _start: float
+
+    @ivar _end: replay frames captured until this time (s since the epoch)
+    @type _end: float
+
+    @ivar _gad: only replay the frames sent to this raw group address
+    @type _gad: int
+
+    @ivar _maxPending: max. number of frames waiting in the ETS queue, when replaying as fast as possible
+    @type _maxPending: int
+
+    @ivar _thread: replay thread, when started with ETS
+    @type _thread: L{Thread<threading>}
+
+    @ivar _stopEvent: set to interrupt the replay
+    @type _stopEvent: L{Event<threading>}
+
+    @ivar _done: set when the replay is over
+    @type _done: L{Event<threading>}
+
+    @ivar _report: report of the last replay
+    @type _report: dict
+
+    @ivar _received: number of frames sent by the devices during the replay
+    @type _received: int
+    """
+    def __init__(self, ets, path=None, speed=1., start=None, end=None, gad=None, maxPending=REPLAY_MAX_PENDING):
+        """
+
+        @param path: path of the capture file
+        @type path: str
+
+        @param speed: replay speed (1 for real time), or None to replay as fast as possible
+        @type speed: float
+
+        @param start: replay frames captured from this time (s since the epoch)
+        @type start: float
+
+        @param end: replay frames captured until this time (s since the epoch)
+        @type end: float
+
+        @param gad: only replay the frames sent to this raw group address
+        @type gad: int
+
+        @param maxPending: max. number of frames waiting in the ETS queue, when replaying as fast as possible (0 for
+                           no limit)
+        @type maxPending: int
+
+        raise ReplayTransceiverValueError:
+        """
+        super(ReplayTransceiver, self).__init__(ets)
+
+        if path is None:
+            raise ReplayTransceiverValueError("no capture file given")
+        if speed is not None and speed <= 0:
+            raise ReplayTransceiverValueError("invalid speed (%r)" % speed)
+
+        self._path = path
+        self._speed = speed
+        self._start = start
+        self._end = end
+        self._gad = gad
+        self._maxPending = maxPending
+
+        self._thread = None
+        self._stopEvent = threading.Event()
+        self._done = threading.Event()
+        self._report = None
+        self._received = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @property
+    def report(self):
+        """ Report of the last replay, or None
+
+        Times are in seconds:
+         - B{frames}: number of frames replayed
+         - B{duration}: replay duration, B{captureDuration}: time range of the replayed frames in the capture
+         - B{speed}: effective speed (captureDuration / duration)
+         - B{throughput}: frames replayed per second
+         - B{lag}, B{lag99}, B{maxLag}: median, 99th percentile and max. delay between the time a frame should have
+           been replayed and the time it was (None when replaying as fast as possible)
+         - B{maxBacklog}: max. number of frames waiting in the ETS queue
+         - B{drain}: time ETS took to process the frames left in its queue at the end of the replay
+         - B{received}: number of frames sent by the devices during the replay
+         - B{interrupted}: True if the replay has been stopped before its end
+        """
+        return self._report
+
+    def formatReport(self):
+        """ Return the report of the last replay, as text
+        """
+        report = self._report
+        if report is None:
+            return "no replay"
+        lines = ["%d frames replayed in %.3f s (%.3f s captured, speed x%.1f)%s" %
+                 (report['frames'], report['duration'], report['captureDuration'], report['speed'],
+                  " (interrupted)" if report['interrupted'] else ""),
+                 "throughput: %.1f frames/s" % report['throughput']]
+        if report['lag'] is not None:
+            lines.append("lag: p50 %.3f ms, p99 %.3f ms, max %.3f ms" %
+                         (report['lag'] * 1e3, report['lag99'] * 1e3, report['maxLag'] * 1e3))
+        lines.append("ETS backlog: max %d frames, drained in %.3f s" % (report['maxBacklog'], report['drain']))
+        lines.append("%d frames sent by the devices" % report['received'])
+
+        return "\n".join(lines)
+
+    def dataInd(self, cEMI):
+        self._received += 1
+
+    def run(self):
+        """ Replay the capture in the calling thread
+
+        ETS must be running, or be processed by some other means, for the replay to end.
+
+        @return: report of the replay
+        @rtype: dict
+        """
+        logger.trace("ReplayTransceiver.run()")
+
+        self._done.clear()
+        self._received = 0
+        speed = self._speed
+        ets = self._ets
+        lags = array.array('d')
+        frames = maxBacklog = 0
+        first = last = None
+        reader = TelegramCaptureReader(self._path)
+        try:
+            startTime = time.time()
+            for record in reader.records(self._start, self._end, self._gad):
+                if self._stopEvent.is_set():
+                    break
+                if first is None:
+                    first = record.timestamp
+                last = record.timestamp
+                if speed is not None:
+                    due = startTime + (record.timestamp - first) / speed
+                    delay = due - time.time()
+                    if delay > 0 and self._stopEvent.wait(delay):
+                        break
+                    lags.append(max(0., time.time() - due))
+                elif self._maxPending:
+                    while ets.pending >= self._maxPending and not self._stopEvent.is_set():
+                        time.sleep(DRAIN_POLL_PERIOD)
+
+                self.dataReq(record.cEMI)
+                frames += 1
+                backlog = ets.pending
+                if backlog > maxBacklog:
+                    maxBacklog = backlog
+
+            endTime = time.time()
+            while ets.pending and ets.running and not self._stopEvent.is_set():
+                time.sleep(DRAIN_POLL_PERIOD)
+            drainTime = time.time()
+        finally:
+            reader.close()
+
+        lags = sorted(lags)
+        duration = max(endTime - startTime, 1e-9)
+        captureDuration = 0. if first is None else last - first
+        self._report = dict(frames=frames, duration=duration, captureDuration=captureDuration,
+                            speed=captureDuration / duration, throughput=frames / duration,
+                            lag=_percentile(lags, 50), lag99=_percentile(lags, 99), maxLag=lags[-1] if lags else None,
+                            maxBacklog=maxBacklog, drain=drainTime - endTime, received=self._received,
+                            interrupted=self._stopEvent.is_set())
+        logger.info("ReplayTransceiver.run(): replay of '%s' done\n%s" % (self._path, self.formatReport()))
+        self._done.set()
+
+        return self._report
+
+    def _replayLoop(self):
+        try:
+            self.run()
+        except Exception:
+            logger.exception("ReplayTransceiver._replayLoop()")
+        finally:
+            self._done.set()
+
+    def wait(self, timeout=None):
+        """ Wait for the end of the replay
+
+        @param timeout: max. time to wait, in s (None to wait forever)
+        @type timeout: float
+
+        @return: report of the replay, or None if it is not over
+        @rtype: dict
+        """
+        if not self._done.wait(timeout):
+            return None
+        return self._report
+
+    def start(self):
+        """
+        """
+        logger.trace("ReplayTransceiver.start()")
+
+        self._stopEvent.clear()
+        self._done.clear()
+        self._thread = threading.Thread(target=self._replayLoop, name="Replay")
+        self._thread.setDaemon(True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        """
+        logger.trace("ReplayTransceiver.stop()")
+
+        self._stopEvent.set()
@@ -45,6 +45,19 @@ The UDPTransceiver uses the local address as returned by socket.gethostbyname(so
 If the hostname is binded to the loopback interface (lo), then, all datas will only be sent/received on this interface.
 You may need to configure this in /etc/hosts.
 
+By default, the receiver works in batch mode: on each wake-up, it drains all datagrams pending in the kernel (up to
+B{recvBatch}) into pre-allocated buffers, validates them, and hands all resulting frames to ETS in a single
+queue operation. The receive buffers are allocated once, and reused on each wake-up, so frames are not decoded in
+place: each cEMI frame (a few bytes) is copied out of its buffer, which is cheaper than allocating a new receive
+buffer per datagram, and a queued frame only holds its own bytes. With recvBatch=0, each datagram is received in its
+own buffer, which the frame wraps (see L{CEMILDataFrame<pyknyx.stack.cemi.cemiLDataFrame>}).
+
+The transmitter builds outgoing datagrams in a single reusable buffer, with KNXnet/IP headers prebuilt per frame
+length. Datagrams dropped by the kernel (when the system reports them) and datagrams too large for the
+buffers are counted, see B{rxDropped} and B{rxOverruns}. Use recvBatch=0 to receive datagrams one at a time.
+
+Frames received and sent, and datagrams ignored, are also counted in L{metrics<pyknyx.services.metrics>}.
+
 Usage
 =====
 
@@ -62,14 +75,26 @@ import socket
 
 from pyknyx.common.exception import PyKNyXValueError
 from pyknyx.services.logger import logging; logger = logging.getLogger(__name__)
+from pyknyx.services.metrics import MetricsRegistry
 from pyknyx.stack.result import Result
 from pyknyx.stack.priority import Priority
 from pyknyx.stack.priorityQueue import PriorityQueue
-from pyknyx.stack.multicastSocket import MulticastSocketReceive, MulticastSocketTransmit
+from pyknyx.stack.multicastSocket import MulticastSocketReceive, MulticastSocketTransmit, RECV_BUFFER_SIZE
 from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceBroadcast
 from pyknyx.stack.knxnetip.knxNetIPHeader import KNXnetIPHeader, KNXnetIPHeaderValueError
 from pyknyx.stack.cemi.cemiLData import CEMILData, CEMIValueError
-from pyknyx.stack.layer2.l_dataService import PRIORITY_DISTRIBUTION
+from pyknyx.stack.layer2.l_dataService import PRIORITY_DISTRIBUTION, QUEUE_BATCH_SIZE
+
+RECV_BATCH_SIZE = 64
+
+_metrics = MetricsRegistry()
+_FRAMES = _metrics.counter("pyknyx_udp_frames_total", "cEMI frames received and sent by the UDP transceivers",
+                           ("direction",))
+_RX, _TX = _FRAMES.labels("rx"), _FRAMES.labels("tx")
+_IGNORED = _metrics.counter("pyknyx_udp_ignored_total", "Datagrams ignored by the UDP transceivers, by reason",
+                            ("reason",))
+_SELF_ECHO, _MALFORMED_HEADER, _MALFORMED_CEMI, _OTHER_SERVICE = \
+    (_IGNORED.labels(reason) for reason in ("self_echo", "malformed_header", "malformed_cemi", "other_service"))
 
 
 class UDPTransceiverValueError(PyKNyXValueError):
@@ -91,8 +116,20 @@ class UDPTransceiver(L_DataServiceBroadcast):
 
     @ivar _transmitter: multicast transmitter loop
     @type _transmitter: L{Thread<threading>}
+
+    @ivar _recvBatch: max. number of datagrams received per wake-up
+    @type _recvBatch: int
+
+    @ivar _buffers: receive buffers (batch mode only)
+    @type _buffers: list of memoryview
+
+    @ivar _txHeaders: prebuilt KNXnet/IP routing indication headers, indexed by cEMI frame length
+    @type _txHeaders: dict of bytes
+
+    @ivar _ownAddr: source address of our own datagrams, looped back by the multicast group
+    @type _ownAddr: tuple
     """
-    def __init__(self, ets, mcastAddr="224.0.23.12", mcastPort=3671):
+    def __init__(self, ets, mcastAddr="224.0.23.12", mcastPort=3671, recvBatch=RECV_BATCH_SIZE, rcvBufSize=None):
         """
 
         @param mcastAddr: multicast address to bind to
@@ -101,6 +138,12 @@ class UDPTransceiver(L_DataServiceBroadcast):
         @param mcastPort: multicast port to bind to
         @type mcastPort: str
 
+        @param recvBatch: max. number of datagrams received per wake-up. Use 0 to receive them one at a time
+        @type recvBatch: int
+
+        @param rcvBufSize: size of the kernel receive buffer (system default if None)
+        @type rcvBufSize: int
+
         raise UDPTransceiverValueError:
         """
         super(UDPTransceiver, self).__init__(ets)
@@ -110,12 +153,21 @@ class UDPTransceiver(L_DataServiceBroadcast):
 
         localAddr = "0.0.0.0"; # socket.gethostbyname(socket.gethostname())
         self._transmitterSock = MulticastSocketTransmit(localAddr, 0, mcastAddr, mcastPort)
-        self._receiverSock = MulticastSocketReceive(localAddr, self._transmitterSock.localPort, mcastAddr, mcastPort)
-        self._queue = PriorityQueue(PRIORITY_DISTRIBUTION)
-
+        self._receiverSock = MulticastSocketReceive(localAddr, self._transmitterSock.localPort, mcastAddr, mcastPort,
+                                                    timeout=0 if recvBatch else 1, rcvBufSize=rcvBufSize)
+        self._queue = PriorityQueue(PRIORITY_DISTRIBUTION, "udp_tx")
+        self._ownAddr = (self._transmitterSock.sourceAddress, self._transmitterSock.localPort)
+
+        self._recvBatch = recvBatch
+        self._txHeaders = {}
+        self._buffers = [memoryview(bytearray(RECV_BUFFER_SIZE)) for i in range(recvBatch)]
+        if recvBatch:
+            receiverLoop = self._batchReceiverLoop
+        else:
+            receiverLoop = self._receiverLoop
 
         # Create transmitter and receiver threads
-        self._receiver = threading.Thread(target=self._receiverLoop, name="UDP receiver")
+        self._receiver = threading.Thread(target=receiverLoop, name="UDP receiver")
         self._receiver.setDaemon(True)
         self._transmitter = threading.Thread(target=self._transmitterLoop, name="UDP transmitter")
         self._transmitter.setDaemon(True)
@@ -136,6 +188,18 @@ class UDPTransceiver(L_DataServiceBroadcast):
     def localPort(self):
         return self._receiverSock.localPort
 
+    @property
+    def rxDropped(self):
+        """ Number of datagrams dropped by the kernel because we did not read them fast enough
+        """
+        return self._receiverSock.dropped
+
+    @property
+    def rxOverruns(self):
+        """ Number of datagrams dropped because they did not fit in the receive buffer
+        """
+        return self._receiverSock.truncated
+
     def _receiverLoop(self):
         """
         """
@@ -145,25 +209,37 @@ class UDPTransceiver(L_DataServiceBroadcast):
             try:
                 inFrame, (fromAddr, fromPort) = self._receiverSock.receive()
                 logger.debug("UDPTransceiver._receiverLoop(): inFrame=%s (%s, %d)" % (repr(inFrame), fromAddr, fromPort))
-                if fromAddr == self._transmitterSock.localAddress and fromPort == self._transmitterSock.localPort:
+                if (fromAddr, fromPort) == self._ownAddr:
+                    if _metrics.enabled:
+                        _SELF_ECHO.inc()
                     continue # we got our own packet
-                inFrame = bytearray(inFrame)
                 try:
                     header = KNXnetIPHeader(inFrame)
                 except KNXnetIPHeaderValueError:
                     logger.exception("UDPTransceiver._receiverLoop()")
+                    if _metrics.enabled:
+                        _MALFORMED_HEADER.inc()
                     continue
                 logger.debug("UDPTransceiver._receiverLoop(): KNXnetIP header=%s" % repr(header))
+                if header.service != KNXnetIPHeader.ROUTING_IND:
+                    logger.debug("UDPTransceiver._receiverLoop(): ignore service %s" % hex(header.service))
+                    if _metrics.enabled:
+                        _OTHER_SERVICE.inc()
+                    continue
 
-                frame = inFrame[KNXnetIPHeader.HEADER_SIZE:]
+                frame = memoryview(inFrame)[KNXnetIPHeader.HEADER_SIZE:]
                 logger.debug("UDPTransceiver._receiverLoop(): frame=%s" % repr(frame))
                 try:
-                    cEMI = CEMILData(frame)
+                    cEMI = CEMILData(frame, wrap=True)
                 except CEMIValueError:
                     logger.exception("UDPTransceiver._receiverLoop()")
+                    if _metrics.enabled:
+                        _MALFORMED_CEMI.inc()
                     continue
                 logger.debug("UDPTransceiver._receiverLoop(): cEMI=%s" % cEMI)
 
+                if _metrics.enabled:
+                    _RX.inc()
                 self.dataReq(cEMI)
 
             except socket.timeout:
@@ -174,6 +250,54 @@ class UDPTransceiver(L_DataServiceBroadcast):
 
         logger.trace("UDPTransceiver._receiverLoop(): ended")
 
+    def _batchReceiverLoop(self):
+        """
+        """
+        logger.trace("UDPTransceiver._batchReceiverLoop()")
+
+        ownAddr = self._ownAddr
+        while self._running:
+            try:
+                batch = self._receiverSock.receiveBatch(self._buffers, timeout=1)
+                cEMIs = []
+                for buffer_, length, fromAddr in batch:
+                    if fromAddr == ownAddr:
+                        if _metrics.enabled:
+                            _SELF_ECHO.inc()
+                        continue # we got our own packet
+                    inFrame = buffer_[:length]
+                    try:
+                        service = KNXnetIPHeader.check(inFrame, length)
+                    except KNXnetIPHeaderValueError:
+                        logger.exception("UDPTransceiver._batchReceiverLoop()")
+                        if _metrics.enabled:
+                            _MALFORMED_HEADER.inc()
+                        continue
+                    if service != KNXnetIPHeader.ROUTING_IND:
+                        logger.debug("UDPTransceiver._batchReceiverLoop(): ignore service %s" % hex(service))
+                        if _metrics.enabled:
+                            _OTHER_SERVICE.inc()
+                        continue
+                    try:
+                        cEMIs.append(CEMILData(inFrame[KNXnetIPHeader.HEADER_SIZE:]))  # copy: buffer is reused
+                    except CEMIValueError:
+                        logger.exception("UDPTransceiver._batchReceiverLoop()")
+                        if _metrics.enabled:
+                            _MALFORMED_CEMI.inc()
+                        continue
+
+                if cEMIs:
+                    logger.debug("UDPTransceiver._batchReceiverLoop(): %d cEMI" % len(cEMIs))
+                    if _metrics.enabled:
+                        _RX.inc(len(cEMIs))
+                    self.dataReqBatch(cEMIs)
+
+            except:
+                if self._running:
+                    logger.exception("UDPTransceiver._batchReceiverLoop()")
+
+        logger.trace("UDPTransceiver._batchReceiverLoop(): ended")
+
     def dataInd(self, cEMI):
         self._queue.add(cEMI, cEMI.priority)
 
@@ -182,24 +306,34 @@ class UDPTransceiver(L_DataServiceBroadcast):
         """
         logger.trace("UDPTransceiver._transmitterLoop()")
 
+        buffer_ = bytearray(RECV_BUFFER_SIZE)
+        view = memoryview(buffer_)
+        headerSize = KNXnetIPHeader.HEADER_SIZE
         while self._running:
-            try:
-                cEMI = self._queue.remove()
+            for cEMI in self._queue.drainUpTo(QUEUE_BATCH_SIZE):
                 if cEMI is None:
                     return
-
-                logger.debug("UDPTransceiver._transmitterLoop(): frame=%s" % repr(cEMI))
-
-                cEMIFrame = cEMI.frame
-                cEMIRawFrame = cEMIFrame.raw
-                header = KNXnetIPHeader(service=KNXnetIPHeader.ROUTING_IND, serviceLength=len(cEMIRawFrame))
-                frame = header.frame + cEMIRawFrame
-                logger.debug("UDPTransceiver._transmitterLoop(): frame= %s" % repr(frame))
-
-                self._transmitterSock.transmit(frame)
-
-            except Exception:
-                logger.exception("UDPTransceiver._transmitterLoop()")
+                try:
+                    logger.debug("UDPTransceiver._transmitterLoop(): frame=%s" % repr(cEMI))
+
+                    cEMIRawFrame = cEMI.frame.raw
+                    length = len(cEMIRawFrame)
+                    try:
+                        header = self._txHeaders[length]
+                    except KeyError:
+                        header = KNXnetIPHeader(service=KNXnetIPHeader.ROUTING_IND, serviceLength=length).frame
+                        header = self._txHeaders[length] = bytes(header)
+                    buffer_[:headerSize] = header
+                    buffer_[headerSize:headerSize+length] = cEMIRawFrame
+                    frame = view[:headerSize+length]
+                    logger.debug("UDPTransceiver._transmitterLoop(): frame= %s" % repr(frame))
+
+                    self._transmitterSock.transmit(frame)
+                    if _metrics.enabled:
+                        _TX.inc()
+
+                except Exception:
+                    logger.exception("UDPTransceiver._transmitterLoop()")
 
         logger.trace("UDPTransceiver._transmitterLoop(): ended")
 
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+""" Python KNX framework
+
+License
+=======
+
+ - B{PyKNyX} (U{https://github.com/knxd/pyknyx}) is Copyright:
+  - © 2016-2017 Matthias Urlichs
+  - PyKNyX is a fork of pKNyX
+   - © 2013-2015 Frédéric Mantegazza
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+or see:
+
+ - U{http://www.gnu.org/licenses/gpl.html}
+
+Module purpose
+==============
+
+Helpers to test devices and stacks, and to benchmark them
+
+Implements
+==========
+
+ - B{RecordingUnicast}
+ - B{RecordingBroadcast}
+ - B{makeCEMI}
+
+Documentation
+=============
+
+B{RecordingUnicast} and B{RecordingBroadcast} are layer 2 services which register in an
+L{ETS<pyknyx.core.ets>} like a device stack does, and keep the frames ETS routes to them in their B{received} list.
+
+L{makeCEMI} builds the L_Data frames fed to ETS, to a L{LoopbackBus<pyknyx.stack.transceiver.loopbackTransceiver>},
+or to a L{TelegramCaptureWriter<pyknyx.services.telegramCapture>}.
+
+Usage
+=====
+
+>>> ets = ETS("1.2.0", addrRange=16, transCls=None)
+>>> device = RecordingUnicast(ets)
+>>> ets.processFrame(RecordingBroadcast(ets), makeCEMI(device.physAddr))
+>>> device.received
+[<CEMILData(...)>]
+
+@license: GPL
+"""
+
+
+from pyknyx.stack.cemi.cemiLData import CEMILData
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.individualAddress import IndividualAddress
+from pyknyx.stack.layer2.l_dataServiceBase import L_DataServiceBroadcast, L_DataServiceUnicast
+
+
+class _RecordingMixin(object):
+    """ Keep the frames received from ETS
+
+    @ivar received: received frames
+    @type received: list of L{CEMILData<pyknyx.stack.cemi.cemiLData>}
+    """
+    def __init__(self, *args, **kwargs):
+        super(_RecordingMixin, self).__init__(*args, **kwargs)
+        self.received = []
+
+    def dataInd(self, cEMI):
+        self.received.append(cEMI)
+
+
+class RecordingUnicast(_RecordingMixin, L_DataServiceUnicast):
+    """ Unicast layer 2 service, recording the frames received from ETS
+    """
+
+
+class RecordingBroadcast(_RecordingMixin, L_DataServiceBroadcast):
+    """ Broadcast layer 2 service, recording the frames received from ETS
+    """
+
+
+def makeCEMI(dest, npdu=b"\x01\x00\x81", src="1.1.1", hopCount=6, mc=CEMILData.MC_LDATA_IND):
+    """ Build an L_Data frame
+
+    @param dest: destination address; a string containing '/' is a group address
+    @type dest: L{GroupAddress<pyknyx.stack.groupAddress>} or L{IndividualAddress<pyknyx.stack.individualAddress>}
+                or str
+
+    @param npdu: NPDU (default: GroupValue_Write of 1, on 6 bits)
+    @type npdu: bytes or bytearray
+
+    @param src: source address
+    @type src: L{IndividualAddress<pyknyx.stack.individualAddress>} or str
+
+    @param hopCount: routing counter
+    @type hopCount: int
+
+    @param mc: message code
+    @type mc: int
+
+    @rtype: L{CEMILData<pyknyx.stack.cemi.cemiLData>}
+    """
+    if not isinstance(dest, (GroupAddress, IndividualAddress)):
+        dest = GroupAddress(dest) if '/' in dest else IndividualAddress(dest)
+    cEMI = CEMILData()
+    cEMI.messageCode = mc
+    cEMI.sourceAddress = IndividualAddress(src)
+    cEMI.destinationAddress = dest
+    cEMI.hopCount = hopCount
+    cEMI.npdu = bytearray(npdu)
+    return cEMI
@@ -93,6 +93,7 @@ setup(name=config.APP_NAME,
       download_url="https://github.com/M-o-a-T/pyknyx",
 
       packages=["pyknyx",
+                "pyknyx.bench",
                 "pyknyx.common",
                 "pyknyx.core",
                 "pyknyx.core.dptXlator",
@@ -111,13 +112,17 @@ setup(name=config.APP_NAME,
                 ],
 
       extras_require={
+        'batch': [
+            'numpy',
+        ],
         'testing': [
             'pytest',
             'pytest-cov',
         ],
       },
       scripts=["pyknyx/scripts/pyknyx-group.py",
-               "pyknyx/scripts/pyknyx-admin.py"],
+               "pyknyx/scripts/pyknyx-admin.py",
+               "pyknyx/scripts/pyknyx-bench.py"],
 
       install_requires=["APScheduler >= 3",
                         "blinker",
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.bench.harness import *
+from pyknyx.bench import harness
+import json
+import time
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class HarnessTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._benchmarks = harness._benchmarks.copy()
+        harness._benchmarks.clear()
+        self.calls = []
+
+        @benchmark("test.count", "count calls")
+        def _count():
+            return lambda: self.calls.append(None)
+
+        @benchmark("test.teardown")
+        def _teardown():
+            return (lambda: None), lambda: self.calls.append("teardown")
+
+    def tearDown(self):
+        harness._benchmarks.clear()
+        harness._benchmarks.update(self._benchmarks)
+
+    def test_getBenchmarks(self):
+        self.assertEqual([bench.name for bench in getBenchmarks()], ["test.count", "test.teardown"])
+        self.assertEqual([bench.name for bench in getBenchmarks(["*.count"])], ["test.count"])
+        self.assertEqual(getBenchmarks(["other.*"]), [])
+
+    def test_measure(self):
+        result = measure(lambda: None, duration=0.02, warmup=0.01)
+        self.assertGreater(result["ops"], 0)
+        self.assertGreater(result["opsPerSec"], 0)
+        self.assertLessEqual(result["p50"], result["p99"])
+        self.assertGreater(result["cpu"], 0)
+
+    def test_measureLatency(self):
+        calls = [0]
+
+        def op():
+            calls[0] += 1
+            if not calls[0] % 20:
+                time.sleep(0.002)
+
+        result = measure(op, duration=0.2, warmup=0.01)
+        self.assertLess(result["p50"], 0.001)  # single operations, not batch means
+        self.assertGreater(result["p99"], 0.001)
+
+    def test_runBenchmarks(self):
+        names = []
+        run = runBenchmarks(duration=0.01, warmup=0.01, callback=lambda result: names.append(result["name"]))
+        self.assertEqual(names, ["test.count", "test.teardown"])
+        self.assertEqual(self.calls[-1], "teardown")
+        self.assertGreaterEqual(self.calls.count(None), run["results"][0]["ops"])
+        run = json.loads(json.dumps(run))
+        self.assertIn("test.count", formatResults(run, baseline=run))
+
+    def test_compareResults(self):
+        baseline = dict(results=[dict(name="a", opsPerSec=100.), dict(name="b", opsPerSec=100.)])
+        run = dict(results=[dict(name="a", opsPerSec=95.), dict(name="b", opsPerSec=50.), dict(name="c", opsPerSec=1.)])
+        self.assertEqual(compareResults(run, baseline), [("b", 0.5)])
+        self.assertEqual(compareResults(run, baseline, threshold=0.01), [("a", 0.95), ("b", 0.5)])
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.bench.soak import *
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class LatencyHistogramTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.histogram = LatencyHistogram()
+
+    def tearDown(self):
+        pass
+
+    def test_percentile(self):
+        self.assertIsNone(self.histogram.percentile(50))
+        for i in range(1, 101):
+            self.histogram.add(i * 1e-3)
+        self.assertEqual(len(self.histogram), 100)
+        self.assertEqual(self.histogram.max, 0.1)
+        self.assertTrue(50e-3 <= self.histogram.percentile(50) <= 50e-3 * (1 + HISTOGRAM_RESOLUTION))
+        self.assertTrue(99e-3 <= self.histogram.percentile(99) <= 0.1)
+        self.assertEqual(self.histogram.percentile(100), 0.1)
+
+    def test_update(self):
+        other = LatencyHistogram()
+        self.histogram.add(1e-3)
+        other.add(0.)
+        other.add(2e-3)
+        self.histogram.update(other)
+        self.assertEqual(len(self.histogram), 3)
+        self.assertEqual(self.histogram.max, 2e-3)
+        self.assertTrue(self.histogram.percentile(1) <= HISTOGRAM_MIN)
+
+
+class SoakTestTestCase(unittest.TestCase):
+
+    def test_constructor(self):
+        with self.assertRaises(SoakTestValueError):
+            SoakTest(devices=0)
+        with self.assertRaises(SoakTestValueError):
+            SoakTest(load="constant")
+
+    def test_run(self):
+        soak = SoakTest(devices=5, rate=200., load="bursty", burst=5, seed=1)
+        report = soak.run(0.5, interval=0.25)
+        summary = report["summary"]
+        self.assertEqual(len(report["samples"]), 2)
+        self.assertGreater(summary["sent"], 0)
+        self.assertEqual(summary["handled"], summary["sent"])
+        self.assertEqual(summary["transmitted"], summary["sent"])
+        self.assertEqual(summary["lost"], 0)
+        self.assertLessEqual(summary["handlerP50"], summary["handlerP99"])
+        self.assertGreater(summary["rssMax"], 0)
+
+        self.assertEqual(checkSLOs(report, handlerP99=10., loss=0.), [])
+        self.assertEqual(len(checkSLOs(report, handlerP99=0., writeP99=0., rss=0)), 3)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.common.lruCache import *
+import threading
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(2)
+
+    def tearDown(self):
+        pass
+
+    def test_constructor(self):
+        with self.assertRaises(LRUCacheValueError):
+            LRUCache(0)
+        self.assertEqual(self.cache.maxSize, 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_eviction(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.cache.put('c', 3)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('a', self.cache)
+        self.assertIn('c', self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_counters(self):
+        self.cache.put('a', 1)
+        self.cache.get('a')
+        self.assertEqual(self.cache.get('b', 0), 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.pop('a'), 1)
+        self.cache.clear()
+        self.assertEqual((self.cache.hits, self.cache.misses, len(self.cache)), (0, 0, 0))
+
+    def test_threads(self):
+        cache = LRUCache(8)
+
+        def run(offset):
+            for i in range(10000):
+                cache.put((i + offset) % 16, i)
+                cache.get((i + offset + 1) % 16)
+
+        threads = [threading.Thread(target=run, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 8)
+        self.assertEqual(cache.hits + cache.misses, 40000)
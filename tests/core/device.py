@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.core.device import *
+from pyknyx.core.datapoint import DP
+from pyknyx.core.groupObject import GO
+from pyknyx.core.functionalBlock import FunctionalBlock
+from pyknyx.core.ets import ETS
+from pyknyx.stack.groupAddress import GroupAddress
 import unittest
 
 # Mute logger
@@ -9,10 +14,30 @@ logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
 
+class TestFunctionalBlock(FunctionalBlock):
+    switch = DP(access="input", dptId="1.001", default="Off")
+    state = DP(access="output", dptId="1.001", default="Off")
+
+    GO_01 = GO(switch, flags="CWU", priority="low")
+    GO_02 = GO(state, flags="CRT", priority="low")
+
+    DESC = "Test FB"
+
+
+class TestDevice(Device):
+    test_fb = FB(TestFunctionalBlock, desc="test fb")
+    FB_02 = dict(cls=TestFunctionalBlock, name="other_fb", desc="other fb")
+
+    LNK_01 = LNK(test_fb.switch, gad="1/1/1")
+    LNK_02 = LNK(fb="other_fb", dp="state", gad="1/1/2")
+
+    DESC = "Test device"
+
+
 class DeviceTestCase(unittest.TestCase):
 
     def setUp(self):
-        pass
+        self.ets = ETS("1.2.0", addrRange=16, transCls=None)
 
     def tearDown(self):
         pass
@@ -20,3 +45,20 @@ class DeviceTestCase(unittest.TestCase):
     def test_constructor(self):
         pass
 
+    def test_schema(self):
+        schema = TestDevice._getSchema()
+        self.assertIs(TestDevice.__dict__["_schema"], schema)
+        self.assertEqual(sorted(key for key, factory in schema.functionalBlocks), ["other_fb", "test_fb"])
+        self.assertEqual(schema.fbNames[TestDevice.test_fb], "test_fb")
+        self.assertEqual(len(schema.links), 2)
+        self.assertEqual(schema.desc, "Test device")
+
+    def test_links(self):
+        device1 = TestDevice(self.ets, "1.2.3")
+        device2 = TestDevice(self.ets, "1.2.4", links=(LNK(TestDevice.test_fb.state, "1/2/1"),))
+        self.assertIsNot(device1.fb["test_fb"], device2.fb["test_fb"])
+        links = dict((str(gad), go) for go, gad in device1.lnk)
+        self.assertIs(links["1/1/1"], device1.fb["test_fb"].go["switch"])
+        self.assertIs(links["1/1/2"], device1.fb["other_fb"].go["state"])
+        self.assertEqual(device2.fb["test_fb"].go["state"].group.gad, GroupAddress("1/2/1"))
+
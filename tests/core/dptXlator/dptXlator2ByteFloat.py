@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.core.dptXlator.dptXlator2ByteFloat import *
+import random
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPTXlator2ByteFloatTestCase(unittest.TestCase):
+class DPTXlator2ByteFloatTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = list(range(0, 0x10000, 5))
 
     def setUp(self):
         self.testTable = (
@@ -59,3 +63,33 @@ class DPTXlator2ByteFloatTestCase(unittest.TestCase):
             self.assertEqual(data_, data, "Conversion failed (converted data for %r is %s, should be %s)" %
                                 (frame, hex(data_), hex(data)))
 
+    def test_decodeTable(self):
+        self.dptXlator.dataToValue(0x0000)
+        table = DPTXlator2ByteFloat._decodeTable
+        self.assertEqual(len(table), 0x10000)
+        DPTXlator2ByteFloat("9.001").dataToValue(0x0000)
+        self.assertIs(DPTXlator2ByteFloat._decodeTable, table)
+        for data in range(0x10000):
+            self.assertEqual(self.dptXlator.dataToValue(data), DPTXlator2ByteFloat._dataToValue(data))
+        self.assertEqual(self.dptXlator.dataToValue(0x7fff), 670760.96)
+
+    def test_valueToDataFrexp(self):
+
+        # Reference implementation, shifting the mantissa until it fits
+        def valueToData(value):
+            sign = 1 if value < 0 else 0
+            exp = 0
+            mant = int(value * 100)
+            while not -2048 <= mant <= 2047:
+                mant = mant >> 1
+                exp += 1
+            return (sign << 15) | (exp << 11) | (int(mant) & 0x07ff)
+
+        rand = random.Random(0)
+        values = [self.dptXlator.dataToValue(data) for data in range(0x10000)]
+        values += [rand.uniform(-671088.64, 670760.96) for i in range(10000)]
+        values += [sign * 2 ** exp / 100. for exp in range(32) for sign in (-1, 1)]
+        values += [sign * 2 ** exp for exp in range(32) for sign in (-1, 1)]
+        for value in values:
+            self.assertEqual(self.dptXlator.valueToData(value), valueToData(value),
+                             "Conversion failed for %r" % value)
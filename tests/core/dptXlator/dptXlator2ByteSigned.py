@@ -3,12 +3,15 @@
 from pyknyx.core.dptXlator.dptXlator2ByteSigned import *
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPT2ByteSignedTestCase(unittest.TestCase):
+class DPT2ByteSignedTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = list(range(0, 0x10000, 5))
 
     def setUp(self):
         self.testTable = (
@@ -58,3 +61,7 @@ class DPT2ByteSignedTestCase(unittest.TestCase):
             self.assertEqual(data_, data, "Conversion failed (converted data for %r is %s, should be %s)" %
                                 (frame, hex(data_), hex(data)))
 
+    def test_valueToDataScaled(self):
+        self.assertEqual(DPTXlator2ByteSigned("8.003").valueToData(-10), 0xffff)
+        self.assertEqual(DPTXlator2ByteSigned("8.010").valueToData(-1.5), 0xff6a)
+        self.assertEqual(DPTXlator2ByteSigned("8.010").dataToValue(0xff6a), -1.5)
@@ -3,12 +3,15 @@
 from pyknyx.core.dptXlator.dptXlator2ByteUnsigned import *
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin, numpy
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPT2ByteUnsignedTestCase(unittest.TestCase):
+class DPT2ByteUnsignedTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = list(range(0, 0x10000, 5))
 
     def setUp(self):
         self.testTable = (
@@ -55,3 +58,19 @@ class DPT2ByteUnsignedTestCase(unittest.TestCase):
             self.assertEqual(data_, data, "Conversion failed (converted data for %r is %s, should be %s)" %
                                 (frame, hex(data_), hex(data)))
 
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_batchFrames(self):
+        frames = self.dptXlator.dataArrayToFrames([0x0000, 0x0102, 0xffff])
+        self.assertEqual(frames.shape, (3, 2))
+        self.assertEqual(frames.tobytes(), b"\x00\x00\x01\x02\xff\xff")
+        self.assertEqual(list(self.dptXlator.framesToDataArray(frames)), [0x0000, 0x0102, 0xffff])
+        self.assertEqual(list(self.dptXlator.framesToDataArray(bytearray(b"\x01\x02"))), [0x0102])
+        self.assertEqual(len(self.dptXlator.framesToValues(b"")), 0)
+        with self.assertRaises(DPTXlatorValueError):
+            self.dptXlator.framesToDataArray(b"\x01\x02\x03")
+        with self.assertRaises(DPTXlatorValueError):
+            self.dptXlator.dataArrayToFrames([0x10000])
+        with self.assertRaises(DPTXlatorValueError):
+            self.dptXlator.valuesToFrames([-1])
+        with self.assertRaises(DPTXlatorValueError):
+            self.dptXlator.valuesToFrames([1.5])
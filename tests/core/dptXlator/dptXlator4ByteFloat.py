@@ -3,12 +3,15 @@
 from pyknyx.core.dptXlator.dptXlator4ByteFloat import *
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin, DATA_TABLE_4BYTE, numpy
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPT4ByteFloatTestCase(unittest.TestCase):
+class DPT4ByteFloatTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = DATA_TABLE_4BYTE
 
     def setUp(self):
         self.testTable = (
@@ -56,3 +59,6 @@ class DPT4ByteFloatTestCase(unittest.TestCase):
             data_ = self.dptXlator.frameToData(frame)
             self.assertEqual(data_, data, "Conversion failed (converted data for %r is %s, should be %s)" %
                                 (frame, hex(data_), hex(data)))
+
+    def assertValuesEqual(self, values, values_, dptId):
+        self.assertTrue((values.view(numpy.uint64) == values_.view(numpy.uint64)).all(), "Conversion failed for %s" % dptId)
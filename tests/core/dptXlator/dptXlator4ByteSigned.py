@@ -3,12 +3,15 @@
 from pyknyx.core.dptXlator.dptXlator4ByteSigned import *
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin, DATA_TABLE_4BYTE
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPT4ByteSignedTestCase(unittest.TestCase):
+class DPT4ByteSignedTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = DATA_TABLE_4BYTE
 
     def setUp(self):
         self.testTable = (
@@ -57,3 +60,9 @@ class DPT4ByteSignedTestCase(unittest.TestCase):
             data_ = self.dptXlator.frameToData(frame)
             self.assertEqual(data_, data, "Conversion failed (converted data for %r is %s, should be %s)" %
                                 (frame, hex(data_), hex(data)))
+
+    def test_valueToDataScaled(self):
+        dptXlator = DPTXlator4ByteSigned("13.xxx")
+        dptXlator.dpt = DPTXlator4ByteSigned.DPT_Value_FlowRate_m3h.id
+        self.assertEqual(dptXlator.valueToData(-1.5), 0xffffc568)
+        self.assertEqual(dptXlator.dataToValue(0xffffc568), -1.5)
@@ -3,12 +3,15 @@
 from pyknyx.core.dptXlator.dptXlator4ByteUnsigned import *
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin, DATA_TABLE_4BYTE
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPT4ByteUnsignedTestCase(unittest.TestCase):
+class DPT4ByteUnsignedTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = DATA_TABLE_4BYTE
 
     def setUp(self):
         self.testTable = (
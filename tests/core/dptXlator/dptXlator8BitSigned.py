@@ -3,12 +3,15 @@
 from pyknyx.core.dptXlator.dptXlator8BitSigned import *
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPT8BitSignedTestCase(unittest.TestCase):
+class DPT8BitSignedTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = list(range(0x100))
 
     def setUp(self):
         self.testTable = (
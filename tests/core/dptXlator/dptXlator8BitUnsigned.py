@@ -3,12 +3,15 @@
 from pyknyx.core.dptXlator.dptXlator8BitUnsigned import *
 import unittest
 
+from dptXlatorBatch import DPTXlatorBatchTestMixin
+
 # Mute logger
 from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
-class DPT8BitUnsignedTestCase(unittest.TestCase):
+class DPT8BitUnsignedTestCase(DPTXlatorBatchTestMixin, unittest.TestCase):
+    dataTable = list(range(0x100))
 
     def setUp(self):
         self.testTable = (
@@ -54,4 +57,3 @@ class DPT8BitUnsignedTestCase(unittest.TestCase):
             data_ = self.dptXlator.frameToData(frame)
             self.assertEqual(data_, data, "Conversion failed (converted data for %r is %s, should be %s)" %
                                 (frame, hex(data_), hex(data)))
-
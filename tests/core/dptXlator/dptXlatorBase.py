@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.core.dptXlator.dptXlatorBase import *
+from pyknyx.core.dptXlator.dpt import DPT
 import unittest
 
 # Mute logger
@@ -23,3 +24,16 @@ class DPTXlatorBaseTestCase(unittest.TestCase):
     def test_constructor(self):
         with self.assertRaises(DPTXlatorValueError):
             DPTXlatorBase("1.001", 0)
+
+    def test_handledDPT(self):
+        class DPTXlatorDummy(DPTXlatorBase):
+            DPT_Generic = DPT("1.xxx", "Generic", (0, 1))
+            DPT_Switch = DPT("1.001", "Switch", ("Off", "On"))
+
+            def __init__(self, dptId):
+                super(DPTXlatorDummy, self).__init__(dptId, 0)
+
+        self.assertEqual(DPTXlatorBase._handledDPT, {})
+        self.assertEqual(DPTXlatorDummy.DPT_Switch.id, DPTID("1.001"))
+        self.assertEqual(DPTXlatorDummy("1.001").handledDPT, [DPTID("1.xxx"), DPTID("1.001")])
+        self.assertIs(DPTXlatorDummy("1.xxx")._handledDPT, DPTXlatorDummy._handledDPT)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+
+from pyknyx.core.dptXlator.dptXlatorBase import DPTXlatorValueError
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DATA_TABLE_4BYTE = [0x00000000, 0x7fffffff, 0x80000000, 0xffffffff] + \
+                   [random.Random(0).randrange(0x100000000) for i in range(2000)]
+
+
+class DPTXlatorBatchTestMixin(object):
+    """ Batch conversions tests, shared by the numeric DPTXlators test cases
+
+    The test case sets self.dptXlator and self.testTable, and dataTable (raw data the batch conversions are compared
+    with the scalar ones on).
+    """
+    dataTable = ()
+
+    def assertValuesEqual(self, values, values_, dptId):
+        self.assertEqual(values.dtype.kind, values_.dtype.kind)
+        self.assertTrue((values == values_).all(), "Conversion failed for %s" % dptId)
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_batch(self):
+        frames = b"".join(frame for value, data, frame in self.testTable)
+        values = self.dptXlator.framesToValues(frames)
+        self.assertEqual(list(values), [value for value, data, frame in self.testTable])
+        self.assertEqual(self.dptXlator.valuesToFrames(values).tobytes(), frames)
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_batchVsScalar(self):
+        for dptId in self.dptXlator.handledDPT:
+            dptXlator = type(self.dptXlator)(dptId)
+            values = dptXlator.dataArrayToValues(numpy.array(self.dataTable, dtype=numpy.int64))
+            values_ = numpy.array([dptXlator.dataToValue(data) for data in self.dataTable])
+            self.assertValuesEqual(values, values_, dptId)
+            low, high = dptXlator.dpt.limits
+            values = values[(values >= low) & (values <= high)]  # data may decode beyond the DPT limits
+            frames = b"".join(bytes(dptXlator.dataToFrame(dptXlator.valueToData(value))) for value in values.tolist())
+            self.assertEqual(dptXlator.valuesToFrames(values).tobytes(), frames, "Conversion failed for %s" % dptId)
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_batchOutOfRange(self):
+        for dptId in self.dptXlator.handledDPT:
+            dptXlator = type(self.dptXlator)(dptId)
+            low, high = dptXlator.dpt.limits
+            for value in (low - max(1, abs(low)), high + max(1, abs(high)), float("nan")):
+                with self.assertRaises(DPTXlatorValueError, msg="%r accepted by %s" % (value, dptId)):
+                    dptXlator.valuesToFrames([value])
+        values = [value for value, data, frame in self.testTable]
+        with self.assertRaises(DPTXlatorValueError):
+            self.dptXlator.valuesToFrames(values + [self.dptXlator.dpt.limits[1] * 2 + 1])
@@ -34,3 +34,25 @@ class DPTXlatorFactoryObjectTestCase(unittest.TestCase):
 
     #def test_constructor(self):
         #print DPTXlatorFactory().handledMainDPTIDs
+
+    def test_handledMainDPTIDs(self):
+        handledMainDPTIDs = DPTXlatorFactory().handledMainDPTIDs
+        self.assertEqual(handledMainDPTIDs, sorted(handledMainDPTIDs))
+        self.assertIn(DPTID("1.xxx"), handledMainDPTIDs)
+
+    def test_create(self):
+        factory = DPTXlatorFactory()
+        dptXlator = factory.create("1.001")
+        self.assertIsInstance(dptXlator, DPTXlatorBoolean)
+        self.assertEqual(dptXlator.dpt, DPTXlatorBoolean.DPT_Switch)
+        self.assertIs(factory.create("1.001"), dptXlator)
+        self.assertIs(factory.create(DPTID("1.001")), dptXlator)
+        self.assertIsNot(factory.create("1.002"), dptXlator)
+
+        private = factory.create("1.001", shared=False)
+        self.assertIsNot(private, dptXlator)
+        private.dpt = "1.002"
+        self.assertEqual(dptXlator.dpt, DPTXlatorBoolean.DPT_Switch)
+
+        with self.assertRaises(DPTXlatorValueError):
+            factory.create("1.999")
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.core.ets import *
+from pyknyx.stack.stack import Stack
+from pyknyx.stack.groupValueCache import GroupValueCache
+from pyknyx.services.telegramCapture import TelegramCaptureWriter, TelegramCaptureReader
+from pyknyx.services.metrics import MetricsRegistry
+from pyknyx.tools.testing import RecordingUnicast, RecordingBroadcast, makeCEMI
+import os
+import shutil
+import tempfile
 import unittest
 
 # Mute logger
@@ -12,7 +20,7 @@ logging.getLogger("pyknyx").setLevel(logging.ERROR)
 class ETSTestCase(unittest.TestCase):
 
     def setUp(self):
-        pass
+        self.ets = ETS("1.2.0", addrRange=16, transCls=None)
 
     def tearDown(self):
         pass
@@ -20,3 +28,133 @@ class ETSTestCase(unittest.TestCase):
     def test_constructor(self):
         pass
 
+    def test_groupRoutes(self):
+        stack1 = Stack(self.ets, "1.2.3")
+        stack2 = Stack(self.ets, "1.2.4")
+        stack1.agds.subscribe("1/1/1", object())
+        stack2.agds.subscribe("1/1/2", object())
+        groupRoutes, groupAll, individualRoutes, others = self.ets._getRoutes()
+        self.assertEqual(groupRoutes[GroupAddress("1/1/1").raw], [stack1._lds])
+        self.assertEqual(groupRoutes[GroupAddress("1/1/2").raw], [stack2._lds])
+        self.assertEqual(individualRoutes[IndividualAddress("1.2.4").raw], stack2._lds)
+
+        # Monitor subscribes to all group addresses
+        stack2.agds.subscribe("0/0/0", object())
+        groupRoutes, groupAll, individualRoutes, others = self.ets._getRoutes()
+        self.assertNotIn(GroupAddress("1/1/2").raw, groupRoutes)
+        self.assertEqual(groupAll, (stack2._lds,))
+
+    def test_processFrame(self):
+        source = RecordingBroadcast(self.ets)
+        other = RecordingBroadcast(self.ets)
+        unicast1 = RecordingUnicast(self.ets, "1.2.5")
+        unicast2 = RecordingUnicast(self.ets, "1.2.6")
+
+        # Broadcast transceivers receive all group frames, with a decremented hop count
+        self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1")))
+        self.assertEqual(len(source.received), 0)
+        self.assertEqual(len(other.received), 1)
+        self.assertEqual(other.received[0].hopCount, 5)
+        self.assertEqual(len(unicast1.received), 1)
+        self.assertEqual(unicast1.received[0].hopCount, 6)
+
+        # Individual frames only go to the addressed device
+        self.ets.processFrame(source, makeCEMI(IndividualAddress("1.2.6")))
+        self.assertEqual(len(unicast1.received), 1)
+        self.assertEqual(len(unicast2.received), 2)
+        self.assertEqual(len(other.received), 1)
+
+        # Unknown individual address: forced to broadcast transceivers
+        self.ets.processFrame(source, makeCEMI(IndividualAddress("1.2.7")))
+        self.assertEqual(len(other.received), 2)
+
+        # Hop count exhausted
+        self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1"), hopCount=0))
+        self.assertEqual(len(other.received), 2)
+
+    def test_groupValueCache(self):
+        self.ets = ETS("1.2.0", addrRange=16, transCls=None, groupValueCache=GroupValueCache())
+        source = RecordingBroadcast(self.ets)
+        other = RecordingBroadcast(self.ets)
+        unicast = RecordingUnicast(self.ets, "1.2.5")
+        read = b'\x01\x00\x00'
+
+        # Unknown value: the read is forwarded
+        self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1"), npdu=read))
+        self.assertEqual(len(other.received), 1)
+        self.assertEqual(len(unicast.received), 1)
+
+        # Known value: the read is answered from the cache, and the response routed instead of the read
+        self.ets.processFrame(other, makeCEMI(GroupAddress("1/1/1"), npdu=b'\x02\x00\x80\x12', src="1.1.7"))
+        self.assertEqual(len(source.received), 1)
+        self.ets.processFrame(unicast, makeCEMI(GroupAddress("1/1/1"), npdu=read, src="1.2.5"))
+        self.assertEqual(len(unicast.received), 3)
+        self.assertEqual(len(source.received), 2)
+        self.assertEqual(len(other.received), 2)
+        for l2 in (unicast, source, other):
+            response = l2.received[-1]
+            self.assertEqual(response.npdu, bytearray(b'\x02\x00\x40\x12'))
+            self.assertEqual(response.sourceAddress, IndividualAddress("1.1.7"))
+            self.assertEqual(response.destinationAddress, GroupAddress("1/1/1"))
+        self.assertEqual((self.ets.groupValueCache.hits, self.ets.groupValueCache.misses), (1, 1))
+
+        # A broadcast requester gets the response; other broadcast transceivers get it with a decremented hop count
+        self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1"), npdu=read))
+        self.assertEqual(source.received[-1].hopCount, 6)
+        self.assertEqual(other.received[-1].hopCount, 5)
+        self.assertEqual(unicast.received[-1].hopCount, 6)
+
+    def test_processImage(self):
+        source = RecordingBroadcast(self.ets)
+        self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1"), npdu=b'\x02\x00\x80\x12'))
+        self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/2"), npdu=b'\x01\x00\x00'))
+        image = self.ets.processImage
+        self.assertEqual(image.gads, [GroupAddress("1/1/1").raw])
+        self.assertEqual(image.payload(GroupAddress("1/1/1").raw).tobytes(), b'\x12')
+        self.assertEqual(image.source(GroupAddress("1/1/1").raw), IndividualAddress("1.1.1").raw)
+
+    def test_capture(self):
+        tmpDir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpDir, "test.cap")
+            capture = TelegramCaptureWriter(path)
+            self.ets = ETS("1.2.0", addrRange=16, transCls=None, capture=capture)
+            source = RecordingBroadcast(self.ets)
+            self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1")))
+            self.ets.processFrame(source, makeCEMI(IndividualAddress("1.2.6")))
+            capture.close()
+            with TelegramCaptureReader(path) as reader:
+                self.assertEqual([record.dest for record in reader],
+                                 [GroupAddress("1/1/1").raw, IndividualAddress("1.2.6").raw])
+        finally:
+            shutil.rmtree(tmpDir)
+
+    def test_captureFailure(self):
+        class FailingCapture(object):
+            def write(self, cEMI):
+                raise IOError("No space left on device")
+
+        self.ets = ETS("1.2.0", addrRange=16, transCls=None, capture=FailingCapture())
+        source = RecordingBroadcast(self.ets)
+        dest = RecordingBroadcast(self.ets)
+        cEMI = makeCEMI(GroupAddress("1/1/1"))
+        self.ets.processFrame(source, cEMI)
+        self.assertIsNone(self.ets.capture)
+        self.ets.processFrame(source, cEMI)
+        self.assertEqual(len(dest.received), 2)
+
+    def test_metrics(self):
+        registry = MetricsRegistry()
+        registry.enable()
+        registry.reset()
+        try:
+            source = RecordingBroadcast(self.ets)
+            RecordingBroadcast(self.ets)
+            self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1")))
+            self.ets.processFrame(source, makeCEMI(GroupAddress("1/1/1"), hopCount=0))
+            frames = registry.get("pyknyx_ets_frames_total")
+            self.assertEqual(frames.labels("forwarded").value, 1)
+            self.assertEqual(frames.labels("hopcount_exhausted").value, 1)
+            self.assertIn('pyknyx_queue_depth{queue="ets",level="0"} 0', registry.exposition())
+        finally:
+            registry.disable()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.core.functionalBlock import *
+from pyknyx.core.datapoint import DP
 import unittest
 
 # Mute logger
@@ -42,3 +43,30 @@ class FunctionalBlockTestCase(unittest.TestCase):
     def test_constructor(self):
         pass
 
+    def test_schema(self):
+        schema = FunctionalBlockTestCase.TestFunctionalBlock._getSchema()
+        self.assertIs(FunctionalBlockTestCase.TestFunctionalBlock.__dict__["_schema"], schema)
+        self.assertEqual(sorted(key for key, factory in schema.datapoints),
+                         ["dp_01", "dp_02", "dp_03", "dp_04", "dp_05", "dp_06"])
+        self.assertEqual(sorted(key for key, factory, dpName in schema.groupObjects),
+                         ["dp_01", "dp_02", "dp_03", "dp_04", "dp_05", "dp_06"])
+        self.assertEqual(schema.desc, "Dummy description")
+
+        # Instances share the factories, but not the Datapoints/GroupObjects
+        self.assertIs(self.fb1.go["dp_01"]._factory, self.fb2.go["dp_01"]._factory)
+        self.assertIsNot(self.fb1.dp["dp_01"], self.fb2.dp["dp_01"])
+        self.assertIs(self.fb1.go["dp_05"].datapoint, self.fb1.dp["dp_05"])
+        self.assertEqual(schema.goNames[self.fb1.dp["dp_05"]._factory], "dp_05")
+
+    def test_schemaInheritance(self):
+
+        class AutoGOFunctionalBlock(FunctionalBlockTestCase.TestFunctionalBlock):
+            dp_07 = DP(access="input", dptId="1.001", default="Off", flags="CWU")
+            DESC = "Auto GO"
+
+        fb = AutoGOFunctionalBlock(dev="foo", name="test3")
+        self.assertIn("dp_07", fb.dp)
+        self.assertEqual(sorted(fb.go), ["dp_01", "dp_02", "dp_03", "dp_04", "dp_05", "dp_06", "dp_07"])
+        self.assertIs(fb.go["dp_07"].datapoint, fb.dp["dp_07"])
+        self.assertIsNot(AutoGOFunctionalBlock._getSchema(), FunctionalBlockTestCase.TestFunctionalBlock._getSchema())
+
@@ -4,8 +4,9 @@ import os
 from pprint import pprint
 
 from pyknyx.api import Device, FunctionalBlock, notify, DP, GO, FB, LNK
-from pyknyx.core.ets import ETS
+from pyknyx.core.ets import ETS, AsyncETS
 from pyknyx.tools.deviceRunner import *
+import threading
 import unittest
 
 # Mute logger
@@ -90,17 +91,37 @@ class SwitchTestCase(unittest.TestCase):
         self.ets2 = self.ets
         self._do_test()
 
+    def test_asyncSwitch(self):
+        self.ets = AsyncETS("1.2.0", transCls=None)
+        self.ets2 = self.ets
+        self._do_test()
+
+    def test_asyncMulticast(self):
+        self.ets = AsyncETS("1.2.0", transParams=dict(mcastAddr="224.55.36.72", mcastPort=os.getpid()))
+        self.ets2 = ETS("1.2.0", transParams=dict(mcastAddr="224.55.36.72", mcastPort=os.getpid()))
+        self._do_test()
+
+    def _start(self, ets):
+        if isinstance(ets, AsyncETS):
+            thread = threading.Thread(target=ets.run)
+            thread.setDaemon(True)
+            thread.start()
+        else:
+            ets.start()
+
     def _do_test(self):
         self.actor = Actor(self.ets, "1.2.3",
             links=(LNK(Actor.actor_fb.change, "1/1/1"),
                    LNK(Actor.actor_fb.status, "1/2/1")))
         self.toggle = Toggle(self.ets2, "1.2.4")
-        self.ets.start()
+        self._start(self.ets)
         if self.ets2 is not self.ets:
-            self.ets2.start()
+            self._start(self.ets2)
         afb = self.actor.fb["actor_fb"]
         assert afb._current is None
         time.sleep(0.5)
+        assert self.toggle.stack.initReader.wait(2)
+        assert not self.toggle.stack.initReader.givenUp
         logger.debug("Set TRUE")
         self.toggle.set(True)
         time.sleep(0.5)
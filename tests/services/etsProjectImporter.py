@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.services.etsProjectImporter import *
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+MASTER = """<?xml version="1.0" encoding="utf-8"?>
+<KNX xmlns="http://knx.org/xml/project/12">
+  <MasterData>
+    <DatapointTypes>
+      <DatapointType Id="DPT-1" Number="1" Name="1.xxx" SizeInBit="1">
+        <DatapointSubtypes>
+          <DatapointSubtype Id="DPST-1-1" Number="1" Name="DPT_Switch" />
+          <DatapointSubtype Id="DPST-1-8" Number="8" Name="DPT_UpDown" />
+        </DatapointSubtypes>
+      </DatapointType>
+      <DatapointType Id="DPT-9" Number="9" Name="9.xxx" SizeInBit="16">
+        <DatapointSubtypes>
+          <DatapointSubtype Id="DPST-9-1" Number="1" Name="DPT_Value_Temp" />
+        </DatapointSubtypes>
+      </DatapointType>
+      <DatapointType Id="DPT-14" Number="14" Name="14.xxx" SizeInBit="32">
+        <DatapointSubtypes>
+          <DatapointSubtype Id="DPST-14-56" Number="56" Name="DPT_Value_Power" />
+        </DatapointSubtypes>
+      </DatapointType>
+    </DatapointTypes>
+  </MasterData>
+</KNX>
+"""
+
+PROJECT = """<?xml version="1.0" encoding="utf-8"?>
+<KNX xmlns="http://knx.org/xml/project/12">
+  <Project Id="P-0001">
+    <ProjectInformation Name="Test" ProjectId="0" />
+  </Project>
+</KNX>
+"""
+
+INSTALLATION = """<?xml version="1.0" encoding="utf-8"?>
+<KNX xmlns="http://knx.org/xml/project/12">
+  <Project Id="P-0001">
+    <Installations>
+      <Installation Name="">
+        <Topology>
+          <Area Id="P-0001-0_A-1" Address="1">
+            <Line Id="P-0001-0_L-1" Address="1">
+              <DeviceInstance Id="P-0001-0_DI-1" Address="1">
+                <ComObjectInstanceRefs>
+                  <ComObjectInstanceRef RefId="M-0083_A-0001-11-2222_O-1_R-1">
+                    <Connectors>
+                      <Send GroupAddressRefId="P-0001-0_GA-2" />
+                    </Connectors>
+                  </ComObjectInstanceRef>
+                  <ComObjectInstanceRef RefId="M-0083_A-0001-11-2222_O-2_R-2">
+                    <Connectors>
+                      <Receive GroupAddressRefId="P-0001-0_GA-2" />
+                    </Connectors>
+                  </ComObjectInstanceRef>
+                  <ComObjectInstanceRef RefId="M-0083_A-0001-11-2222_O-4_R-4">
+                    <Connectors>
+                      <Send GroupAddressRefId="P-0001-0_GA-3" />
+                    </Connectors>
+                  </ComObjectInstanceRef>
+                  <ComObjectInstanceRef RefId="M-0083_A-0001-11-2222_O-3_R-3" DatapointType="DPST-9-1">
+                    <Connectors>
+                      <Send GroupAddressRefId="P-0001-0_GA-4" />
+                    </Connectors>
+                  </ComObjectInstanceRef>
+                </ComObjectInstanceRefs>
+              </DeviceInstance>
+            </Line>
+          </Area>
+        </Topology>
+        <GroupAddresses>
+          <GroupRanges>
+            <GroupRange Id="P-0001-0_GR-1" Name="Lights" RangeStart="2048" RangeEnd="4095">
+              <GroupRange Id="P-0001-0_GR-2" Name="Commands" RangeStart="2304" RangeEnd="2559">
+                <GroupAddress Id="P-0001-0_GA-1" Address="2305" Name="light_cmd" DatapointType="DPST-1-1" />
+                <GroupAddress Id="P-0001-0_GA-2" Address="2306" Name="blind_cmd" Description="Blinds" />
+              </GroupRange>
+            </GroupRange>
+            <GroupRange Id="P-0001-0_GR-3" Name="Power" RangeStart="4096" RangeEnd="6143">
+              <GroupAddress Id="P-0001-0_GA-3" Address="4097" Name="power" />
+              <GroupAddress Id="P-0001-0_GA-4" Address="4098" Name="temp" />
+              <GroupAddress Id="P-0001-0_GA-5" Address="4099" Name="unused" />
+            </GroupRange>
+          </GroupRanges>
+        </GroupAddresses>
+      </Installation>
+    </Installations>
+  </Project>
+</KNX>
+"""
+
+MANUFACTURER = """<?xml version="1.0" encoding="utf-8"?>
+<KNX xmlns="http://knx.org/xml/project/12">
+  <ManufacturerData>
+    <Manufacturer RefId="M-0083">
+      <ApplicationPrograms>
+        <ApplicationProgram Id="M-0083_A-0001-11-2222">
+          <Static>
+            <ComObjectTable>
+              <ComObject Id="M-0083_A-0001-11-2222_O-1" ObjectSize="1 Bit" DatapointType="DPST-1-1" />
+              <ComObject Id="M-0083_A-0001-11-2222_O-2" ObjectSize="1 Bit" />
+              <ComObject Id="M-0083_A-0001-11-2222_O-4" ObjectSize="4 Bytes" />
+            </ComObjectTable>
+            <ComObjectRefs>
+              <ComObjectRef Id="M-0083_A-0001-11-2222_O-1_R-1" RefId="M-0083_A-0001-11-2222_O-1" />
+              <ComObjectRef Id="M-0083_A-0001-11-2222_O-2_R-2" RefId="M-0083_A-0001-11-2222_O-2" DatapointType="DPST-1-8" />
+              <ComObjectRef Id="M-0083_A-0001-11-2222_O-4_R-4" RefId="M-0083_A-0001-11-2222_O-4" />
+            </ComObjectRefs>
+          </Static>
+        </ApplicationProgram>
+      </ApplicationPrograms>
+    </Manufacturer>
+  </ManufacturerData>
+</KNX>
+"""
+
+EXPORT = """<?xml version="1.0" encoding="utf-8"?>
+<GroupAddress-Export xmlns="http://knx.org/xml/ga-export/01">
+  <GroupRange Name="Lights" RangeStart="2048" RangeEnd="4095">
+    <GroupAddress Name="light_cmd" Address="1/1/1" DPTs="DPST-1-1" />
+    <GroupAddress Name="light_state" Address="1/2/1" DPTs="DPT-1" />
+    <GroupAddress Name="light_delay" Address="1/3/1" />
+  </GroupRange>
+</GroupAddress-Export>
+"""
+
+
+class EtsProjectImporterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "test.knxproj")
+        with zipfile.ZipFile(self.path, "w") as archive:
+            archive.writestr("knx_master.xml", MASTER)
+            archive.writestr("P-0001.signature", "")
+            archive.writestr("P-0001/Project.xml", PROJECT)
+            archive.writestr("P-0001/0.xml", INSTALLATION)
+            archive.writestr("M-0083/M-0083_A-0001-11-2222.xml", MANUFACTURER)
+        self.cacheDir = os.path.join(self.dir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_groupAddresses(self):
+        groupAddresses = EtsProjectImporter(self.path).groupAddresses
+        self.assertEqual([ga.address for ga in groupAddresses], ["1/1/1", "1/1/2", "2/0/1", "2/0/2", "2/0/3"])
+        self.assertEqual(groupAddresses[0].path, ("Lights", "Commands", "light_cmd"))
+        self.assertEqual(groupAddresses[1].desc, "Blinds")
+        self.assertEqual([ga.dptId and str(ga.dptId) for ga in groupAddresses],
+                         ["1.001",  # GAD Datapoint Type
+                          "1.008",  # receiving object first, from its ComObjectRef
+                          "14.056",  # object size
+                          "9.001",  # ComObjectInstanceRef Datapoint Type
+                          None])
+
+    def test_sameRefId(self):
+        """ Objects with the same RefId on a GAD, with and without Datapoint Type (central functions)
+        """
+        central = """
+                  <ComObjectInstanceRef RefId="M-0083_A-0001-11-2222_O-2_R-2">
+                    <Connectors>
+                      <Receive GroupAddressRefId="P-0001-0_GA-5" />
+                    </Connectors>
+                  </ComObjectInstanceRef>
+                  <ComObjectInstanceRef RefId="M-0083_A-0001-11-2222_O-2_R-2" DatapointType="DPST-1-1">
+                    <Connectors>
+                      <Receive GroupAddressRefId="P-0001-0_GA-5" />
+                    </Connectors>
+                  </ComObjectInstanceRef>
+                  <ComObjectInstanceRef RefId="M-0083_A-0001-11-2222_O-2_R-2">
+                    <Connectors>
+                      <Receive GroupAddressRefId="P-0001-0_GA-5" />
+                    </Connectors>
+                  </ComObjectInstanceRef>
+                </ComObjectInstanceRefs>"""
+        with zipfile.ZipFile(self.path, "w") as archive:
+            archive.writestr("knx_master.xml", MASTER)
+            archive.writestr("P-0001.signature", "")
+            archive.writestr("P-0001/Project.xml", PROJECT)
+            archive.writestr("P-0001/0.xml", INSTALLATION.replace("\n                </ComObjectInstanceRefs>", central))
+            archive.writestr("M-0083/M-0083_A-0001-11-2222.xml", MANUFACTURER)
+        groupAddresses = EtsProjectImporter(self.path).groupAddresses
+        self.assertEqual(str(groupAddresses[4].dptId), "1.008")  # first object, in document order
+
+    def test_export(self):
+        path = os.path.join(self.dir, "export.xml")
+        with open(path, "w") as export:
+            export.write(EXPORT)
+        table = EtsProjectImporter(path).table
+        self.assertEqual(table, {"1/1/1": {'name': "light_cmd", 'desc': None, 'dptId': "1.001"},
+                                 "1/2/1": {'name': "light_state", 'desc': None, 'dptId': "1.xxx"},
+                                 "1/3/1": {'name': "light_delay", 'desc': None, 'dptId': None}})
+
+    def test_cache(self):
+        table = EtsProjectImporter(self.path, self.cacheDir).table
+        self.assertEqual(len(os.listdir(self.cacheDir)), 1)
+        self.assertEqual(table["2/0/1"], {'name': "power", 'desc': None, 'dptId': "14.056"})
+
+        # Loaded from the cache: the project is not imported
+        importer = EtsProjectImporter(self.path, self.cacheDir)
+        self.assertEqual(importer.table, table)
+        self.assertIsNone(importer._groupAddresses)
+
+        # Same content, new modification time
+        stat = os.stat(self.path)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime + 10))
+        importer = EtsProjectImporter(self.path, self.cacheDir)
+        self.assertEqual(importer.table, table)
+        self.assertIsNone(importer._groupAddresses)
+
+        # Modified project
+        with zipfile.ZipFile(self.path, "a") as archive:
+            archive.writestr("P-0001/extra.xml", "")
+        importer = EtsProjectImporter(self.path, self.cacheDir)
+        self.assertEqual(importer.table, table)
+        self.assertIsNotNone(importer._groupAddresses)
+
+    def test_invalidProject(self):
+        with zipfile.ZipFile(self.path, "a") as archive:
+            archive.writestr("P-0002.signature", "")
+        with self.assertRaises(EtsProjectImporterValueError):
+            EtsProjectImporter(self.path).groupAddresses
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.services.groupAddressTableMapper import *
+import os
+import shutil
+import tempfile
 import unittest
 
 # Mute logger
@@ -58,3 +61,43 @@ class GroupAddressTableMapperTestCase(unittest.TestCase):
         self.assertEqual(self._gadTableMapper.getDesc("light_cmd"), "Commands (1/1/-)")
         self.assertEqual(self._gadTableMapper.getDesc("light_cmd_test"), "Test (1/1/1)")
 
+
+    def test_updateWith(self):
+        self._gadTableMapper.updateWith({"1/1/2": dict(name="light_cmd_test2", desc="Test (1/1/2)")})
+        self.assertEqual(self._gadTableMapper.getGad("light_cmd_test2"), "1/1/2")
+
+        # Nickname already used by another GAD: rejected
+        self._gadTableMapper.updateWith({"1/1/3": dict(name="light_cmd_test", desc="Test (1/1/3)")})
+        self.assertNotIn("1/1/3", self._gadTableMapper.table)
+        self.assertEqual(self._gadTableMapper.getGad("light_cmd_test"), "1/1/1")
+
+        # Renamed GAD: its old nickname is released
+        self._gadTableMapper.updateWith({"1/1/1": dict(name="light_cmd_renamed", desc="Test (1/1/1)"),
+                                         "1/1/3": dict(name="light_cmd_test", desc="Test (1/1/3)")})
+        self.assertEqual(self._gadTableMapper.getGad("light_cmd_renamed"), "1/1/1")
+        self.assertEqual(self._gadTableMapper.getGad("light_cmd_test"), "1/1/3")
+        self.assertEqual(self._gadTableMapper.getNickname("1/1/1"), "light_cmd_renamed")
+
+    def test_getDptXlator(self):
+        self._gadTableMapper.updateWith({"1/1/2": dict(name="light_cmd_test2", desc="Test (1/1/2)", dptId="1.001")})
+        dptXlator = self._gadTableMapper.getDptXlator("1/1/2")
+        self.assertEqual(str(dptXlator.dpt.id), "1.001")
+        self.assertIs(self._gadTableMapper.getDptXlator("light_cmd_test2"), dptXlator)
+        self._gadTableMapper.updateWith({"1/1/2": dict(name="light_cmd_test2", desc="Test (1/1/2)", dptId="5.001")})
+        self.assertEqual(str(self._gadTableMapper.getDptXlator("1/1/2").dpt.id), "5.001")
+        with self.assertRaises(GroupAddressTableMapperValueError):
+            self._gadTableMapper.getDptXlator("1/1/9")
+
+    def test_loadXML(self):
+        tmpDir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpDir, "export.xml")
+            with open(path, "w") as export:
+                export.write('<GroupAddress-Export xmlns="http://knx.org/xml/ga-export/01">'
+                             '<GroupRange Name="Lights"><GroupAddress Name="light_cmd" Address="1/1/1" DPTs="DPST-1-1" />'
+                             '</GroupRange></GroupAddress-Export>')
+            self._gadTableMapper.loadXML(path, os.path.join(tmpDir, "cache"))
+            self.assertEqual(self._gadTableMapper.getGad("light_cmd"), "1/1/1")
+            self.assertEqual(str(self._gadTableMapper.getDptXlator("1/1/1").dpt.id), "1.001")
+        finally:
+            shutil.rmtree(tmpDir)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.services.metrics import *
+import os
+import shutil
+import tempfile
+import unittest
+
+from six.moves.urllib.request import urlopen
+from six.moves.urllib.error import HTTPError
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def tearDown(self):
+        self.registry.disable()
+
+    def test_counter(self):
+        counter = Counter("test_total", "Test counter", ("kind",))
+        with self.assertRaises(MetricsValueError):
+            counter.labels()
+        with self.assertRaises(MetricsValueError):
+            Counter("test_total", "Test counter", ("kind",)).inc()
+        counter.labels("a").inc()
+        counter.labels("a").inc(2)
+        counter.labels('b"\n').inc()
+        self.assertIs(counter.labels("a"), counter.labels("a"))
+        self.assertEqual(counter.labels("a").value, 3)
+        self.assertEqual(counter.samples(), [("test_total", (("kind", "a"),), 3),
+                                             ("test_total", (("kind", 'b"\n'),), 1)])
+        counter.reset()
+        self.assertEqual(counter.labels("a").value, 0)
+
+    def test_histogram(self):
+        with self.assertRaises(MetricsValueError):
+            Histogram("test_seconds", "Test histogram", buckets=(1, 0.5))
+        histogram = Histogram("test_seconds", "Test histogram", buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.samples(), [("test_seconds_bucket", (("le", "0.1"),), 2),
+                                               ("test_seconds_bucket", (("le", "1.0"),), 3),
+                                               ("test_seconds_bucket", (("le", "+Inf"),), 4),
+                                               ("test_seconds_sum", (), 2.65),
+                                               ("test_seconds_count", (), 4)])
+
+    def test_gauge(self):
+        gauge = Gauge("test_depth", "Test gauge", lambda: [(("q", 0), 3)], ("queue", "level"))
+        self.assertEqual(gauge.samples(), [("test_depth", (("queue", "q"), ("level", "0")), 3)])
+        failing = Gauge("test_failing", "Test gauge", lambda: 1 / 0)
+        self.assertEqual(failing.samples(), [])
+
+    def test_registry(self):
+        counter = self.registry.counter("pyknyx_test_total", "Test counter")
+        self.assertIs(self.registry.counter("pyknyx_test_total", "Test counter"), counter)
+        self.assertIs(self.registry.get("pyknyx_test_total"), counter)
+        with self.assertRaises(MetricsValueError):
+            self.registry.histogram("pyknyx_test_total", "Test counter")
+        with self.assertRaises(MetricsValueError):
+            self.registry.get("pyknyx_unknown")
+
+        self.registry.reset()
+        counter.inc(5)
+        exposition = self.registry.exposition()
+        self.assertIn("# HELP pyknyx_test_total Test counter\n# TYPE pyknyx_test_total counter\n"
+                      "pyknyx_test_total 5\n", exposition)
+        self.assertIn("# TYPE pyknyx_ets_frames_total counter\n", exposition)
+
+    def test_server(self):
+        server = MetricsServer(port=0)
+        self.registry.disable()
+        server.start()
+        try:
+            self.assertTrue(self.registry.enabled)
+            response = urlopen("http://127.0.0.1:%d/metrics" % server.port, timeout=5)
+            self.assertEqual(response.headers["Content-Type"], METRICS_CONTENT_TYPE)
+            self.assertIn(b"# TYPE pyknyx_ets_frames_total counter", response.read())
+            with self.assertRaises(HTTPError):
+                urlopen("http://127.0.0.1:%d/other" % server.port, timeout=5)
+        finally:
+            server.stop()
+
+    def test_dumper(self):
+        with self.assertRaises(MetricsValueError):
+            MetricsDumper("metrics.prom", period=0)
+        tmpDir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpDir, "metrics.prom")
+            dumper = MetricsDumper(path, period=0.01)
+            dumper.start()
+            dumper.stop()
+            with open(path) as f:
+                self.assertEqual(f.read(), self.registry.exposition())
+            self.assertEqual(os.listdir(tmpDir), ["metrics.prom"])
+        finally:
+            shutil.rmtree(tmpDir)
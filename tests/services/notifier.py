@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.services.notifier import *
+from pyknyx.services.notifierExecutor import NotifierExecutor, ThreadNotifierExecutor
+from pyknyx.core.datapoint import DP
+from pyknyx.core.functionalBlock import FunctionalBlock
+import asyncio
+import inspect
+import threading
 import unittest
 
 # Mute logger
@@ -20,3 +26,85 @@ class NotifierTestCase(unittest.TestCase):
     def test_constructor(self):
         pass
 
+    def test_doRegisterJobs(self):
+        notifier = Notifier()
+        result = []
+
+        class NotifierFB(FunctionalBlock):
+            state = DP(access="input", dptId="1.001", default="Off")
+
+            DESC = "Notifier FB"
+
+            @notifier.datapoint(dp="state", condition="change")
+            def stateChanged(self, event):
+                result.append((self.name, event['oldValue'], event['newValue']))
+
+        fb1 = NotifierFB(dev=None, name="fb1")
+        fb2 = NotifierFB(dev=None, name="fb2")
+        notifier.doRegisterJobs(fb1)
+        notifier.doRegisterJobs(fb2)
+        self.assertEqual(notifier._getClassJobs(NotifierFB), (("stateChanged", "datapoint", ("state", "change")),))
+
+        fb2.dp["state"].value = "On"
+        self.assertEqual(result, [("fb2", "Off", "On")])
+        fb2.dp["state"].value = "On"
+        self.assertEqual(len(result), 1)
+
+    def test_eventPerMethod(self):
+        notifier = Notifier()
+        events = []
+
+        class NotifierFB(FunctionalBlock):
+            state = DP(access="input", dptId="1.001", default="Off")
+
+            DESC = "Notifier FB"
+
+            @notifier.datapoint(dp="state", condition="change")
+            def stateChanged1(self, event):
+                events.append(dict(event))
+                event['newValue'] = "Off"
+
+            @notifier.datapoint(dp="state", condition="change")
+            def stateChanged2(self, event):
+                events.append(dict(event))
+                event['newValue'] = "Off"
+
+        fb = NotifierFB(dev=None, name="fb")
+        notifier.doRegisterJobs(fb)
+        fb.dp["state"].value = "On"
+        self.assertEqual([event['newValue'] for event in events], ["On", "On"])
+
+    def test_setExecutor(self):
+        notifier = Notifier()
+        executor = ThreadNotifierExecutor(workers=1)
+        try:
+            notifier.setExecutor(executor)
+            self.assertIs(notifier.executor, executor)
+            event = threading.Event()
+            notifier.executor.submit("fb", notifier._call, lambda e: event.set(), None)
+            self.assertTrue(event.wait(1))
+        finally:
+            notifier.setExecutor(NotifierExecutor())
+
+
+    def test_coroutine(self):
+        notifier = Notifier()
+        coros = []
+
+        def job(event):
+            coros.append(asyncio.sleep(0, event))
+            return coros[-1]
+
+        loop = asyncio.new_event_loop()
+        try:
+            notifier.setLoop(loop)
+            notifier._execute(job, "event")
+            loop.run_until_complete(asyncio.sleep(0.05))
+            self.assertEqual(inspect.getcoroutinestate(coros[0]), inspect.CORO_CLOSED)
+        finally:
+            notifier.setLoop(None)
+            loop.close()
+
+        # No event loop: the coroutine is dropped
+        notifier._execute(job, "event")
+        self.assertEqual(inspect.getcoroutinestate(coros[1]), inspect.CORO_CLOSED)
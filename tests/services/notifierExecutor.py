@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.services.notifierExecutor import *
+import asyncio
+import threading
+import time
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class NotifierExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = NotifierExecutor()
+        self.result = []
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _fail(self):
+        raise RuntimeError("job failure")
+
+    def test_inline(self):
+        self.executor.submit("fb", self.result.append, 1)
+        self.executor.submit("fb", self._fail)
+        self.assertEqual(self.result, [1])
+        metrics = self.executor.metrics
+        self.assertEqual((metrics['pending'], metrics['peakPending']), (0, 1))
+        self.assertEqual((metrics['executed'], metrics['failed']), (2, 1))
+
+
+class ThreadNotifierExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadNotifierExecutor(workers=2)
+        self.result = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _job(self, key, value, delay=0.):
+        time.sleep(delay)
+        with self.lock:
+            self.result.append((key, value))
+
+    def _wait(self, count):
+        end = time.time() + 2.
+        while self.executor.metrics['executed'] < count and time.time() < end:
+            time.sleep(0.01)
+
+    def test_constructor(self):
+        with self.assertRaises(NotifierExecutorValueError):
+            ThreadNotifierExecutor(workers=0)
+        with self.assertRaises(NotifierExecutorValueError):
+            ThreadNotifierExecutor(maxPending=-1)
+
+    def test_ordering(self):
+        for i in range(5):
+            self.executor.submit("slow", self._job, "slow", i, 0.02)
+            self.executor.submit("fast", self._job, "fast", i)
+        self._wait(10)
+
+        # Jobs of a key keep their order; a slow key does not delay the others
+        self.assertEqual([v for k, v in self.result if k == "slow"], list(range(5)))
+        self.assertEqual([v for k, v in self.result if k == "fast"], list(range(5)))
+        self.assertEqual([k for k, v in self.result[:5]], ["fast"] * 5)
+        metrics = self.executor.metrics
+        self.assertEqual((metrics['pending'], metrics['executed'], metrics['failed']), (0, 10, 0))
+        self.assertGreaterEqual(metrics['maxLatency'], 0.02)
+
+    def test_maxPending(self):
+        self.executor = ThreadNotifierExecutor(workers=1, maxPending=2)
+        for i in range(6):
+            self.executor.submit(i, self._job, i, i, 0.01)
+        self._wait(6)
+        self.assertEqual(len(self.result), 6)
+        self.assertLessEqual(self.executor.metrics['peakPending'], 2)
+
+    def test_maxPendingReentrant(self):
+        self.executor = ThreadNotifierExecutor(workers=2, maxPending=2)
+
+        def job(key, value):
+            time.sleep(0.01)
+            self.executor.submit(key + 10, self._job, key + 10, value)
+
+        for i in range(2):
+            self.executor.submit(i, job, i, i)
+        self._wait(4)
+        self.executor.shutdown(wait=False)  # don't join deadlocked workers
+        self.assertEqual(sorted(self.result), [(10, 0), (11, 1)])
+
+
+class AsyncNotifierExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.executor = AsyncNotifierExecutor(workers=2)
+        self.executor.setLoop(self.loop)
+        self.executor.start()
+        self.result = []
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.loop.close()
+
+    def _job(self, value):
+        self.result.append(value)
+
+    def _coroutine(self, value):
+        self.result.append("start %d" % value)
+        coro = asyncio.sleep(0.02)
+
+        def done(future):
+            self.result.append("end %d" % value)
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(done)
+        return future
+
+    def test_ordering(self):
+        self.executor.submit("fb", self._coroutine, 1)
+        self.executor.submit("fb", self._job, 2)
+        self.loop.run_until_complete(asyncio.sleep(0.2))
+
+        # The coroutine completes before the next job of the key starts
+        self.assertEqual(self.result, ["start 1", "end 1", 2])
+        metrics = self.executor.metrics
+        self.assertEqual((metrics['pending'], metrics['executed'], metrics['failed']), (0, 2, 0))
+
+    def test_noLoop(self):
+        self.executor.setLoop(None)
+        self.executor.submit("fb", self._job, 1)
+        self.assertEqual(self.result, [1])
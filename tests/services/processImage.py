@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.services.processImage import *
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class ProcessImageTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.image = ProcessImage()
+
+    def tearDown(self):
+        pass
+
+    def test_constructor(self):
+        self.assertEqual(len(self.image), 0)
+        self.assertNotIn(0x0901, self.image)
+        self.assertIsNone(self.image.payload(0x0901))
+        self.assertEqual(self.image.count(0x0901), 0)
+
+    def test_update(self):
+        self.image.update(0x0901, bytearray(b"\x00\x81"), 0x1101, 10.)
+        self.image.update(0x0902, bytearray(b"\x00\x80\x0c\x1a"), 0x1102, 11.)
+        self.image.update(0x0901, bytearray(b"\x00\x40"), 0x1103, 12.)
+        self.assertEqual(len(self.image), 2)
+        self.assertEqual(self.image.gads, [0x0901, 0x0902])
+        self.assertEqual(self.image.payload(0x0901).tobytes(), b"\x00")
+        self.assertEqual(self.image.payload(0x0902).tobytes(), b"\x0c\x1a")
+        self.assertEqual(self.image.count(0x0901), 2)
+        self.assertEqual(self.image.timestamp(0x0901), 12.)
+        self.assertEqual(self.image.source(0x0901), 0x1103)
+
+        buffer_ = bytearray(PAYLOAD_SIZE)
+        self.assertEqual(self.image.readInto(0x0902, buffer_), 2)
+        self.assertEqual(buffer_[:2], b"\x0c\x1a")
+        self.assertEqual(self.image.readInto(0x0903, buffer_), 0)
+
+        # Payload too long
+        self.image.update(0x0903, bytearray(PAYLOAD_SIZE + 3), 0x1101, 10.)
+        self.assertNotIn(0x0903, self.image)
+
+    def test_snapshot(self):
+        self.image.update(0x0901, bytearray(b"\x00\x81"), 0x1101, 10.)
+        snapshot = self.image.snapshot()
+        self.assertTrue(snapshot.frozen)
+        with self.assertRaises(ProcessImageValueError):
+            snapshot.update(0x0901, bytearray(b"\x00\x80"), 0x1101, 11.)
+
+        self.image.update(0x0901, bytearray(b"\x00\x80"), 0x1101, 11.)
+        self.image.update(0x0a01, bytearray(b"\x00\x80"), 0x1101, 11.)
+        self.assertEqual(snapshot.payload(0x0901).tobytes(), b"\x01")
+        self.assertEqual(self.image.diff(snapshot), [0x0901, 0x0a01])
+        self.assertEqual(self.image.snapshot().diff(self.image), [])
+
+    def test_countWrap(self):
+        self.assertEqual(self.image._counts.itemsize, 4)
+        self.image.update(0x0901, bytearray(b"\x00\x81"), 0x1101, 10.)
+        self.image._counts[0x0901] = COUNT_MAX
+        self.image.update(0x0901, bytearray(b"\x00\x80"), 0x1101, 11.)
+        self.assertEqual(self.image.count(0x0901), 1)
+        self.assertEqual(self.image.gads, [0x0901])
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.services.scheduler import *
+from pyknyx.services.timerWheel import TimerWheelScheduler
 import time
 import unittest
 from pyknyx.services.logger import _setup; _setup()
@@ -33,3 +34,40 @@ class SchedulerTestCase(unittest.TestCase):
         time.sleep(1)
         assert some_obj.runs
 
+
+    def test_setType(self):
+        apscheduler = self.sched.apscheduler
+        self.sched.setType(BackgroundScheduler)
+        self.assertIs(self.sched.apscheduler, apscheduler)
+        self.sched.setType(BackgroundScheduler, job_defaults=dict(coalesce=True))
+        self.assertIsNot(self.sched.apscheduler, apscheduler)
+        self.assertFalse(self.sched.apscheduler.running)
+        self.sched.setType(BackgroundScheduler)
+
+    def test_setTypeKeepsJobs(self):
+        some_obj = SomeClass()
+        self.sched.doRegisterJobs(some_obj)
+        try:
+            self.sched.setType(TimerWheelScheduler)
+            self.assertEqual(len(self.sched.apscheduler.get_jobs()), 1)
+            self.sched.setType(BackgroundScheduler)
+            jobs = self.sched.apscheduler.get_jobs()
+            self.assertEqual(len(jobs), 1)
+            self.assertEqual(jobs[0].func, some_obj.again)
+            self.sched.start()
+            time.sleep(0.7)
+            self.assertTrue(some_obj.runs)
+        finally:
+            self.sched.setType(BackgroundScheduler)
+
+    def test_timerWheel(self):
+        try:
+            self.sched.setType(TimerWheelScheduler)
+            self.assertIs(self.sched.type, TimerWheelScheduler)
+            some_obj = SomeClass()
+            self.sched.doRegisterJobs(some_obj)
+            self.sched.start()
+            time.sleep(0.7)
+            self.assertEqual(some_obj.runs, 2)
+        finally:
+            self.sched.setType(BackgroundScheduler)
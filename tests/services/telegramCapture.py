@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.services.telegramCapture import *
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.individualAddress import IndividualAddress
+from pyknyx.stack.layer7.apci import APCI
+from pyknyx.stack.priority import Priority
+from pyknyx.tools.testing import makeCEMI
+import os
+import shutil
+import tempfile
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+T0 = 1500000000.
+
+
+class TelegramCaptureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "test.cap")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _fill(self, writer, count=100, first=0):
+        for i in range(first, first + count):
+            writer.write(makeCEMI(GroupAddress("1/1/%d" % (i % 7))), T0 + i)
+
+    def test_constructor(self):
+        with self.assertRaises(TelegramCaptureValueError):
+            TelegramCaptureWriter(self.path, indexRecords=0)
+        with open(self.path, "wb") as f:
+            f.write(b"not a capture file")
+        with self.assertRaises(TelegramCaptureValueError):
+            TelegramCaptureReader(self.path)
+
+    def test_record(self):
+        writer = TelegramCaptureWriter(self.path)
+        cEMI = makeCEMI(GroupAddress("1/2/3"), hopCount=5)
+        cEMI.priority = Priority('urgent')
+        writer.write(cEMI, T0)
+        writer.write(makeCEMI(IndividualAddress("1.1.2"), npdu=b'\x00\x80'), T0 - 1)
+        writer.close()
+        with TelegramCaptureReader(self.path) as reader:
+            records = list(reader)
+        self.assertEqual(len(records), 2)
+        record = records[0]
+        self.assertEqual(record.timestamp, T0)
+        self.assertEqual((record.src, record.dest), (IndividualAddress("1.1.1").raw, GroupAddress("1/2/3").raw))
+        self.assertTrue(record.isGroup)
+        self.assertEqual((record.priority, record.hopCount), (cEMI.priority.level, 5))
+        self.assertEqual(record.apci, APCI.GROUPVALUE_WRITE)
+        self.assertEqual(record.cEMI.frame.raw, cEMI.frame.raw)
+
+        # Timestamps never decrease
+        self.assertEqual(records[1].timestamp, T0)
+        self.assertFalse(records[1].isGroup)
+        self.assertEqual(records[1].apci, NO_APCI)
+
+    def test_seek(self):
+        writer = TelegramCaptureWriter(self.path, indexRecords=10)
+        self._fill(writer)
+        writer.close()
+        with TelegramCaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), 100)
+            self.assertEqual(len(reader._chunks), 10)
+            self.assertEqual([r.timestamp - T0 for r in reader.records(start=T0 + 42.5, end=T0 + 45)], [43, 44, 45])
+            gad = GroupAddress("1/1/3").raw
+            self.assertEqual([r.timestamp - T0 for r in reader.records(gad=gad)], list(range(3, 100, 7)))
+            self.assertEqual([r.timestamp - T0 for r in reader.records(start=T0 + 50, gad=gad)],
+                             list(range(52, 100, 7)))
+            self.assertEqual(list(reader.records(gad=GroupAddress("2/2/2").raw)), [])
+            self.assertEqual(list(reader.records(start=T0 + 200)), [])
+
+    def test_indexPeriod(self):
+        writer = TelegramCaptureWriter(self.path, indexPeriod=10)
+        self._fill(writer, 35)
+        writer.close()
+        with TelegramCaptureReader(self.path) as reader:
+            self.assertEqual([chunk.count for chunk in reader._chunks], [11, 11, 11, 2])
+
+    def test_recover(self):
+        writer = TelegramCaptureWriter(self.path, indexRecords=10)
+        self._fill(writer, 25)
+        writer._file.flush()  # not closed: the last 5 records are not indexed
+        size = os.path.getsize(self.path)
+        with open(self.path, "ab") as f:
+            f.write(b'\x01\x00')  # truncated record
+        with TelegramCaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), 25)
+            self.assertEqual(reader.end, size)
+            self.assertIsNone(reader._chunks[-1].gadTable)
+            self.assertEqual(len(list(reader.records(gad=GroupAddress("1/1/1").raw))), 4)
+
+        # Append to the recovered file
+        writer = TelegramCaptureWriter(self.path, indexRecords=10)
+        self._fill(writer, 10, first=25)
+        writer.close()
+        with TelegramCaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), 35)
+            self.assertTrue(all(chunk.gadTable is not None for chunk in reader._chunks))
+            self.assertEqual([r.timestamp - T0 for r in reader], list(range(35)))
+            self.assertEqual([r.timestamp - T0 for r in reader.records(gad=GroupAddress("1/1/1").raw)],
+                             list(range(1, 35, 7)))
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.services.timerWheel import *
+import asyncio
+import random
+import time
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class TimerWheelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = TimerWheel(bits=4, levels=2)  # 16 slots per level, overflow after 256 ticks
+
+    def tearDown(self):
+        pass
+
+    def test_pop(self):
+        ticks = [random.randint(0, 2000) for i in range(500)]
+        for tick in ticks:
+            self.wheel.add(tick, tick)
+        self.assertEqual(len(self.wheel), 500)
+        result = []
+        while len(self.wheel):
+            tick = self.wheel.nextTick()
+            items = self.wheel.pop(tick)
+            self.assertTrue(all(item == tick for item in items))
+            result.extend(items)
+        self.assertEqual(result, sorted(ticks))
+        self.assertIsNone(self.wheel.nextTick())
+
+    def test_late(self):
+        self.wheel.pop(100)
+        self.wheel.add(50, "late")
+        self.assertEqual(self.wheel.nextTick(), 101)
+        self.assertEqual(self.wheel.pop(101), ["late"])
+
+    def test_nextTick(self):
+        self.wheel.add(40, "a")
+        self.assertEqual(self.wheel.nextTick(), 0)  # pending cascade
+        self.assertEqual(self.wheel.pop(0), [])
+        self.assertEqual(self.wheel.nextTick(), 16)  # next cascade
+        self.assertEqual(self.wheel.pop(39), [])
+        self.assertEqual(self.wheel.nextTick(), 40)
+
+
+class TimerWheelSchedulerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = TimerWheelScheduler(resolution=0.01)
+        self.runs = []
+        self.events = []
+        self.scheduler.add_listener(self.events.append)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def _job(self, value=None):
+        self.runs.append(value)
+
+    def test_constructor(self):
+        with self.assertRaises(TimerWheelValueError):
+            TimerWheelScheduler(resolution=0)
+        with self.assertRaises(TimerWheelValueError):
+            self.scheduler.add_job(self._job, trigger="foo")
+
+    def test_thread(self):
+        self.scheduler.add_job(self._job, "interval", seconds=0.05, args=(1,))
+        job = self.scheduler.add_job(self._job, "interval", seconds=0.05, args=(2,))
+        self.scheduler.add_job(self._job, args=(3,))
+        self.scheduler.start()
+        time.sleep(0.12)
+        job.remove()
+        time.sleep(0.1)
+        self.scheduler.shutdown()
+        self.assertEqual(self.runs.count(3), 1)
+        self.assertEqual(self.runs.count(2), 2)
+        self.assertGreaterEqual(self.runs.count(1), 3)
+        self.assertEqual(len(self.scheduler.get_jobs()), 1)
+
+    def test_error(self):
+        self.scheduler.add_job(lambda: 1 / 0)
+        self.scheduler.start()
+        time.sleep(0.05)
+        self.assertEqual([event.code for event in self.events], [EVENT_JOB_SUBMITTED, EVENT_JOB_ERROR])
+        self.assertIsInstance(self.events[1].exception, ZeroDivisionError)
+
+    def test_coalesce(self):
+        job1 = self.scheduler.add_job(self._job, "interval", seconds=1, args=(1,), misfire_grace_time=None)
+        job2 = self.scheduler.add_job(self._job, "interval", seconds=1, args=(2,), coalesce=False,
+                                      misfire_grace_time=None)
+        job3 = self.scheduler.add_job(self._job, "interval", seconds=1, args=(3,), coalesce=False,
+                                      misfire_grace_time=2.5)
+        now = job1.nextRunTime + 9.5
+        with self.scheduler._condition:
+            runs = self.scheduler._collect(now)
+        self.assertEqual([job for job, runTime in runs].count(job1), 1)
+        self.assertEqual([job for job, runTime in runs].count(job2), 10)
+        self.assertEqual([job for job, runTime in runs].count(job3), 3)
+        self.assertEqual(len(self.events), 1)  # job3 missed runs
+        self.assertGreater(job1.nextRunTime, now)
+
+    def test_jitter(self):
+        job = self.scheduler.add_job(self._job, "interval", seconds=1, jitter=0.5)
+        nominal = job._nominal
+        self.assertTrue(nominal <= job.nextRunTime <= nominal + 0.5)
+        with self.scheduler._condition:
+            self.scheduler._collect(job.nextRunTime + self.scheduler.resolution)
+        self.assertEqual(job._nominal, nominal + 1)  # jitter does not accumulate
+
+    def test_loop(self):
+        loop = asyncio.new_event_loop()
+        try:
+            self.scheduler.loop = loop
+
+            def coroutineJob():
+                self.runs.append("start")
+                return asyncio.sleep(0.12)
+
+            self.scheduler.add_job(coroutineJob, "interval", seconds=0.05)
+            self.scheduler.add_job(self._job, "cron", second="*", args=("cron",))
+            self.scheduler.start()
+            with self.assertRaises(TimerWheelValueError):
+                self.scheduler.loop = None
+            loop.run_until_complete(asyncio.sleep(0.3))
+            self.scheduler.shutdown()
+            loop.run_until_complete(asyncio.sleep(0.15))
+
+            # The coroutine job can't be run while its previous run is still running
+            self.assertIn(self.runs.count("start"), (2, 3))
+            self.assertTrue(any(event.code == EVENT_JOB_MAX_INSTANCES for event in self.events))
+        finally:
+            loop.close()
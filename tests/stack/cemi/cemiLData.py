@@ -29,3 +29,24 @@ class CEMILDataTestCase(unittest.TestCase):
             import pdb;pdb.set_trace()
             CEMILData(b")\x03\xff\xff\xff\xbc\xd0\x11\x04\x10\x04\x03\x00\x80\x19,")  # ext frame
 
+
+    def test_wrap(self):
+        buffer_ = bytearray(b"\x06\x10\x05\x30\x00\x11)\x00\xbc\xd0\x11\x0e\x19\x02\x01\x00\x80")
+        cEMI = CEMILData(memoryview(buffer_)[6:], wrap=True)
+        self.assertEqual(cEMI.destinationAddress, GroupAddress("3/1/2"))
+        self.assertIs(cEMI.sourceAddress, cEMI.sourceAddress)
+        self.assertIs(cEMI.priority, cEMI.priority)
+        cEMI_b = cEMI.copy()
+        cEMI_b.hopCount = 4
+        self.assertEqual(cEMI.hopCount, 5)
+        self.assertEqual(cEMI_b.hopCount, 4)
+        self.assertEqual(buffer_[9], 0xd0)
+
+    def test_cache(self):
+        self.assertEqual(self.frame2.priority.level, Priority('low').level)
+        self.frame2.priority = Priority('urgent')
+        self.assertEqual(self.frame2.priority.level, Priority('urgent').level)
+        self.frame2.sourceAddress = IndividualAddress("1.2.3")
+        self.assertEqual(self.frame2.sourceAddress, IndividualAddress("1.2.3"))
+        self.frame2.addressType = CEMILData.AT_INDIVIDUAL_ADDRESS
+        self.assertEqual(self.frame2.destinationAddress, IndividualAddress("1.9.2"))
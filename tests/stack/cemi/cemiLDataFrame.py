@@ -121,3 +121,35 @@ class CEMILDataFrameTestCase(unittest.TestCase):
         self.assertEqual(self.frame1.npdu, b'\xff\xff')
         self.assertEqual(self.frame2.npdu, b'\x01\x00\x80')
         self.assertEqual(self.frame3.npdu, b'\x03\x00\x80\x19,')
+
+    def test_wrap(self):
+        buffer_ = bytearray(b")\x00\xbc\xd0\x11\x0e\x19\x02\x01\x00\x80")
+        frame = CEMILDataFrame(memoryview(buffer_), wrap=True)
+        self.assertEqual(frame.sa, 4366)
+        self.assertEqual(frame.da, 6402)
+        self.assertEqual(frame.npdu, b'\x01\x00\x80')
+        self.assertIsInstance(frame.npdu, bytearray)
+        buffer_[0] = 0x11
+        self.assertIs(frame._raw.obj, buffer_)  # not copied
+        frame.ctrl2 = 0xc0
+        self.assertEqual(buffer_[3], 0xd0)  # copied on write
+        self.assertEqual(frame.raw, b"\x11\x00\xbc\xc0\x11\x0e\x19\x02\x01\x00\x80")
+
+        frame = CEMILDataFrame(memoryview(buffer_), wrap=True)
+        raw = frame.raw
+        self.assertIs(frame.raw, raw)  # copied once
+        raw[1] = 0x01
+        self.assertEqual(buffer_[1], 0x00)  # raw never writes to the buffer
+
+    def test_copy(self):
+        frame = self.frame2.copy()
+        self.assertIs(frame._raw, self.frame2._raw)  # not copied
+        frame.raw[0] = 0x11
+        self.assertEqual(frame.mc, 0x29)
+        self.assertEqual(self.frame2.raw[0], 0x29)  # raw is detached from the shared buffer
+        frame.sa = 1000
+        self.assertEqual(self.frame2.sa, 4366)
+        self.assertEqual(frame.sa, 1000)
+        self.frame2.da = 2000
+        self.assertEqual(frame.da, 6402)
+        self.assertEqual(self.frame2.raw, b")\x00\xbc\xd0\x11\x0e\x07\xd0\x01\x00\x80")
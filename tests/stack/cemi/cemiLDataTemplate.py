@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.stack.cemi.cemiLDataTemplate import *
+from pyknyx.core.ets import ETS
+from pyknyx.stack.stack import Stack
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.priority import Priority
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class CEMILDataTemplateTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = []
+        self.ets = ETS("1.2.0", transCls=None)
+        self.ets.putFrame = lambda l2, cEMI: self.frames.append(cEMI)
+        self.stack = Stack(self.ets, "1.2.3")
+        self.gad = GroupAddress("1/2/3")
+
+    def tearDown(self):
+        pass
+
+    def test_send(self):
+        agds = self.stack.agds
+        for data, size in ((b"\x01", 0), (b"\xff", 1), (b"\x0c\x1a", 2), (b"\x01\x02\x03\x04", 4)):
+            agds.groupValueWriteReq(self.gad, Priority('normal'), data, size)
+            template = agds.groupValueWriteTemplate(self.gad, Priority('normal'), size)
+            self.assertEqual(template.size, size)
+            template.send(data)
+            reference, cEMI = self.frames[-2:]
+            self.assertEqual(bytes(cEMI.frame.raw), bytes(reference.frame.raw))
+
+    def test_make(self):
+        template = self.stack.agds.groupValueWriteTemplate(self.gad, Priority('low'), 0)
+        cEMI1 = template.make(b"\x01")
+        cEMI2 = template.make(b"\x00")
+        self.assertEqual(cEMI1.npdu[-1] & 0x3f, 1)
+        self.assertEqual(cEMI2.npdu[-1] & 0x3f, 0)
+        with self.assertRaises(CEMIValueError):
+            template.make(b"\x40")
+        template = self.stack.agds.groupValueWriteTemplate(self.gad, Priority('low'), 2)
+        with self.assertRaises(CEMIValueError):
+            template.make(b"\x01")
+
+    def test_makeOwnsBuffer(self):
+        template = self.stack.agds.groupValueWriteTemplate(self.gad, Priority('low'), 2)
+        cEMI1 = template.make(b"\x0c\x1a")
+        cEMI2 = template.make(b"\x0c\x1b")
+        self.assertFalse(cEMI1.frame._shared)
+        raw = cEMI1.frame._raw
+        self.assertIs(cEMI1.frame.raw, raw)
+        self.assertIsNot(cEMI2.frame.raw, raw)
+        self.assertEqual(bytes(raw[-2:]), b"\x0c\x1a")
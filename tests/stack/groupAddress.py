@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.stack.groupAddress import *
+import copy
+import pickle
 import unittest
 
 # Mute logger
@@ -89,10 +91,10 @@ class GroupAddressTestCase(unittest.TestCase):
         self.assertEqual(self.ad4.address, "1/0/2")
 
     def test_address2(self):
-        self.ad1.outFormatLevel = 2
-        self.ad2.outFormatLevel = 2
-        self.ad3.outFormatLevel = 2
-        self.ad4.outFormatLevel = 2
+        self.ad1 = self.ad1.withFormatLevel(2)
+        self.ad2 = self.ad2.withFormatLevel(2)
+        self.ad3 = GroupAddress((1, 2, 3), outFormatLevel=2)
+        self.ad4 = GroupAddress((1, 2), outFormatLevel=2)
         self.assertEqual(self.ad1.address, "1/515")
         self.assertEqual(self.ad2.address, "1/2")
         self.assertEqual(self.ad3.address, "1/515")
@@ -111,10 +113,10 @@ class GroupAddressTestCase(unittest.TestCase):
         self.assertEqual(self.ad4.middle, 0)
 
     def test_middle2(self):
-        self.ad1.outFormatLevel = 2
-        self.ad2.outFormatLevel = 2
-        self.ad3.outFormatLevel = 2
-        self.ad4.outFormatLevel = 2
+        self.ad1 = self.ad1.withFormatLevel(2)
+        self.ad2 = self.ad2.withFormatLevel(2)
+        self.ad3 = GroupAddress((1, 2, 3), outFormatLevel=2)
+        self.ad4 = GroupAddress((1, 2), outFormatLevel=2)
         self.assertEqual(self.ad1.middle, 0)
         self.assertEqual(self.ad2.middle, 0)
         self.assertEqual(self.ad3.middle, 0)
@@ -127,10 +129,10 @@ class GroupAddressTestCase(unittest.TestCase):
         self.assertEqual(self.ad4.sub, 2)
 
     def test_sub2(self):
-        self.ad1.outFormatLevel = 2
-        self.ad2.outFormatLevel = 2
-        self.ad3.outFormatLevel = 2
-        self.ad4.outFormatLevel = 2
+        self.ad1 = self.ad1.withFormatLevel(2)
+        self.ad2 = self.ad2.withFormatLevel(2)
+        self.ad3 = GroupAddress((1, 2, 3), outFormatLevel=2)
+        self.ad4 = GroupAddress((1, 2), outFormatLevel=2)
         self.assertEqual(self.ad1.sub, 515)
         self.assertEqual(self.ad2.sub, 2)
         self.assertEqual(self.ad3.sub, 515)
@@ -138,8 +140,21 @@ class GroupAddressTestCase(unittest.TestCase):
 
     def test_outFormatLevel(self):
         self.assertEqual(self.ad1.outFormatLevel, 3)
-        with self.assertRaises(GroupAddressValueError):
-            self.ad1.outFormatLevel = 1
-        with self.assertRaises(GroupAddressValueError):
-            self.ad1.outFormatLevel = 4
+        self.assertEqual(self.ad1.withFormatLevel(2).outFormatLevel, 2)
+        with self.assertRaises(GroupAddressValueError):
+            self.ad1.withFormatLevel(1)
+        with self.assertRaises(GroupAddressValueError):
+            GroupAddress("1/2/3", outFormatLevel=4)
+        with self.assertRaises(AttributeError):
+            self.ad1.outFormatLevel = 2
+
+    def test_interned(self):
+        self.assertIs(self.ad1, self.ad3)
+        self.assertIs(GroupAddress.fromRaw(self.ad1.raw), self.ad1)
+        self.assertIsNot(self.ad1.withFormatLevel(2), self.ad1)
+        self.assertEqual(self.ad1.withFormatLevel(2), self.ad1)
+        self.assertIs(copy.deepcopy(self.ad1), self.ad1)
+        self.assertIs(pickle.loads(pickle.dumps(self.ad1)), self.ad1)
+        with self.assertRaises(AttributeError):
+            self.ad1.foo = 1
 
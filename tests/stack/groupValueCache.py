@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.stack.groupValueCache import *
+from pyknyx.stack.layer7.apci import APCI
+from pyknyx.stack.layer7.apdu import APDU
+import time
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class GroupValueCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = GroupValueCache(maxSize=2, maxAge=0.2)
+
+    def tearDown(self):
+        pass
+
+    def _npdu(self, apci, data=b"\x00", size=0):
+        aPDU = APDU.makeGroupValue(apci, data, size)
+        return bytearray((len(aPDU) - 1,)) + aPDU
+
+    def test_constructor(self):
+        with self.assertRaises(GroupValueCacheValueError):
+            GroupValueCache(maxAge=0)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.maxSize, 2)
+
+    def test_groupValueService(self):
+        npdu = self._npdu(APCI.GROUPVALUE_WRITE, b"\x12\x34", 2)
+        self.assertEqual(GroupValueCache.groupValueService(npdu), (APCI.GROUPVALUE_WRITE, npdu[1:]))
+        npdu = self._npdu(APCI.GROUPVALUE_READ)
+        self.assertEqual(GroupValueCache.groupValueService(npdu), (APCI.GROUPVALUE_READ, npdu[1:]))
+        self.assertEqual(GroupValueCache.groupValueService(bytearray(b"\x01\x03\xc0")), (None, None))
+        self.assertEqual(GroupValueCache.groupValueService(bytearray(b"\x01\x40\x80")), (None, None))
+
+    def test_getPut(self):
+        self.assertIsNone(self.cache.get(1))
+        self.cache.put(1, self._npdu(APCI.GROUPVALUE_WRITE, b"\x01")[1:])
+        self.cache.put(2, self._npdu(APCI.GROUPVALUE_RES, b"\x12\x34", 2)[1:])
+        self.assertEqual(self.cache.get(1), self._npdu(APCI.GROUPVALUE_RES, b"\x01")[1:])
+        self.assertEqual(self.cache.get(2), self._npdu(APCI.GROUPVALUE_RES, b"\x12\x34", 2)[1:])
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_lookup(self):
+        self.assertEqual(self.cache.lookup(1), (None, None))
+        self.cache.put(1, self._npdu(APCI.GROUPVALUE_WRITE, b"\x01")[1:], 0x1107)
+        self.cache.put(2, self._npdu(APCI.GROUPVALUE_WRITE, b"\x01")[1:])
+        self.assertEqual(self.cache.lookup(1), (self._npdu(APCI.GROUPVALUE_RES, b"\x01")[1:], 0x1107))
+        self.assertEqual(self.cache.lookup(2)[1], None)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_lru(self):
+        for gad in (1, 2):
+            self.cache.put(gad, self._npdu(APCI.GROUPVALUE_WRITE)[1:])
+        self.cache.get(1)
+        self.cache.put(3, self._npdu(APCI.GROUPVALUE_WRITE)[1:])
+        self.assertIn(1, self.cache)
+        self.assertNotIn(2, self.cache)
+        self.assertIn(3, self.cache)
+
+    def test_maxAge(self):
+        self.cache.put(1, self._npdu(APCI.GROUPVALUE_WRITE)[1:])
+        time.sleep(0.3)
+        self.assertIsNone(self.cache.get(1))
+        self.assertNotIn(1, self.cache)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+    def test_invalidate(self):
+        for gad in (1, 2):
+            self.cache.put(gad, self._npdu(APCI.GROUPVALUE_WRITE)[1:])
+        self.cache.invalidate(1)
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
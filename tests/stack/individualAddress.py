@@ -83,3 +83,8 @@ class IndividualAddressTestCase(unittest.TestCase):
         self.assertEqual(self.ad1.device, 3)
         self.assertEqual(self.ad2.device, 3)
 
+    def test_interned(self):
+        self.assertIs(self.ad1, self.ad2)
+        self.assertIs(IndividualAddress.fromRaw(self.ad4.raw), self.ad4)
+        self.assertIs(IndividualAddress(self.ad3), self.ad3)
+        self.assertEqual((self.ad1 + 1), self.ad3)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.stack.initReader import *
+from pyknyx.stack.groupAddress import GroupAddress
+import threading
+import time
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class FakeGroup(object):
+    """ Group answering (or not) read requests
+    """
+    def __init__(self, gad, test, answers=True):
+        self.gad = GroupAddress(gad)
+        self.test = test
+        self.answers = answers
+        self.reads = []
+        self.reader = None
+
+    def read(self, priority):
+        self.reads.append(time.time())
+        self.test.sent(self)
+
+
+class InitReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.maxOutstanding = 0
+        self.reader = None
+
+    def tearDown(self):
+        if self.reader is not None:
+            self.reader.stop()
+
+    def sent(self, group):
+        with self.lock:
+            self.outstanding += 1
+            self.maxOutstanding = max(self.maxOutstanding, self.outstanding)
+        if group.answers:
+            timer = threading.Timer(0.02, self.answer, (group,))
+            timer.start()
+
+    def answer(self, group):
+        with self.lock:
+            self.outstanding -= 1
+        (group.reader or self.reader).valueReceived(group.gad.raw)
+
+    def test_constructor(self):
+        with self.assertRaises(InitReaderValueError):
+            InitReader([], window=0)
+        with self.assertRaises(InitReaderValueError):
+            InitReader([], rate=0)
+        with self.assertRaises(InitReaderValueError):
+            InitReadBudget(window=0)
+
+    def test_empty(self):
+        done = []
+        self.reader = InitReader([], callback=done.append)
+        self.reader.start()
+        self.assertTrue(self.reader.finished)
+        self.assertEqual(done, [[]])
+
+    def test_window(self):
+        groups = [FakeGroup("1/1/%d" % i, self) for i in range(20)]
+        self.reader = InitReader(groups, window=3, rate=1000., delay=0)
+        self.reader.start()
+        self.assertTrue(self.reader.wait(5))
+        self.assertEqual(self.maxOutstanding, 3)
+        self.assertEqual([len(group.reads) for group in groups], [1] * 20)
+        self.assertEqual(self.reader.remaining, 0)
+        self.assertEqual(self.reader.givenUp, [])
+
+    def test_rate(self):
+        groups = [FakeGroup("1/1/%d" % i, self) for i in range(6)]
+        self.reader = InitReader(groups, window=10, rate=50., delay=0)
+        self.reader.start()
+        self.assertTrue(self.reader.wait(5))
+        reads = sorted(group.reads[0] for group in groups)
+        self.assertGreaterEqual(reads[-1] - reads[0], 5 * 0.02 * 0.9)
+
+    def test_valueReceived(self):
+        groups = [FakeGroup("1/1/%d" % i, self, answers=False) for i in range(3)]
+        self.reader = InitReader(groups, window=1, rate=1000., timeout=5., delay=0.1)
+        for group in groups:
+            self.reader.valueReceived(group.gad.raw)
+        self.reader.start()
+        self.assertTrue(self.reader.wait(1))
+        self.assertEqual([group.reads for group in groups], [[], [], []])
+
+    def test_retry(self):
+        groups = [FakeGroup("1/1/1", self, answers=False), FakeGroup("1/1/2", self)]
+        done = []
+        self.reader = InitReader(groups, rate=1000., timeout=0.05, retries=2, delay=0, callback=done.append)
+        self.reader.start()
+        self.assertTrue(self.reader.wait(5))
+        self.assertEqual(len(groups[0].reads), 3)
+        self.assertEqual(len(groups[1].reads), 1)
+        reads = groups[0].reads
+        self.assertGreater(reads[2] - reads[1], reads[1] - reads[0])
+        self.assertEqual(done, [[groups[0]]])
+        self.assertEqual(self.reader.givenUp, [groups[0]])
+
+    def test_budget(self):
+        budget = InitReadBudget(window=2, rate=100.)
+        groups = [[FakeGroup("1/%d/%d" % (i, j), self) for j in range(5)] for i in range(3)]
+        readers = [InitReader(groups_, budget=budget, delay=0) for groups_ in groups]
+        for reader, groups_ in zip(readers, groups):
+            for group in groups_:
+                group.reader = reader
+        try:
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                self.assertTrue(reader.wait(5))
+        finally:
+            for reader in readers:
+                reader.stop()
+        self.assertEqual(self.maxOutstanding, 2)
+        self.assertEqual(budget.outstanding, 0)
+        reads = sorted(group.reads[0] for groups_ in groups for group in groups_)
+        self.assertGreaterEqual(reads[-1] - reads[0], 14 * 0.01 * 0.9)
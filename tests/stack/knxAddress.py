@@ -37,6 +37,13 @@ class KnxAddressTestCase(unittest.TestCase):
     def test_raw(self):
         self.assertEqual(self.ad2.raw, 8753)
 
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.ad2._raw = 0
+        with self.assertRaises(AttributeError):
+            del self.ad2._raw
+        self.assertEqual(self.ad2.raw, 8753)
+
     def test_lowhigh(self):
         self.assertEqual(self.ad2.low, 0x31)
         self.assertEqual(self.ad2.high, 0x22)
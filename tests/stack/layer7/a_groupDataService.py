@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.stack.layer7.a_groupDataService import *
+from pyknyx.stack.individualAddress import IndividualAddress
+from pyknyx.stack.priority import Priority
 import unittest
 
 # Mute logger
@@ -9,10 +11,26 @@ logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
 
+class TGDS(object):
+
+    def setListener(self, listener):
+        pass
+
+
+class Listener(object):
+
+    def __init__(self):
+        self.written = []
+
+    def onWrite(self, *args):
+        self.written.append(args)
+
+
 class A_GDSTestCase(unittest.TestCase):
 
     def setUp(self):
-        pass
+        self.agds = A_GroupDataService(TGDS())
+        self.agdsFlat = A_GroupDataService(TGDS(), flat=True)
 
     def tearDown(self):
         pass
@@ -20,3 +38,28 @@ class A_GDSTestCase(unittest.TestCase):
     def test_constructor(self):
         pass
 
+    def test_subscribe(self):
+        group = self.agds.subscribe("1/2/3", Listener())
+        self.assertIs(self.agds.subscribe(GroupAddress("1/2/3"), Listener()), group)
+        self.assertEqual(list(self.agds.rawGroups.keys()), [GroupAddress("1/2/3").raw])
+        self.assertEqual(self.agds.groupAddresses, set([GroupAddress("1/2/3").raw]))
+        monitor = self.agds.subscribe("0/0/0", Listener())
+        self.assertEqual(self.agds.monitors, [monitor])
+        self.assertEqual(self.agds.groups, {"1/2/3": group, "0/0/0": monitor})
+        self.assertIsNone(self.agds.groupAddresses)
+        with self.assertRaises(TypeError):
+            self.agds.groups["1/2/4"] = group
+        with self.assertRaises(TypeError):
+            self.agds.rawGroups[GroupAddress("1/2/4").raw] = group
+
+    def test_groupDataInd(self):
+        aPDU = APDU.makeGroupValue(APCI.GROUPVALUE_WRITE, b"\x01", 0)
+        for agds in (self.agds, self.agdsFlat):
+            listener = Listener()
+            monitorListener = Listener()
+            agds.subscribe("1/2/3", listener)
+            agds.subscribe("0/0/0", monitorListener)
+            agds.groupDataInd(IndividualAddress("1.1.1"), GroupAddress("1/2/3"), Priority(), aPDU)
+            agds.groupDataInd(IndividualAddress("1.1.1"), GroupAddress("1/2/4"), Priority(), aPDU)
+            self.assertEqual(len(listener.written), 1)
+            self.assertEqual(len(monitorListener.written), 2)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.stack.multicastSocket import *
+import os
 import unittest
 
 # Mute logger
@@ -12,11 +13,34 @@ logging.getLogger("pyknyx").setLevel(logging.ERROR)
 class MulticastSocketTestCase(unittest.TestCase):
 
     def setUp(self):
-        pass
+        port = 20000 + os.getpid() % 20000
+        self.transmitter = MulticastSocketTransmit("0.0.0.0", 0, "224.55.36.72", port)
+        self.receiver = MulticastSocketReceive("0.0.0.0", port, "224.55.36.72", port, timeout=0)
 
     def tearDown(self):
-        pass
+        self.transmitter.close()
+        self.receiver.close()
 
     def test_constructor(self):
-        pass
-
+        with self.assertRaises(McastSockValueError):
+            MulticastSocketReceive("0.0.0.0", 0, "192.168.1.1", 0)
+
+    def test_receiveBatch(self):
+        buffers = [bytearray(RECV_BUFFER_SIZE) for i in range(4)]
+        for i in range(6):
+            self.transmitter.transmit(b"data %d" % i)
+        batch = self.receiver.receiveBatch(buffers, timeout=1)
+        self.assertEqual(len(batch), 4)
+        self.assertEqual([bytes(buffer_[:length]) for buffer_, length, address in batch],
+                         [b"data %d" % i for i in range(4)])
+        batch = self.receiver.receiveBatch(buffers, timeout=1)
+        self.assertEqual([bytes(buffer_[:length]) for buffer_, length, address in batch], [b"data 4", b"data 5"])
+        self.assertEqual(self.receiver.receiveBatch(buffers, timeout=0), [])
+
+    def test_truncated(self):
+        buffers = [bytearray(8)]
+        self.transmitter.transmit(b"0123456789")
+        self.transmitter.transmit(b"short")
+        batch = self.receiver.receiveBatch(buffers, timeout=1)
+        self.assertEqual([bytes(buffer_[:length]) for buffer_, length, address in batch], [b"short"])
+        self.assertEqual(self.receiver.truncated, 1)
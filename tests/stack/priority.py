@@ -47,3 +47,15 @@ class PriorityTestCase(unittest.TestCase):
         self.assertEqual(self.priority6.name, 'normal')
         self.assertEqual(self.priority7.name, 'urgent')
         self.assertEqual(self.priority8.name, 'low')
+
+    def test_singleton(self):
+        self.assertIs(self.priority1, self.priority5)
+        self.assertIs(Priority(self.priority2), self.priority2)
+        self.assertIs(Priority(), self.priority4)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.priority8._level = 0
+        with self.assertRaises(AttributeError):
+            del self.priority8._level
+        self.assertEqual(Priority('low').name, 'low')
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.stack.priorityQueue import *
+from pyknyx.stack.priority import Priority
+from pyknyx.services.metrics import MetricsRegistry
+import asyncio
+import threading
 import unittest
 
 # Mute logger
@@ -12,11 +16,125 @@ logging.getLogger("pyknyx").setLevel(logging.ERROR)
 class PriorityQueueTestCase(unittest.TestCase):
 
     def setUp(self):
-        pass
+        self.queue = PriorityQueue((-1, 3, 2, 1))
 
     def tearDown(self):
         pass
 
     def test_constructor(self):
-        pass
+        with self.assertRaises(PriorityQueueValueError):
+            PriorityQueue((-1,))
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.depths, (0, 0, 0, 0))
+
+    def test_levels(self):
+        self.queue.add("low", Priority('low'))
+        self.queue.add("normal", Priority('normal'))
+        self.assertEqual(self.queue.depths, (0, 1, 0, 1))
+        self.assertEqual(len(self.queue), 2)
+
+    def test_fifo(self):
+        for i in range(5):
+            self.queue.add(i, Priority('normal'))
+        self.assertEqual([self.queue.remove() for i in range(5)], list(range(5)))
+
+    def test_distribution(self):
+        for i in range(5):
+            self.queue.add("n%d" % i, Priority('normal'))
+        for i in range(3):
+            self.queue.add("u%d" % i, Priority('urgent'))
+        for i in range(2):
+            self.queue.add("l%d" % i, Priority('low'))
+        for i in range(2):
+            self.queue.add("s%d" % i, Priority('system'))
+        order = [self.queue.remove() for i in range(12)]
+        self.assertEqual(order, ["s0", "s1", "n0", "n1", "n2", "u0", "u1", "l0", "n3", "n4", "u2", "l1"])
+        self.assertEqual(len(self.queue), 0)
+
+    def test_drainUpTo(self):
+        for i in range(5):
+            self.queue.add("n%d" % i, Priority('normal'))
+        for i in range(3):
+            self.queue.add("u%d" % i, Priority('urgent'))
+        self.assertEqual(self.queue.drainUpTo(4), ["n0", "n1", "n2", "u0"])
+        self.assertEqual(self.queue.drainUpTo(10), ["u1", "n3", "n4", "u2"])
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.drainUpTo(10, block=False), [])
+
+    def test_metrics(self):
+        registry = MetricsRegistry()
+        registry.enable()
+        registry.reset()
+        try:
+            queue = PriorityQueue((-1, 3, 2, 1), "test")
+            queue.add("n0", Priority('normal'))
+            queue.addMany([("n1", Priority('normal')), ("l0", Priority('low'))])
+            self.assertIn('pyknyx_queue_depth{queue="test",level="1"} 2', registry.exposition())
+            self.assertEqual(queue.remove(), "n0")
+            self.assertEqual(queue.drainUpTo(10), ["n1", "l0"])
+            self.assertEqual(registry.get("pyknyx_queue_wait_seconds").labels("test").count, 3)
+        finally:
+            registry.disable()
+
+    def test_metricsEnabledLater(self):
+        registry = MetricsRegistry()
+        registry.reset()
+        wait = registry.get("pyknyx_queue_wait_seconds").labels("test")
+        queue = PriorityQueue((-1, 3, 2, 1), "test")  # created before metrics are enabled
+        queue.add("n0", Priority('normal'))
+        registry.enable()
+        try:
+            queue.add("n1", Priority('normal'))
+            queue.addMany([("n2", Priority('normal'))])
+            self.assertEqual(queue.drainUpTo(10), ["n0", "n1", "n2"])
+            self.assertEqual(wait.count, 2)
+            queue.add("n3", Priority('normal'))
+        finally:
+            registry.disable()
+        self.assertEqual(queue.remove(), "n3")
+        queue.add("n4", Priority('normal'))
+        self.assertEqual(queue.remove(), "n4")
+        self.assertEqual(wait.count, 2)
+
+    def test_blocking(self):
+        result = []
+        thread = threading.Thread(target=lambda: result.extend(self.queue.drainUpTo(10)))
+        thread.start()
+        self.queue.add("s0", Priority('system'))
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(result, ["s0"])
+
+
+class AsyncPriorityQueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.calls = 0
+        self.result = []
+        self.queue = AsyncPriorityQueue((-1, 3, 2, 1), self.loop, self._consumer)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _consumer(self):
+        self.calls += 1
+        self.result.extend(self.queue.drainNowait(2))
+        if not len(self.queue):
+            self.loop.stop()
+
+    def test_consumer(self):
+        for i in range(3):
+            self.queue.add("n%d" % i, Priority('normal'))
+        self.queue.addMany([("u0", Priority('urgent')), ("s0", Priority('system'))])
+        self.loop.run_forever()
+        self.assertEqual(self.result, ["s0", "n0", "n1", "n2", "u0"])
+        self.assertEqual(self.calls, 3)
 
+    def test_threadsafe(self):
+        thread = threading.Thread(target=lambda: self.queue.add("s0", Priority('system')))
+        thread.start()
+        thread.join(1)
+        self.loop.run_forever()
+        self.assertEqual(self.result, ["s0"])
+        self.assertEqual(self.calls, 1)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.stack.stack import *
+from pyknyx.core.ets import ETS
 import unittest
 
 # Mute logger
@@ -12,7 +13,7 @@ logging.getLogger("pyknyx").setLevel(logging.ERROR)
 class StackTestCase(unittest.TestCase):
 
     def setUp(self):
-        pass
+        self.ets = ETS("1.2.0", addrRange=16, transCls=None)
 
     def tearDown(self):
         pass
@@ -20,3 +21,13 @@ class StackTestCase(unittest.TestCase):
     def test_constructor(self):
         pass
 
+    def test_initReadBudget(self):
+        stacks = [Stack(self.ets, "1.2.%d" % i) for i in (1, 2)]
+        stacks.append(Stack(self.ets, "1.2.3", initReadParams=dict(window=8)))
+        for stack in stacks:
+            stack.start()
+            stack.stop()
+        self.assertIs(stacks[0].initReader.budget, self.ets.initReadBudget)
+        self.assertIs(stacks[1].initReader.budget, self.ets.initReadBudget)
+        self.assertEqual(stacks[2].initReader.budget.window, 8)
+
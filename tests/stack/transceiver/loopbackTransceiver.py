@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.stack.transceiver.loopbackTransceiver import *
+from pyknyx.core.ets import ETS
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.tools.testing import RecordingUnicast, makeCEMI
+import time
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class LoopbackTransceiverTestCase(unittest.TestCase):
+
+    def _network(self, size=3, **kwargs):
+        self.bus = LoopbackBus(**kwargs)
+        self.etss = []
+        self.devices = []
+        for i in range(size):
+            ets = ETS("1.%d.0" % (i + 1), addrRange=16, transCls=LoopbackTransceiver, transParams=dict(bus=self.bus))
+            self.etss.append(ets)
+            self.devices.append(RecordingUnicast(ets))
+
+    def tearDown(self):
+        self.bus.close()
+
+    def _send(self, index, dest="1/1/1", npdu=b'\x01\x00\x80'):
+        self.devices[index].dataReq(makeCEMI(dest, npdu, src=self.devices[index].physAddr))
+
+    def test_constructor(self):
+        with self.assertRaises(LoopbackTransceiverValueError):
+            LoopbackBus(loss=2)
+        self.bus = LoopbackBus()
+        with self.assertRaises(LoopbackTransceiverValueError):
+            ETS("1.1.0", transCls=LoopbackTransceiver, transParams={})
+        with self.assertRaises(LoopbackTransceiverValueError):
+            self.bus.run()
+
+    def test_deterministic(self):
+        self._network(deterministic=True)
+        self._send(0)
+        self.assertEqual(self.bus.run(), 2)
+        self.assertEqual([len(device.received) for device in self.devices], [0, 1, 1])
+        self.assertEqual(self.devices[1].received[0].destinationAddress, GroupAddress("1/1/1"))
+        self.assertEqual((self.bus.sent, self.bus.delivered, self.bus.lost), (1, 2, 0))
+
+        # Individual frame
+        self._send(2, dest=str(self.devices[0].physAddr))
+        self.bus.run()
+        self.assertEqual([len(device.received) for device in self.devices], [1, 1, 1])
+
+    def test_latency(self):
+        self._network(latency=0.01, deterministic=True)
+        self._send(0)
+        self.assertEqual(self.bus.advance(0.005), 0)
+        self.assertEqual(self.bus.pending, 2)
+        self.assertEqual(self.bus.advance(0.01), 2)
+        self.assertAlmostEqual(self.bus.now, 0.015)
+        self.assertEqual([len(device.received) for device in self.devices], [0, 1, 1])
+
+    def test_jitter(self):
+        self._network(size=2, latency=0.01, jitter=0.05, seed=1, deterministic=True)
+        for i in range(20):
+            self._send(0, dest="1/1/%d" % i)
+            self.bus.advance(0.001)
+        self.bus.run()
+        self.assertEqual([str(cEMI.destinationAddress) for cEMI in self.devices[1].received],
+                         ["1/1/%d" % i for i in range(20)])
+
+    def test_loss(self):
+        results = []
+        for i in range(2):
+            self._network(loss=0.5, seed=1, deterministic=True)
+            for j in range(100):
+                self._send(0, dest="1/1/%d" % j)
+            self.bus.run()
+            self.assertEqual(self.bus.delivered + self.bus.lost, 200)
+            self.assertTrue(0 < self.bus.lost < 200)
+            results.append([[str(cEMI.destinationAddress) for cEMI in device.received] for device in self.devices])
+            self.bus.close()
+        self.assertEqual(results[0], results[1])
+
+    def test_realTime(self):
+        self._network(size=2)
+        self._send(0)
+        self.etss[0].processPending()
+        self.assertEqual(self.etss[1].processPending(), 1)
+        self.assertEqual(len(self.devices[1].received), 1)
+
+        self.bus.close()
+        self._network(size=2, latency=0.02)
+        self._send(0)
+        self.etss[0].processPending()
+        self.assertEqual(self.bus.pending, 1)
+        for i in range(100):
+            if self.etss[1].processPending():
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(self.devices[1].received), 1)
+
+    def test_stop(self):
+        self._network(deterministic=True)
+        self.etss[2].transceiver.stop()
+        self._send(0)
+        self.bus.run()
+        self.assertEqual([len(device.received) for device in self.devices], [0, 1, 0])
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.stack.transceiver.replayTransceiver import *
+from pyknyx.core.ets import ETS
+from pyknyx.services.telegramCapture import TelegramCaptureWriter
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.tools.testing import RecordingUnicast, makeCEMI
+import os
+import shutil
+import tempfile
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+T0 = 1500000000.
+
+
+class ReplayTransceiverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "test.cap")
+        writer = TelegramCaptureWriter(self.path)
+        for i in range(50):
+            writer.write(makeCEMI("1/1/%d" % (i % 5)), T0 + i * 0.002)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _ets(self, **kwargs):
+        kwargs["path"] = self.path
+        self.ets = ETS("1.2.0", addrRange=16, transCls=ReplayTransceiver, transParams=kwargs)
+        self.device = RecordingUnicast(self.ets)
+        return self.ets.transceiver
+
+    def test_constructor(self):
+        with self.assertRaises(ReplayTransceiverValueError):
+            ETS("1.2.0", transCls=ReplayTransceiver, transParams={})
+        with self.assertRaises(ReplayTransceiverValueError):
+            self._ets(speed=0)
+        self.assertEqual(self._ets().formatReport(), "no replay")
+
+    def test_fast(self):
+        replay = self._ets(speed=None)
+        report = replay.run()
+        self.assertEqual(report['frames'], 50)
+        self.assertEqual(report['maxBacklog'], 50)
+        self.assertIsNone(report['lag'])
+        self.assertFalse(report['interrupted'])
+        self.assertAlmostEqual(report['captureDuration'], 0.098)
+        self.ets.processPending()
+        self.assertEqual(len(self.device.received), 50)
+        self.assertEqual(self.device.received[0].destinationAddress, GroupAddress("1/1/0"))
+
+    def test_backPressure(self):
+        replay = self._ets(speed=None, maxPending=10)
+        replay.start()
+        while replay.wait(0.001) is None:
+            self.ets.processPending()
+        self.ets.processPending()
+        self.assertEqual(replay.report['frames'], 50)
+        self.assertLessEqual(replay.report['maxBacklog'], 10)
+        self.assertEqual(len(self.device.received), 50)
+
+    def test_speed(self):
+        replay = self._ets(speed=2., start=T0 + 0.05, gad=GroupAddress("1/1/1").raw)
+        report = replay.run()
+        self.assertEqual(report['frames'], 5)
+        self.assertGreaterEqual(report['duration'], 0.04 / 2)
+        self.assertIsNotNone(report['lag99'])
+        self.assertIn("5 frames replayed", replay.formatReport())
+
+    def test_stop(self):
+        replay = self._ets(speed=1e-3)
+        replay.start()
+        replay.stop()
+        report = replay.wait(5)
+        self.assertTrue(report['interrupted'])
+        self.assertLess(report['frames'], 50)
+
+    def test_ets(self):
+        replay = self._ets(speed=None)
+        self.ets.start()
+        try:
+            report = replay.wait(5)
+        finally:
+            self.ets.stop()
+        self.assertEqual(report['frames'], 50)
+        self.assertEqual(len(self.device.received), 50)
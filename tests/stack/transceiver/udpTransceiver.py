@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
 from pyknyx.stack.transceiver.udpTransceiver import *
+from pyknyx.core.ets import ETS
+from pyknyx.services.metrics import MetricsRegistry
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.multicastSocket import MulticastSocketReceive, MulticastSocketTransmit, RECV_BUFFER_SIZE
+from pyknyx.tools.testing import makeCEMI
+import os
+import time
 import unittest
 
 # Mute logger
@@ -8,15 +15,124 @@ from pyknyx.services.logger import logging
 logger = logging.getLogger(__name__)
 logging.getLogger("pyknyx").setLevel(logging.ERROR)
 
+MCAST_ADDR = "224.55.36.74"
+
+
+class RecordingETS(ETS):
+    """ ETS recording the frames handed by the transceivers, instead of routing them
+    """
+    def __init__(self, *args, **kwargs):
+        super(RecordingETS, self).__init__(*args, **kwargs)
+        self.batches = []
+
+    def putFrame(self, l2, cEMI):
+        self.batches.append([cEMI])
+
+    def putFrames(self, l2, cEMIs):
+        self.batches.append(list(cEMIs))
+
+    @property
+    def frames(self):
+        return [cEMI for batch in self.batches for cEMI in batch]
+
+
+def _datagram(cEMI, service=KNXnetIPHeader.ROUTING_IND):
+    raw = bytes(cEMI.frame.raw)
+    return bytes(KNXnetIPHeader(service=service, serviceLength=len(raw)).frame) + raw
+
 
 class UDPTransceiverTestCase(unittest.TestCase):
 
     def setUp(self):
-        pass
+        self.port = 20000 + (os.getpid() + 7) % 20000
+        self.ets = RecordingETS("1.2.0", addrRange=16, transCls=None)
+        self.sender = MulticastSocketTransmit("0.0.0.0", 0, MCAST_ADDR, self.port)
+        self.registry = MetricsRegistry()
+        self.registry.enable()
+        self.registry.reset()
+        self.tc = None
 
     def tearDown(self):
-        pass
+        self.registry.disable()
+        if self.tc is not None:
+            self.tc.stop()
+        self.sender.close()
+
+    def _start(self, **kwargs):
+        self.tc = UDPTransceiver(self.ets, mcastAddr=MCAST_ADDR, mcastPort=self.port, **kwargs)
+        self.tc.start()
+
+    def _wait(self, count):
+        end = time.time() + 2.
+        while len(self.ets.frames) < count and time.time() < end:
+            time.sleep(0.01)
+
+    def _ignored(self, reason):
+        return self.registry.get("pyknyx_udp_ignored_total").labels(reason).value
+
+    def _check(self):
+        valid = makeCEMI("1/1/1")
+        last = makeCEMI("1/1/2", npdu=b"\x01\x00\x80")
+        self.tc._transmitterSock.transmit(_datagram(makeCEMI("1/1/3")))
+        self.sender.transmit(_datagram(valid))
+        self.sender.transmit(b"\x06\x10\x05")
+        self.sender.transmit(_datagram(valid)[:-1])
+        self.sender.transmit(bytes(KNXnetIPHeader(service=KNXnetIPHeader.ROUTING_IND, serviceLength=2).frame) +
+                             b"\x29\x00")
+        self.sender.transmit(_datagram(valid, service=KNXnetIPHeader.SEARCH_REQ))
+        self.sender.transmit(_datagram(last))
+        self._wait(2)
+
+        self.assertEqual([cEMI.destinationAddress for cEMI in self.ets.frames], [GroupAddress("1/1/1"),
+                                                                                  GroupAddress("1/1/2")])
+        self.assertEqual(bytes(self.ets.frames[0].frame.raw), bytes(valid.frame.raw))
+        self.assertEqual(bytes(self.ets.frames[1].frame.raw), bytes(last.frame.raw))
+        self.assertEqual(self._ignored("self_echo"), 1)
+        self.assertEqual(self._ignored("malformed_header"), 2)
+        self.assertEqual(self._ignored("malformed_cemi"), 1)
+        self.assertEqual(self._ignored("other_service"), 1)
+        self.assertEqual(self.registry.get("pyknyx_udp_frames_total").labels("rx").value, 2)
+
+    def test_batchReceive(self):
+        self._start()
+        self.sender.transmit(b"\x06" * (RECV_BUFFER_SIZE + 10))
+        self._check()
+        self.assertEqual(self.tc.rxOverruns, 1)
+
+    def test_batch(self):
+        self.tc = UDPTransceiver(self.ets, mcastAddr=MCAST_ADDR, mcastPort=self.port, rcvBufSize=4096)
+        for i in range(200):  # queued in the kernel until started; most are dropped
+            self.sender.transmit(_datagram(makeCEMI(GroupAddress.fromRaw(i + 1))))
+        self.tc.start()
+        time.sleep(0.1)
+        self.sender.transmit(_datagram(makeCEMI("1/1/1")))
+        end = time.time() + 2.
+        while GroupAddress("1/1/1") not in [cEMI.destinationAddress for cEMI in self.ets.frames] and time.time() < end:
+            time.sleep(0.01)
+
+        frames = self.ets.frames[:-1]
+        self.assertTrue(0 < len(frames) < 200)
+        self.assertLess(len(self.ets.batches), len(frames) + 1)
+        self.assertEqual([cEMI.destinationAddress.raw for cEMI in frames], list(range(1, len(frames) + 1)))
+        if self.tc._receiverSock._rxqOvfl:
+            self.assertEqual(self.tc.rxDropped, 200 - len(frames))
 
-    def test_constructor(self):
-        pass
+    def test_receive(self):
+        self._start(recvBatch=0)
+        self._check()
 
+    def test_transmit(self):
+        self._start()
+        receiver = MulticastSocketReceive("0.0.0.0", self.port, MCAST_ADDR, self.port, timeout=0)
+        try:
+            cEMI = makeCEMI("1/1/1")
+            self.tc.dataInd(cEMI)
+            batch = receiver.receiveBatch([bytearray(RECV_BUFFER_SIZE)], timeout=1)
+            self.assertEqual([bytes(buffer_[:length]) for buffer_, length, address in batch], [_datagram(cEMI)])
+            end = time.time() + 2.
+            while not self._ignored("self_echo") and time.time() < end:
+                time.sleep(0.01)
+            self.assertEqual(self._ignored("self_echo"), 1)
+            self.assertEqual(self.ets.frames, [])
+        finally:
+            receiver.close()
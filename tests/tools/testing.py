@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from pyknyx.tools.testing import *
+from pyknyx.core.ets import ETS
+from pyknyx.stack.cemi.cemiLData import CEMILData
+from pyknyx.stack.groupAddress import GroupAddress
+from pyknyx.stack.individualAddress import IndividualAddress
+import unittest
+
+# Mute logger
+from pyknyx.services.logger import logging
+logger = logging.getLogger(__name__)
+logging.getLogger("pyknyx").setLevel(logging.ERROR)
+
+
+class TestingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ets = ETS("1.2.0", addrRange=16, transCls=None)
+
+    def tearDown(self):
+        pass
+
+    def test_makeCEMI(self):
+        cEMI = makeCEMI("1/2/3")
+        self.assertEqual(cEMI.messageCode, CEMILData.MC_LDATA_IND)
+        self.assertEqual(cEMI.sourceAddress, IndividualAddress("1.1.1"))
+        self.assertEqual(cEMI.destinationAddress, GroupAddress("1/2/3"))
+        self.assertEqual(cEMI.hopCount, 6)
+        self.assertEqual(cEMI.npdu, b'\x01\x00\x81')
+        cEMI = makeCEMI(IndividualAddress("1.2.3"), b'\x00\x80', src="1.1.2", hopCount=0, mc=CEMILData.MC_LDATA_REQ)
+        self.assertEqual(cEMI.messageCode, CEMILData.MC_LDATA_REQ)
+        self.assertEqual(cEMI.sourceAddress, IndividualAddress("1.1.2"))
+        self.assertEqual(cEMI.destinationAddress, IndividualAddress("1.2.3"))
+        self.assertEqual(cEMI.hopCount, 0)
+        self.assertEqual(makeCEMI("1.2.3").destinationAddress, IndividualAddress("1.2.3"))
+
+    def test_recording(self):
+        source = RecordingBroadcast(self.ets)
+        device = RecordingUnicast(self.ets)
+        cEMI = makeCEMI(device.physAddr)
+        self.ets.processFrame(source, cEMI)
+        self.assertEqual(device.received, [cEMI])
+        self.assertEqual(source.received, [])